@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 생성 결과 스키마 검증
+Gemini가 만든 시나리오 JSON을 게임이 기대하는 구조로 검증하고, 스탯 변화를
+프롬프트가 요청한 범위로 잘라 정규화합니다. 구조가 틀리면 어느 필드가 문제인지 알려 줍니다.
+응답 텍스트에서 JSON 객체를 찾는 것은 한 번의 순회로 괄호 균형을 추적하는 JsonObjectExtractor가 맡습니다.
+"""
+
+import json
+import math
+import re
+from typing import Dict, Optional
+
+
+# 스탯 변화 허용 범위 (프롬프트의 응답 형식과 같음)
+STAT_LIMITS = {
+    'reputation': 30,
+    'budget': 40,
+    'staff_morale': 30,
+    'project_success': 30,
+    'stress': 30,
+    'wellbeing': 30,
+}
+
+# 시나리오당 선택지 수 (프롬프트는 4개를 요청, 최소 2개는 있어야 선택이 성립)
+MIN_CHOICES = 2
+MAX_CHOICES = 4
+
+
+# 문자열 밖에서 의미 있는 문자 / 문자열 안에서 의미 있는 문자
+_STRUCTURAL = re.compile(r'[{}"]')
+_IN_STRING = re.compile(r'["\\]')
+
+
+class JsonObjectExtractor:
+    """텍스트에서 가장 바깥쪽의 균형 잡힌 JSON 객체를 찾는 증분 추출기
+
+    feed로 청크를 이어 붙이면 지난번에 멈춘 위치부터 이어서 훑으므로, 스트리밍 응답도
+    전체를 다시 읽지 않고 한 번만 순회합니다. 코드 블록 표시나 앞뒤 설명 문장은 객체 밖이라
+    자연히 무시됩니다. 균형이 맞았지만 JSON으로 읽을 수 없는 부분은 건너뛰고 다음 객체를 찾습니다.
+    """
+
+    __slots__ = ('_text', '_pos', '_start', '_depth', '_in_string', 'result')
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self.result: Optional[Dict] = None
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        """청크를 추가하고, 객체가 완성되었으면 파싱한 딕셔너리 반환 (아직이면 None)"""
+        if self.result is not None:
+            return self.result
+        self._text += chunk
+        text = self._text
+        pos = self._pos
+        while True:
+            if self._in_string:
+                match = _IN_STRING.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                if match.group() == '\\':
+                    if match.end() >= len(text):
+                        # 이스케이프 대상 문자가 다음 청크에 있음
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                pos = len(text)
+                break
+            char = match.group()
+            pos = match.end()
+            if self._start < 0:
+                # 객체 시작 전의 문자열/닫는 괄호는 설명 문장의 일부
+                if char == '{':
+                    self._start = match.start()
+                    self._depth = 1
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        data = json.loads(text[self._start:pos])
+                    except json.JSONDecodeError:
+                        data = None
+                    self._start = -1
+                    if isinstance(data, dict):
+                        self.result = data
+                        break
+        self._pos = pos
+        return self.result
+
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    """텍스트에서 첫 번째로 읽을 수 있는 가장 바깥쪽 JSON 객체 추출 (없으면 None)"""
+    return JsonObjectExtractor().feed(text)
+
+
+class ScenarioValidationError(ValueError):
+    """AI 생성 결과가 스키마에 맞지 않음 (field: 문제가 된 필드 경로)"""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(f"{field}: {message}")
+        self.field = field
+
+
+def _require_text(data: Dict, key: str, field: str) -> str:
+    value = data.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise ScenarioValidationError(field, "비어 있지 않은 문자열이어야 합니다")
+    return value.strip()
+
+
+def clamp_stat_changes(stats, field: str = 'stats') -> Dict[str, int]:
+    """스탯 변화 딕셔너리를 허용 범위의 정수로 정규화 (알 수 없는 스탯은 제외)"""
+    if stats is None:
+        return {}
+    if not isinstance(stats, dict):
+        raise ScenarioValidationError(field, "객체여야 합니다")
+
+    clamped = {}
+    for stat, limit in STAT_LIMITS.items():
+        if stat not in stats:
+            continue
+        value = stats[stat]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ScenarioValidationError(f"{field}.{stat}", "숫자여야 합니다")
+        # json.loads는 NaN/Infinity도 받아들이므로 유한한 값만 허용
+        if not math.isfinite(value):
+            raise ScenarioValidationError(f"{field}.{stat}", "유한한 숫자여야 합니다")
+        clamped[stat] = max(-limit, min(limit, int(round(value))))
+    return clamped
+
+
+def validate_scenario(data) -> Dict:
+    """AI 시나리오를 검증하여 정규화된 새 딕셔너리 반환
+
+    선택지는 최대 MAX_CHOICES개까지 사용하고, 결과에는 message와 스탯 변화만 남깁니다
+    (advance_time/next는 호출자가 붙임).
+
+    Raises:
+        ScenarioValidationError: 필수 필드가 없거나 형식이 틀린 경우
+    """
+    if not isinstance(data, dict):
+        raise ScenarioValidationError('$', "JSON 객체여야 합니다")
+
+    title = _require_text(data, 'title', 'title')
+    description = _require_text(data, 'description', 'description')
+
+    choices = data.get('choices')
+    if not isinstance(choices, list) or len(choices) < MIN_CHOICES:
+        raise ScenarioValidationError('choices', f"선택지가 {MIN_CHOICES}개 이상인 배열이어야 합니다")
+
+    normalized_choices = []
+    for i, choice in enumerate(choices[:MAX_CHOICES]):
+        field = f"choices[{i}]"
+        if not isinstance(choice, dict):
+            raise ScenarioValidationError(field, "객체여야 합니다")
+        result = choice.get('result')
+        if not isinstance(result, dict):
+            raise ScenarioValidationError(f"{field}.result", "객체여야 합니다")
+        normalized_choices.append({
+            'text': _require_text(choice, 'text', f"{field}.text"),
+            'result': {
+                'message': _require_text(result, 'message', f"{field}.result.message"),
+                'stats': clamp_stat_changes(result.get('stats'), f"{field}.result.stats")
+            }
+        })
+
+    return {'title': title, 'description': description, 'choices': normalized_choices}
+
+
+def validate_free_form_result(data) -> Dict:
+    """자유 입력 결과를 검증하여 정규화된 새 딕셔너리 반환
+
+    success는 불리언이어야 하고 message는 필수입니다. 실패(success: false)한 행동은
+    스탯 변화가 없으므로 stats를 비웁니다.
+
+    Raises:
+        ScenarioValidationError: 필수 필드가 없거나 형식이 틀린 경우
+    """
+    if not isinstance(data, dict):
+        raise ScenarioValidationError('$', "JSON 객체여야 합니다")
+
+    success = data.get('success')
+    if not isinstance(success, bool):
+        raise ScenarioValidationError('success', "true 또는 false여야 합니다")
+
+    return {
+        'success': success,
+        'message': _require_text(data, 'message', 'message'),
+        'stats': clamp_stat_changes(data.get('stats'), 'stats') if success else {}
+    }
@@ -8,6 +8,8 @@ import random
 from collections import Counter
 from typing import Dict, List
 
+from koica_game import DIRECTOR_TYPES, score_director_types
+
 
 def determine_director_type(
     reputation: int,
@@ -23,250 +25,21 @@ def determine_director_type(
     risk_taking: int,
     total_choices: int
 ) -> str:
-    """소장 유형 결정 로직 (koica_game.py의 _determine_director_types 로직 복제)
+    """소장 유형 결정 로직 (koica_game.score_director_types 점수 기준)
 
     점수 기반 시스템으로 12개 유형의 확률을 균등하게 배분합니다.
     """
-
-    work_stats = {
-        'reputation': reputation,
-        'budget': budget_execution_rate,
-        'staff': staff_morale,
-        'project': project_success
-    }
-
-    # 가장 높은 스탯 찾기
-    max_stat = max(work_stats.values()) if work_stats.values() else 50
-    max_stat_name = max(work_stats, key=work_stats.get)
-
-    # 스탯 균형도 계산
-    stat_values = list(work_stats.values())
-    avg_stat = sum(stat_values) / len(stat_values) if stat_values else 50
-    variance = sum((v - avg_stat) ** 2 for v in stat_values) / len(stat_values) if stat_values else 0
-
-    # 플레이 스타일 분석
-    risk_ratio = risk_taking / total_choices if total_choices > 0 else 0
-
-    # 가장 중점을 둔 영역 찾기
-    focus_areas = {
-        'reputation': reputation_focused,
-        'budget': budget_focused,
-        'staff': staff_focused,
-        'project': project_focused
-    }
-    max_focus = max(focus_areas.values()) if focus_areas.values() else 0
-    most_focused = max(focus_areas, key=focus_areas.get) if max_focus > 0 else None
-
-    # === 점수 기반 유형 결정 (12개 유형) ===
-    type_scores = {}
-
-    # 1. 혁신적인 소장 - 높은 위험 감수 + 우수한 성과
-    score = 0
-    if risk_ratio > 0.45:
-        score += 50
-    elif risk_ratio > 0.35:
-        score += 30
-    elif risk_ratio > 0.25:
-        score += 10
-    if max_stat >= 70:
-        score += 30
-    elif max_stat >= 60:
-        score += 20
-    elif max_stat >= 50:
-        score += 10
-    type_scores["혁신적인 소장"] = score
-
-    # 2. 여유로운 소장 - 높은 웰빙 + 낮은 스트레스
-    score = 0
-    if wellbeing >= 70:
-        score += 40
-    elif wellbeing >= 60:
-        score += 25
-    elif wellbeing >= 50:
-        score += 10
-    if stress <= 30:
-        score += 40
-    elif stress <= 40:
-        score += 25
-    elif stress <= 50:
-        score += 10
-    if avg_stat >= 50:
-        score += 20
-    type_scores["여유로운 소장"] = score
-
-    # 3. 헌신적인 소장 - 높은 스트레스 + 높은 성과 (조건 더 완화)
-    score = 0
-    if stress >= 65:
-        score += 40
-    elif stress >= 55:
-        score += 30
-    elif stress >= 45:
-        score += 20
-    if avg_stat >= 60:
-        score += 40
-    elif avg_stat >= 50:
-        score += 30
-    elif avg_stat >= 40:
-        score += 20
-    type_scores["헌신적인 소장"] = score
-
-    # 4. 균형잡힌 소장 - 낮은 분산 + 좋은 평균 (조건 더 완화)
-    score = 0
-    if variance < 250:
-        score += 45
-    elif variance < 350:
-        score += 35
-    elif variance < 450:
-        score += 25
-    elif variance < 600:
-        score += 15
-    if avg_stat >= 50:
-        score += 40
-    elif avg_stat >= 40:
-        score += 30
-    elif avg_stat >= 30:
-        score += 20
-    type_scores["균형잡힌 소장"] = score
-
-    # 5. 온화한 소장 - 직원 중심 + 낮은 스트레스 (점수 상향)
-    score = 0
-    if most_focused == 'staff':
-        score += 32
-    if staff_focused >= 5:
-        score += 30
-    elif staff_focused >= 3:
-        score += 18
-    if stress <= 40:
-        score += 30
-    elif stress <= 55:
-        score += 18
-    if work_stats['staff'] >= 60:
-        score += 20
-    type_scores["온화한 소장"] = score
-
-    # 6. 사람 중심 소장 - 직원 만족도 우선
-    score = 0
-    if most_focused == 'staff':
-        score += 35
-    if staff_focused >= 5:
-        score += 35
-    elif staff_focused >= 3:
-        score += 20
-    elif staff_focused >= 1:
-        score += 10
-    if work_stats['staff'] >= 65:
-        score += 30
-    elif work_stats['staff'] >= 55:
-        score += 20
-    elif work_stats['staff'] >= 45:
-        score += 10
-    type_scores["사람 중심 소장"] = score
-
-    # 7. 신중한 외교가 - 평판 중심 + 낮은 위험
-    score = 0
-    if most_focused == 'reputation':
-        score += 35
-    if reputation_focused >= 5:
-        score += 30
-    elif reputation_focused >= 3:
-        score += 15
-    if risk_ratio < 0.15:
-        score += 35
-    elif risk_ratio < 0.25:
-        score += 20
-    elif risk_ratio < 0.35:
-        score += 10
-    if work_stats['reputation'] >= 60:
-        score += 20
-    type_scores["신중한 외교가"] = score
-
-    # 8. 외교적인 소장 - 평판 우선
-    score = 0
-    if most_focused == 'reputation':
-        score += 35
-    if reputation_focused >= 5:
-        score += 35
-    elif reputation_focused >= 3:
-        score += 20
-    elif reputation_focused >= 1:
-        score += 10
-    if work_stats['reputation'] >= 65:
-        score += 30
-    elif work_stats['reputation'] >= 55:
-        score += 20
-    elif work_stats['reputation'] >= 45:
-        score += 10
-    type_scores["외교적인 소장"] = score
-
-    # 9. 진취적인 소장 - 프로젝트 중심 + 높은 위험 (최종 조정)
-    score = 0
-    if most_focused == 'project':
-        score += 28
-    if project_focused >= 5:
-        score += 26
-    elif project_focused >= 3:
-        score += 16
-    if risk_ratio > 0.32:
-        score += 30
-    elif risk_ratio > 0.24:
-        score += 20
-    elif risk_ratio > 0.17:
-        score += 10
-    if work_stats['project'] >= 60:
-        score += 16
-    type_scores["진취적인 소장"] = score
-
-    # 10. 성과 중심 소장 - 프로젝트 성공 우선 (최종 조정)
-    score = 0
-    if most_focused == 'project':
-        score += 32
-    if project_focused >= 5:
-        score += 32
-    elif project_focused >= 3:
-        score += 22
-    elif project_focused >= 1:
-        score += 14
-    if work_stats['project'] >= 65:
-        score += 30
-    elif work_stats['project'] >= 55:
-        score += 22
-    elif work_stats['project'] >= 45:
-        score += 14
-    type_scores["성과 중심 소장"] = score
-
-    # 11. 실무형 소장 - 예산 집행 우선 (점수 조정)
-    score = 0
-    if most_focused == 'budget':
-        score += 28
-    if budget_focused >= 5:
-        score += 28
-    elif budget_focused >= 3:
-        score += 18
-    elif budget_focused >= 1:
-        score += 10
-    if work_stats['budget'] >= 65:
-        score += 25
-    elif work_stats['budget'] >= 55:
-        score += 18
-    elif work_stats['budget'] >= 45:
-        score += 10
-    type_scores["실무형 소장"] = score
-
-    # 12. 분투한 소장 - 낮은 성과 (폴백)
-    score = 0
-    if avg_stat < 45:
-        score += 60
-    elif avg_stat < 50:
-        score += 40
-    elif avg_stat < 55:
-        score += 20
-    if max_stat < 50:
-        score += 30
-    type_scores["분투한 소장"] = score
-
-    # 가장 높은 점수를 받은 유형 선택 (동점이면 랜덤)
-    if not type_scores:
-        return "분투한 소장"
+    type_scores = score_director_types(
+        reputation, budget_execution_rate, staff_morale, project_success, stress, wellbeing,
+        {
+            'reputation_focused': reputation_focused,
+            'budget_focused': budget_focused,
+            'staff_focused': staff_focused,
+            'project_focused': project_focused,
+            'risk_taking': risk_taking
+        },
+        total_choices
+    )
 
     max_score = max(type_scores.values())
     top_types = [t for t, s in type_scores.items() if s == max_score]
@@ -347,6 +120,45 @@ def generate_random_game_state() -> Dict:
     }
 
 
+def generate_random_game_states(num_states: int, rng):
+    """generate_random_game_state와 같은 분포의 상태 num_states개를 열 단위로 생성
+
+    rng(np.random.Generator)로 열마다 한 번에 뽑아 director_scoring의 구조화 배열을 채웁니다.
+    """
+    import numpy as np
+    from director_scoring import empty_states
+
+    states = empty_states(num_states)
+    total_choices = rng.integers(20, 36, num_states)
+
+    # 선택 분포 (0: 한 영역 집중, 1: 두 영역 집중, 2: 균등 분배, 3: 완전 랜덤)
+    distribution = rng.integers(0, 4, num_states)
+
+    # 한 영역 집중: 집중 영역 하나 / 두 영역 집중: 무작위 순열의 앞 두 영역
+    main_focus = rng.integers(0, 4, num_states)
+    dual_order = rng.random((num_states, 4)).argsort(axis=1)
+    avg = total_choices // 4
+
+    focus_fields = ('reputation_focused', 'budget_focused', 'staff_focused', 'project_focused')
+    for area, field in enumerate(focus_fields):
+        low = rng.integers(0, 4, num_states)
+        single = np.where(main_focus == area, rng.integers(8, 16, num_states), low)
+        in_dual = (dual_order[:, 0] == area) | (dual_order[:, 1] == area)
+        dual = np.where(in_dual, rng.integers(6, 13, num_states), low)
+        balanced = rng.integers(avg - 2, avg + 3)
+        uniform = rng.integers(0, 11, num_states)
+        states[field] = np.choose(distribution, (single, dual, balanced, uniform))
+
+    states['risk_taking'] = rng.integers(0, total_choices + 1)
+    states['total_choices'] = total_choices
+
+    for field in ('reputation', 'budget_execution_rate', 'staff_morale', 'project_success'):
+        states[field] = rng.integers(20, 91, num_states)
+    states['stress'] = rng.integers(0, 101, num_states)
+    states['wellbeing'] = rng.integers(0, 101, num_states)
+    return states
+
+
 def run_simulation(num_simulations: int = 100000) -> Dict[str, float]:
     """몬테카를로 시뮬레이션 실행"""
     print(f"🎲 {num_simulations:,}회 시뮬레이션 시작...\n")
@@ -372,6 +184,30 @@ def run_simulation(num_simulations: int = 100000) -> Dict[str, float]:
     return probabilities, counter
 
 
+def run_simulation_vectorized(num_simulations: int = 1000000, seed: int = None) -> Dict[str, float]:
+    """몬테카를로 시뮬레이션 실행 (상태를 열 단위로 생성하여 director_scoring으로 일괄 채점)"""
+    import numpy as np
+    from director_scoring import determine_director_type_indices
+
+    print(f"🎲 {num_simulations:,}회 시뮬레이션 시작 (일괄 채점)...\n")
+
+    rng = np.random.default_rng(seed)
+    states = generate_random_game_states(num_simulations, rng)
+    indices = determine_director_type_indices(states, rng)
+    counts = np.bincount(indices, minlength=len(DIRECTOR_TYPES))
+
+    counter = Counter({
+        director_type: int(count)
+        for director_type, count in zip(DIRECTOR_TYPES, counts) if count
+    })
+    probabilities = {
+        director_type: (count / num_simulations) * 100
+        for director_type, count in counter.items()
+    }
+
+    return probabilities, counter
+
+
 def print_results(probabilities: Dict[str, float], counter: Counter):
     """결과 출력"""
     print("\n" + "="*70)
@@ -422,9 +258,42 @@ def print_results(probabilities: Dict[str, float], counter: Counter):
     print("\n" + "="*70)
 
 
+def run_playthrough_simulation(num_games: int, seed: int = None, workers: int = None) -> Dict[str, float]:
+    """무작위 스탯 대신 실제 게임 플레이(simulator.run_monte_carlo)로 확률 추정"""
+    from simulator import run_monte_carlo
+
+    print(f"🎮 실제 게임 {num_games:,}회 플레이 시뮬레이션 시작...\n")
+    summary = run_monte_carlo(num_games, policy_name='random', seed=seed, workers=workers)
+    counter = summary['director_types']
+    total = summary['games']
+
+    probabilities = {
+        director_type: (count / total) * 100
+        for director_type, count in counter.items()
+    }
+
+    return probabilities, counter
+
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='소장 유형 도달 확률 계산')
+    parser.add_argument('--playthroughs', type=int, default=None,
+                        help='무작위 스탯 샘플링 대신 실제 게임을 N회 플레이하여 확률 계산')
+    parser.add_argument('--vectorized', type=int, default=None, metavar='N',
+                        help='무작위 상태 N개를 NumPy로 일괄 채점 (대규모 샘플용)')
+    parser.add_argument('--seed', type=int, default=None, help='난수 시드 (--playthroughs/--vectorized 사용 시)')
+    parser.add_argument('--workers', type=int, default=None, help='작업 프로세스 수 (--playthroughs 사용 시)')
+    args = parser.parse_args()
+
     # 시뮬레이션 실행
-    probabilities, counter = run_simulation(num_simulations=100000)
+    if args.playthroughs:
+        probabilities, counter = run_playthrough_simulation(args.playthroughs, args.seed, args.workers)
+    elif args.vectorized:
+        probabilities, counter = run_simulation_vectorized(args.vectorized, args.seed)
+    else:
+        probabilities, counter = run_simulation(num_simulations=100000)
 
     # 결과 출력
     print_results(probabilities, counter)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+소장 유형 일괄 채점 (NumPy 벡터화)
+koica_game.score_director_types()의 조건 분기를 배열 연산으로 옮겨
+수백만 개의 최종 상태를 한 번의 호출로 채점합니다.
+스칼라 구현이 기준이며, 이 모듈의 점수는 항상 그와 정확히 일치해야 합니다.
+"""
+
+from typing import Iterable, Optional
+
+from koica_game import DIRECTOR_TYPES
+
+# NumPy import (optional - 일괄 채점에만 필요)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# 최종 상태 구조화 배열의 필드 (calculate_director_probability.determine_director_type 인자와 동일)
+STATE_FIELDS = [
+    ('reputation', 'f8'),
+    ('budget_execution_rate', 'f8'),
+    ('staff_morale', 'f8'),
+    ('project_success', 'f8'),
+    ('stress', 'f8'),
+    ('wellbeing', 'f8'),
+    ('reputation_focused', 'f8'),
+    ('budget_focused', 'f8'),
+    ('staff_focused', 'f8'),
+    ('project_focused', 'f8'),
+    ('risk_taking', 'f8'),
+    ('total_choices', 'i8'),
+]
+
+STATE_DTYPE = np.dtype(STATE_FIELDS) if NUMPY_AVAILABLE else None
+
+# 가장 중점을 둔 영역 인덱스 (focus 필드 순서, 없으면 -1)
+_FOCUS_REPUTATION, _FOCUS_BUDGET, _FOCUS_STAFF, _FOCUS_PROJECT = range(4)
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("일괄 채점에는 numpy가 필요합니다: pip install numpy")
+
+
+def empty_states(size: int):
+    """채점용 빈 구조화 배열 생성"""
+    _require_numpy()
+    return np.zeros(size, dtype=STATE_DTYPE)
+
+
+def states_from_games(game_states: Iterable):
+    """GameState 목록을 채점용 구조화 배열로 변환"""
+    _require_numpy()
+    rows = [
+        (s.reputation, s.budget_execution_rate, s.staff_morale, s.project_success, s.stress, s.wellbeing,
+         s.player_style['reputation_focused'], s.player_style['budget_focused'],
+         s.player_style['staff_focused'], s.player_style['project_focused'],
+         s.player_style['risk_taking'], s.analytics.total_choices)
+        for s in game_states
+    ]
+    return np.array(rows, dtype=STATE_DTYPE)
+
+
+def _tiers(conditions, points):
+    """첫 번째로 참인 조건의 점수 (if/elif 체인과 동일), 모두 거짓이면 0"""
+    return np.select(conditions, points, 0)
+
+
+def score_director_types_batch(states):
+    """구조화 배열의 각 행에 대해 12개 소장 유형 점수 계산
+
+    Returns:
+        (N, 12) int32 배열 - 열 순서는 DIRECTOR_TYPES와 같음
+    """
+    _require_numpy()
+    reputation = states['reputation']
+    budget = states['budget_execution_rate']
+    staff = states['staff_morale']
+    project = states['project_success']
+    stress = states['stress']
+    wellbeing = states['wellbeing']
+    reputation_focused = states['reputation_focused']
+    budget_focused = states['budget_focused']
+    staff_focused = states['staff_focused']
+    project_focused = states['project_focused']
+    total_choices = states['total_choices']
+
+    # 스칼라 구현과 같은 연산 순서로 계산해야 부동소수점 결과가 일치함
+    work_stats = np.stack([reputation, budget, staff, project], axis=1)
+    max_stat = work_stats.max(axis=1)
+    avg_stat = (((reputation + budget) + staff) + project) / 4
+    variance = ((((reputation - avg_stat) ** 2 + (budget - avg_stat) ** 2)
+                 + (staff - avg_stat) ** 2) + (project - avg_stat) ** 2) / 4
+
+    risk_ratio = np.divide(states['risk_taking'], total_choices,
+                           out=np.zeros(len(states)), where=total_choices > 0)
+
+    focus = np.stack([reputation_focused, budget_focused, staff_focused, project_focused], axis=1)
+    most_focused = np.where(focus.max(axis=1) > 0, focus.argmax(axis=1), -1)
+
+    scores = np.empty((len(states), len(DIRECTOR_TYPES)), dtype=np.int32)
+
+    # 1. 혁신적인 소장 - 높은 위험 감수 + 우수한 성과
+    scores[:, 0] = (_tiers([risk_ratio > 0.45, risk_ratio > 0.35, risk_ratio > 0.25], [50, 30, 10])
+                    + _tiers([max_stat >= 70, max_stat >= 60, max_stat >= 50], [30, 20, 10]))
+
+    # 2. 여유로운 소장 - 높은 웰빙 + 낮은 스트레스
+    scores[:, 1] = (_tiers([wellbeing >= 70, wellbeing >= 60, wellbeing >= 50], [40, 25, 10])
+                    + _tiers([stress <= 30, stress <= 40, stress <= 50], [40, 25, 10])
+                    + np.where(avg_stat >= 50, 20, 0))
+
+    # 3. 헌신적인 소장 - 높은 스트레스 + 높은 성과
+    scores[:, 2] = (_tiers([stress >= 65, stress >= 55, stress >= 45], [40, 30, 20])
+                    + _tiers([avg_stat >= 60, avg_stat >= 50, avg_stat >= 40], [40, 30, 20]))
+
+    # 4. 균형잡힌 소장 - 낮은 분산 + 좋은 평균
+    scores[:, 3] = (_tiers([variance < 250, variance < 350, variance < 450, variance < 600], [45, 35, 25, 15])
+                    + _tiers([avg_stat >= 50, avg_stat >= 40, avg_stat >= 30], [40, 30, 20]))
+
+    # 5. 온화한 소장 - 직원 중심 + 낮은 스트레스
+    staff_most = most_focused == _FOCUS_STAFF
+    scores[:, 4] = (np.where(staff_most, 35, 0)
+                    + _tiers([staff_focused >= 8, staff_focused >= 5, staff_focused >= 3], [35, 20, 10])
+                    + _tiers([stress <= 40, stress <= 50], [30, 15])
+                    + _tiers([staff >= 65, staff >= 55], [25, 15]))
+
+    # 6. 사람 중심 소장 - 직원 만족도 우선
+    scores[:, 5] = (np.where(staff_most, 40, 0)
+                    + _tiers([staff_focused >= 8, staff_focused >= 5, staff_focused >= 3], [40, 25, 15])
+                    + _tiers([staff >= 70, staff >= 60, staff >= 50], [35, 25, 15]))
+
+    # 7. 신중한 외교가 - 평판 중심 + 낮은 위험
+    reputation_most = most_focused == _FOCUS_REPUTATION
+    scores[:, 6] = (np.where(reputation_most, 40, 0)
+                    + _tiers([reputation_focused >= 8, reputation_focused >= 5, reputation_focused >= 3],
+                             [35, 20, 10])
+                    + _tiers([risk_ratio < 0.15, risk_ratio < 0.25], [35, 20])
+                    + _tiers([reputation >= 65, reputation >= 55], [25, 15]))
+
+    # 8. 외교적인 소장 - 평판 우선
+    scores[:, 7] = (np.where(reputation_most, 40, 0)
+                    + _tiers([reputation_focused >= 8, reputation_focused >= 5, reputation_focused >= 3],
+                             [40, 25, 15])
+                    + _tiers([reputation >= 70, reputation >= 60, reputation >= 50], [35, 25, 15]))
+
+    # 9. 진취적인 소장 - 프로젝트 중심 + 높은 위험
+    project_most = most_focused == _FOCUS_PROJECT
+    scores[:, 8] = (np.where(project_most, 35, 0)
+                    + _tiers([project_focused >= 8, project_focused >= 5, project_focused >= 3], [30, 20, 10])
+                    + _tiers([risk_ratio > 0.35, risk_ratio > 0.25, risk_ratio > 0.18], [35, 25, 15])
+                    + _tiers([project >= 65, project >= 55], [20, 10]))
+
+    # 10. 성과 중심 소장 - 프로젝트 성공 우선
+    scores[:, 9] = (np.where(project_most, 40, 0)
+                    + _tiers([project_focused >= 8, project_focused >= 5, project_focused >= 3], [40, 25, 15])
+                    + _tiers([project >= 70, project >= 60, project >= 50], [35, 25, 15]))
+
+    # 11. 실무형 소장 - 예산 집행 우선
+    scores[:, 10] = (np.where(most_focused == _FOCUS_BUDGET, 40, 0)
+                     + _tiers([budget_focused >= 8, budget_focused >= 5, budget_focused >= 3], [40, 25, 15])
+                     + _tiers([budget >= 70, budget >= 60, budget >= 50], [35, 25, 15]))
+
+    # 12. 분투한 소장 - 낮은 성과 (폴백)
+    scores[:, 11] = (_tiers([avg_stat < 45, avg_stat < 50, avg_stat < 55], [60, 40, 20])
+                     + np.where(max_stat < 50, 30, 0))
+
+    return scores
+
+
+def top_director_type_mask(states):
+    """각 행에서 최고 점수를 받은 유형(동점 후보) 마스크 (N, 12) 반환"""
+    scores = score_director_types_batch(states)
+    return scores == scores.max(axis=1, keepdims=True)
+
+
+def determine_director_type_indices(states, rng: Optional["np.random.Generator"] = None):
+    """각 행의 소장 유형 인덱스 (DIRECTOR_TYPES 기준) 반환
+
+    동점이면 스칼라 구현처럼 후보 중 균등하게 무작위로 고르며,
+    rng가 없으면 DIRECTOR_TYPES 순서상 첫 번째 후보를 고릅니다.
+    """
+    top = top_director_type_mask(states)
+    if rng is None:
+        return top.argmax(axis=1)
+
+    # 동점 후보 중 k번째(0-based)를 균등하게 선택
+    candidates = top.sum(axis=1)
+    pick = (rng.random(len(top)) * candidates).astype(np.int64)
+    rank = np.cumsum(top, axis=1) - 1
+    return (top & (rank == pick[:, None])).argmax(axis=1)
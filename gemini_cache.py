@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini 생성 결과 캐시 (메모리 LRU + SQLite 디스크 저장소)
+같은 테마/시기/약점/성향의 시나리오나 비슷한 최종 스탯의 엔딩처럼 사실상 같은 프롬프트는
+정규화한 게임 컨텍스트를 키로 이전 생성 결과를 재사용하여 API 지연과 비용을 줄입니다.
+'offline' 정책에서는 캐시만 사용하므로 저장된 결과로 플레이를 결정적으로 재현할 수 있습니다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+# 캐시 적중 정책
+#   use: 캐시에 있으면 재사용, 없으면 생성 후 저장 (기본)
+#   refresh: 항상 새로 생성하고 결과로 캐시를 갱신
+#   offline: 캐시만 사용하고 API를 호출하지 않음 (재현용)
+HIT_POLICIES = ('use', 'refresh', 'offline')
+
+DEFAULT_CACHE_PATH = 'gemini_cache.sqlite3'
+DEFAULT_TTL = 7 * 24 * 3600      # 7일
+DEFAULT_MEMORY_SIZE = 256
+DEFAULT_MAX_ENTRIES = 5000
+
+# 스탯 정규화 구간 크기 (이 폭 안의 차이는 같은 컨텍스트로 취급)
+STAT_BUCKET = 10
+
+
+def bucket_stat(value, size: int = STAT_BUCKET) -> int:
+    """스탯 값을 size 단위 구간의 하한으로 정규화 (예: 47 -> 40)"""
+    return int(value) // size * size
+
+
+def context_key(kind: str, context: Dict) -> str:
+    """생성 종류와 정규화된 컨텍스트로 캐시 키 생성 (딕셔너리 순서와 무관)"""
+    payload = json.dumps([kind, context], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """생성 결과 2단 캐시 (메모리 LRU -> SQLite)
+
+    값은 JSON으로 직렬화할 수 있어야 하며, 조회할 때마다 새 객체로 복원하므로
+    호출자가 결과를 수정해도 캐시에는 영향이 없습니다.
+    여러 스레드(Streamlit 세션, 선행 생성 작업)에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, memory_size: int = DEFAULT_MEMORY_SIZE,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = DEFAULT_TTL,
+                 hit_policy: str = 'use'):
+        # path가 None이면 메모리 캐시만 사용
+        if hit_policy not in HIT_POLICIES:
+            raise ValueError(f"알 수 없는 캐시 정책 '{hit_policy}' (가능한 값: {', '.join(HIT_POLICIES)})")
+        self.path = path
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hit_policy = hit_policy
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()  # 키 -> (저장 시각, JSON 텍스트)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_failed = False
+
+    @property
+    def allows_generation(self) -> bool:
+        """캐시 미스일 때 API를 호출해도 되는지 여부"""
+        return self.hit_policy != 'offline'
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """디스크 저장소 연결 (처음 사용할 때 생성, 실패하면 메모리 캐시만 사용)"""
+        if self.path is None or self._disk_failed:
+            return None
+        if self._conn is None:
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS generations ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS generations_accessed ON generations (accessed_at)")
+                conn.commit()
+                self._conn = conn
+            except (sqlite3.Error, OSError) as e:
+                print(f"Warning: Gemini 캐시 파일을 열 수 없어 메모리 캐시만 사용합니다: {e}")
+                self._disk_failed = True
+                return None
+        return self._conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, created_at: float, text: str):
+        """메모리 LRU에 저장 (가장 오래 사용하지 않은 항목부터 제거)"""
+        self._memory[key] = (created_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 값 반환 (없거나 만료되었거나 'refresh' 정책이면 None)"""
+        if self.hit_policy == 'refresh':
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry[0], now):
+                    del self._memory[key]
+                    entry = None
+                else:
+                    self._memory.move_to_end(key)
+
+            if entry is None:
+                entry = self._load_from_disk(key, now)
+                if entry is not None:
+                    self._remember(key, *entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry[1])
+
+    def _load_from_disk(self, key: str, now: float) -> Optional[tuple]:
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT created_at, value FROM generations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[0], now):
+                conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE generations SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0], row[1]
+        except sqlite3.Error:
+            return None
+
+    def put(self, key: str, value: Any):
+        """값 저장 ('offline' 정책에서는 저장하지 않음)"""
+        if self.hit_policy == 'offline' or value is None:
+            return
+
+        text = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, text)
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO generations (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, text, now, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """만료된 항목 삭제 후, 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        if self.ttl is not None:
+            conn.execute("DELETE FROM generations WHERE created_at < ?", (now - self.ttl,))
+        count = conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM generations WHERE key IN "
+                "(SELECT key FROM generations ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """메모리/디스크 캐시 전체 삭제"""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.execute("DELETE FROM generations")
+                    conn.commit()
+                except sqlite3.Error:
+                    pass
+
+    def close(self):
+        """디스크 연결 닫기"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 프로세스 공용 캐시 (CLI 게임과 모든 Streamlit 세션이 공유)
+_default_cache: Optional[GenerationCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_generation_cache() -> GenerationCache:
+    """프로세스 공용 기본 캐시 (처음 호출할 때 생성)
+
+    환경변수 GEMINI_CACHE_PATH(파일 경로), GEMINI_CACHE_POLICY(use/refresh/offline)로 설정합니다.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = GenerationCache(
+                path=os.environ.get('GEMINI_CACHE_PATH', DEFAULT_CACHE_PATH),
+                hit_policy=os.environ.get('GEMINI_CACHE_POLICY', 'use')
+            )
+        return _default_cache
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+프로세스 공용 Gemini 모델 클라이언트
+API 키마다 독립된 genai.Client로 만든 모델 하나를 모든 게임/Streamlit 세션이 공유하고,
+동시 요청 수를 세마포어로 제한하며, 같은 요청이 진행 중이면 새로 호출하지 않고
+그 결과를 함께 받습니다 (single-flight). 스트리밍 요청의 대기자도 도착한 텍스트를 함께 받습니다.
+
+지연 SLO 모드(generate_hedged)에서는 요청마다 마감 시간을 두고, 첫 요청이 최근 p95 지연을
+넘기면 같은 요청을 한 번 더 보내(hedging) 먼저 도착한 유효한 응답을 사용합니다.
+
+클라이언트마다 회로 차단기(CircuitBreaker)가 최근 요청의 오류율과 지연을 추적하여, API가
+계속 실패하거나 느리면 일정 시간 요청을 막고(open) 시험 요청(half-open)으로 회복을 확인합니다.
+
+프롬프트 템플릿의 고정 앞부분을 등록해 두면 처음 사용할 때 백그라운드에서 컨텍스트 캐시(CachedContent)로
+만들어, 캐시가 준비된 뒤 그 앞부분으로 시작하는 프롬프트는 나머지 부분만 전송합니다.
+"""
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+# Gemini API import (optional - AI 모드에만 필요, google-genai 패키지)
+try:
+    from google import genai
+    from google.genai import types as genai_types
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+
+
+GEMINI_MODEL_NAME = 'gemini-2.5-flash-lite'
+GEMINI_TEMPERATURE = 1.2   # 높은 temperature로 다양성 증가
+
+# 프로세스 전체의 동시 업스트림 요청 수 (환경변수 GEMINI_MAX_CONCURRENCY로 변경)
+DEFAULT_MAX_CONCURRENCY = 8
+
+# 지연 SLO: 요청 마감 시간과, 지연 통계가 쌓이기 전의 hedging 대기 시간 (초)
+DEFAULT_DEADLINE = float(os.environ.get('GEMINI_DEADLINE_SECONDS', 20))
+DEFAULT_HEDGE_DELAY = 6.0
+# p95 계산에 쓰는 최근 성공 요청 수와, p95를 믿기 시작하는 최소 표본 수
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 10
+
+# 회로 차단기 상태
+BREAKER_CLOSED = 'closed'         # 정상 - 모든 요청 허용
+BREAKER_OPEN = 'open'             # 차단 - 요청하지 않고 바로 폴백
+BREAKER_HALF_OPEN = 'half_open'   # 회복 확인 중 - 시험 요청만 허용
+
+# 회로 차단기 기본값: 최근 BREAKER_WINDOW초의 요청이 BREAKER_MIN_CALLS개 이상일 때
+# 실패율 또는 느린 요청 비율이 기준을 넘으면 차단하고, 차단 시간은 실패가 반복될 때마다 두 배로 늘림
+BREAKER_WINDOW = 60.0
+BREAKER_MIN_CALLS = 4
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_SLOW_CALL_SECONDS = 12.0
+BREAKER_SLOW_CALL_RATE = 0.8
+BREAKER_OPEN_SECONDS = 30.0
+BREAKER_MAX_OPEN_SECONDS = 300.0
+
+# 업스트림 HTTP 요청 타임아웃 (초) - 응답하지 않는 요청이 마감 시간 뒤에도 동시 요청 슬롯을 붙잡지 않도록
+# 마감 시간과 같게 둠
+UPSTREAM_TIMEOUT = DEFAULT_DEADLINE
+
+
+# 컨텍스트 캐시: 사용 여부(환경변수 GEMINI_CONTEXT_CACHE=0이면 끔), 보관 시간, 만료 전 갱신 여유,
+# 생성에 실패했을 때(너무 짧은 앞부분, 지원하지 않는 모델 등) 다시 시도하기까지의 시간 (초)
+CONTEXT_CACHE_ENABLED = os.environ.get('GEMINI_CONTEXT_CACHE', '1') != '0'
+CONTEXT_CACHE_TTL = 3600
+CONTEXT_CACHE_REFRESH_MARGIN = 60
+CONTEXT_CACHE_RETRY = 3600
+
+
+class DeadlineExceeded(TimeoutError):
+    """마감 시간 안에 유효한 응답을 받지 못함"""
+
+
+class CircuitOpenError(RuntimeError):
+    """회로 차단기가 열려 있어 요청하지 않음"""
+
+
+class CircuitBreaker:
+    """최근 요청의 실패율과 지연으로 업스트림 상태를 판단하는 회로 차단기
+
+    closed 상태에서 실패율이나 느린 요청 비율이 기준을 넘으면 open으로 바뀌어 open_seconds 동안
+    요청을 막습니다. 그 뒤 half_open 상태에서 시험 요청 하나만 허용하여, 성공하면 closed로
+    돌아가고 실패하면 차단 시간을 두 배로 늘려 다시 open이 됩니다.
+    allow_request가 발급한 요청 번호로 결과를 기록하므로, 차단 전에 시작한 요청의 늦은 결과는
+    무시되고 half_open의 회복 여부는 시험 요청의 결과만으로 결정됩니다.
+    여러 스레드(Streamlit 세션, 선행 생성 작업)에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, window: float = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate: float = BREAKER_SLOW_CALL_RATE, open_seconds: float = BREAKER_OPEN_SECONDS,
+                 max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = BREAKER_CLOSED
+        self._calls = deque()          # (완료 시각, 성공 여부, 지연)
+        self._open_seconds = open_seconds
+        self._opened_at = 0.0
+        self._tokens = 0                        # 마지막으로 발급한 요청 번호
+        self._trip_token = 0                    # 마지막 차단 시점까지 발급한 요청 번호 (이하의 결과는 무시)
+        self._probe_token: Optional[int] = None  # half_open 시험 요청 번호
+        # 관측용 카운터
+        self.trips = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        """현재 상태 (open 상태에서 차단 시간이 지났으면 half_open)"""
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == BREAKER_OPEN and now - self._opened_at >= self._open_seconds:
+            self._state = BREAKER_HALF_OPEN
+            self._probe_token = None
+        return self._state
+
+    def allow_request(self) -> Optional[int]:
+        """요청을 보내도 되면 요청 번호(1 이상), 막혀 있으면 None
+
+        결과는 이 번호와 함께 record_success/record_failure로 기록합니다.
+        half_open에서 번호를 받은 호출자가 시험 요청을 맡습니다.
+        """
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == BREAKER_CLOSED:
+                self._tokens += 1
+                return self._tokens
+            if state == BREAKER_HALF_OPEN and self._probe_token is None:
+                self._tokens += 1
+                self._probe_token = self._tokens
+                return self._tokens
+            self.rejected_calls += 1
+            return None
+
+    def record_success(self, latency: float, token: Optional[int] = None):
+        """요청 성공 기록 (half_open의 시험 요청이면 회로를 닫음)"""
+        self._record(True, latency, token)
+
+    def record_failure(self, latency: float, token: Optional[int] = None):
+        """요청 실패(오류, 마감 시간 초과) 기록"""
+        self._record(False, latency, token)
+
+    def _record(self, ok: bool, latency: float, token: Optional[int]):
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if token is not None and token <= self._trip_token:
+                # 차단 전에 시작한 요청의 늦은 결과는 무시
+                return
+            if state == BREAKER_HALF_OPEN:
+                if token is None or token != self._probe_token:
+                    # 시험 요청의 결과만 회복 여부를 결정
+                    return
+                self._probe_token = None
+                if ok and latency < self.slow_call_seconds:
+                    self._state = BREAKER_CLOSED
+                    self._open_seconds = self.base_open_seconds
+                    self._calls.clear()
+                else:
+                    self._trip(now, min(self.max_open_seconds, self._open_seconds * 2))
+                return
+            if state == BREAKER_OPEN:
+                return
+
+            self._calls.append((now, ok, latency))
+            self._prune(now)
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            slow = sum(1 for _, _, call_latency in self._calls if call_latency >= self.slow_call_seconds)
+            if failures / total >= self.failure_rate or slow / total >= self.slow_call_rate:
+                self._trip(now, self.base_open_seconds)
+
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _trip(self, now: float, open_seconds: float):
+        self._state = BREAKER_OPEN
+        self._opened_at = now
+        self._open_seconds = open_seconds
+        self._calls.clear()
+        self._trip_token = self._tokens
+        self._probe_token = None
+        self.trips += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """화면 표시/모니터링용 상태 요약"""
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._prune(now)
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            latencies = [latency for _, ok, latency in self._calls if ok]
+            retry_in = max(0.0, self._opened_at + self._open_seconds - now) if state == BREAKER_OPEN else 0.0
+            return {
+                'state': state,
+                'calls': total,
+                'error_rate': failures / total if total else 0.0,
+                'avg_latency': sum(latencies) / len(latencies) if latencies else None,
+                'retry_in': retry_in,
+                'trips': self.trips,
+                'rejected_calls': self.rejected_calls,
+            }
+
+
+class _Flight:
+    """진행 중인 업스트림 요청 하나 (대기자들이 누적 텍스트와 완료 여부를 관찰)"""
+
+    __slots__ = ('condition', 'text', 'done', 'error')
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.text = ""
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class _ContextCache:
+    """컨텍스트 캐시에 등록한 프롬프트 앞부분 하나
+
+    model: 캐시를 참조하는 모델 (없으면 미생성/실패), creating: 백그라운드에서 생성 중인지 여부
+    """
+
+    __slots__ = ('prefix', 'model', 'expires_at', 'retry_at', 'creating')
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.model = None
+        self.expires_at = 0.0
+        self.retry_at = 0.0
+        self.creating = False
+
+
+class ModelClient:
+    """모델 하나를 감싸 동시 요청 제한과 동일 요청 병합을 제공
+
+    model은 generate_content(prompt, stream=...)를 가진 객체면 됩니다
+    (API 키별 GeminiModel 또는 테스트용 스텁 모델).
+    context_cache_factory(prefix)는 앞부분을 컨텍스트 캐시로 등록하고 그 캐시를 쓰는 모델을
+    반환하는 함수입니다 (None이면 항상 전체 프롬프트를 전송).
+    """
+
+    def __init__(self, model, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 context_cache_factory: Optional[Callable[[str], Any]] = None):
+        self.model = model
+        self.context_cache_factory = context_cache_factory
+        self._context_caches: Dict[str, _ContextCache] = {}
+        self._context_lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        # 관측용 카운터
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self.hedged_calls = 0
+        self.prompt_chars_sent = 0
+        self.context_cache_hits = 0
+        # 최근 성공한 업스트림 요청의 지연 (초)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        # 이 모델을 쓰는 모든 세션이 공유하는 업스트림 상태
+        self.breaker = CircuitBreaker()
+
+    def register_context_prefixes(self, prefixes):
+        """컨텍스트 캐시로 만들 프롬프트 앞부분 등록 (실제 생성은 처음 사용할 때, 이미 등록된 앞부분은 무시)"""
+        if self.context_cache_factory is None:
+            return
+        with self._context_lock:
+            for prefix in prefixes:
+                if prefix not in self._context_caches:
+                    self._context_caches[prefix] = _ContextCache(prefix)
+
+    def _route(self, prompt: str):
+        """프롬프트를 보낼 모델과 전송할 텍스트 결정 ((모델, 텍스트, 사용한 컨텍스트 캐시))
+
+        등록된 앞부분으로 시작하면 그 컨텍스트 캐시를 쓰는 모델로 나머지 부분만 보냅니다.
+        캐시가 없거나 만료가 가까우면 백그라운드 스레드에서 새로 만들도록 표시만 하고
+        (생성 호출이 다른 요청을 막지 않도록), 준비될 때까지는 전체 프롬프트를 보냅니다.
+        """
+        if not self._context_caches:
+            return self.model, prompt, None
+        for entry in list(self._context_caches.values()):
+            if not prompt.startswith(entry.prefix):
+                continue
+            create = False
+            with self._context_lock:
+                now = time.monotonic()
+                if entry.model is not None and now >= entry.expires_at - CONTEXT_CACHE_REFRESH_MARGIN:
+                    entry.model = None
+                if entry.model is None and not entry.creating and now >= entry.retry_at:
+                    entry.creating = True
+                    create = True
+                model = entry.model
+            if create:
+                threading.Thread(target=self._create_context_cache, args=(entry,),
+                                 name='context-cache', daemon=True).start()
+            if model is not None:
+                self.context_cache_hits += 1
+                return model, prompt[len(entry.prefix):], entry
+            break
+        return self.model, prompt, None
+
+    def _create_context_cache(self, entry: _ContextCache):
+        """컨텍스트 캐시 생성 (잠금과 동시 요청 슬롯 밖의 백그라운드 스레드에서 실행)"""
+        model = None
+        try:
+            model = self.context_cache_factory(entry.prefix)
+        except Exception as e:
+            print(f"Warning: 프롬프트 컨텍스트 캐시를 만들 수 없어 전체 프롬프트를 전송합니다 ({e})")
+        with self._context_lock:
+            now = time.monotonic()
+            entry.creating = False
+            if model is None:
+                entry.retry_at = now + CONTEXT_CACHE_RETRY
+            else:
+                entry.model = model
+                entry.expires_at = now + CONTEXT_CACHE_TTL
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """최근 성공 요청 지연의 분위수 (표본이 부족하면 None)"""
+        samples = sorted(self._latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def generate_text(self, prompt: str, on_text: Optional[Callable[[str], None]] = None,
+                      key: Optional[str] = None) -> str:
+        """프롬프트 응답 텍스트 반환
+
+        key가 같은 요청이 이미 진행 중이면 그 결과를 함께 받습니다 (기본 키는 프롬프트 해시).
+        on_text를 주면 스트리밍으로 받아 누적 텍스트가 늘어날 때마다 호출합니다.
+        업스트림 호출이 실패하면 대기자 모두에게 같은 예외가 전달됩니다.
+        """
+        if key is None:
+            key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        flight, leader = self._join(key)
+        if leader:
+            return self._lead(key, flight, prompt, on_text)
+        return self._follow(flight, on_text)
+
+    def _join(self, key: str):
+        """key의 진행 중인 요청에 합류하거나 새 요청 등록 ((요청, 직접 호출해야 하는지 여부))"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced_calls += 1
+                return flight, False
+            flight = _Flight()
+            self._flights[key] = flight
+            self.upstream_calls += 1
+            return flight, True
+
+    def _abandon(self, key: str, flight: _Flight):
+        """마감 시간이 지난 요청을 진행 중 목록에서 제거 (이후의 같은 요청은 새로 호출)
+
+        업스트림 호출 자체는 HTTP 타임아웃으로 끝나며, 이미 합류한 대기자는 그 결과를 받습니다.
+        """
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _lead(self, key: str, flight: _Flight, prompt: str, on_text: Optional[Callable[[str], None]]) -> str:
+        """업스트림 호출을 직접 수행하고 결과를 대기자와 공유"""
+        context_cache = None
+        try:
+            model, prompt, context_cache = self._route(prompt)
+            with self._semaphore:
+                started = time.monotonic()
+                self.prompt_chars_sent += len(prompt)
+                # 호출자가 스트리밍을 원할 때만 스트리밍 요청 (대기자는 누적 텍스트를 함께 관찰)
+                if on_text is None:
+                    text = model.generate_content(prompt).text
+                    with flight.condition:
+                        flight.text = text
+                else:
+                    for chunk in model.generate_content(prompt, stream=True):
+                        if chunk.text:
+                            with flight.condition:
+                                flight.text += chunk.text
+                                text = flight.text
+                                flight.condition.notify_all()
+                            on_text(text)
+                self._latencies.append(time.monotonic() - started)
+        except BaseException as e:
+            if context_cache is not None:
+                # 서버에서 캐시가 먼저 만료되었을 수 있으므로 다음 요청에서 다시 생성
+                with self._context_lock:
+                    context_cache.model = None
+            with flight.condition:
+                flight.error = e
+                flight.done = True
+                flight.condition.notify_all()
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+        with flight.condition:
+            flight.done = True
+            flight.condition.notify_all()
+            return flight.text
+
+    def _follow(self, flight: _Flight, on_text: Optional[Callable[[str], None]]) -> str:
+        """진행 중인 요청의 결과를 기다림 (도착한 텍스트는 on_text로 전달)"""
+        seen = 0
+        while True:
+            with flight.condition:
+                while not flight.done and len(flight.text) == seen:
+                    flight.condition.wait()
+                text, done, error = flight.text, flight.done, flight.error
+            if error is not None:
+                raise error
+            if on_text is not None and len(text) > seen:
+                on_text(text)
+            seen = len(text)
+            if done:
+                return text
+
+    def generate_hedged(self, prompt: str, parse: Callable[[str], Any], deadline: float = DEFAULT_DEADLINE,
+                        hedge_delay: Optional[float] = None, on_text: Optional[Callable[[str], None]] = None,
+                        key: Optional[str] = None, max_attempts: int = 2) -> Any:
+        """마감 시간이 있는 hedged 요청 - 먼저 도착한 유효한 응답의 parse 결과 반환
+
+        첫 요청이 hedge_delay(기본: 최근 p95 지연) 안에 끝나지 않거나 실패/무효 응답이면
+        같은 요청을 추가로 보냅니다 (최대 max_attempts회). parse가 None을 반환하면 무효 응답입니다.
+        요청은 작업 스레드에서 실행되며, 스트리밍 텍스트는 호출자 스레드에서 on_text로 전달합니다
+        (처음 텍스트를 보낸 요청 하나만). 늦게 끝난 요청의 결과는 버리고, 마감 시간이 지나면
+        응답하지 않는 요청을 진행 중 목록에서 빼서 이후의 같은 요청이 거기에 합류하지 않게 합니다.
+
+        Raises:
+            DeadlineExceeded: 마감 시간 안에 유효한 응답이 없는 경우
+            Exception: 모든 요청이 실패한 경우 마지막 요청의 예외
+        """
+        if hedge_delay is None:
+            hedge_delay = self.latency_quantile(0.95) or DEFAULT_HEDGE_DELAY
+        if key is None:
+            key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+        events: 'queue.Queue' = queue.Queue()
+        start = time.monotonic()
+
+        def run_attempt(attempt: int, attempt_key: str, flight: _Flight, leader: bool):
+            relay = (lambda text: events.put(('text', attempt, text))) if on_text else None
+            try:
+                if leader:
+                    text = self._lead(attempt_key, flight, prompt, relay)
+                else:
+                    text = self._follow(flight, relay)
+                events.put(('done', attempt, text))
+            except Exception as e:
+                events.put(('error', attempt, e))
+
+        def launch():
+            attempt = launched[0]
+            launched[0] += 1
+            if attempt > 0:
+                self.hedged_calls += 1
+            # 추가 요청은 첫 요청과 병합되지 않도록 별도 키 사용
+            attempt_key = key if attempt == 0 else f"{key}#hedge{attempt}"
+            flight, leader = self._join(attempt_key)
+            joined.append((attempt_key, flight))
+            threading.Thread(target=run_attempt, args=(attempt, attempt_key, flight, leader), daemon=True,
+                             name=f'gemini-attempt-{attempt}').start()
+
+        launched = [0]
+        joined = []
+        finished = 0
+        streaming_attempt = None
+        last_error: Optional[Exception] = None
+        launch()
+
+        while True:
+            now = time.monotonic()
+            remaining = start + deadline - now
+            if remaining <= 0:
+                for attempt_key, flight in joined:
+                    self._abandon(attempt_key, flight)
+                raise DeadlineExceeded(f"{deadline:.1f}초 안에 유효한 응답을 받지 못했습니다")
+            wait = remaining
+            if launched[0] < max_attempts:
+                wait = min(wait, max(0.0, start + hedge_delay * launched[0] - now))
+
+            try:
+                kind, attempt, payload = events.get(timeout=wait)
+            except queue.Empty:
+                if launched[0] < max_attempts and time.monotonic() >= start + hedge_delay * launched[0]:
+                    launch()
+                continue
+
+            if kind == 'text':
+                if streaming_attempt is None:
+                    streaming_attempt = attempt
+                if attempt == streaming_attempt:
+                    on_text(payload)
+                continue
+
+            finished += 1
+            if kind == 'done':
+                result = parse(payload)
+                if result is not None:
+                    return result
+            else:
+                last_error = payload
+            if attempt == streaming_attempt:
+                streaming_attempt = None
+            # 실패/무효 응답이면 기다리지 않고 바로 추가 요청
+            if launched[0] < max_attempts:
+                launch()
+            elif finished == launched[0]:
+                if last_error is not None:
+                    raise last_error
+                return None
+
+
+# API 키 해시 -> 공용 클라이언트
+_shared_clients: Dict[str, ModelClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def shared_model_client(api_key: str) -> ModelClient:
+    """API 키별 프로세스 공용 클라이언트 (처음 호출할 때 모델 생성)
+
+    키마다 별도의 genai.Client를 만들므로 (프로세스 전역 설정을 쓰지 않음)
+    한 사용자의 요청과 컨텍스트 캐시가 다른 사용자의 키로 전송되거나 과금되지 않습니다.
+    응답하지 않는 요청은 UPSTREAM_TIMEOUT에 끊겨 동시 요청 슬롯을 돌려줍니다.
+    """
+    if not GEMINI_AVAILABLE:
+        raise RuntimeError("google-genai 패키지가 필요합니다: pip install google-genai")
+
+    client_key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    with _shared_clients_lock:
+        client = _shared_clients.get(client_key)
+        if client is None:
+            # HttpOptions.timeout은 밀리초 단위
+            http_options = genai_types.HttpOptions(timeout=int(UPSTREAM_TIMEOUT * 1000))
+            api_client = genai.Client(api_key=api_key, http_options=http_options)
+            max_concurrency = int(os.environ.get('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+            factory = ContextCacheFactory(api_client) if CONTEXT_CACHE_ENABLED else None
+            client = ModelClient(GeminiModel(api_client), max_concurrency=max_concurrency,
+                                 context_cache_factory=factory)
+            _shared_clients[client_key] = client
+        return client
+
+
+class GeminiModel:
+    """API 키 하나의 genai.Client로 요청하는 모델 (ModelClient가 쓰는 generate_content 인터페이스)
+
+    cached_content를 주면 그 컨텍스트 캐시(같은 키로 만든 캐시)를 앞부분으로 사용합니다.
+    """
+
+    __slots__ = ('api_client', 'config')
+
+    def __init__(self, api_client, cached_content: Optional[str] = None):
+        self.api_client = api_client
+        self.config = genai_types.GenerateContentConfig(temperature=GEMINI_TEMPERATURE,
+                                                        cached_content=cached_content)
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        if stream:
+            return self.api_client.models.generate_content_stream(
+                model=GEMINI_MODEL_NAME, contents=prompt, config=self.config)
+        return self.api_client.models.generate_content(model=GEMINI_MODEL_NAME, contents=prompt, config=self.config)
+
+
+class ContextCacheFactory:
+    """프롬프트 앞부분을 컨텍스트 캐시로 만들고 그 캐시를 쓰는 모델 반환 (API 키 하나의 클라이언트 사용)
+
+    앞부분이 모델의 최소 캐시 크기보다 짧거나 모델이 캐시를 지원하지 않으면 예외가 발생하며,
+    호출자(ModelClient)는 전체 프롬프트 전송으로 대체합니다.
+    """
+
+    __slots__ = ('api_client',)
+
+    def __init__(self, api_client):
+        self.api_client = api_client
+
+    def __call__(self, prefix: str) -> GeminiModel:
+        cached_content = self.api_client.caches.create(
+            model=GEMINI_MODEL_NAME,
+            config=genai_types.CreateCachedContentConfig(
+                display_name='koica-prompt-prefix',
+                contents=[prefix],
+                ttl=f'{CONTEXT_CACHE_TTL}s',
+            ),
+        )
+        return GeminiModel(self.api_client, cached_content=cached_content.name)
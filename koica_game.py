@@ -12,38 +12,235 @@ import re
 import time
 import random
 import argparse
-from typing import Dict, List, Optional, Tuple
+import copy
+import threading
+from array import array
+from collections.abc import MutableMapping, Sequence
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ai_schema import ScenarioValidationError, extract_json_object, validate_free_form_result, validate_scenario
+from gemini_cache import (DEFAULT_CACHE_PATH, HIT_POLICIES, GenerationCache, bucket_stat, context_key,
+                          default_generation_cache)
+from gemini_client import (BREAKER_CLOSED, BREAKER_OPEN, DEFAULT_DEADLINE, CircuitOpenError, DeadlineExceeded,
+                           ModelClient, shared_model_client)
+from play_analytics import FOCUS_AREAS, PlayStyleAnalytics, scenario_category
+from procedural_scenarios import default_procedural_generator, identify_weaknesses
+from prompt_builder import default_prompt_builder
+from scenario_batch import (DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE, ScenarioBatchQueue, stat_snapshot,
+                            upcoming_periods)
+from scenario_graph import (FLAG_ADVANCE_TIME, FLAG_HAS_DELAYED_EFFECTS, FLAG_HAS_DEPUTY_MORALE, FLAG_HAS_STATS,
+                            ScenarioGraph, compile_scenarios, load_scenario_graph, main_scenario_id,
+                            pack_stat_changes)
+from scenario_pool import ScenarioPool, default_scenario_pool, pool_key
+from scenario_prefetch import ScenarioPrefetcher, leads_to_ai_scenario
+from stat_history import StatHistory
 
 # Gemini API import (optional - graceful degradation if not available)
 try:
-    import google.generativeai as genai
+    from google import genai
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
-    print("Warning: google-generativeai not installed. AI features will be disabled.")
+    print("Warning: google-genai not installed. AI features will be disabled.")
+
+
+# GameState 스탯 벡터 인덱스 (고정 길이 리스트에 정수 점수로 저장)
+(STAT_REPUTATION, STAT_BUDGET_PERSONNEL, STAT_BUDGET_PROJECT, STAT_BUDGET_OPERATION,
+ STAT_STAFF_MORALE, STAT_PROJECT_SUCCESS, STAT_STRESS, STAT_WELLBEING) = range(8)
+
+# KOICA 예산 세목 (인건비, 사업비, 운영비는 별도 세목) -> 스탯 벡터 인덱스
+BUDGET_CATEGORIES = ('인건비', '사업비', '운영비')
+_BUDGET_INDEX = {
+    '인건비': STAT_BUDGET_PERSONNEL,
+    '사업비': STAT_BUDGET_PROJECT,
+    '운영비': STAT_BUDGET_OPERATION
+}
+
+# 초기 스탯 (평판, 인건비, 사업비, 운영비, 직원 만족도, 프로젝트 성공도, 스트레스, 웰빙)
+# 평판/프로젝트 성공도는 더 어려운 시작점, 직원 만족도/웰빙은 밸런스 개선, 스트레스는 더 높은 시작점
+_INITIAL_STATS = (25, 25, 25, 25, 50, 25, 50, 50)
+
+# 직원 그룹별 고정 정보 (사기를 제외한 필드, 사기는 그룹별 배열에 저장)
+DEPUTY_INFO = (
+    {"name": "부소장 1", "personality": "principled",  # 원칙주의자
+     "description": "규정과 원칙을 중시하는 스타일"},
+    {"name": "부소장 2", "personality": "local_friendly",  # 현지친화형
+     "description": "현지 파트너와의 관계를 중시하는 스타일"}
+)
+COORDINATOR_INFO = (
+    {"name": "코디 1"},
+    {"name": "코디 2"}
+)
+YP_INFO = (
+    {"name": "YP 1", "specialty": "monitoring_evaluation"},  # 모니터링 평가 전문
+    {"name": "YP 2", "specialty": "community_development"}   # 지역사회 개발 전문
+)
+
+
+def _build_local_staff_info():
+    """10명의 현지직원 고정 정보 생성"""
+    roles = [
+        ("행정", 2),  # 행정 직원 2명
+        ("통역", 2),  # 통역사 2명
+        ("운전기사", 2),  # 운전기사 2명
+        ("프로젝트 보조", 3),  # 프로젝트 보조 직원 3명
+        ("청소/경비", 1)  # 청소/경비 1명
+    ]
+    local_staff = []
+    for role, count in roles:
+        for i in range(count):
+            local_staff.append({
+                "id": len(local_staff) + 1,
+                "name": f"{role} {i+1}" if count > 1 else role,
+                "role": role,
+                "salary_satisfaction": 50  # 급여 만족도
+            })
+    return tuple(local_staff)
+
+
+LOCAL_STAFF_INFO = _build_local_staff_info()
+_DEPUTY_INDEX = {info["personality"]: i for i, info in enumerate(DEPUTY_INFO)}
+_LOCAL_STAFF_INDEX = {info["id"]: i for i, info in enumerate(LOCAL_STAFF_INFO)}
+_LOCAL_STAFF_ROLE_INDICES = {}
+for _i, _info in enumerate(LOCAL_STAFF_INFO):
+    _LOCAL_STAFF_ROLE_INDICES.setdefault(_info["role"], []).append(_i)
+_LOCAL_STAFF_ROLE_INDICES = {role: tuple(indices) for role, indices in _LOCAL_STAFF_ROLE_INDICES.items()}
+
+# 직원 초기 사기
+_INITIAL_MORALE = 50
+
+
+class BudgetExecutionRates(MutableMapping):
+    """GameState 스탯 벡터의 세목별 예산 집행률을 딕셔너리처럼 보여주는 뷰"""
+
+    __slots__ = ('_stats',)
+
+    def __init__(self, stats):
+        self._stats = stats
+
+    def __getitem__(self, category):
+        return self._stats[_BUDGET_INDEX[category]]
+
+    def __setitem__(self, category, value):
+        self._stats[_BUDGET_INDEX[category]] = round(value)
+
+    def __delitem__(self, category):
+        raise TypeError("예산 세목은 삭제할 수 없습니다.")
+
+    def __iter__(self):
+        return iter(BUDGET_CATEGORIES)
+
+    def __len__(self):
+        return len(BUDGET_CATEGORIES)
+
+    def copy(self) -> Dict[str, int]:
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class StaffMember(MutableMapping):
+    """직원 한 명을 딕셔너리처럼 보여주는 뷰 (사기만 변경 가능)"""
+
+    __slots__ = ('_morale', '_index', '_info')
+
+    def __init__(self, morale, index, info):
+        self._morale = morale
+        self._index = index
+        self._info = info
+
+    def __getitem__(self, key):
+        if key == "morale":
+            return self._morale[self._index]
+        return self._info[key]
+
+    def __setitem__(self, key, value):
+        if key != "morale":
+            raise TypeError(f"직원 정보 '{key}'는 변경할 수 없습니다.")
+        self._morale[self._index] = round(value)
+
+    def __delitem__(self, key):
+        raise TypeError("직원 정보는 삭제할 수 없습니다.")
+
+    def __iter__(self):
+        yield from self._info
+        yield "morale"
+
+    def __len__(self):
+        return len(self._info) + 1
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class StaffGroup(Sequence):
+    """직원 그룹을 직원 딕셔너리 목록처럼 보여주는 뷰"""
+
+    __slots__ = ('_morale', '_infos')
+
+    def __init__(self, morale, infos):
+        self._morale = morale
+        self._infos = infos
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._infos)))]
+        if index < 0:
+            index += len(self._infos)
+        return StaffMember(self._morale, index, self._infos[index])
+
+    def __len__(self):
+        return len(self._infos)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _clamp_stat(value):
+    return max(0, min(100, value))
+
+
+def _stat_property(index: int, doc: str) -> property:
+    """스탯 벡터의 한 칸을 정수 속성으로 노출"""
+    def getter(self):
+        return self._stats[index]
+
+    def setter(self, value):
+        self._stats[index] = round(value)
+
+    return property(getter, setter, doc=doc)
 
 
 class GameState:
-    """게임 상태를 관리하는 클래스"""
+    """게임 상태를 관리하는 클래스
+
+    스탯은 고정 길이 정수 벡터에, 직원 사기는 그룹별 정수 배열(array)에 저장하고
+    기존 속성/딕셔너리 API는 프로퍼티와 뷰로 제공합니다.
+    """
+
+    __slots__ = (
+        'year', 'period', '_stats', 'current_scenario', 'visited_scenarios', 'game_over', 'ending',
+        'car_choice', 'housing_choice', 'leisure_choice', 'meal_choice',
+        'choice_history', 'stat_history', 'major_decisions', 'analytics',
+        'triggered_life_events', 'life_events_count', 'triggered_deputy_events',
+        'pending_delayed_effects', 'ethics_violations', 'pending_turn',
+        '_deputy_morale', '_coordinator_morale', '_yp_morale', '_local_staff_morale'
+    )
+
+    reputation = _stat_property(STAT_REPUTATION, "평판 (0-100)")
+    staff_morale = _stat_property(STAT_STAFF_MORALE, "직원 만족도 (0-100)")
+    project_success = _stat_property(STAT_PROJECT_SUCCESS, "프로젝트 성공도 (0-100)")
+    stress = _stat_property(STAT_STRESS, "스트레스 (0-100, 낮을수록 좋음)")
+    wellbeing = _stat_property(STAT_WELLBEING, "웰빙 (0-100, 높을수록 좋음)")
 
-    def __init__(self):
+    def __init__(self, stat_history_limit: Optional[int] = None):
         self.year = 1
         self.period = 1  # 격월 단위 (1=1-2월, 2=3-4월, 3=5-6월, 4=7-8월, 5=9-10월, 6=11-12월)
-        self.reputation = 25  # 평판 (0-100) - 더 어려운 시작점
-
-        # KOICA 예산은 세목별로 관리됨 (인건비, 사업비, 운영비는 별도 세목)
-        self.budget_execution_rates = {
-            '인건비': 25,  # 현지직원 급여 등
-            '사업비': 25,  # 프로젝트 사업비
-            '운영비': 25   # 사무소 운영비
-        }
-
-        self.staff_morale = 50  # 직원 만족도 (0-100) - 밸런스 개선
-        self.project_success = 25  # 프로젝트 성공도 (0-100) - 더 어려운 시작점
 
-        # 생활 스탯 추가
-        self.stress = 50  # 스트레스 (0-100, 낮을수록 좋음) - 더 높은 시작점
-        self.wellbeing = 50  # 웰빙 (0-100, 높을수록 좋음) - 밸런스 개선
+        # 업무/생활 스탯 벡터 (세목별 예산 집행률 포함)
+        # 매 스텝 읽고 쓰므로 인덱스 접근이 가장 빠른 리스트 사용 (길이는 항상 고정)
+        self._stats = list(_INITIAL_STATS)
 
         self.current_scenario = "start"
         self.visited_scenarios = []
@@ -58,16 +255,9 @@ class GameState:
 
         # Enhanced: Player history tracking
         self.choice_history = []  # 선택 히스토리
-        self.stat_history = []  # 스탯 변화 히스토리
+        self.stat_history = StatHistory(maxlen=stat_history_limit)  # 스탯 변화 히스토리 (열 지향, 선택적 상한)
         self.major_decisions = []  # 주요 결정 포인트
-        self.player_style = {  # 플레이어 스타일 분석
-            "reputation_focused": 0,
-            "budget_focused": 0,
-            "staff_focused": 0,
-            "project_focused": 0,
-            "risk_taking": 0,
-            "principle_oriented": 0
-        }
+        self.analytics = PlayStyleAnalytics()  # 플레이어 스타일 분석 (선택마다 누적)
 
         # 발생한 생활 이벤트 추적 (중복 방지)
         self.triggered_life_events = set()
@@ -84,175 +274,202 @@ class GameState:
         # 고급 기능: 윤리 위반 횟수 (새로운 엔딩 조건용)
         self.ethics_violations = 0
 
-        # 부소장 및 코디네이터 관리 시스템 (부소장 2명, 코디 2명)
-        self.deputies = self._initialize_deputies()
-        self.coordinators = self._initialize_coordinators()
+        # 이벤트 선택을 기다리는 턴의 남은 단계 ({'stage', 'next'}, 전이 엔진 step이 관리)
+        self.pending_turn = None
+
+        # 부소장 및 코디네이터 (부소장 2명, 코디 2명), YP 및 현지직원 (YP 2명, 현지직원 10명) 사기
+        self._deputy_morale = array('h', [_INITIAL_MORALE] * len(DEPUTY_INFO))
+        self._coordinator_morale = array('h', [_INITIAL_MORALE] * len(COORDINATOR_INFO))
+        self._yp_morale = array('h', [_INITIAL_MORALE] * len(YP_INFO))
+        self._local_staff_morale = array('h', [_INITIAL_MORALE] * len(LOCAL_STAFF_INFO))
+
+    # copy()에서 슬라이스로 새로 만드는 리스트/배열, copy()로 복사하는 컨테이너 (나머지는 불변 값이라 공유)
+    # pending_turn은 제자리에서 바꾸지 않고 항상 새 딕셔너리로 교체하므로 공유합니다
+    _SLICED_SLOTS = ('_stats', 'visited_scenarios', 'choice_history', 'major_decisions', 'pending_delayed_effects',
+                     '_deputy_morale', '_coordinator_morale', '_yp_morale', '_local_staff_morale')
+    _COPIED_SLOTS = ('stat_history', 'analytics', 'triggered_life_events', 'triggered_deputy_events')
+
+    def copy(self) -> 'GameState':
+        """게임 상태 복사 (배열과 컨테이너는 새로 만들고, 기록된 결과 딕셔너리는 공유)
 
-        # YP 및 현지직원 관리 시스템 (YP 2명, 현지직원 10명)
-        self.yps = self._initialize_yps()
-        self.local_staff = self._initialize_local_staff()
+        전이 엔진(step)이 선택마다 호출하므로 슬롯별 처리 방법을 미리 나눠 두고 분기 없이 복사합니다.
+        """
+        clone = GameState.__new__(GameState)
+        for name in _SHARED_SLOTS:
+            setattr(clone, name, getattr(self, name))
+        for name in GameState._SLICED_SLOTS:
+            setattr(clone, name, getattr(self, name)[:])
+        for name in GameState._COPIED_SLOTS:
+            setattr(clone, name, getattr(self, name).copy())
+        return clone
+
+    __copy__ = copy
+
+    def to_dict(self, graph: Optional[ScenarioGraph] = None) -> Dict:
+        """JSON으로 직렬화할 수 있는 딕셔너리 (세션 저장용)
+
+        graph를 주면 시나리오 파일에 있는 선택지 그대로인 선택 기록은 [시나리오 ID, 선택 번호, 년차, 기간]만
+        저장하고 복원할 때 그래프의 결과를 다시 참조합니다. AI 시나리오와 자유 입력은 결과까지 저장합니다.
+        """
+        scenario_map = graph.scenario_map if graph is not None else {}
+        return {
+            'year': self.year,
+            'period': self.period,
+            'stats': self._stats,
+            'morale': [self._deputy_morale.tolist(), self._coordinator_morale.tolist(),
+                       self._yp_morale.tolist(), self._local_staff_morale.tolist()],
+            'current_scenario': self.current_scenario,
+            'visited_scenarios': self.visited_scenarios,
+            'game_over': self.game_over,
+            'ending': self.ending,
+            'lifestyle': [self.car_choice, self.housing_choice, self.leisure_choice, self.meal_choice],
+            'choice_history': [_encode_choice_record(record, scenario_map) for record in self.choice_history],
+            'stat_history': self.stat_history.to_dict(),
+            'major_decisions': self.major_decisions,
+            'analytics': self.analytics.to_dict(),
+            'triggered_life_events': sorted(self.triggered_life_events),
+            'life_events_count': self.life_events_count,
+            'triggered_deputy_events': sorted(self.triggered_deputy_events),
+            'pending_delayed_effects': self.pending_delayed_effects,
+            'ethics_violations': self.ethics_violations,
+            'pending_turn': self.pending_turn,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, graph: Optional[ScenarioGraph] = None,
+                  stat_history_limit: Optional[int] = None) -> 'GameState':
+        """to_dict 결과로 게임 상태 복원 (저장할 때와 같은 시나리오 그래프를 전달)"""
+        scenario_map = graph.scenario_map if graph is not None else {}
+        state = cls.__new__(cls)
+        state.year = data['year']
+        state.period = data['period']
+        state._stats = list(data['stats'])
+        deputy, coordinator, yp, local_staff = data['morale']
+        state._deputy_morale = array('h', deputy)
+        state._coordinator_morale = array('h', coordinator)
+        state._yp_morale = array('h', yp)
+        state._local_staff_morale = array('h', local_staff)
+        state.current_scenario = data['current_scenario']
+        state.visited_scenarios = list(data['visited_scenarios'])
+        state.game_over = data['game_over']
+        state.ending = data['ending']
+        state.car_choice, state.housing_choice, state.leisure_choice, state.meal_choice = data['lifestyle']
+        state.choice_history = [_decode_choice_record(record, scenario_map) for record in data['choice_history']]
+        state.stat_history = StatHistory.from_dict(data['stat_history'], maxlen=stat_history_limit)
+        state.major_decisions = list(data['major_decisions'])
+        state.analytics = PlayStyleAnalytics.from_dict(data['analytics'])
+        state.triggered_life_events = set(data['triggered_life_events'])
+        state.life_events_count = data['life_events_count']
+        state.triggered_deputy_events = set(data['triggered_deputy_events'])
+        state.pending_delayed_effects = list(data['pending_delayed_effects'])
+        state.ethics_violations = data['ethics_violations']
+        state.pending_turn = data['pending_turn']
+        return state
+
+    @property
+    def player_style(self):
+        """플레이어 스타일 가중치 집계 (reputation_focused, risk_taking 등)"""
+        return self.analytics.style
+
+    @player_style.setter
+    def player_style(self, style):
+        self.analytics.style = style
+
+    @property
+    def budget_execution_rates(self):
+        """세목별 예산 집행률 (딕셔너리처럼 사용하는 뷰)"""
+        return BudgetExecutionRates(self._stats)
+
+    @budget_execution_rates.setter
+    def budget_execution_rates(self, rates):
+        for category, value in rates.items():
+            self._stats[_BUDGET_INDEX[category]] = round(value)
 
     @property
     def budget_execution_rate(self):
         """세목별 예산 집행률의 평균 (호환성을 위한 프로퍼티)"""
-        return sum(self.budget_execution_rates.values()) / len(self.budget_execution_rates)
+        stats = self._stats
+        return (stats[STAT_BUDGET_PERSONNEL] + stats[STAT_BUDGET_PROJECT] + stats[STAT_BUDGET_OPERATION]) / 3
 
     @budget_execution_rate.setter
     def budget_execution_rate(self, value):
         """모든 세목의 예산 집행률을 동일한 값으로 설정 (호환성을 위한 setter)"""
-        for key in self.budget_execution_rates:
-            self.budget_execution_rates[key] = value
+        value = round(value)
+        for index in _BUDGET_INDEX.values():
+            self._stats[index] = value
 
-    def update_stats(self, changes):
-        """스탯 업데이트 및 히스토리 기록"""
-        old_stats = {
-            'reputation': self.reputation,
-            'budget_execution_rate': self.budget_execution_rate,
-            'staff_morale': self.staff_morale,
-            'project_success': self.project_success,
-            'stress': self.stress,
-            'wellbeing': self.wellbeing
-        }
+    @property
+    def deputies(self):
+        """부소장 목록 (이름, 성격, 설명, 사기)"""
+        return StaffGroup(self._deputy_morale, DEPUTY_INFO)
 
-        if 'reputation' in changes:
-            self.reputation = max(0, min(100, self.reputation + changes['reputation']))
-
-        # 세목별 예산 집행률 처리
-        if 'budget_personnel' in changes or 'budget_인건비' in changes:
-            # 인건비 세목
-            change_value = changes.get('budget_personnel', changes.get('budget_인건비', 0))
-            self.budget_execution_rates['인건비'] = max(0, min(100,
-                self.budget_execution_rates['인건비'] + change_value))
-
-        if 'budget_project' in changes or 'budget_사업비' in changes:
-            # 사업비 세목
-            change_value = changes.get('budget_project', changes.get('budget_사업비', 0))
-            self.budget_execution_rates['사업비'] = max(0, min(100,
-                self.budget_execution_rates['사업비'] + change_value))
-
-        if 'budget_operation' in changes or 'budget_운영비' in changes:
-            # 운영비 세목
-            change_value = changes.get('budget_operation', changes.get('budget_운영비', 0))
-            self.budget_execution_rates['운영비'] = max(0, min(100,
-                self.budget_execution_rates['운영비'] + change_value))
-
-        if 'budget' in changes:
-            # 기존 호환성을 위해 'budget'은 사업비로 처리
-            self.budget_execution_rates['사업비'] = max(0, min(100,
-                self.budget_execution_rates['사업비'] + changes['budget']))
-
-        if 'staff_morale' in changes:
-            self.staff_morale = max(0, min(100, self.staff_morale + changes['staff_morale']))
-        if 'project_success' in changes:
-            self.project_success = max(0, min(100, self.project_success + changes['project_success']))
-        if 'stress' in changes:
-            self.stress = max(0, min(100, self.stress + changes['stress']))
-        if 'wellbeing' in changes:
-            self.wellbeing = max(0, min(100, self.wellbeing + changes['wellbeing']))
+    @property
+    def coordinators(self):
+        """코디네이터 목록 (이름, 사기)"""
+        return StaffGroup(self._coordinator_morale, COORDINATOR_INFO)
 
-        # 스탯 변화 기록
-        self.stat_history.append({
-            'year': self.year,
-            'period': self.period,
-            'changes': changes,
-            'old': old_stats,
-            'new': {
-                'reputation': self.reputation,
-                'budget_execution_rate': self.budget_execution_rate,
-                'budget_execution_rates': self.budget_execution_rates.copy(),  # 세목별 예산 집행률
-                'staff_morale': self.staff_morale,
-                'project_success': self.project_success,
-                'stress': self.stress,
-                'wellbeing': self.wellbeing
-            }
-        })
+    @property
+    def yps(self):
+        """YP (Young Professional) 목록 (이름, 사기, 전문 분야)"""
+        return StaffGroup(self._yp_morale, YP_INFO)
 
-    def _initialize_deputies(self):
-        """2명의 부소장 초기화 (성격과 사기 부여)"""
-        deputy_types = [
-            {
-                "name": "부소장 1",
-                "personality": "principled",  # 원칙주의자
-                "description": "규정과 원칙을 중시하는 스타일",
-                "morale": 50
-            },
-            {
-                "name": "부소장 2",
-                "personality": "local_friendly",  # 현지친화형
-                "description": "현지 파트너와의 관계를 중시하는 스타일",
-                "morale": 50
-            }
-        ]
-        return deputy_types
+    @property
+    def local_staff(self):
+        """현지직원 목록 (ID, 이름, 역할, 사기, 급여 만족도)"""
+        return StaffGroup(self._local_staff_morale, LOCAL_STAFF_INFO)
 
-    def _initialize_coordinators(self):
-        """2명의 코디네이터 초기화"""
-        coordinators = [
-            {
-                "name": "코디 1",
-                "morale": 50
-            },
-            {
-                "name": "코디 2",
-                "morale": 50
-            }
-        ]
-        return coordinators
+    def update_stats(self, changes):
+        """스탯 업데이트 및 히스토리 기록"""
+        self.apply_stat_deltas([round(delta) for delta in pack_stat_changes(changes)])
 
-    def _initialize_yps(self):
-        """2명의 YP (Young Professional) 초기화"""
-        yps = [
-            {
-                "name": "YP 1",
-                "morale": 50,
-                "specialty": "monitoring_evaluation"  # 모니터링 평가 전문
-            },
-            {
-                "name": "YP 2",
-                "morale": 50,
-                "specialty": "community_development"  # 지역사회 개발 전문
-            }
-        ]
-        return yps
-
-    def _initialize_local_staff(self):
-        """10명의 현지직원 초기화"""
-        local_staff = []
-        roles = [
-            ("행정", 2),  # 행정 직원 2명
-            ("통역", 2),  # 통역사 2명
-            ("운전기사", 2),  # 운전기사 2명
-            ("프로젝트 보조", 3),  # 프로젝트 보조 직원 3명
-            ("청소/경비", 1)  # 청소/경비 1명
-        ]
+    def apply_stat_deltas(self, deltas):
+        """STAT_DELTA_FIELDS 순서의 스탯 변화 벡터 적용 및 히스토리 기록
 
-        staff_id = 1
-        for role, count in roles:
-            for i in range(count):
-                local_staff.append({
-                    "id": staff_id,
-                    "name": f"{role} {i+1}" if count > 1 else role,
-                    "role": role,
-                    "morale": 50,
-                    "salary_satisfaction": 50  # 급여 만족도
-                })
-                staff_id += 1
+        컴파일된 시나리오 그래프의 선택지 효과는 이미 벡터로 저장되어 있으므로
+        키 조회 없이 바로 적용합니다.
+        """
+        reputation, personnel, project, operation, budget, staff_morale, project_success, stress, wellbeing = deltas
+        stats = self._stats
+        old_stats = stats[:]
+
+        # 변화량이 0이면 값이 0-100 범위 안에 있으므로 clamp 결과도 같음
+        if reputation:
+            stats[STAT_REPUTATION] = max(0, min(100, stats[STAT_REPUTATION] + reputation))
+
+        # 세목별 예산 집행률 처리 ('budget'은 기존 호환성을 위해 사업비로 처리)
+        if personnel:
+            stats[STAT_BUDGET_PERSONNEL] = max(0, min(100, stats[STAT_BUDGET_PERSONNEL] + personnel))
+        if project:
+            stats[STAT_BUDGET_PROJECT] = max(0, min(100, stats[STAT_BUDGET_PROJECT] + project))
+        if operation:
+            stats[STAT_BUDGET_OPERATION] = max(0, min(100, stats[STAT_BUDGET_OPERATION] + operation))
+        if budget:
+            stats[STAT_BUDGET_PROJECT] = max(0, min(100, stats[STAT_BUDGET_PROJECT] + budget))
+
+        if staff_morale:
+            stats[STAT_STAFF_MORALE] = max(0, min(100, stats[STAT_STAFF_MORALE] + staff_morale))
+        if project_success:
+            stats[STAT_PROJECT_SUCCESS] = max(0, min(100, stats[STAT_PROJECT_SUCCESS] + project_success))
+        if stress:
+            stats[STAT_STRESS] = max(0, min(100, stats[STAT_STRESS] + stress))
+        if wellbeing:
+            stats[STAT_WELLBEING] = max(0, min(100, stats[STAT_WELLBEING] + wellbeing))
 
-        return local_staff
+        # 스탯 변화 기록
+        self.stat_history.append(self.year, self.period, old_stats, stats, deltas)
 
     def update_deputy_morale(self, personality_type, change):
         """특정 성격의 부소장 사기 변경"""
-        for deputy in self.deputies:
-            if deputy["personality"] == personality_type:
-                deputy["morale"] = max(0, min(100, deputy["morale"] + change))
-                break
+        index = _DEPUTY_INDEX.get(personality_type)
+        if index is not None:
+            self._deputy_morale[index] = max(0, min(100, self._deputy_morale[index] + round(change)))
 
     def get_deputy_by_personality(self, personality_type):
         """특정 성격의 부소장 정보 반환"""
-        for deputy in self.deputies:
-            if deputy["personality"] == personality_type:
-                return deputy
-        return None
+        index = _DEPUTY_INDEX.get(personality_type)
+        if index is None:
+            return None
+        return StaffMember(self._deputy_morale, index, DEPUTY_INFO[index])
 
     def get_low_morale_deputies(self, threshold=40):
         """사기가 낮은 부소장 목록 반환"""
@@ -260,52 +477,55 @@ class GameState:
 
     def get_average_deputy_morale(self):
         """부소장 평균 사기 계산"""
-        return sum(d["morale"] for d in self.deputies) / len(self.deputies)
+        return sum(self._deputy_morale) / len(self._deputy_morale)
 
     def update_coordinator_morale(self, coordinator_index, change):
         """코디네이터 사기 변경 (0-based index)"""
-        if 0 <= coordinator_index < len(self.coordinators):
-            self.coordinators[coordinator_index]["morale"] = max(0, min(100, self.coordinators[coordinator_index]["morale"] + change))
+        if 0 <= coordinator_index < len(self._coordinator_morale):
+            morale = self._coordinator_morale
+            morale[coordinator_index] = _clamp_stat(morale[coordinator_index] + round(change))
 
     def update_yp_morale(self, yp_index, change):
         """YP 사기 변경 (0-based index)"""
-        if 0 <= yp_index < len(self.yps):
-            self.yps[yp_index]["morale"] = max(0, min(100, self.yps[yp_index]["morale"] + change))
+        if 0 <= yp_index < len(self._yp_morale):
+            self._yp_morale[yp_index] = _clamp_stat(self._yp_morale[yp_index] + round(change))
 
     def update_all_yp_morale(self, change):
         """모든 YP의 사기 일괄 변경"""
-        for yp in self.yps:
-            yp["morale"] = max(0, min(100, yp["morale"] + change))
+        morale = self._yp_morale
+        for i in range(len(morale)):
+            morale[i] = _clamp_stat(morale[i] + round(change))
 
     def get_average_yp_morale(self):
         """YP 평균 사기 계산"""
-        if len(self.yps) == 0:
+        if len(self._yp_morale) == 0:
             return 50
-        return sum(yp["morale"] for yp in self.yps) / len(self.yps)
+        return sum(self._yp_morale) / len(self._yp_morale)
 
     def update_local_staff_morale(self, staff_id, change):
         """특정 현지직원 사기 변경 (ID 기반)"""
-        for staff in self.local_staff:
-            if staff["id"] == staff_id:
-                staff["morale"] = max(0, min(100, staff["morale"] + change))
-                break
+        index = _LOCAL_STAFF_INDEX.get(staff_id)
+        if index is not None:
+            morale = self._local_staff_morale
+            morale[index] = _clamp_stat(morale[index] + round(change))
 
     def update_all_local_staff_morale(self, change):
         """모든 현지직원 사기 일괄 변경"""
-        for staff in self.local_staff:
-            staff["morale"] = max(0, min(100, staff["morale"] + change))
+        morale = self._local_staff_morale
+        for i in range(len(morale)):
+            morale[i] = _clamp_stat(morale[i] + round(change))
 
     def update_local_staff_by_role(self, role, change):
         """특정 역할의 현지직원 사기 변경"""
-        for staff in self.local_staff:
-            if staff["role"] == role:
-                staff["morale"] = max(0, min(100, staff["morale"] + change))
+        morale = self._local_staff_morale
+        for i in _LOCAL_STAFF_ROLE_INDICES.get(role, ()):
+            morale[i] = _clamp_stat(morale[i] + round(change))
 
     def get_average_local_staff_morale(self):
         """현지직원 평균 사기 계산"""
-        if len(self.local_staff) == 0:
+        if len(self._local_staff_morale) == 0:
             return 50
-        return sum(staff["morale"] for staff in self.local_staff) / len(self.local_staff)
+        return sum(self._local_staff_morale) / len(self._local_staff_morale)
 
     def get_low_morale_local_staff(self, threshold=40):
         """사기가 낮은 현지직원 목록 반환"""
@@ -313,11 +533,12 @@ class GameState:
 
     def get_staff_count_by_role(self, role):
         """특정 역할의 직원 수 반환"""
-        return sum(1 for s in self.local_staff if s["role"] == role)
+        return len(_LOCAL_STAFF_ROLE_INDICES.get(role, ()))
 
     def get_total_staff_count(self):
         """전체 직원 수 반환 (부소장 + 코디 + YP + 현지직원)"""
-        return len(self.deputies) + len(self.coordinators) + len(self.yps) + len(self.local_staff)
+        return (len(self._deputy_morale) + len(self._coordinator_morale)
+                + len(self._yp_morale) + len(self._local_staff_morale))
 
     def record_choice(self, scenario_id, choice_text, choice_index, result):
         """선택 기록 및 플레이어 스타일 분석"""
@@ -330,58 +551,8 @@ class GameState:
             'result': result
         })
 
-        # 플레이어 스타일 분석 (가중치 기반)
-        if 'stats' in result:
-            stats = result['stats']
-
-            # 평판 중심: 큰 변화에 가중치 부여
-            if 'reputation' in stats:
-                rep_change = stats['reputation']
-                if abs(rep_change) >= 10:
-                    # 큰 변화는 2배 가중치
-                    self.player_style['reputation_focused'] += 2 if rep_change > 0 else 1
-                elif rep_change > 0:
-                    self.player_style['reputation_focused'] += 1
-                elif rep_change <= -5:
-                    # 큰 희생을 감수한 경우도 일부 반영 (다른 목표를 위한 tradeoff)
-                    self.player_style['reputation_focused'] += 0.5
-
-            # 예산 중심: 예산 집행률 관리에 신경 쓰는 선택
-            if 'budget' in stats:
-                budget_change = stats['budget']
-                if abs(budget_change) >= 10:
-                    self.player_style['budget_focused'] += 2 if budget_change > 0 else 1
-                elif budget_change != 0:
-                    self.player_style['budget_focused'] += 1
-
-            # 직원 중심: 직원 만족도 증가 선택
-            if 'staff_morale' in stats:
-                morale_change = stats['staff_morale']
-                if abs(morale_change) >= 10:
-                    self.player_style['staff_focused'] += 2 if morale_change > 0 else 1
-                elif morale_change > 0:
-                    self.player_style['staff_focused'] += 1
-                elif morale_change <= -5:
-                    self.player_style['staff_focused'] += 0.5
-
-            # 프로젝트 중심: 프로젝트 성공도 증가 선택
-            if 'project_success' in stats:
-                project_change = stats['project_success']
-                if abs(project_change) >= 10:
-                    self.player_style['project_focused'] += 2 if project_change > 0 else 1
-                elif project_change > 0:
-                    self.player_style['project_focused'] += 1
-                elif project_change <= -5:
-                    self.player_style['project_focused'] += 0.5
-
-            # 위험 감수 성향 분석 (큰 변화를 선택하는 경우)
-            total_change = sum(abs(v) for v in stats.values())
-            if total_change >= 30:
-                # 매우 큰 변화
-                self.player_style['risk_taking'] += 2
-            elif total_change >= 20:
-                # 큰 변화
-                self.player_style['risk_taking'] += 1
+        # 플레이어 스타일 분석 (가중치 기반) 및 엔딩용 누적 집계
+        self.analytics.record(scenario_id, choice_text, result)
 
     def get_play_summary(self):
         """플레이 요약 반환 (Gemini에게 전달할 컨텍스트)"""
@@ -416,31 +587,30 @@ class GameState:
             self.year += 1
 
         # 매 격월마다 자동 예산 집행 (현실적인 공공 프로젝트 운영)
+        stats = self._stats
         # 인건비: 급여 등 정기 지출 (격월당 +7)
-        self.budget_execution_rates['인건비'] = min(100,
-            self.budget_execution_rates['인건비'] + 7)
+        stats[STAT_BUDGET_PERSONNEL] = min(100, stats[STAT_BUDGET_PERSONNEL] + 7)
         # 사업비: 프로젝트 진행에 따른 지출 (격월당 +4)
-        self.budget_execution_rates['사업비'] = min(100,
-            self.budget_execution_rates['사업비'] + 4)
+        stats[STAT_BUDGET_PROJECT] = min(100, stats[STAT_BUDGET_PROJECT] + 4)
         # 운영비: 사무소 운영 비용 (격월당 +6)
-        self.budget_execution_rates['운영비'] = min(100,
-            self.budget_execution_rates['운영비'] + 6)
+        stats[STAT_BUDGET_OPERATION] = min(100, stats[STAT_BUDGET_OPERATION] + 6)
 
     def check_game_over(self):
         """게임 오버 조건 확인"""
-        if self.reputation <= 0:
+        stats = self._stats
+        if stats[STAT_REPUTATION] <= 0:
             self.game_over = True
             self.ending = "reputation_loss"
             return True
-        if self.staff_morale <= 0:
+        if stats[STAT_STAFF_MORALE] <= 0:
             self.game_over = True
             self.ending = "staff_revolt"
             return True
-        if self.stress >= 100:
+        if stats[STAT_STRESS] >= 100:
             self.game_over = True
             self.ending = "burnout"
             return True
-        if self.wellbeing <= 0:
+        if stats[STAT_WELLBEING] <= 0:
             self.game_over = True
             self.ending = "health_crisis"
             return True
@@ -468,8 +638,8 @@ class GameState:
 
         return temp_reputation <= 0 or temp_staff_morale <= 0 or temp_stress >= 100 or temp_wellbeing <= 0
 
-    def calculate_final_ending(self):
-        """최종 엔딩 계산"""
+    def final_score(self):
+        """최종 평가 점수 (평판, 직원 만족도, 프로젝트 성공도, 예산 점수의 평균)"""
         # 예산 집행률 평가: 80-100%가 이상적 (100점), 그 외는 감점
         if 80 <= self.budget_execution_rate <= 100:
             budget_score = 100
@@ -480,7 +650,11 @@ class GameState:
             # 100% 초과는 없어야 하지만, 만약 있다면 100점으로 처리
             budget_score = 100
 
-        total_score = (self.reputation + self.staff_morale + self.project_success + budget_score) / 4
+        return (self.reputation + self.staff_morale + self.project_success + budget_score) / 4
+
+    def calculate_final_ending(self):
+        """최종 엔딩 계산"""
+        total_score = self.final_score()
 
         if total_score >= 80:
             self.ending = "legendary_director"
@@ -528,22 +702,87 @@ class GameState:
         print("="*60 + "\n")
 
 
+# GameState.copy()에서 그대로 공유하는 불변 값 슬롯
+_SHARED_SLOTS = tuple(name for name in GameState.__slots__
+                      if name not in GameState._SLICED_SLOTS + GameState._COPIED_SLOTS)
+
+
+def _encode_choice_record(record: Dict, scenario_map: Dict) -> List:
+    """선택 기록 하나를 목록으로 압축 (시나리오 파일의 선택지와 같으면 결과 생략)"""
+    scenario_id, choice_index = record['scenario_id'], record['choice_index']
+    encoded = [scenario_id, choice_index, record['year'], record['period']]
+    choices = scenario_map.get(scenario_id, {}).get('choices', ())
+    if 0 <= choice_index < len(choices):
+        choice = choices[choice_index]
+        if choice['text'] == record['choice_text'] and choice['result'] == record['result']:
+            return encoded
+    encoded.append(record['choice_text'])
+    encoded.append(record['result'])
+    return encoded
+
+
+def _decode_choice_record(encoded: List, scenario_map: Dict) -> Dict:
+    """_encode_choice_record의 역변환 (생략된 결과는 시나리오 그래프의 결과를 공유)"""
+    scenario_id, choice_index, year, period = encoded[:4]
+    if len(encoded) > 4:
+        choice_text, result = encoded[4], encoded[5]
+    else:
+        choice = scenario_map[scenario_id]['choices'][choice_index]
+        choice_text, result = choice['text'], choice['result']
+    return {
+        'scenario_id': scenario_id,
+        'choice_text': choice_text,
+        'choice_index': choice_index,
+        'year': year,
+        'period': period,
+        'result': result
+    }
+
+
+def link_ai_choices(scenario: Dict) -> Dict:
+    """AI 모드 시나리오의 선택지가 시간을 진행하고 다음 AI 시나리오로 이어지도록 설정"""
+    for choice in scenario.get('choices', []):
+        choice['result']['advance_time'] = True
+        choice['result']['next'] = 'ai_generated'  # AI 생성 시나리오는 계속 AI 생성
+    return scenario
+
+
 class GeminiIntegration:
     """Gemini API 연동 클래스 - 동적 시나리오 및 선택지 생성"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[GenerationCache] = None,
+                 model=None, pool: Optional[ScenarioPool] = None,
+                 deadline: Optional[float] = DEFAULT_DEADLINE, hedge_delay: Optional[float] = None,
+                 batch_size: int = 1):
         self.enabled = GEMINI_AVAILABLE and api_key is not None
-        if self.enabled:
-            genai.configure(api_key=api_key)
-            # temperature를 높여 더 창의적이고 다양한 시나리오 생성
-            self.model = genai.GenerativeModel(
-                'gemini-2.5-flash-lite',
-                generation_config=genai.types.GenerationConfig(
-                    temperature=1.2,  # 높은 temperature로 다양성 증가
-                )
-            )
+        # 지연 SLO: 요청 마감 시간(None이면 무제한)과 hedged 요청 대기 시간(None이면 최근 p95 지연)
+        self.deadline = deadline
+        self.hedge_delay = hedge_delay
+        # 생성 결과 캐시 (None이면 캐시 없이 매번 생성)
+        self.cache = cache
+        # 사전 생성 시나리오 풀과 이번 게임의 풀 사용 위치 (키 -> (시작 위치, 사용한 수))
+        self.pool = pool
+        self._pool_cursors = {}
+        self._pool_lock = threading.Lock()
+        # 일괄 생성: 한 번에 생성할 시기 수와 이번 게임의 대기열 (1이면 시기마다 따로 생성)
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.batch_queue = ScenarioBatchQueue() if self.batch_size > 1 else None
+        if model is not None:
+            # 외부에서 주입한 모델 (풀 생성용 스텁 모델 등) - generate_content만 있으면 됨
+            self.client = ModelClient(model)
+            self.enabled = True
+        elif self.enabled:
+            # API 키별로 프로세스 전체가 공유하는 모델 클라이언트 (동시 요청 제한 + 동일 요청 병합)
+            self.client = shared_model_client(api_key)
         else:
-            self.model = None
+            self.client = None
+        self.model = self.client.model if self.client is not None else None
+        # 업스트림 회로 차단기 (같은 클라이언트를 쓰는 모든 게임이 공유)
+        self.breaker = self.client.breaker if self.client is not None else None
+        # 프롬프트 템플릿 (고정 앞부분은 프로세스당 한 번 생성, 클라이언트에 컨텍스트 캐시 대상으로 등록)
+        self.prompts = default_prompt_builder()
+        if self.client is not None:
+            self.client.register_context_prefixes(self.prompts.prefixes)
 
         # 시나리오 테마 카테고리 정의
         self.scenario_themes = [
@@ -609,19 +848,30 @@ class GeminiIntegration:
             }
         ]
 
-    def generate_scenario(self, game_state: GameState) -> Optional[Dict]:
-        """게임 상태를 기반으로 동적 시나리오 생성"""
+    def generate_scenario(self, game_state: GameState,
+                          on_partial: Optional[Callable[[Dict], None]] = None,
+                          theme: Optional[Dict] = None, use_pool: bool = True,
+                          allow_local: bool = True, use_batch: bool = True) -> Optional[Dict]:
+        """게임 상태를 기반으로 동적 시나리오 생성
+
+        사전 생성 풀 -> 일괄 생성 대기열 -> 생성 캐시 -> 실시간 생성 순으로 시나리오를 구합니다.
+        일괄 생성(batch_size > 1)에서는 앞으로의 여러 시기를 한 번에 생성하여 나머지를 대기열에 넣습니다.
+        API를 호출할 수 없으면('offline' 캐시 정책, 회로 차단기 open) allow_local일 때
+        로컬 절차적 생성기로 즉시 만듭니다.
+        on_partial을 주면 응답을 스트리밍으로 받으며, title/description이 완성될 때마다
+        지금까지 완성된 필드 딕셔너리로 호출합니다 (선택지가 도착하기 전에 화면 표시용).
+        theme을 주면 무작위 테마 대신 사용합니다 (풀 생성 작업용).
+        선행 생성은 use_pool=False, use_batch=False로 호출하여 풀과 대기열의 항목을 소비하지 않고
+        (예측이 빗나가면 잃어버리므로) 이번 시기 하나만 생성합니다.
+        """
         if not self.enabled:
             return None
 
-        summary = game_state.get_play_summary()
-
         # 플레이어 스타일 분석
         style_desc = self._analyze_player_style(game_state.player_style)
 
         # 무작위 테마 선택 (다양성 확보)
-        import random
-        selected_theme = random.choice(self.scenario_themes)
+        selected_theme = theme or self.pick_theme()
 
         # 현재 시기에 따른 계절/상황 분석
         period = game_state.period
@@ -630,53 +880,97 @@ class GeminiIntegration:
         # 현재 스탯 분석 (약점 파악)
         weak_stats = self._identify_weak_stats(game_state)
 
+        # 사전 생성 풀에 같은 테마/시기/약점의 아직 쓰지 않은 시나리오가 있으면 사용
+        if use_pool and self.pool is not None:
+            with self._pool_lock:
+                pooled = self.pool.take(pool_key(selected_theme['name'], period, weak_stats), self._pool_cursors)
+            if pooled:
+                link_ai_choices(pooled)
+                if on_partial:
+                    on_partial({'title': pooled['title'], 'description': pooled['description']})
+                return pooled
+
+        # 일괄 생성 대기열에 이번 시기의 시나리오가 있으면 사용 (생성 당시와 스탯 차이가 작을 때만)
+        batch_queue = self.batch_queue if use_batch else None
+        if batch_queue is not None:
+            queued = batch_queue.take(game_state)
+            if queued:
+                if on_partial:
+                    on_partial({'title': queued['title'], 'description': queued['description']})
+                return queued
+
+        # 같은 테마/시기/약점/성향의 이전 생성 결과가 있으면 재사용
+        cache_key = self._cache_key('scenario', game_state, theme=selected_theme['name'],
+                                    season=season_context, weak=weak_stats, style=style_desc)
+        cached = self._cache_get(cache_key)
+        if cached and not self._seen_in_game(cached, game_state):
+            if on_partial:
+                on_partial({'title': cached.get('title', ''), 'description': cached.get('description', '')})
+            return cached
+        if not self._may_generate():
+            return self.generate_local_scenario(game_state, selected_theme) if allow_local else None
+
+        # 일괄 생성이면 이번 시기부터 여러 시기를 한 번에 생성 (시기마다 다른 테마)
+        periods = upcoming_periods(game_state, self.batch_size) if batch_queue is not None else []
+        periods = periods or [(game_state.year, period)]
+        others = [t for t in self.scenario_themes if t['name'] != selected_theme['name']]
+        themes = [selected_theme] + random.sample(others, len(periods) - 1)
+
+        prompt = self.prompts.render('scenario', self._scenario_state_prompt(
+            game_state, season_context, style_desc, weak_stats) + self._scenario_targets_prompt(periods, themes))
+
+        try:
+            on_text = self._field_listener(('title', 'description'), on_partial) if on_partial else None
+            # 같은 컨텍스트(캐시 키)의 진행 중인 생성은 하나로 병합 (일괄 생성은 응답이 다르므로 별도 키)
+            request_key = cache_key if len(periods) == 1 else f"{cache_key}#batch{len(periods)}"
+            scenarios = self._generate_parsed(prompt, lambda text: self._parse_scenarios(text, len(periods)),
+                                              on_text, key=request_key)
+        except CircuitOpenError:
+            return None
+        except DeadlineExceeded as e:
+            print(f"Warning: AI scenario generation timed out ({e})")
+            return None
+        except Exception as e:
+            print(f"Error generating scenario: {e}")
+            return None
+
+        if scenarios is None:
+            return None
+        # advance_time과 next 필드 추가
+        scenario_json = link_ai_choices(scenarios[0])
+        self._cache_put(cache_key, scenario_json)
+
+        # 나머지 시기의 시나리오는 대기열로 (검증에 실패한 시나리오는 그 시기에 다시 생성)
+        # 드리프트 판정을 위해 지금의 스탯을 함께 기록
+        if len(scenarios) > 1:
+            snapshot = stat_snapshot(game_state)
+            batch_queue.put([
+                {'year': year, 'period': target_period, 'theme': target_theme['name'], 'stats': snapshot,
+                 'scenario': link_ai_choices(scenario)}
+                for (year, target_period), target_theme, scenario in zip(periods[1:], themes[1:], scenarios[1:])
+                if scenario is not None
+            ])
+        return scenario_json
+
+    def _scenario_targets_prompt(self, periods: List[Tuple[int, int]], themes: List[Dict]) -> str:
+        """시나리오 프롬프트의 '작성할 시나리오' 부분 (시기마다 계절/상황과 테마)"""
+        lines = [f"## 작성할 시나리오 ({len(periods)}개, 시기 순서대로)"]
+        for i, ((year, period), theme) in enumerate(zip(periods, themes), 1):
+            lines.append(f"""
+### {i}. {year}년차 {period}기
+- 계절/상황: {self._get_season_context(period)}
+- **테마**: {theme['name']}
+- 설명: {theme['description']}
+- 관련 키워드: {', '.join(theme['keywords'][:4])}""")
+        return '\n'.join(lines) + '\n'
+
+    def _scenario_state_prompt(self, game_state: GameState, season_context: str, style_desc: str,
+                               weak_stats: str) -> str:
+        """시나리오 프롬프트의 현재 게임 상태 부분 (스탯, 성향, 약점, 최근 방문 시나리오)"""
+        summary = game_state.get_play_summary()
         # 최근 방문한 시나리오를 많이 추적 (중복 방지)
         recent_scenarios = ', '.join(summary['visited_scenarios'][-8:]) if summary['visited_scenarios'] else '없음'
-
-        prompt = f"""
-당신은 KOICA 해외사무소장 시뮬레이터 게임의 시나리오 작가입니다.
-플레이어는 KOICA 48개국 해외사무소 중 한 곳의 사무소장으로서 15년 이상 경력의 전문가입니다.
-
-## 조직 구성 (약 37명)
-- 소장: 1명 (플레이어), 부소장: 2명, 코디네이터: 2명
-- YP(영프로페셔널): 7명 (19-34세), 현지 직원: 17명 (4개 섹터)
-
-## KOICA 예산 구조 (중요!)
-**본부 (HQ)**:
-- 외교부 등으로부터 전체 예산을 확보
-- 사업 계획과 전략에 따라 각 국가별, 사업별로 예산을 편성하고 배정
-- 전체적인 '예산집행지침' 마련 및 예산 이월 등 중요 변경사항 최종 승인
-
-**해외사무소 (Offices)**:
-- 본부로부터 사업별로 배정받은 예산을 집행하는 역할
-- 실제 사업 현장에서 돈을 지출하고 정산하는 실무 담당
-- **중요: 해외사무소는 배정받은 예산을 다른 사업으로 재배분할 권한 없음**
-- **중요: 해외사무소는 자체적으로 예산을 늘릴 수 없음**
-
-**따라서 시나리오 작성시 주의사항**:
-- 본부가 신규 사업 추진을 요청할 때는 반드시 예산 추가 배정과 함께 와야 함
-- "해외사무소가 예산을 추가로 헌신"하라는 요구는 구조적으로 불가능 (비현실적)
-- 현지 사무소는 A 사업 예산을 B 사업으로 옮기는 재배분 권한 없음
-- 추가 예산이 필요한 경우 본부에 요청하는 것이 정상적이고 자연스러운 절차
-- 사무소장의 예산 관련 딜레마는 "배정받은 예산을 효율적으로 집행"이거나 "본부에 추가 예산 요청 여부"여야 함
-
-## 사무소장의 6대 핵심 역할
-1. **사업 발굴 및 형성**: 현지 수요조사, 국별협력전략(CPS) 수립, PCP 접수/검토
-2. **사업 이행 및 관리**: 프로젝트 총괄, 착수/추진계획, 현장 모니터링, 평가/사후관리
-3. **연수사업 지원**: 연수생 선발 추천, 비자 발급, 출국 지원, 귀국 후 평가
-4. **해외봉사단 지원**: 단원 적응 훈련, 비자/신분증 관리, 안전관리, 활동 모니터링
-5. **협력 네트워크**: 협력국 정부 정기 협의, 타 공여국(UN 등) 동향 파악, 민관합동 회의, NGO 간담회
-6. **본부-협력국 중간 연결**: 정책 전달, 현지 상황 보고, 실시간 피드백, 의사소통 가교
-
-## 사무소장의 직무 및 책임
-- 조직 총괄: 인력/자산/회계 관리, 리더십, 팀워크 형성
-- 사업 총괄: 최종 의사결정, 성과 및 예산 책임
-- 대외 협력: 협력국 정부 고위급 협의, 재외공관(대사관) 협력, 국제기구 조율
-- 위기관리: 파견 인력 안전 총괄, 긴급상황 대응
-- 전략적 의사결정: 국별 협력전략 수립, 우선순위 설정, 자원 배분
-- 소통 및 보고: 정기 본부 보고, 연례 해외사무소장 회의(48개국) 참석
-
-## 현재 게임 상태
+        return f"""## 현재 게임 상태
 - 시기: {summary['current_stats']['year']}년차 {summary['current_stats']['period']}기 (격월 단위: 1=1-2월, 2=3-4월, 3=5-6월, 4=7-8월, 5=9-10월, 6=11-12월)
 - 계절/상황: {season_context}
 - 평판: {summary['current_stats']['reputation']}/100
@@ -693,111 +987,65 @@ class GeminiIntegration:
 ## 최근 방문한 시나리오 (절대 중복 금지!)
 {recent_scenarios}
 
-## 이번 시나리오 테마
-**테마**: {selected_theme['name']}
-**설명**: {selected_theme['description']}
-**관련 키워드**: {', '.join(selected_theme['keywords'][:4])}
-
-## 요구사항
-1. **반드시** 위에 지정된 테마({selected_theme['name']})를 중심으로 시나리오를 작성하세요
-2. 계절/시기({season_context})를 시나리오에 자연스럽게 반영하세요
-3. **최근 방문한 시나리오와 절대 유사하지 않은**, 완전히 새롭고 독창적인 상황을 만드세요
-4. 플레이어의 약점({weak_stats})을 고려하되, 너무 노골적이지 않게 반영하세요
-5. 4개의 선택지는 서로 **완전히 다른 접근법**을 제시해야 합니다:
-   - 적극적/소극적, 단기적/장기적, 내부/외부, 협력/독립 등 다양한 축으로 분산
-6. **중요: 선택지 텍스트(choice.text)는 최대 80자 이내로 간결하게 작성하세요**
-   - 핵심 행동만 명시하고, 상세한 설명은 생략하세요
-   - 예: "현지 파트너와 긴급 협의를 진행한다" (O)
-   - 예: "현지 파트너와 긴급 협의를 진행하여 문제의 원인을 파악하고 해결책을 모색한다" (X - 너무 김)
-7. 각 선택의 결과로 스탯 변화를 제안하세요 (reputation, budget, staff_morale, project_success)
-   - budget 값은 예산 집행률 변화를 의미 (양수=집행률 상승, 음수=집행률 하락)
-8. 결과 메시지(result.message)는 3-5문장으로 풍부하게 작성하세요:
-   - 선택한 행동이 어떻게 실행되었는지
-   - 이해관계자들(직원, 파트너, 본부 등)의 구체적인 반응
-   - 최종적으로 어떤 결과와 영향이 발생했는지
-   - 인과관계를 명확히 보여주세요
-9. **창의성**: 예측 가능한 뻔한 시나리오가 아닌, 흥미롭고 예상치 못한 전개를 만드세요
-
-## 응답 형식 (반드시 JSON 형식으로)
-{{
-  "title": "시나리오 제목",
-  "description": "상황 설명 (3-5문장)",
-  "choices": [
-    {{
-      "text": "선택지 텍스트",
-      "result": {{
-        "message": "결과 설명",
-        "stats": {{
-          "reputation": 변화값 (-30~30),
-          "budget": 변화값 (-40~40),
-          "staff_morale": 변화값 (-30~30),
-          "project_success": 변화값 (-30~30)
-        }}
-      }}
-    }}
-  ]
-}}
-
-중요: 순수 JSON만 반환하세요. 추가 설명이나 마크다운 코드 블록 없이.
 """
 
-        try:
-            response = self.model.generate_content(prompt)
-            scenario_json = self._extract_json(response.text)
+    def generate_local_scenario(self, game_state: GameState, theme: Optional[Dict] = None) -> Dict:
+        """네트워크 없이 로컬 절차적 생성기로 시나리오 생성 (같은 상황이면 같은 결과)"""
+        scenario = default_procedural_generator().generate(
+            theme or self.pick_theme(), game_state, self._get_season_context(game_state.period))
+        return link_ai_choices(scenario)
 
-            if scenario_json:
-                # advance_time과 next 필드 추가
-                for choice in scenario_json.get('choices', []):
-                    choice['result']['advance_time'] = True
-                    choice['result']['next'] = 'ai_generated'  # AI 생성 시나리오는 계속 AI 생성
+    def pick_theme(self) -> Dict:
+        """무작위 시나리오 테마 선택 (생성 실패 시 같은 테마로 폴백하도록 호출자가 먼저 고를 수 있음)"""
+        return random.choice(self.scenario_themes)
 
-                return scenario_json
-            else:
-                print("Warning: Failed to parse AI response as JSON")
-                return None
+    def _parse_scenarios(self, text: str, count: int = 1) -> Optional[List[Optional[Dict]]]:
+        """응답 텍스트를 검증/보정된 시나리오 목록으로 변환
 
-        except Exception as e:
-            print(f"Error generating scenario: {e}")
+        단일 시나리오 객체나 {"scenarios": [...]} 형식을 받으며, 최대 count개를 사용합니다.
+        검증에 실패한 항목은 None이고, 첫 항목이 무효면 None을 반환합니다 (hedged 요청에서는 재시도).
+        """
+        data = extract_json_object(text)
+        if not data:
+            print("Warning: Failed to parse AI response as JSON")
+            return None
+        items = data.get('scenarios') if isinstance(data, dict) and 'scenarios' in data else [data]
+        if not isinstance(items, list) or not items:
+            print("Warning: AI response has no scenarios")
             return None
 
-    def generate_free_form_result(self, game_state: GameState, player_action: str) -> Optional[Dict]:
-        """플레이어의 자유 입력에 대한 결과 생성"""
+        scenarios = []
+        for i, item in enumerate(items[:count]):
+            try:
+                # 구조 검증 및 스탯 범위 보정
+                scenarios.append(validate_scenario(item))
+            except ScenarioValidationError as e:
+                print(f"Warning: AI scenario {i + 1} failed validation ({e})")
+                scenarios.append(None)
+        return scenarios if scenarios[0] is not None else None
+
+    def _parse_free_form(self, text: str) -> Optional[Dict]:
+        """응답 텍스트를 검증/보정된 자유 입력 결과로 변환 (무효면 None - hedged 요청에서는 재시도)"""
+        data = extract_json_object(text)
+        if not data:
+            print("Warning: Failed to parse AI response as JSON")
+            return None
+        try:
+            return validate_free_form_result(data)
+        except ScenarioValidationError as e:
+            print(f"Warning: AI free-form result failed validation ({e})")
+            return None
+
+    def generate_free_form_result(self, game_state: GameState, player_action: str,
+                                  on_partial: Optional[Callable[[Dict], None]] = None) -> Optional[Dict]:
+        """플레이어의 자유 입력에 대한 결과 생성 (on_partial: message 완성 시 스트리밍 콜백)"""
         if not self.enabled:
             return None
 
         summary = game_state.get_play_summary()
         current_scenario = game_state.current_scenario
 
-        prompt = f"""
-당신은 KOICA 해외사무소장 시뮬레이터 게임의 게임 마스터입니다.
-플레이어는 KOICA 48개국 해외사무소 중 한 곳의 사무소장으로서 약 37명(부소장 2명, 코디네이터 2명, YP 7명, 현지 직원 17명)을 총괄합니다.
-플레이어가 자유롭게 입력한 행동에 대해 결과를 판정하고 스탯 변화를 계산하세요.
-
-## KOICA 예산 구조 (중요!)
-**본부**: 전체 예산 확보 및 사업별로 각 해외사무소에 배정
-**해외사무소**: 본부로부터 사업별로 배정받은 예산을 집행하는 역할
-**중요**:
-- 해외사무소는 A 사업 예산을 B 사업으로 임의로 재배분할 권한 없음
-- 해외사무소는 자체적으로 예산을 늘릴 수 없음
-- **예산 증액 요청 또는 예산 전용(목적 변경) 요청은 본부 지역실에 하는 것이 정상적이고 당연한 절차임**
-- 요청한다고 해서 항상 승인되는 것은 아니며, 본부 지역실이 검토 후 결과를 사무소에 통보함
-- **요청 자체는 문제가 없고 오히려 적극적인 사업 관리의 일환임. 단, 승인 여부는 본부의 판단**
-
-## 사무소장의 6대 핵심 역할과 권한
-1. 사업 발굴 및 형성 (CPS 수립, PCP 검토)
-2. 사업 이행 및 관리 (프로젝트 총괄, 모니터링, 평가)
-3. 연수사업 지원 (연수생 선발, 출국 지원)
-4. 해외봉사단 지원 (안전 관리, 활동 모니터링)
-5. 협력 네트워크 구축 (정부/UN/NGO 협의, 재외공관 협력)
-6. 본부-협력국 중간 연결 (보고, 조율, 피드백)
-
-## 사무소장의 직무 권한
-- 조직 총괄: 약 37명 인력 관리, 자산/회계 책임
-- 최종 의사결정권자: 모든 사업의 승인 권한
-- 외교관 준하는 지위: 수원국 장관급 면담
-- 위기관리 총괄: 파견 인력 안전 최종 책임
-
-## 현재 상황
+        prompt = self.prompts.render('free_form', f"""## 현재 상황
 - 시기: {summary['current_stats']['year']}년차 {summary['current_stats']['period']}기 (격월 단위: 1=1-2월, 2=3-4월, 3=5-6월, 4=7-8월, 5=9-10월, 6=11-12월)
 - 평판: {summary['current_stats']['reputation']}/100
 - 예산 집행률: {summary['current_stats']['budget_execution_rate']}/100 (80-100%가 이상적)
@@ -806,55 +1054,42 @@ class GeminiIntegration:
 
 ## 플레이어의 행동
 "{player_action}"
-
-## 요구사항
-1. 플레이어의 행동을 최대한 수용하세요. 사무소장으로서 할 수 있는 다양한 창의적 시도를 긍정적으로 해석하세요
-2. 행동의 결과를 3-5문장으로 풍부하게 설명하세요:
-   - 첫 문장: 즉각적인 결과나 반응
-   - 중간 문장들: 구체적인 과정과 영향 (누가 어떻게 반응했는지, 어떤 변화가 일어났는지)
-   - 마지막 문장: 최종 결과와 조직/개인에 미친 영향
-3. 4가지 스탯에 미치는 영향을 계산하세요 (합리적인 범위 내에서)
-4. 창의적이고 전략적인 행동은 적극 보상하세요
-5. 극단적으로 비윤리적이거나 범죄적인 행동이 아닌 이상 success: true로 처리하세요
-6. 인과관계를 명확히: "이 행동으로 인해 → 이런 일이 발생 → 그 결과" 흐름을 자연스럽게 서술하세요
-
-## 응답 형식 (반드시 JSON 형식으로)
-{{
-  "success": true/false,
-  "message": "결과 설명",
-  "stats": {{
-    "reputation": 변화값,
-    "budget": 변화값,
-    "staff_morale": 변화값,
-    "project_success": 변화값
-  }}
-}}
-
-중요: 순수 JSON만 반환하세요.
-"""
+""")
 
         try:
-            response = self.model.generate_content(prompt)
-            result_json = self._extract_json(response.text)
-            return result_json
+            on_text = self._field_listener(('message',), on_partial) if on_partial else None
+            return self._generate_parsed(prompt, self._parse_free_form, on_text)
+        except CircuitOpenError:
+            return None
         except Exception as e:
             print(f"Error processing free-form input: {e}")
             return None
 
-    def generate_personalized_ending(self, game_state: GameState) -> str:
-        """플레이어의 플레이 스타일을 분석하여 개인화된 엔딩 생성"""
+    def generate_personalized_ending(self, game_state: GameState,
+                                     on_text: Optional[Callable[[str], None]] = None) -> str:
+        """플레이어의 플레이 스타일을 분석하여 개인화된 엔딩 생성
+
+        on_text를 주면 응답을 스트리밍으로 받으며, 청크마다 지금까지의 텍스트로 호출합니다.
+        """
         if not self.enabled:
             return ""
 
         summary = game_state.get_play_summary()
-        total_score = (game_state.reputation + game_state.staff_morale +
-                      game_state.project_success + game_state.budget / 2) / 3.5
+        total_score = game_state.final_score()
+        style_desc = self._analyze_player_style(game_state.player_style)
 
-        prompt = f"""
-당신은 KOICA 소장 시뮬레이터 게임의 엔딩 작가입니다.
-플레이어의 2년간의 여정을 분석하여 개인화된 엔딩 내러티브를 작성하세요.
+        # 비슷한 최종 스탯/총점/성향의 엔딩은 재사용
+        cache_key = self._cache_key('ending', game_state, style=style_desc,
+                                    total_score=bucket_stat(total_score))
+        cached = self._cache_get(cache_key)
+        if cached:
+            if on_text:
+                on_text(cached)
+            return cached
+        if not self._may_generate():
+            return ""
 
-## 최종 스탯
+        prompt = self.prompts.render('ending', f"""## 최종 스탯
 - 평판: {game_state.reputation}/100
 - 예산 집행률: {game_state.budget_execution_rate}/100
 - 직원 만족도: {game_state.staff_morale}/100
@@ -862,26 +1097,138 @@ class GeminiIntegration:
 - 총점: {total_score:.1f}/100
 
 ## 플레이어 성향
-{self._analyze_player_style(game_state.player_style)}
+{style_desc}
 
 ## 주요 결정
 {self._format_major_decisions(game_state.choice_history[-10:])}
 
-## 요구사항
-1. 플레이어의 선택과 성향을 반영한 맞춤형 엔딩을 작성하세요
-2. 3-5개의 문단으로 구성하세요
-3. 플레이어의 유산(legacy)과 장기적 영향을 설명하세요
-4. 감동적이고 의미있는 마무리를 제공하세요
-
 엔딩 내러티브를 작성하세요:
-"""
+""")
 
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            ending_text = self._generate_parsed(prompt, lambda text: text.strip() or None, on_text,
+                                                key=cache_key) or ""
+        except CircuitOpenError:
+            return ""
         except Exception as e:
             print(f"Error generating personalized ending: {e}")
             return ""
+        if ending_text:
+            self._cache_put(cache_key, ending_text)
+        return ending_text
+
+    def prompt_metrics(self) -> Dict[str, Any]:
+        """프롬프트 크기 통계 (템플릿별 고정/가변 부분 문자 수, 실제 전송 문자 수, 컨텍스트 캐시 사용 횟수)"""
+        metrics = {'templates': self.prompts.snapshot()}
+        if self.client is not None:
+            metrics['chars_sent'] = self.client.prompt_chars_sent
+            metrics['context_cache_hits'] = self.client.context_cache_hits
+        return metrics
+
+    def _cache_key(self, kind: str, game_state: GameState, **context) -> str:
+        """정규화된 게임 컨텍스트(구간화한 스탯 + 추가 항목)로 캐시 키 생성"""
+        context['stats'] = {
+            'reputation': bucket_stat(game_state.reputation),
+            'budget_execution_rate': bucket_stat(game_state.budget_execution_rate),
+            'staff_morale': bucket_stat(game_state.staff_morale),
+            'project_success': bucket_stat(game_state.project_success),
+            'stress': bucket_stat(game_state.stress),
+            'wellbeing': bucket_stat(game_state.wellbeing)
+        }
+        return context_key(kind, context)
+
+    def _cache_get(self, cache_key: str):
+        return self.cache.get(cache_key) if self.cache is not None else None
+
+    def _cache_put(self, cache_key: str, value):
+        if self.cache is not None:
+            self.cache.put(cache_key, value)
+
+    def _may_generate(self) -> bool:
+        """캐시 미스일 때 API 호출 가능 여부 ('offline' 캐시 정책이거나 회로 차단기가 열려 있으면 False)"""
+        if self.breaker is not None and self.breaker.state == BREAKER_OPEN:
+            return False
+        return self.cache is None or self.cache.allows_generation
+
+    @property
+    def degraded(self) -> bool:
+        """AI 백엔드가 장애로 차단되었거나 회복 확인 중인지 (오프라인 폴백 사용 중)"""
+        return self.breaker is not None and self.breaker.state != BREAKER_CLOSED
+
+    def backend_status(self) -> Dict[str, Any]:
+        """AI 백엔드 상태 요약 (회로 차단기 상태, 최근 오류율/평균 지연, 재시도까지 남은 시간)"""
+        if self.breaker is None:
+            return {'state': BREAKER_CLOSED if self.enabled else 'disabled'}
+        return self.breaker.snapshot()
+
+    def _seen_in_game(self, scenario: Dict, game_state: GameState) -> bool:
+        """캐시된 시나리오를 이번 게임에서 이미 플레이했는지 (선택지 텍스트로 판단)"""
+        choice_texts = {choice.get('text') for choice in scenario.get('choices', [])}
+        return any(entry['scenario_id'] == 'ai_generated' and entry['choice_text'] in choice_texts
+                   for entry in game_state.choice_history)
+
+    def _generate_text(self, prompt: str, on_text: Optional[Callable[[str], None]] = None,
+                       key: Optional[str] = None) -> str:
+        """프롬프트 응답 텍스트 반환 (on_text가 있으면 스트리밍으로 받아 청크마다 누적 텍스트 전달)
+
+        key가 같은 요청이 다른 세션에서 진행 중이면 새로 호출하지 않고 그 결과를 함께 받습니다.
+        """
+        return self.client.generate_text(prompt, on_text, key=key)
+
+    def _generate_parsed(self, prompt: str, parse: Callable[[str], Any],
+                         on_text: Optional[Callable[[str], None]] = None, key: Optional[str] = None):
+        """응답을 parse로 변환한 결과 반환 (무효 응답이면 None)
+
+        마감 시간이 설정되어 있으면 지연 SLO 모드로 요청합니다: 느린 요청에는 hedged 요청을
+        추가로 보내고, 마감 시간을 넘기면 DeadlineExceeded를 발생시킵니다.
+        결과(오류, 마감 초과, 무효 응답 포함)는 회로 차단기에 기록하며, 차단기가 열려 있으면
+        요청하지 않고 CircuitOpenError를 발생시킵니다.
+        """
+        token = self.breaker.allow_request()
+        if token is None:
+            raise CircuitOpenError("AI 백엔드 장애로 요청을 잠시 중단했습니다")
+
+        started = time.monotonic()
+        try:
+            if self.deadline is None:
+                result = parse(self._generate_text(prompt, on_text, key=key))
+            else:
+                result = self.client.generate_hedged(prompt, parse, deadline=self.deadline,
+                                                     hedge_delay=self.hedge_delay, on_text=on_text, key=key)
+        except Exception:
+            self.breaker.record_failure(time.monotonic() - started, token)
+            raise
+        if result is None:
+            self.breaker.record_failure(time.monotonic() - started, token)
+        else:
+            self.breaker.record_success(time.monotonic() - started, token)
+        return result
+
+    def _field_listener(self, fields: Tuple[str, ...], on_partial: Callable[[Dict], None]) -> Callable[[str], None]:
+        """누적 텍스트에서 새로 완성된 문자열 필드가 생길 때마다 on_partial을 호출하는 콜백 생성"""
+        found = {}
+
+        def on_text(text: str):
+            fields_before = len(found)
+            for field in fields:
+                if field not in found:
+                    value = self._extract_partial_field(text, field)
+                    if value is not None:
+                        found[field] = value
+            if len(found) > fields_before:
+                on_partial(dict(found))
+
+        return on_text
+
+    def _extract_partial_field(self, text: str, field: str) -> Optional[str]:
+        """미완성 JSON 텍스트에서 닫는 따옴표까지 도착한 첫 번째 문자열 필드 값 추출"""
+        match = re.search(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)"' % re.escape(field), text)
+        if not match:
+            return None
+        try:
+            return json.loads('"' + match.group(1) + '"')
+        except json.JSONDecodeError:
+            return None
 
     def _get_season_context(self, period: int) -> str:
         """시기에 따른 계절/상황 설명"""
@@ -896,48 +1243,14 @@ class GeminiIntegration:
         return contexts.get(period, f"{period}기")
 
     def _identify_weak_stats(self, game_state: GameState) -> str:
-        """현재 약점 파악"""
-        weak_areas = []
-
-        if game_state.reputation < 50:
-            weak_areas.append("평판 저하 (외부 신뢰 회복 필요)")
-        if game_state.budget_execution_rate < 60:
-            weak_areas.append("예산 집행률 저조 (80% 이상 목표)")
-        elif game_state.budget_execution_rate > 95:
-            weak_areas.append("예산 과다 집행 위험 (통제 필요)")
-        if game_state.staff_morale < 50:
-            weak_areas.append("직원 사기 저하 (내부 화합 필요)")
-        if game_state.project_success < 50:
-            weak_areas.append("프로젝트 성과 부진 (성과 개선 필요)")
-        if game_state.stress > 70:
-            weak_areas.append("높은 스트레스 (개인 건강 관리 필요)")
-        if game_state.wellbeing < 40:
-            weak_areas.append("낮은 웰빙 (휴식과 회복 필요)")
+        """현재 약점 파악 (판정 기준은 로컬 생성기와 공유하는 WEAKNESS_RULES)"""
+        weak_areas = [label for _, _, label in identify_weaknesses(game_state)]
 
         if not weak_areas:
             return "현재 모든 지표가 안정적입니다. 균형 유지가 중요합니다."
 
         return ", ".join(weak_areas[:3])  # 최대 3개까지만 표시
 
-    def _extract_json(self, text: str) -> Optional[Dict]:
-        """텍스트에서 JSON 추출"""
-        # 마크다운 코드 블록 제거
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*', '', text)
-
-        # JSON 파싱 시도
-        try:
-            return json.loads(text.strip())
-        except json.JSONDecodeError:
-            # JSON 객체 찾기 시도
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group(0))
-                except json.JSONDecodeError:
-                    return None
-            return None
-
     def _analyze_player_style(self, player_style: Dict) -> str:
         """플레이어 스타일 분석"""
         styles = []
@@ -976,21 +1289,898 @@ class GeminiIntegration:
         return "\n".join(formatted)
 
 
+# 소장 유형 목록 (점수 계산 순서이자 동점 후보의 순서)
+DIRECTOR_TYPES = [
+    "혁신적인 소장", "여유로운 소장", "헌신적인 소장", "균형잡힌 소장",
+    "온화한 소장", "사람 중심 소장", "신중한 외교가", "외교적인 소장",
+    "진취적인 소장", "성과 중심 소장", "실무형 소장", "분투한 소장"
+]
+
+
+def score_director_types(reputation, budget_execution_rate, staff_morale, project_success,
+                         stress, wellbeing, style: Dict, total_choices: int) -> Dict[str, int]:
+    """최종 스탯과 플레이 스타일로 12개 소장 유형의 점수 계산 (스칼라 기준 구현)
+
+    점수 기반 시스템으로 12개 유형의 확률을 균등하게 배분합니다.
+    각 유형마다 조건을 체크하고 점수를 부여하며, 반환 순서는 DIRECTOR_TYPES와 같습니다.
+    """
+    # 각 스탯의 상대적 수준 분석
+    work_stats = {
+        'reputation': reputation,
+        'budget': budget_execution_rate,
+        'staff': staff_morale,
+        'project': project_success
+    }
+
+    # 가장 높은 스탯 찾기
+    max_stat = max(work_stats.values()) if work_stats.values() else 50
+    max_stat_name = max(work_stats, key=work_stats.get)
+
+    # 스탯 균형도 계산
+    stat_values = list(work_stats.values())
+    avg_stat = sum(stat_values) / len(stat_values) if stat_values else 50
+    variance = sum((v - avg_stat) ** 2 for v in stat_values) / len(stat_values) if stat_values else 0
+
+    # 플레이 스타일 분석
+    risk_ratio = style['risk_taking'] / total_choices if total_choices > 0 else 0
+
+    # 가장 중점을 둔 영역 찾기
+    focus_areas = {
+        'reputation': style['reputation_focused'],
+        'budget': style['budget_focused'],
+        'staff': style['staff_focused'],
+        'project': style['project_focused']
+    }
+    max_focus = max(focus_areas.values()) if focus_areas.values() else 0
+    most_focused = max(focus_areas, key=focus_areas.get) if max_focus > 0 else None
+
+    # === 점수 기반 유형 결정 (12개 유형) ===
+    type_scores = {}
+
+    # 1. 혁신적인 소장 - 높은 위험 감수 + 우수한 성과
+    score = 0
+    if risk_ratio > 0.45:
+        score += 50
+    elif risk_ratio > 0.35:
+        score += 30
+    elif risk_ratio > 0.25:
+        score += 10
+    if max_stat >= 70:
+        score += 30
+    elif max_stat >= 60:
+        score += 20
+    elif max_stat >= 50:
+        score += 10
+    type_scores["혁신적인 소장"] = score
+
+    # 2. 여유로운 소장 - 높은 웰빙 + 낮은 스트레스
+    score = 0
+    if wellbeing >= 70:
+        score += 40
+    elif wellbeing >= 60:
+        score += 25
+    elif wellbeing >= 50:
+        score += 10
+    if stress <= 30:
+        score += 40
+    elif stress <= 40:
+        score += 25
+    elif stress <= 50:
+        score += 10
+    if avg_stat >= 50:
+        score += 20
+    type_scores["여유로운 소장"] = score
+
+    # 3. 헌신적인 소장 - 높은 스트레스 + 높은 성과 (조건 더 완화)
+    score = 0
+    if stress >= 65:
+        score += 40
+    elif stress >= 55:
+        score += 30
+    elif stress >= 45:
+        score += 20
+    if avg_stat >= 60:
+        score += 40
+    elif avg_stat >= 50:
+        score += 30
+    elif avg_stat >= 40:
+        score += 20
+    type_scores["헌신적인 소장"] = score
+
+    # 4. 균형잡힌 소장 - 낮은 분산 + 좋은 평균 (조건 더 완화)
+    score = 0
+    if variance < 250:
+        score += 45
+    elif variance < 350:
+        score += 35
+    elif variance < 450:
+        score += 25
+    elif variance < 600:
+        score += 15
+    if avg_stat >= 50:
+        score += 40
+    elif avg_stat >= 40:
+        score += 30
+    elif avg_stat >= 30:
+        score += 20
+    type_scores["균형잡힌 소장"] = score
+
+    # 5. 온화한 소장 - 직원 중심 + 낮은 스트레스
+    score = 0
+    if most_focused == 'staff':
+        score += 35
+    if style['staff_focused'] >= 8:
+        score += 35
+    elif style['staff_focused'] >= 5:
+        score += 20
+    elif style['staff_focused'] >= 3:
+        score += 10
+    if stress <= 40:
+        score += 30
+    elif stress <= 50:
+        score += 15
+    if work_stats['staff'] >= 65:
+        score += 25
+    elif work_stats['staff'] >= 55:
+        score += 15
+    type_scores["온화한 소장"] = score
+
+    # 6. 사람 중심 소장 - 직원 만족도 우선
+    score = 0
+    if most_focused == 'staff':
+        score += 40
+    if style['staff_focused'] >= 8:
+        score += 40
+    elif style['staff_focused'] >= 5:
+        score += 25
+    elif style['staff_focused'] >= 3:
+        score += 15
+    if work_stats['staff'] >= 70:
+        score += 35
+    elif work_stats['staff'] >= 60:
+        score += 25
+    elif work_stats['staff'] >= 50:
+        score += 15
+    type_scores["사람 중심 소장"] = score
+
+    # 7. 신중한 외교가 - 평판 중심 + 낮은 위험
+    score = 0
+    if most_focused == 'reputation':
+        score += 40
+    if style['reputation_focused'] >= 8:
+        score += 35
+    elif style['reputation_focused'] >= 5:
+        score += 20
+    elif style['reputation_focused'] >= 3:
+        score += 10
+    if risk_ratio < 0.15:
+        score += 35
+    elif risk_ratio < 0.25:
+        score += 20
+    if work_stats['reputation'] >= 65:
+        score += 25
+    elif work_stats['reputation'] >= 55:
+        score += 15
+    type_scores["신중한 외교가"] = score
+
+    # 8. 외교적인 소장 - 평판 우선
+    score = 0
+    if most_focused == 'reputation':
+        score += 40
+    if style['reputation_focused'] >= 8:
+        score += 40
+    elif style['reputation_focused'] >= 5:
+        score += 25
+    elif style['reputation_focused'] >= 3:
+        score += 15
+    if work_stats['reputation'] >= 70:
+        score += 35
+    elif work_stats['reputation'] >= 60:
+        score += 25
+    elif work_stats['reputation'] >= 50:
+        score += 15
+    type_scores["외교적인 소장"] = score
+
+    # 9. 진취적인 소장 - 프로젝트 중심 + 높은 위험
+    score = 0
+    if most_focused == 'project':
+        score += 35
+    if style['project_focused'] >= 8:
+        score += 30
+    elif style['project_focused'] >= 5:
+        score += 20
+    elif style['project_focused'] >= 3:
+        score += 10
+    if risk_ratio > 0.35:
+        score += 35
+    elif risk_ratio > 0.25:
+        score += 25
+    elif risk_ratio > 0.18:
+        score += 15
+    if work_stats['project'] >= 65:
+        score += 20
+    elif work_stats['project'] >= 55:
+        score += 10
+    type_scores["진취적인 소장"] = score
+
+    # 10. 성과 중심 소장 - 프로젝트 성공 우선
+    score = 0
+    if most_focused == 'project':
+        score += 40
+    if style['project_focused'] >= 8:
+        score += 40
+    elif style['project_focused'] >= 5:
+        score += 25
+    elif style['project_focused'] >= 3:
+        score += 15
+    if work_stats['project'] >= 70:
+        score += 35
+    elif work_stats['project'] >= 60:
+        score += 25
+    elif work_stats['project'] >= 50:
+        score += 15
+    type_scores["성과 중심 소장"] = score
+
+    # 11. 실무형 소장 - 예산 집행 우선
+    score = 0
+    if most_focused == 'budget':
+        score += 40
+    if style['budget_focused'] >= 8:
+        score += 40
+    elif style['budget_focused'] >= 5:
+        score += 25
+    elif style['budget_focused'] >= 3:
+        score += 15
+    if work_stats['budget'] >= 70:
+        score += 35
+    elif work_stats['budget'] >= 60:
+        score += 25
+    elif work_stats['budget'] >= 50:
+        score += 15
+    type_scores["실무형 소장"] = score
+
+    # 12. 분투한 소장 - 낮은 성과 (폴백)
+    score = 0
+    if avg_stat < 45:
+        score += 60
+    elif avg_stat < 50:
+        score += 40
+    elif avg_stat < 55:
+        score += 20
+    if max_stat < 50:
+        score += 30
+    type_scores["분투한 소장"] = score
+
+    return type_scores
+
+
+# ============================================================
+# 게임 전이 엔진 (CLI, Streamlit, 배치 시뮬레이터가 공유)
+# ============================================================
+
+# 전이 이벤트 종류 (step이 반환하는 이벤트 딕셔너리의 'type')
+EVENT_NOTICE = 'notice'                  # 알림 문장 (message)
+EVENT_LIFE = 'life_event'                # 생활/서사 이벤트 발생 - 다음 step에서 scenario_id의 선택지를 처리
+EVENT_DEPUTY = 'deputy_event'            # 부소장 임계값 이벤트 발생 - 위와 같음
+EVENT_DELAYED_EFFECT = 'delayed_effect'  # 과거 선택의 장기 영향 발동 (effect, 스탯은 이미 반영됨)
+EVENT_GAME_OVER = 'game_over'            # 게임 종료 (ending, 엔딩 시나리오 도착이나 임기 종료면 None일 수 있음)
+
+# 턴 진행 단계 (이벤트 선택지를 처리한 뒤 남은 단계부터 이어서 진행)
+_STAGE_LIFE, _STAGE_DEPUTY, _STAGE_EFFECTS, _STAGE_NEXT = range(4)
+
+
+def check_life_event(state: GameState, rng: random.Random, events: Optional[List[Dict]] = None) -> Optional[str]:
+    """주기적 생활 이벤트 발생 확인 - 전체 플레이 동안 최대 4회 랜덤 발생
+
+    events를 주면 운동 습관 효과 같은 알림을 EVENT_NOTICE 이벤트로 추가합니다.
+    """
+    # 운동 습관의 패시브 효과: 웰빙 하락 방어
+    if state.leisure_choice == "exercise" and state.wellbeing < 40:
+        # 운동 습관이 웰빙 하락을 방어해 줌
+        state.update_stats({'wellbeing': 5, 'stress': -5})
+        if events is not None:
+            events.append({'type': EVENT_NOTICE,
+                           'message': "💪 [운동 습관 효과] 규칙적인 운동으로 정신 건강이 개선되었습니다. (웰빙 +5, 스트레스 -5)"})
+
+    # 이미 4회 발생했으면 더 이상 발생하지 않음
+    if state.life_events_count >= 4:
+        return None
+
+    # 기본 확률 계산 (2년 12 periods 동안 평균 4회 발생하도록 조정)
+    # 남은 횟수에 따라 확률 동적 조정
+    remaining_events = 4 - state.life_events_count
+    remaining_periods = (2 - state.year) * 6 + (6 - state.period) + 1
+
+    # 남은 기간이 없으면 발생 안 함
+    if remaining_periods <= 0:
+        return None
+
+    # 기본 확률: 남은 이벤트 수 / 남은 기간 수
+    base_chance = remaining_events / remaining_periods
+
+    # 최소 15%, 최대 50% 확률로 제한
+    base_chance = max(0.15, min(0.50, base_chance))
+
+    # 스트레스/웰빙 상태에 따라 확률 조정
+    if state.stress > 70:
+        base_chance += 0.10  # 스트레스 높으면 이벤트 확률 증가
+    if state.wellbeing < 30:
+        base_chance += 0.10  # 웰빙 낮으면 이벤트 확률 증가
+
+    # 확률을 60%로 제한 (너무 자주 발생하지 않도록)
+    base_chance = min(0.60, base_chance)
+
+    # 랜덤으로 이벤트 발생 여부 결정
+    if rng.random() < base_chance:
+        event = select_life_event(state, rng)
+        if event:
+            # 중복 방지를 위해 추적 세트에 즉시 추가
+            state.triggered_life_events.add(event)
+            # 생활 이벤트 발생 횟수 증가
+            state.life_events_count += 1
+        return event
+    return None
+
+
+def select_life_event(state: GameState, rng: random.Random) -> Optional[str]:
+    """모든 타입의 이벤트 선택 - 생활, 서사, 부소장, 연차별 이벤트 포함 (최대 4회 발생)"""
+    available_events = []
+
+    # === 생활 이벤트 (생활 선택과 연동) ===
+    # 건강 이벤트 (웰빙 낮을 때) - 음주 습관 + 스트레스 시 확률 증가
+    if state.wellbeing < 40 and "life_event_health_issue" not in state.triggered_life_events:
+        weight = 3
+        # 음주 + 스트레스 조합은 건강 위험 증가
+        if state.leisure_choice == "drinking" and state.stress > 60:
+            weight = 6  # 확률 2배 증가
+        available_events.append(("life_event_health_issue", weight))
+
+    # 향수병 (기간에 따라 - 5-6개월 이상 지났을 때)
+    if state.year >= 1 and state.period >= 3 and "life_event_homesickness" not in state.triggered_life_events:
+        available_events.append(("life_event_homesickness", 2))
+
+    # 심리적 압박 (스트레스 높을 때)
+    if state.stress > 60 and "life_event_psychological_pressure" not in state.triggered_life_events:
+        available_events.append(("life_event_psychological_pressure", 3))
+
+    # 자동차 고장 (자동차가 있는 경우) - 현지 중고차는 고장 확률 높음
+    if state.car_choice in ["bring_from_korea", "buy_local"] and "life_event_car_breakdown" not in state.triggered_life_events:
+        weight = 1
+        if state.car_choice == "buy_local":
+            weight = 4  # 현지 중고차는 고장 확률 4배
+        available_events.append(("life_event_car_breakdown", weight))
+
+    # 주거 문제 (모든 경우) - 사무실 근처 집은 문제 발생 확률 높음
+    if "life_event_housing_issue" not in state.triggered_life_events:
+        weight = 1
+        if state.housing_choice == "near_office":
+            weight = 3  # 좁고 오래된 집은 문제 발생 확률 3배
+        available_events.append(("life_event_housing_issue", weight))
+
+    # === 서사 이벤트 ===
+
+    # --- 긍정적 이벤트 (높은 stat 요구) ---
+    if state.project_success >= 70 and state.year >= 1 and "narrative_event_project_opening" not in state.triggered_life_events:
+        available_events.append(("narrative_event_project_opening", 2))
+
+    if state.staff_morale >= 60 and "narrative_event_volunteer_success" not in state.triggered_life_events:
+        available_events.append(("narrative_event_volunteer_success", 2))
+
+    if state.project_success >= 60 and state.year >= 1 and "narrative_event_partner_growth" not in state.triggered_life_events:
+        available_events.append(("narrative_event_partner_growth", 2))
+
+    if state.project_success >= 65 and "narrative_event_unexpected_impact" not in state.triggered_life_events:
+        available_events.append(("narrative_event_unexpected_impact", 2))
+
+    if state.reputation >= 60 and "narrative_event_emergency_relief" not in state.triggered_life_events:
+        available_events.append(("narrative_event_emergency_relief", 1))
+
+    if state.staff_morale >= 60 and state.year >= 1 and "narrative_event_staff_wedding" not in state.triggered_life_events:
+        available_events.append(("narrative_event_staff_wedding", 2))
+
+    if state.reputation >= 60 and state.period >= 1 and "narrative_event_new_year_letters" not in state.triggered_life_events:
+        available_events.append(("narrative_event_new_year_letters", 1))
+
+    if state.reputation >= 70 and state.year >= 1 and "narrative_event_minister_trust" not in state.triggered_life_events:
+        available_events.append(("narrative_event_minister_trust", 2))
+
+    if state.staff_morale >= 65 and "narrative_event_staff_dedication" not in state.triggered_life_events:
+        available_events.append(("narrative_event_staff_dedication", 2))
+
+    if state.project_success >= 75 and state.reputation >= 75 and "narrative_event_international_award" not in state.triggered_life_events:
+        available_events.append(("narrative_event_international_award", 1))
+
+    if state.reputation >= 70 and "narrative_event_media_interview" not in state.triggered_life_events:
+        available_events.append(("narrative_event_media_interview", 2))
+
+    # --- 부정적 이벤트 (낮은 stat 또는 위기 상황) ---
+    if state.period == 6 and "narrative_event_policy_shift" not in state.triggered_life_events:
+        available_events.append(("narrative_event_policy_shift", 2))
+
+    if state.period >= 10 and state.budget_execution_rate < 70 and "narrative_event_budget_pressure" not in state.triggered_life_events:
+        available_events.append(("narrative_event_budget_pressure", 3))
+
+    if "narrative_event_volunteer_safety" not in state.triggered_life_events:
+        available_events.append(("narrative_event_volunteer_safety", 1))
+
+    if state.year >= 1 and "narrative_event_regime_change" not in state.triggered_life_events:
+        available_events.append(("narrative_event_regime_change", 1))
+
+    if state.reputation < 60 and "narrative_event_jica_competition" not in state.triggered_life_events:
+        available_events.append(("narrative_event_jica_competition", 2))
+
+    if (state.period == 9 or state.period == 3) and "narrative_event_audit" not in state.triggered_life_events:
+        available_events.append(("narrative_event_audit", 2))
+
+    if (state.period == 5 or state.period == 11) and "narrative_event_congress_visit" not in state.triggered_life_events:
+        available_events.append(("narrative_event_congress_visit", 2))
+
+    if state.stress > 50 and state.staff_morale < 50 and "narrative_event_yp_adaptation_failure" not in state.triggered_life_events:
+        available_events.append(("narrative_event_yp_adaptation_failure", 2))
+
+    if "narrative_event_currency_crisis" not in state.triggered_life_events:
+        available_events.append(("narrative_event_currency_crisis", 1))
+
+    if "narrative_event_corruption_pressure" not in state.triggered_life_events:
+        available_events.append(("narrative_event_corruption_pressure", 1))
+
+    if state.project_success < 60 and "narrative_event_harsh_evaluation" not in state.triggered_life_events:
+        available_events.append(("narrative_event_harsh_evaluation", 2))
+
+    if state.reputation < 50 and "narrative_event_media_attack" not in state.triggered_life_events:
+        available_events.append(("narrative_event_media_attack", 2))
+
+    # --- 양면적 이벤트 (복잡한 선택지) ---
+    if "narrative_event_china_proposal" not in state.triggered_life_events:
+        available_events.append(("narrative_event_china_proposal", 1))
+
+    if "narrative_event_hq_unrealistic_schedule" not in state.triggered_life_events:
+        available_events.append(("narrative_event_hq_unrealistic_schedule", 1))
+
+    if state.year >= 1 and "narrative_event_staff_salary_demand" not in state.triggered_life_events:
+        available_events.append(("narrative_event_staff_salary_demand", 2))
+
+    if "narrative_event_ppp_suspicion" not in state.triggered_life_events:
+        available_events.append(("narrative_event_ppp_suspicion", 1))
+
+    if "narrative_event_gender_culture" not in state.triggered_life_events:
+        available_events.append(("narrative_event_gender_culture", 1))
+
+    if (state.period == 4 or state.period == 10) and "narrative_event_ramadan_schedule" not in state.triggered_life_events:
+        available_events.append(("narrative_event_ramadan_schedule", 1))
+
+    if state.project_success < 50 and "narrative_event_admitting_failure" not in state.triggered_life_events:
+        available_events.append(("narrative_event_admitting_failure", 2))
+
+    if state.staff_morale >= 50 and "narrative_event_volunteer_social_enterprise" not in state.triggered_life_events:
+        available_events.append(("narrative_event_volunteer_social_enterprise", 1))
+
+    if "narrative_event_family_emergency" not in state.triggered_life_events:
+        available_events.append(("narrative_event_family_emergency", 1))
+
+    if "narrative_event_local_crisis_support" not in state.triggered_life_events:
+        available_events.append(("narrative_event_local_crisis_support", 1))
+
+    # === 부소장 관련 이벤트 ===
+    # 특정 부소장의 사기가 낮을 때
+    low_morale_deputies = state.get_low_morale_deputies(threshold=30)
+    if low_morale_deputies and "deputy_event_low_morale" not in state.triggered_life_events:
+        available_events.append(("deputy_event_low_morale", 3))
+
+    # 부소장 간 갈등
+    if state.year >= 1 and state.period >= 3 and "deputy_event_conflict" not in state.triggered_life_events:
+        available_events.append(("deputy_event_conflict", 2))
+
+    # === 연차별 특화 이벤트 ===
+    # 1년차 전용: 신임 소장 적응
+    if state.year == 1 and state.period <= 3 and "year1_event_adaptation" not in state.triggered_life_events:
+        available_events.append(("year1_event_adaptation", 2))
+
+    # 2년차 전용: 본부 정기 감사
+    if state.year == 2 and state.period >= 2 and "year2_event_audit" not in state.triggered_life_events:
+        available_events.append(("year2_event_audit", 3))
+
+    # 2년차 전용: 임기 말 평가 압박
+    if state.year == 2 and state.period >= 9 and "year2_event_final_evaluation" not in state.triggered_life_events:
+        available_events.append(("year2_event_final_evaluation", 4))
+
+    # 2년차 전용: 차기 CPS 구상
+    if state.year == 2 and state.period >= 6 and "year2_event_cps_planning" not in state.triggered_life_events:
+        available_events.append(("year2_event_cps_planning", 2))
+
+    if not available_events:
+        return None
+
+    # 가중치를 고려한 랜덤 선택
+    events = [e[0] for e in available_events]
+    weights = [e[1] for e in available_events]
+    total_weight = sum(weights)
+    rand = rng.uniform(0, total_weight)
+
+    cumulative = 0
+    for event, weight in zip(events, weights):
+        cumulative += weight
+        if rand <= cumulative:
+            return event
+
+    return events[0]  # 폴백
+
+
+def check_deputy_event(state: GameState) -> Optional[str]:
+    """부소장 임계값 이벤트 체크 (morale, 프로젝트 성공도, 평판)"""
+    # Backward compatibility: Initialize triggered_deputy_events if it doesn't exist
+    if not hasattr(state, 'triggered_deputy_events'):
+        state.triggered_deputy_events = set()
+
+    # 전체 이벤트 발생 횟수 제한 체크 (4회)
+    if state.life_events_count >= 4:
+        return None
+
+    deputy_principled = state.get_deputy_by_personality("principled")
+    deputy_local = state.get_deputy_by_personality("local_friendly")
+
+    if not deputy_principled or not deputy_local:
+        return None
+
+    event_id = None
+
+    # 김유영 부소장 효율성 우려 이벤트 (프로젝트 성공도 낮을 때)
+    if (state.project_success <= 30 and
+        'deputy_principled_efficiency_concern' not in state.triggered_deputy_events):
+        event_id = 'deputy_principled_efficiency_concern'
+    # 이수진 부소장 투명성 우려 이벤트 (평판 낮을 때)
+    elif (state.reputation <= 30 and
+        'deputy_local_friendly_transparency_concern' not in state.triggered_deputy_events):
+        event_id = 'deputy_local_friendly_transparency_concern'
+    # 김유영 부소장 전보 위기 이벤트
+    elif (deputy_principled['morale'] <= 20 and
+        'deputy_principled_low_resignation' not in state.triggered_deputy_events):
+        event_id = 'deputy_principled_low_resignation'
+    # 이수진 부소장 네트워크 보너스 이벤트
+    elif (deputy_local['morale'] >= 50 and
+        'deputy_local_friendly_network_bonus' not in state.triggered_deputy_events):
+        event_id = 'deputy_local_friendly_network_bonus'
+    # 이수진 부소장 문화 갈등 이벤트
+    elif (deputy_local['morale'] <= 20 and
+        'deputy_local_friendly_cultural_crisis' not in state.triggered_deputy_events):
+        event_id = 'deputy_local_friendly_cultural_crisis'
+
+    # 이벤트가 선택되면 카운트 증가 및 추적 세트에 추가
+    if event_id:
+        state.triggered_deputy_events.add(event_id)
+        state.life_events_count += 1
+
+    return event_id
+
+
+def collect_delayed_effects(state: GameState, rng: random.Random) -> List[Dict]:
+    """대기 중인 장기 효과 체크 및 발동"""
+    # Backward compatibility: Initialize pending_delayed_effects if it doesn't exist
+    if not hasattr(state, 'pending_delayed_effects'):
+        state.pending_delayed_effects = []
+
+    triggered_effects = []
+
+    for effect in state.pending_delayed_effects[:]:  # 복사본 순회
+        # trigger_period 체크
+        current_period_number = (state.year - 1) * 6 + state.period
+        if current_period_number >= effect.get('trigger_period', 0):
+            # condition 체크
+            condition = effect.get('condition', 'always')
+
+            should_trigger = False
+            if condition == 'always':
+                should_trigger = True
+            elif condition.startswith('random'):
+                # "random < 0.3" 같은 조건
+                prob = float(condition.split('<')[1].strip())
+                if rng.random() < prob:
+                    should_trigger = True
+            elif '>=' in condition:
+                # "project_success >= 50" 같은 조건
+                stat_name, threshold = condition.split('>=')
+                stat_name = stat_name.strip()
+                threshold = int(threshold.strip())
+                current_value = getattr(state, stat_name, 0)
+                if current_value >= threshold:
+                    should_trigger = True
+            elif '<=' in condition:
+                stat_name, threshold = condition.split('<=')
+                stat_name = stat_name.strip()
+                threshold = int(threshold.strip())
+                current_value = getattr(state, stat_name, 0)
+                if current_value <= threshold:
+                    should_trigger = True
+
+            if should_trigger:
+                triggered_effects.append(effect)
+                state.pending_delayed_effects.remove(effect)
+
+    return triggered_effects
+
+
+def check_advanced_ending(state: GameState) -> Optional[str]:
+    """고급 엔딩 조건 체크"""
+    # Backward compatibility: Initialize ethics_violations if it doesn't exist
+    if not hasattr(state, 'ethics_violations'):
+        state.ethics_violations = 0
+
+    # 번아웃 엔딩
+    if state.stress >= 100 or state.wellbeing <= 0:
+        return 'ending_burnout'
+
+    # 평판 추락 엔딩
+    if state.reputation <= 0:
+        return 'ending_reputation_collapse'
+
+    # 윤리 위반 엔딩
+    if state.ethics_violations >= 3:
+        return 'ending_ethical_crisis'
+
+    # 완벽한 균형 엔딩 (임기 종료 시)
+    if state.year >= 2 and state.period >= 6:
+        # 모든 스탯이 80 이상
+        if (state.reputation >= 80 and
+            state.project_success >= 80 and
+            state.staff_morale >= 80 and
+            state.budget_execution_rate >= 70):
+            # 양측 부소장 모두 높은 morale
+            deputy_principled = state.get_deputy_by_personality("principled")
+            deputy_local = state.get_deputy_by_personality("local_friendly")
+            if (deputy_principled and deputy_local and
+                deputy_principled['morale'] >= 40 and
+                deputy_local['morale'] >= 40):
+                return 'ending_perfect_balance'
+
+    return None
+
+
+def resolve_next_scenario(state: GameState, next_id: Optional[str]) -> Optional[str]:
+    """선택 결과의 next를 실제 시나리오 ID로 변환
+
+    'continue_main_scenario'이거나 next가 없으면 현재 period의 메인 시나리오이고,
+    임기가 끝났으면 None입니다.
+    """
+    if next_id and next_id != 'continue_main_scenario':
+        return next_id
+    return main_scenario_id((state.year - 1) * 6 + state.period)
+
+
+def _apply_result(state: GameState, result: Dict):
+    """선택 결과의 상태 변화 적용 (스탯 -> 부소장 사기 -> 장기 영향 등록 -> 시간 진행)"""
+    if 'stats' in result:
+        state.update_stats(result['stats'])
+    if 'deputy_morale' in result:
+        for personality, change in result['deputy_morale'].items():
+            state.update_deputy_morale(personality, change)
+    if 'delayed_effects' in result:
+        for effect in result['delayed_effects']:
+            state.pending_delayed_effects.append(effect.copy())
+    if result.get('advance_time'):
+        state.advance_time()
+
+
+def _apply_compiled_result(state: GameState, graph: ScenarioGraph, offset: int):
+    """컴파일된 그래프의 선택지 효과 적용 (_apply_result와 같은 순서, 미리 계산한 벡터 사용)"""
+    flags = graph.choice_flags[offset]
+    if flags & FLAG_HAS_STATS:
+        state.apply_stat_deltas(graph.stat_deltas(offset))
+    if flags & FLAG_HAS_DEPUTY_MORALE:
+        for personality, change in graph.deputy_deltas(offset):
+            state.update_deputy_morale(personality, change)
+    if flags & FLAG_HAS_DELAYED_EFFECTS:
+        for effect in graph.choice_results[offset]['delayed_effects']:
+            state.pending_delayed_effects.append(effect.copy())
+    if flags & FLAG_ADVANCE_TIME:
+        state.advance_time()
+
+
+def _has_choices(graph: ScenarioGraph, scenario_id: str) -> bool:
+    scenario = graph.get(scenario_id)
+    return bool(scenario and scenario.get('choices'))
+
+
+def _finish_turn(state: GameState, rng: random.Random, graph: ScenarioGraph, stage: int,
+                 next_id: Optional[str], events: List[Dict]):
+    """턴의 남은 단계 진행: 생활 이벤트 -> 부소장 이벤트 -> 장기 영향/고급 엔딩 -> 다음 시나리오
+
+    플레이어가 골라야 하는 이벤트가 생기면 현재 시나리오를 그 이벤트로 바꾸고 남은 단계를
+    state.pending_turn에 남긴 채 멈춥니다 (이벤트 선택지를 처리하는 다음 step이 이어서 진행).
+    """
+    if stage <= _STAGE_LIFE:
+        event_id = check_life_event(state, rng, events)
+        if event_id and _has_choices(graph, event_id):
+            _interrupt(state, EVENT_LIFE, event_id, _STAGE_DEPUTY, next_id, events)
+            return
+    if stage <= _STAGE_DEPUTY:
+        event_id = check_deputy_event(state)
+        if event_id and _has_choices(graph, event_id):
+            _interrupt(state, EVENT_DEPUTY, event_id, _STAGE_EFFECTS, next_id, events)
+            return
+    if stage <= _STAGE_EFFECTS:
+        for effect in collect_delayed_effects(state, rng):
+            if 'stats' in effect:
+                state.update_stats(effect['stats'])
+            events.append({'type': EVENT_DELAYED_EFFECT, 'effect': effect})
+        ending = check_advanced_ending(state)
+        if ending:
+            state.game_over = True
+            state.ending = ending
+            events.append({'type': EVENT_GAME_OVER, 'ending': ending})
+            return
+
+    next_scenario = resolve_next_scenario(state, next_id)
+    if next_scenario is None:
+        # 임기가 끝났으면 엔딩으로
+        state.game_over = True
+        events.append({'type': EVENT_GAME_OVER, 'ending': state.ending})
+    else:
+        state.current_scenario = next_scenario
+
+
+def _interrupt(state: GameState, event_type: str, event_id: str, resume_stage: int,
+               next_id: Optional[str], events: List[Dict]):
+    state.pending_turn = {'stage': resume_stage, 'next': next_id}
+    state.current_scenario = event_id
+    events.append({'type': event_type, 'scenario_id': event_id})
+
+
+def _play_result(state: GameState, scenario_id: str, choice_text: str, choice_index: int, result: Dict,
+                 rng: random.Random, graph: ScenarioGraph, offset: int = -1) -> List[Dict]:
+    """선택 하나를 기록/적용하고 턴을 진행 (state를 직접 변경)"""
+    events = []
+    pending = state.pending_turn
+    if pending is None:
+        state.visited_scenarios.append(scenario_id)
+
+    state.record_choice(scenario_id, choice_text, choice_index, result)
+    if offset >= 0:
+        _apply_compiled_result(state, graph, offset)
+    else:
+        _apply_result(state, result)
+
+    if state.check_game_over():
+        state.pending_turn = None
+        events.append({'type': EVENT_GAME_OVER, 'ending': state.ending})
+        return events
+
+    if pending is not None:
+        # 이벤트 선택지 처리 후 원래 턴의 남은 단계 진행 (이벤트의 next는 사용하지 않음)
+        state.pending_turn = None
+        _finish_turn(state, rng, graph, pending['stage'], pending['next'], events)
+    else:
+        stage = _STAGE_LIFE if result.get('advance_time') else _STAGE_NEXT
+        _finish_turn(state, rng, graph, stage, result.get('next'), events)
+    return events
+
+
+def step(state: GameState, scenario_id: str, choice_idx: int, rng: random.Random,
+         graph: Optional[ScenarioGraph] = None, scenario: Optional[Dict] = None) -> Tuple[GameState, List[Dict]]:
+    """시나리오의 선택지 하나를 골랐을 때의 상태 전이 (입력 상태는 바꾸지 않음)
+
+    선택 결과 적용 -> 게임 오버 확인 -> (시간이 진행되었으면) 생활 이벤트, 부소장 이벤트,
+    장기 영향, 고급 엔딩 -> 다음 시나리오 순으로 진행합니다. 플레이어가 골라야 하는 이벤트가
+    생기면 new_state.current_scenario가 그 이벤트가 되고, 그 선택지를 다시 step에 넘기면
+    원래 턴의 남은 단계를 이어서 진행합니다. 선택지가 없는 시나리오(엔딩)는 게임을 끝냅니다.
+
+    Args:
+        graph: 시나리오 그래프 (기본: scenarios.json)
+        scenario: 그래프에 없는 시나리오(AI 생성, 폴백 복사본)의 내용. 주지 않거나 그래프의
+            시나리오와 같은 객체면 컴파일된 선택지 벡터를 사용합니다.
+
+    Returns:
+        (new_state, events) - events는 EVENT_* 종류의 이벤트 딕셔너리 목록
+    """
+    if graph is None:
+        graph = load_scenario_graph()
+    state = state.copy()
+
+    scenario_index = graph.index.get(scenario_id, -1)
+    compiled = scenario_index >= 0 and (scenario is None or scenario is graph.scenarios[scenario_index])
+    if scenario is None:
+        if not compiled:
+            raise KeyError(f"알 수 없는 시나리오 '{scenario_id}'")
+        scenario = graph.scenarios[scenario_index]
+
+    choices = scenario.get('choices')
+    if not choices:
+        # 엔딩 시나리오
+        if state.pending_turn is None:
+            state.visited_scenarios.append(scenario_id)
+        state.pending_turn = None
+        state.game_over = True
+        return state, [{'type': EVENT_GAME_OVER, 'ending': state.ending}]
+
+    if compiled:
+        offset = graph.choice_start[scenario_index] + choice_idx
+        events = _play_result(state, scenario_id, graph.choice_texts[offset], choice_idx,
+                              graph.choice_results[offset], rng, graph, offset)
+    else:
+        choice = choices[choice_idx]
+        events = _play_result(state, scenario_id, choice['text'], choice_idx, choice['result'], rng, graph)
+    return state, events
+
+
+def step_free_form(state: GameState, scenario_id: str, action: str, result: Dict, rng: random.Random,
+                   graph: Optional[ScenarioGraph] = None) -> Tuple[GameState, List[Dict]]:
+    """자유 입력 행동의 결과를 적용하는 상태 전이 (선택지 인덱스는 -1로 기록)
+
+    AI 자유 입력은 항상 시간을 진행시키고 다음 AI 시나리오로 이어지며, 그 밖의 진행은 step과 같습니다.
+    """
+    if graph is None:
+        graph = load_scenario_graph()
+    state = state.copy()
+    result = dict(result, advance_time=True)
+    result.setdefault('next', 'ai_generated')
+    events = _play_result(state, scenario_id, action, -1, result, rng, graph)
+    return state, events
+
+
 class KOICAGame:
     """메인 게임 클래스"""
 
-    def __init__(self, ai_mode: bool = False, api_key: Optional[str] = None, demo_mode: bool = False):
-        self.state = GameState()
-        self.scenarios = self.load_scenarios()
+    # 초기 생활 선택별 효과 (선택 번호 -> 스탯 변화 및 선택 코드)
+    CAR_EFFECTS = {
+        1: {"stress": -3, "wellbeing": 6, "choice": "bring_from_korea"},
+        2: {"stress": 4, "wellbeing": 0, "choice": "buy_local"},
+        3: {"stress": 6, "wellbeing": -2, "choice": "no_car"}
+    }
+    HOUSING_EFFECTS = {
+        1: {"stress": -2, "wellbeing": 8, "choice": "spacious"},
+        2: {"stress": -3, "wellbeing": 10, "budget": -3, "choice": "nice"},
+        3: {"stress": -6, "wellbeing": -2, "choice": "near_office"},
+        4: {"stress": -3, "wellbeing": 4, "choice": "secure"}
+    }
+    LEISURE_EFFECTS = {
+        1: {"stress": -5, "wellbeing": 6, "choice": "reading"},
+        2: {"stress": -6, "wellbeing": 15, "choice": "exercise"},
+        3: {"stress": -3, "wellbeing": -2, "staff_morale": 4, "choice": "drinking"},
+        4: {"stress": -2, "wellbeing": 4, "choice": "gaming"}
+    }
+    MEAL_EFFECTS = {
+        1: {"stress": 3, "wellbeing": 10, "choice": "cook_at_home"},
+        2: {"stress": -2, "wellbeing": -2, "budget": -3, "choice": "eat_out"},
+        3: {"stress": 0, "wellbeing": 4, "budget": -1, "choice": "mixed"}
+    }
+
+    def __init__(self, ai_mode: bool = False, api_key: Optional[str] = None, demo_mode: bool = False,
+                 scenarios: Optional[Dict] = None, rng: Optional[random.Random] = None,
+                 graph: Optional[ScenarioGraph] = None, stat_history_limit: Optional[int] = None,
+                 generation_cache: Optional[GenerationCache] = None,
+                 scenario_pool: Optional[ScenarioPool] = None, ai_batch_size: int = DEFAULT_BATCH_SIZE):
+        # generation_cache: AI 생성 결과 캐시 (None이면 프로세스 공용 기본 캐시)
+        # scenario_pool: 사전 생성 AI 시나리오 풀 (None이면 ai_scenario_pool.json이 있을 때 사용)
+        # ai_batch_size: 한 번의 AI 호출로 생성할 시기 수 (1이면 일괄 생성하지 않음)
+        # stat_history_limit: 스탯 히스토리를 최근 N개만 유지 (장시간 웹 세션용, None이면 무제한)
+        self.state = GameState(stat_history_limit=stat_history_limit)
+        # 배치 시뮬레이션에서는 이미 컴파일한 시나리오 그래프를 공유하여 재파싱/재컴파일을 피함
+        if graph is None:
+            graph = compile_scenarios(scenarios) if scenarios is not None else self.load_scenario_graph()
+        self.graph = graph
+        self.scenarios = graph.scenario_map
         self.ai_mode = ai_mode
-        self.gemini = GeminiIntegration(api_key) if ai_mode else None
+        if ai_mode:
+            self.gemini = GeminiIntegration(api_key, cache=generation_cache or default_generation_cache(),
+                                            pool=scenario_pool or default_scenario_pool(),
+                                            batch_size=ai_batch_size)
+        else:
+            self.gemini = None
+        # AI 모드: 플레이어가 현재 시나리오를 읽는 동안 다음 AI 시나리오를 미리 생성
+        self.prefetcher = ScenarioPrefetcher(self.gemini) if ai_mode else None
         self.demo_mode = demo_mode
+        # 난수 생성기 (기본값은 random 모듈, 시뮬레이션에서는 시드 고정 Random 주입)
+        self.rng = rng if rng is not None else random
+
+    @staticmethod
+    def load_scenarios():
+        """시나리오 데이터 로드 (컴파일된 그래프의 원본 딕셔너리, 읽기 전용)"""
+        return KOICAGame.load_scenario_graph().scenario_map
 
-    def load_scenarios(self):
-        """시나리오 데이터 로드"""
+    @staticmethod
+    def load_scenario_graph() -> ScenarioGraph:
+        """컴파일된 시나리오 그래프 로드 (바이너리 번들 캐시 및 프로세스 내 메모 사용)"""
         try:
-            with open('scenarios.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_scenario_graph('scenarios.json')
         except FileNotFoundError:
             print("오류: scenarios.json 파일을 찾을 수 없습니다.")
             sys.exit(1)
@@ -999,6 +2189,10 @@ class KOICAGame:
         """화면 지우기"""
         os.system('clear' if os.name == 'posix' else 'cls')
 
+    def notify(self, message: str):
+        """플레이어 알림 출력 (헤드리스 실행에서는 재정의하여 출력 생략)"""
+        print(message)
+
     def display_intro(self):
         """인트로 화면"""
         self.clear_screen()
@@ -1065,20 +2259,13 @@ class KOICAGame:
         print("3. 자동차 없이 택시와 대중교통 이용 (자유롭지만 불편)")
 
         if self.demo_mode:
-            car_choice = random.randint(1, 3)
+            car_choice = self.rng.randint(1, 3)
             print(f"\n🤖 [데모 모드] 선택: {car_choice}")
             time.sleep(1)
         else:
             car_choice = self._get_choice_input(3)
 
-        car_effects = {
-            1: {"stress": -3, "wellbeing": 6, "choice": "bring_from_korea"},
-            2: {"stress": 4, "wellbeing": 0, "choice": "buy_local"},
-            3: {"stress": 6, "wellbeing": -2, "choice": "no_car"}
-        }
-        self.state.car_choice = car_effects[car_choice]["choice"]
-        self.state.update_stats({"stress": car_effects[car_choice]["stress"],
-                                  "wellbeing": car_effects[car_choice]["wellbeing"]})
+        self.state.car_choice = self.apply_lifestyle_effect(self.CAR_EFFECTS, car_choice)
 
         # 2. 주거지 선택
         print("\n" + "="*60)
@@ -1090,20 +2277,13 @@ class KOICAGame:
         print("4. 치안 좋은 동네 집 (안전, 하지만 시내에서 멀고 심심함)")
 
         if self.demo_mode:
-            housing_choice = random.randint(1, 4)
+            housing_choice = self.rng.randint(1, 4)
             print(f"\n🤖 [데모 모드] 선택: {housing_choice}")
             time.sleep(1)
         else:
             housing_choice = self._get_choice_input(4)
 
-        housing_effects = {
-            1: {"stress": -2, "wellbeing": 8, "choice": "spacious"},
-            2: {"stress": -3, "wellbeing": 10, "budget": -3, "choice": "nice"},
-            3: {"stress": -6, "wellbeing": -2, "choice": "near_office"},
-            4: {"stress": -3, "wellbeing": 4, "choice": "secure"}
-        }
-        self.state.housing_choice = housing_effects[housing_choice]["choice"]
-        self.state.update_stats({k: v for k, v in housing_effects[housing_choice].items() if k != "choice"})
+        self.state.housing_choice = self.apply_lifestyle_effect(self.HOUSING_EFFECTS, housing_choice)
 
         # 3. 여가 생활 선택
         print("\n" + "="*60)
@@ -1115,20 +2295,13 @@ class KOICAGame:
         print("4. 집에서 뒹굴기 (편안한 휴식)")
 
         if self.demo_mode:
-            leisure_choice = random.randint(1, 4)
+            leisure_choice = self.rng.randint(1, 4)
             print(f"\n🤖 [데모 모드] 선택: {leisure_choice}")
             time.sleep(1)
         else:
             leisure_choice = self._get_choice_input(4)
 
-        leisure_effects = {
-            1: {"stress": -5, "wellbeing": 6, "choice": "reading"},
-            2: {"stress": -6, "wellbeing": 15, "choice": "exercise"},
-            3: {"stress": -3, "wellbeing": -2, "staff_morale": 4, "choice": "drinking"},
-            4: {"stress": -2, "wellbeing": 4, "choice": "gaming"}
-        }
-        self.state.leisure_choice = leisure_effects[leisure_choice]["choice"]
-        self.state.update_stats({k: v for k, v in leisure_effects[leisure_choice].items() if k != "choice"})
+        self.state.leisure_choice = self.apply_lifestyle_effect(self.LEISURE_EFFECTS, leisure_choice)
 
         # 4. 식사 방식 선택
         print("\n" + "="*60)
@@ -1139,19 +2312,13 @@ class KOICAGame:
         print("3. 배달&포장 (편리하고 시간 절약, 하지만 배달비 부담)")
 
         if self.demo_mode:
-            meal_choice = random.randint(1, 3)
+            meal_choice = self.rng.randint(1, 3)
             print(f"\n🤖 [데모 모드] 선택: {meal_choice}")
             time.sleep(1)
         else:
             meal_choice = self._get_choice_input(3)
 
-        meal_effects = {
-            1: {"stress": 3, "wellbeing": 10, "choice": "cook_at_home"},
-            2: {"stress": -2, "wellbeing": -2, "budget": -3, "choice": "eat_out"},
-            3: {"stress": 0, "wellbeing": 4, "budget": -1, "choice": "mixed"}
-        }
-        self.state.meal_choice = meal_effects[meal_choice]["choice"]
-        self.state.update_stats({k: v for k, v in meal_effects[meal_choice].items() if k != "choice"})
+        self.state.meal_choice = self.apply_lifestyle_effect(self.MEAL_EFFECTS, meal_choice)
 
         # 결과 요약
         print("\n" + "="*60)
@@ -1193,6 +2360,12 @@ class KOICAGame:
         else:
             time.sleep(2)
 
+    def apply_lifestyle_effect(self, effects: Dict, choice_num: int) -> str:
+        """생활 선택 효과를 스탯에 반영하고 선택 코드 반환"""
+        effect = effects[choice_num]
+        self.state.update_stats({k: v for k, v in effect.items() if k != "choice"})
+        return effect["choice"]
+
     def _get_choice_input(self, max_choice):
         """선택 입력 헬퍼 함수"""
         while True:
@@ -1209,234 +2382,16 @@ class KOICAGame:
                 sys.exit(0)
 
     def check_and_trigger_life_event(self):
-        """주기적 생활 이벤트 발생 확인 - 전체 플레이 동안 최대 4회 랜덤 발생"""
-        # 운동 습관의 패시브 효과: 웰빙 하락 방어
-        if self.state.leisure_choice == "exercise" and self.state.wellbeing < 40:
-            # 운동 습관이 웰빙 하락을 방어해 줌
-            self.state.update_stats({'wellbeing': 5, 'stress': -5})
-            print("\n💪 [운동 습관 효과] 규칙적인 운동으로 정신 건강이 개선되었습니다. (웰빙 +5, 스트레스 -5)")
-
-        # 이미 4회 발생했으면 더 이상 발생하지 않음
-        if self.state.life_events_count >= 4:
-            return None
-
-        # 기본 확률 계산 (2년 12 periods 동안 평균 4회 발생하도록 조정)
-        # 남은 횟수에 따라 확률 동적 조정
-        remaining_events = 4 - self.state.life_events_count
-        remaining_periods = (2 - self.state.year) * 6 + (6 - self.state.period) + 1
-
-        # 남은 기간이 없으면 발생 안 함
-        if remaining_periods <= 0:
-            return None
-
-        # 기본 확률: 남은 이벤트 수 / 남은 기간 수
-        base_chance = remaining_events / remaining_periods
-
-        # 최소 15%, 최대 50% 확률로 제한
-        base_chance = max(0.15, min(0.50, base_chance))
-
-        # 스트레스/웰빙 상태에 따라 확률 조정
-        if self.state.stress > 70:
-            base_chance += 0.10  # 스트레스 높으면 이벤트 확률 증가
-        if self.state.wellbeing < 30:
-            base_chance += 0.10  # 웰빙 낮으면 이벤트 확률 증가
-
-        # 확률을 60%로 제한 (너무 자주 발생하지 않도록)
-        base_chance = min(0.60, base_chance)
-
-        # 랜덤으로 이벤트 발생 여부 결정
-        if random.random() < base_chance:
-            event = self.select_life_event()
-            if event:
-                # 중복 방지를 위해 추적 세트에 즉시 추가
-                self.state.triggered_life_events.add(event)
-                # 생활 이벤트 발생 횟수 증가
-                self.state.life_events_count += 1
-            return event
-        return None
+        """주기적 생활 이벤트 발생 확인 (check_life_event에 위임, 알림은 notify로 출력)"""
+        notices = []
+        event_id = check_life_event(self.state, self.rng, notices)
+        for notice in notices:
+            self.notify("\n" + notice['message'])
+        return event_id
 
     def select_life_event(self):
-        """모든 타입의 이벤트 선택 - 생활, 서사, 부소장, 연차별 이벤트 포함 (최대 4회 발생)"""
-        available_events = []
-
-        # === 생활 이벤트 (생활 선택과 연동) ===
-        # 건강 이벤트 (웰빙 낮을 때) - 음주 습관 + 스트레스 시 확률 증가
-        if self.state.wellbeing < 40 and "life_event_health_issue" not in self.state.triggered_life_events:
-            weight = 3
-            # 음주 + 스트레스 조합은 건강 위험 증가
-            if self.state.leisure_choice == "drinking" and self.state.stress > 60:
-                weight = 6  # 확률 2배 증가
-            available_events.append(("life_event_health_issue", weight))
-
-        # 향수병 (기간에 따라 - 5-6개월 이상 지났을 때)
-        if self.state.year >= 1 and self.state.period >= 3 and "life_event_homesickness" not in self.state.triggered_life_events:
-            available_events.append(("life_event_homesickness", 2))
-
-        # 심리적 압박 (스트레스 높을 때)
-        if self.state.stress > 60 and "life_event_psychological_pressure" not in self.state.triggered_life_events:
-            available_events.append(("life_event_psychological_pressure", 3))
-
-        # 자동차 고장 (자동차가 있는 경우) - 현지 중고차는 고장 확률 높음
-        if self.state.car_choice in ["bring_from_korea", "buy_local"] and "life_event_car_breakdown" not in self.state.triggered_life_events:
-            weight = 1
-            if self.state.car_choice == "buy_local":
-                weight = 4  # 현지 중고차는 고장 확률 4배
-            available_events.append(("life_event_car_breakdown", weight))
-
-        # 주거 문제 (모든 경우) - 사무실 근처 집은 문제 발생 확률 높음
-        if "life_event_housing_issue" not in self.state.triggered_life_events:
-            weight = 1
-            if self.state.housing_choice == "near_office":
-                weight = 3  # 좁고 오래된 집은 문제 발생 확률 3배
-            available_events.append(("life_event_housing_issue", weight))
-
-        # === 서사 이벤트 ===
-
-        # --- 긍정적 이벤트 (높은 stat 요구) ---
-        if self.state.project_success >= 70 and self.state.year >= 1 and "narrative_event_project_opening" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_project_opening", 2))
-
-        if self.state.staff_morale >= 60 and "narrative_event_volunteer_success" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_volunteer_success", 2))
-
-        if self.state.project_success >= 60 and self.state.year >= 1 and "narrative_event_partner_growth" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_partner_growth", 2))
-
-        if self.state.project_success >= 65 and "narrative_event_unexpected_impact" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_unexpected_impact", 2))
-
-        if self.state.reputation >= 60 and "narrative_event_emergency_relief" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_emergency_relief", 1))
-
-        if self.state.staff_morale >= 60 and self.state.year >= 1 and "narrative_event_staff_wedding" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_staff_wedding", 2))
-
-        if self.state.reputation >= 60 and self.state.period >= 1 and "narrative_event_new_year_letters" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_new_year_letters", 1))
-
-        if self.state.reputation >= 70 and self.state.year >= 1 and "narrative_event_minister_trust" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_minister_trust", 2))
-
-        if self.state.staff_morale >= 65 and "narrative_event_staff_dedication" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_staff_dedication", 2))
-
-        if self.state.project_success >= 75 and self.state.reputation >= 75 and "narrative_event_international_award" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_international_award", 1))
-
-        if self.state.reputation >= 70 and "narrative_event_media_interview" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_media_interview", 2))
-
-        # --- 부정적 이벤트 (낮은 stat 또는 위기 상황) ---
-        if self.state.period == 6 and "narrative_event_policy_shift" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_policy_shift", 2))
-
-        if self.state.period >= 10 and self.state.budget_execution_rate < 70 and "narrative_event_budget_pressure" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_budget_pressure", 3))
-
-        if "narrative_event_volunteer_safety" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_volunteer_safety", 1))
-
-        if self.state.year >= 1 and "narrative_event_regime_change" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_regime_change", 1))
-
-        if self.state.reputation < 60 and "narrative_event_jica_competition" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_jica_competition", 2))
-
-        if (self.state.period == 9 or self.state.period == 3) and "narrative_event_audit" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_audit", 2))
-
-        if (self.state.period == 5 or self.state.period == 11) and "narrative_event_congress_visit" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_congress_visit", 2))
-
-        if self.state.stress > 50 and self.state.staff_morale < 50 and "narrative_event_yp_adaptation_failure" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_yp_adaptation_failure", 2))
-
-        if "narrative_event_currency_crisis" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_currency_crisis", 1))
-
-        if "narrative_event_corruption_pressure" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_corruption_pressure", 1))
-
-        if self.state.project_success < 60 and "narrative_event_harsh_evaluation" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_harsh_evaluation", 2))
-
-        if self.state.reputation < 50 and "narrative_event_media_attack" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_media_attack", 2))
-
-        # --- 양면적 이벤트 (복잡한 선택지) ---
-        if "narrative_event_china_proposal" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_china_proposal", 1))
-
-        if "narrative_event_hq_unrealistic_schedule" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_hq_unrealistic_schedule", 1))
-
-        if self.state.year >= 1 and "narrative_event_staff_salary_demand" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_staff_salary_demand", 2))
-
-        if "narrative_event_ppp_suspicion" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_ppp_suspicion", 1))
-
-        if "narrative_event_gender_culture" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_gender_culture", 1))
-
-        if (self.state.period == 4 or self.state.period == 10) and "narrative_event_ramadan_schedule" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_ramadan_schedule", 1))
-
-        if self.state.project_success < 50 and "narrative_event_admitting_failure" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_admitting_failure", 2))
-
-        if self.state.staff_morale >= 50 and "narrative_event_volunteer_social_enterprise" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_volunteer_social_enterprise", 1))
-
-        if "narrative_event_family_emergency" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_family_emergency", 1))
-
-        if "narrative_event_local_crisis_support" not in self.state.triggered_life_events:
-            available_events.append(("narrative_event_local_crisis_support", 1))
-
-        # === 부소장 관련 이벤트 ===
-        # 특정 부소장의 사기가 낮을 때
-        low_morale_deputies = self.state.get_low_morale_deputies(threshold=30)
-        if low_morale_deputies and "deputy_event_low_morale" not in self.state.triggered_life_events:
-            available_events.append(("deputy_event_low_morale", 3))
-
-        # 부소장 간 갈등
-        if self.state.year >= 1 and self.state.period >= 3 and "deputy_event_conflict" not in self.state.triggered_life_events:
-            available_events.append(("deputy_event_conflict", 2))
-
-        # === 연차별 특화 이벤트 ===
-        # 1년차 전용: 신임 소장 적응
-        if self.state.year == 1 and self.state.period <= 3 and "year1_event_adaptation" not in self.state.triggered_life_events:
-            available_events.append(("year1_event_adaptation", 2))
-
-        # 2년차 전용: 본부 정기 감사
-        if self.state.year == 2 and self.state.period >= 2 and "year2_event_audit" not in self.state.triggered_life_events:
-            available_events.append(("year2_event_audit", 3))
-
-        # 2년차 전용: 임기 말 평가 압박
-        if self.state.year == 2 and self.state.period >= 9 and "year2_event_final_evaluation" not in self.state.triggered_life_events:
-            available_events.append(("year2_event_final_evaluation", 4))
-
-        # 2년차 전용: 차기 CPS 구상
-        if self.state.year == 2 and self.state.period >= 6 and "year2_event_cps_planning" not in self.state.triggered_life_events:
-            available_events.append(("year2_event_cps_planning", 2))
-
-        if not available_events:
-            return None
-
-        # 가중치를 고려한 랜덤 선택
-        events = [e[0] for e in available_events]
-        weights = [e[1] for e in available_events]
-        total_weight = sum(weights)
-        rand = random.uniform(0, total_weight)
-
-        cumulative = 0
-        for event, weight in zip(events, weights):
-            cumulative += weight
-            if rand <= cumulative:
-                return event
-
-        return events[0]  # 폴백
+        """발생 조건을 만족하는 이벤트 중 하나를 가중치에 따라 선택"""
+        return select_life_event(self.state, self.rng)
 
     # ============================================================
     # 고급 기능: 부소장 임계값 이벤트 체크
@@ -1444,49 +2399,7 @@ class KOICAGame:
 
     def check_deputy_threshold_events(self):
         """부소장 임계값 이벤트 체크 (morale, 프로젝트 성공도, 평판)"""
-        # Backward compatibility: Initialize triggered_deputy_events if it doesn't exist
-        if not hasattr(self.state, 'triggered_deputy_events'):
-            self.state.triggered_deputy_events = set()
-
-        # 전체 이벤트 발생 횟수 제한 체크 (4회)
-        if self.state.life_events_count >= 4:
-            return None
-
-        deputy_principled = self.state.get_deputy_by_personality("principled")
-        deputy_local = self.state.get_deputy_by_personality("local_friendly")
-
-        if not deputy_principled or not deputy_local:
-            return None
-
-        event_id = None
-
-        # 김유영 부소장 효율성 우려 이벤트 (프로젝트 성공도 낮을 때)
-        if (self.state.project_success <= 30 and
-            'deputy_principled_efficiency_concern' not in self.state.triggered_deputy_events):
-            event_id = 'deputy_principled_efficiency_concern'
-        # 이수진 부소장 투명성 우려 이벤트 (평판 낮을 때)
-        elif (self.state.reputation <= 30 and
-            'deputy_local_friendly_transparency_concern' not in self.state.triggered_deputy_events):
-            event_id = 'deputy_local_friendly_transparency_concern'
-        # 김유영 부소장 전보 위기 이벤트
-        elif (deputy_principled['morale'] <= 20 and
-            'deputy_principled_low_resignation' not in self.state.triggered_deputy_events):
-            event_id = 'deputy_principled_low_resignation'
-        # 이수진 부소장 네트워크 보너스 이벤트
-        elif (deputy_local['morale'] >= 50 and
-            'deputy_local_friendly_network_bonus' not in self.state.triggered_deputy_events):
-            event_id = 'deputy_local_friendly_network_bonus'
-        # 이수진 부소장 문화 갈등 이벤트
-        elif (deputy_local['morale'] <= 20 and
-            'deputy_local_friendly_cultural_crisis' not in self.state.triggered_deputy_events):
-            event_id = 'deputy_local_friendly_cultural_crisis'
-
-        # 이벤트가 선택되면 카운트 증가 및 추적 세트에 추가
-        if event_id:
-            self.state.triggered_deputy_events.add(event_id)
-            self.state.life_events_count += 1
-
-        return event_id
+        return check_deputy_event(self.state)
 
     # ============================================================
     # 고급 기능: 장기 영향(delayed effects) 체크
@@ -1494,48 +2407,7 @@ class KOICAGame:
 
     def check_delayed_effects(self):
         """대기 중인 장기 효과 체크 및 발동"""
-        # Backward compatibility: Initialize pending_delayed_effects if it doesn't exist
-        if not hasattr(self.state, 'pending_delayed_effects'):
-            self.state.pending_delayed_effects = []
-
-        triggered_effects = []
-
-        for effect in self.state.pending_delayed_effects[:]:  # 복사본 순회
-            # trigger_period 체크
-            current_period_number = (self.state.year - 1) * 6 + self.state.period
-            if current_period_number >= effect.get('trigger_period', 0):
-                # condition 체크
-                condition = effect.get('condition', 'always')
-
-                should_trigger = False
-                if condition == 'always':
-                    should_trigger = True
-                elif condition.startswith('random'):
-                    # "random < 0.3" 같은 조건
-                    prob = float(condition.split('<')[1].strip())
-                    if random.random() < prob:
-                        should_trigger = True
-                elif '>=' in condition:
-                    # "project_success >= 50" 같은 조건
-                    stat_name, threshold = condition.split('>=')
-                    stat_name = stat_name.strip()
-                    threshold = int(threshold.strip())
-                    current_value = getattr(self.state, stat_name, 0)
-                    if current_value >= threshold:
-                        should_trigger = True
-                elif '<=' in condition:
-                    stat_name, threshold = condition.split('<=')
-                    stat_name = stat_name.strip()
-                    threshold = int(threshold.strip())
-                    current_value = getattr(self.state, stat_name, 0)
-                    if current_value <= threshold:
-                        should_trigger = True
-
-                if should_trigger:
-                    triggered_effects.append(effect)
-                    self.state.pending_delayed_effects.remove(effect)
-
-        return triggered_effects
+        return collect_delayed_effects(self.state, self.rng)
 
     # ============================================================
     # 고급 기능: 게임 오버 조건 확장
@@ -1543,38 +2415,48 @@ class KOICAGame:
 
     def check_advanced_endings(self):
         """고급 엔딩 조건 체크"""
-        # Backward compatibility: Initialize ethics_violations if it doesn't exist
-        if not hasattr(self.state, 'ethics_violations'):
-            self.state.ethics_violations = 0
-
-        # 번아웃 엔딩
-        if self.state.stress >= 100 or self.state.wellbeing <= 0:
-            return 'ending_burnout'
-
-        # 평판 추락 엔딩
-        if self.state.reputation <= 0:
-            return 'ending_reputation_collapse'
-
-        # 윤리 위반 엔딩
-        if self.state.ethics_violations >= 3:
-            return 'ending_ethical_crisis'
-
-        # 완벽한 균형 엔딩 (임기 종료 시)
-        if self.state.year >= 2 and self.state.period >= 6:
-            # 모든 스탯이 80 이상
-            if (self.state.reputation >= 80 and
-                self.state.project_success >= 80 and
-                self.state.staff_morale >= 80 and
-                self.state.budget_execution_rate >= 70):
-                # 양측 부소장 모두 높은 morale
-                deputy_principled = self.state.get_deputy_by_personality("principled")
-                deputy_local = self.state.get_deputy_by_personality("local_friendly")
-                if (deputy_principled and deputy_local and
-                    deputy_principled['morale'] >= 40 and
-                    deputy_local['morale'] >= 40):
-                    return 'ending_perfect_balance'
+        return check_advanced_ending(self.state)
 
-        return None
+    # AI 모드 폴백에 쓰는 클래식 시나리오 분류 (시기와 무관하게 끼워 넣을 수 있는 이벤트)
+    FALLBACK_CATEGORIES = ('narrative_event', 'yearly_event')
+
+    def fallback_ai_scenario(self, theme: Optional[Dict] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """AI 생성이 실패하거나 마감 시간을 넘겼을 때 대신 쓸 클래식 시나리오
+
+        아직 방문하지 않은 서사/연차 이벤트 중 테마 키워드가 가장 많이 맞는 것을 고르고,
+        AI 시나리오처럼 시간을 진행하고 다음 AI 시나리오로 이어지도록 바꾼 복사본을 반환합니다.
+        고른 시나리오는 방문 기록에 추가하여 같은 게임에서 다시 쓰지 않습니다.
+        후보를 모두 썼으면 로컬 절차적 생성기로 같은 테마의 시나리오를 만듭니다.
+
+        Returns:
+            (시나리오 ID, 시나리오) - 후보가 전혀 없으면 (None, None)
+        """
+        year_prefix = f"year{self.state.year}_"
+        eligible = [
+            scenario_id for scenario_id in self.graph.regular_ids
+            if scenario_category(scenario_id) in self.FALLBACK_CATEGORIES
+            and (not scenario_id.startswith('year') or scenario_id.startswith(year_prefix))
+        ]
+        candidates = [s for s in eligible if s not in self.state.visited_scenarios]
+        if not candidates and self.gemini is not None:
+            return 'ai_generated', self.gemini.generate_local_scenario(self.state, theme)
+        candidates = candidates or eligible
+        if not candidates:
+            return None, None
+
+        if theme:
+            def theme_score(scenario_id):
+                scenario = self.scenarios[scenario_id]
+                text = scenario['title'] + scenario['description']
+                return sum(1 for keyword in theme['keywords'] if keyword in text)
+
+            scores = {scenario_id: theme_score(scenario_id) for scenario_id in candidates}
+            best = max(scores.values())
+            candidates = [scenario_id for scenario_id in candidates if scores[scenario_id] == best]
+
+        scenario_id = self.rng.choice(candidates)
+        self.state.visited_scenarios.append(scenario_id)
+        return scenario_id, link_ai_choices(copy.deepcopy(self.scenarios[scenario_id]))
 
     def display_scenario(self, scenario_id):
         """시나리오 표시 (AI 생성 지원)"""
@@ -1587,16 +2469,19 @@ class KOICAGame:
                 scenario_id = 'period_12'
                 scenario = self.scenarios.get(scenario_id)
             else:
-                print("\n🤖 AI가 맞춤형 시나리오를 생성중입니다...\n")
-                scenario = self.gemini.generate_scenario(self.state)
+                if self.gemini.degraded:
+                    print("\n⚠️ AI 서버 응답이 불안정하여 준비된 시나리오로 진행합니다...\n")
+                else:
+                    print("\n🤖 AI가 맞춤형 시나리오를 생성중입니다...\n")
+                # 이전 시나리오를 읽는 동안 미리 생성한 결과가 있으면 사용
+                theme = self.gemini.pick_theme()
+                scenario = self.prefetcher.take(self.state) or self.gemini.generate_scenario(self.state, theme=theme)
 
                 if not scenario:
-                    print("AI 시나리오 생성 실패. 기본 시나리오를 사용합니다.")
-                    # 폴백: 랜덤 시나리오 선택
-                    import random
-                    fallback_scenarios = ['budget_crisis_1', 'cultural_conflict', 'staff_problem_1']
-                    scenario_id = random.choice(fallback_scenarios)
-                    scenario = self.scenarios.get(scenario_id)
+                    if not self.gemini.degraded:
+                        print("AI 시나리오 생성 실패. 기본 시나리오를 사용합니다.")
+                    # 폴백: 같은 테마의 클래식 시나리오
+                    scenario_id, scenario = self.fallback_ai_scenario(theme)
         else:
             scenario = self.scenarios.get(scenario_id)
 
@@ -1611,6 +2496,10 @@ class KOICAGame:
         print(scenario['description'])
         print()
 
+        # 플레이어가 읽고 고르는 동안 다음 AI 시나리오 생성 시작
+        if self.prefetcher and leads_to_ai_scenario(scenario):
+            self.prefetcher.start(self.state)
+
         return scenario
 
     def display_choices(self, choices):
@@ -1695,7 +2584,7 @@ class KOICAGame:
         max_score = max(choice_scores)
         best_choices = [i for i, s in enumerate(choice_scores) if s == max_score]
 
-        return random.choice(best_choices)
+        return self.rng.choice(best_choices)
 
     def handle_free_form_input(self):
         """자유 입력 모드 처리"""
@@ -1732,296 +2621,61 @@ class KOICAGame:
             input("\nEnter를 눌러 다시 선택...")
             return None
 
-    def apply_choice_result(self, result):
-        """선택 결과 적용"""
+    def display_choice_result(self, result):
+        """선택 결과 표시 (상태 변화는 전이 엔진 step이 이미 적용)"""
         if 'message' in result:
             print(f"\n💬 {result['message']}")
-            if not self.demo_mode:
-                input("\nEnter를 눌러 계속...")
-            else:
-                time.sleep(1.5)
-
-        if 'stats' in result:
-            self.state.update_stats(result['stats'])
+            self._pause("\nEnter를 눌러 계속...", 1.5)
 
-        # 부소장 사기 변경 처리
+        # 부소장 사기 변화 표시
         if 'deputy_morale' in result:
             print("\n👥 부소장 사기 변화:")
             for personality, change in result['deputy_morale'].items():
-                self.state.update_deputy_morale(personality, change)
                 deputy = self.state.get_deputy_by_personality(personality)
                 if deputy:
                     change_str = f"+{change}" if change > 0 else str(change)
                     print(f"  • {deputy['name']}: {change_str} (현재 사기: {deputy['morale']})")
 
-        # 고급 기능: 장기 영향(delayed_effects) 추가
         if 'delayed_effects' in result:
-            # Backward compatibility: Initialize pending_delayed_effects if it doesn't exist
-            if not hasattr(self.state, 'pending_delayed_effects'):
-                self.state.pending_delayed_effects = []
-            for effect in result['delayed_effects']:
-                self.state.pending_delayed_effects.append(effect.copy())
             print(f"\n⏰ 장기 영향 {len(result['delayed_effects'])}개가 등록되었습니다.")
 
-        if 'advance_time' in result and result['advance_time']:
-            self.state.advance_time()
+    def display_events(self, events: List[Dict]):
+        """전이 엔진이 반환한 이벤트 표시 (이벤트 선택지는 다음 루프에서 현재 시나리오로 표시됨)"""
+        for event in events:
+            if event['type'] == EVENT_NOTICE:
+                self.notify("\n" + event['message'])
+            elif event['type'] in (EVENT_LIFE, EVENT_DEPUTY):
+                print("\n" + "="*60)
+                if event['type'] == EVENT_LIFE:
+                    print("🏠 생활 이벤트가 발생했습니다!")
+                else:
+                    print("👥 부소장 관련 특별 이벤트가 발생했습니다!")
+                print("="*60)
+                self._pause("\nEnter를 눌러 계속...", 1)
+            elif event['type'] == EVENT_DELAYED_EFFECT:
+                print("\n" + "="*60)
+                print("⏰ 과거 선택의 장기 영향이 나타났습니다!")
+                print("="*60)
+                print(f"\n💬 {event['effect'].get('message', '과거의 선택이 영향을 미치고 있습니다.')}")
+                self._pause("\nEnter를 눌러 계속...", 1.5)
+
+    def _pause(self, prompt: str, seconds: float):
+        """플레이어가 읽을 수 있도록 대기 (데모 모드에서는 정해진 시간만큼)"""
+        if not self.demo_mode:
+            input(prompt)
+        else:
+            time.sleep(seconds)
 
     def _determine_director_types(self) -> List[str]:
         """플레이어의 스탯과 선택 패턴을 분석하여 가장 적합한 소장 유형 1개를 결정
 
-        점수 기반 시스템으로 12개 유형의 확률을 균등하게 배분합니다.
-        각 유형마다 조건을 체크하고 점수를 부여하며, 가장 높은 점수를 받은 유형이 선택됩니다.
+        점수는 score_director_types()로 계산하며, 가장 높은 점수를 받은 유형이 선택됩니다.
         """
         stats = self.state
-        style = stats.player_style
-
-        # 각 스탯의 상대적 수준 분석
-        work_stats = {
-            'reputation': stats.reputation,
-            'budget': stats.budget_execution_rate,
-            'staff': stats.staff_morale,
-            'project': stats.project_success
-        }
-
-        # 가장 높은 스탯 찾기
-        max_stat = max(work_stats.values()) if work_stats.values() else 50
-        max_stat_name = max(work_stats, key=work_stats.get)
-
-        # 스탯 균형도 계산
-        stat_values = list(work_stats.values())
-        avg_stat = sum(stat_values) / len(stat_values) if stat_values else 50
-        variance = sum((v - avg_stat) ** 2 for v in stat_values) / len(stat_values) if stat_values else 0
-
-        # 플레이 스타일 분석
-        total_choices = len(stats.choice_history)
-        risk_ratio = style['risk_taking'] / total_choices if total_choices > 0 else 0
-
-        # 가장 중점을 둔 영역 찾기
-        focus_areas = {
-            'reputation': style['reputation_focused'],
-            'budget': style['budget_focused'],
-            'staff': style['staff_focused'],
-            'project': style['project_focused']
-        }
-        max_focus = max(focus_areas.values()) if focus_areas.values() else 0
-        most_focused = max(focus_areas, key=focus_areas.get) if max_focus > 0 else None
-
-        # === 점수 기반 유형 결정 (12개 유형) ===
-        type_scores = {}
-
-        # 1. 혁신적인 소장 - 높은 위험 감수 + 우수한 성과
-        score = 0
-        if risk_ratio > 0.45:
-            score += 50
-        elif risk_ratio > 0.35:
-            score += 30
-        elif risk_ratio > 0.25:
-            score += 10
-        if max_stat >= 70:
-            score += 30
-        elif max_stat >= 60:
-            score += 20
-        elif max_stat >= 50:
-            score += 10
-        type_scores["혁신적인 소장"] = score
-
-        # 2. 여유로운 소장 - 높은 웰빙 + 낮은 스트레스
-        score = 0
-        if stats.wellbeing >= 70:
-            score += 40
-        elif stats.wellbeing >= 60:
-            score += 25
-        elif stats.wellbeing >= 50:
-            score += 10
-        if stats.stress <= 30:
-            score += 40
-        elif stats.stress <= 40:
-            score += 25
-        elif stats.stress <= 50:
-            score += 10
-        if avg_stat >= 50:
-            score += 20
-        type_scores["여유로운 소장"] = score
-
-        # 3. 헌신적인 소장 - 높은 스트레스 + 높은 성과 (조건 더 완화)
-        score = 0
-        if stats.stress >= 65:
-            score += 40
-        elif stats.stress >= 55:
-            score += 30
-        elif stats.stress >= 45:
-            score += 20
-        if avg_stat >= 60:
-            score += 40
-        elif avg_stat >= 50:
-            score += 30
-        elif avg_stat >= 40:
-            score += 20
-        type_scores["헌신적인 소장"] = score
-
-        # 4. 균형잡힌 소장 - 낮은 분산 + 좋은 평균 (조건 더 완화)
-        score = 0
-        if variance < 250:
-            score += 45
-        elif variance < 350:
-            score += 35
-        elif variance < 450:
-            score += 25
-        elif variance < 600:
-            score += 15
-        if avg_stat >= 50:
-            score += 40
-        elif avg_stat >= 40:
-            score += 30
-        elif avg_stat >= 30:
-            score += 20
-        type_scores["균형잡힌 소장"] = score
-
-        # 5. 온화한 소장 - 직원 중심 + 낮은 스트레스
-        score = 0
-        if most_focused == 'staff':
-            score += 35
-        if style['staff_focused'] >= 8:
-            score += 35
-        elif style['staff_focused'] >= 5:
-            score += 20
-        elif style['staff_focused'] >= 3:
-            score += 10
-        if stats.stress <= 40:
-            score += 30
-        elif stats.stress <= 50:
-            score += 15
-        if work_stats['staff'] >= 65:
-            score += 25
-        elif work_stats['staff'] >= 55:
-            score += 15
-        type_scores["온화한 소장"] = score
-
-        # 6. 사람 중심 소장 - 직원 만족도 우선
-        score = 0
-        if most_focused == 'staff':
-            score += 40
-        if style['staff_focused'] >= 8:
-            score += 40
-        elif style['staff_focused'] >= 5:
-            score += 25
-        elif style['staff_focused'] >= 3:
-            score += 15
-        if work_stats['staff'] >= 70:
-            score += 35
-        elif work_stats['staff'] >= 60:
-            score += 25
-        elif work_stats['staff'] >= 50:
-            score += 15
-        type_scores["사람 중심 소장"] = score
-
-        # 7. 신중한 외교가 - 평판 중심 + 낮은 위험
-        score = 0
-        if most_focused == 'reputation':
-            score += 40
-        if style['reputation_focused'] >= 8:
-            score += 35
-        elif style['reputation_focused'] >= 5:
-            score += 20
-        elif style['reputation_focused'] >= 3:
-            score += 10
-        if risk_ratio < 0.15:
-            score += 35
-        elif risk_ratio < 0.25:
-            score += 20
-        if work_stats['reputation'] >= 65:
-            score += 25
-        elif work_stats['reputation'] >= 55:
-            score += 15
-        type_scores["신중한 외교가"] = score
-
-        # 8. 외교적인 소장 - 평판 우선
-        score = 0
-        if most_focused == 'reputation':
-            score += 40
-        if style['reputation_focused'] >= 8:
-            score += 40
-        elif style['reputation_focused'] >= 5:
-            score += 25
-        elif style['reputation_focused'] >= 3:
-            score += 15
-        if work_stats['reputation'] >= 70:
-            score += 35
-        elif work_stats['reputation'] >= 60:
-            score += 25
-        elif work_stats['reputation'] >= 50:
-            score += 15
-        type_scores["외교적인 소장"] = score
-
-        # 9. 진취적인 소장 - 프로젝트 중심 + 높은 위험
-        score = 0
-        if most_focused == 'project':
-            score += 35
-        if style['project_focused'] >= 8:
-            score += 30
-        elif style['project_focused'] >= 5:
-            score += 20
-        elif style['project_focused'] >= 3:
-            score += 10
-        if risk_ratio > 0.35:
-            score += 35
-        elif risk_ratio > 0.25:
-            score += 25
-        elif risk_ratio > 0.18:
-            score += 15
-        if work_stats['project'] >= 65:
-            score += 20
-        elif work_stats['project'] >= 55:
-            score += 10
-        type_scores["진취적인 소장"] = score
-
-        # 10. 성과 중심 소장 - 프로젝트 성공 우선
-        score = 0
-        if most_focused == 'project':
-            score += 40
-        if style['project_focused'] >= 8:
-            score += 40
-        elif style['project_focused'] >= 5:
-            score += 25
-        elif style['project_focused'] >= 3:
-            score += 15
-        if work_stats['project'] >= 70:
-            score += 35
-        elif work_stats['project'] >= 60:
-            score += 25
-        elif work_stats['project'] >= 50:
-            score += 15
-        type_scores["성과 중심 소장"] = score
-
-        # 11. 실무형 소장 - 예산 집행 우선
-        score = 0
-        if most_focused == 'budget':
-            score += 40
-        if style['budget_focused'] >= 8:
-            score += 40
-        elif style['budget_focused'] >= 5:
-            score += 25
-        elif style['budget_focused'] >= 3:
-            score += 15
-        if work_stats['budget'] >= 70:
-            score += 35
-        elif work_stats['budget'] >= 60:
-            score += 25
-        elif work_stats['budget'] >= 50:
-            score += 15
-        type_scores["실무형 소장"] = score
-
-        # 12. 분투한 소장 - 낮은 성과 (폴백)
-        score = 0
-        if avg_stat < 45:
-            score += 60
-        elif avg_stat < 50:
-            score += 40
-        elif avg_stat < 55:
-            score += 20
-        if max_stat < 50:
-            score += 30
-        type_scores["분투한 소장"] = score
+        type_scores = score_director_types(
+            stats.reputation, stats.budget_execution_rate, stats.staff_morale, stats.project_success,
+            stats.stress, stats.wellbeing, stats.player_style, stats.analytics.total_choices
+        )
 
         # 가장 높은 점수를 받은 유형 선택 (동점이면 랜덤)
         if not type_scores:
@@ -2031,8 +2685,7 @@ class KOICAGame:
         top_types = [t for t, s in type_scores.items() if s == max_score]
 
         # 동점이면 랜덤 선택
-        import random
-        return [random.choice(top_types)]
+        return [self.rng.choice(top_types)]
 
     def display_ending(self):
         """엔딩 표시 (AI 개인화 지원)"""
@@ -2044,12 +2697,19 @@ class KOICAGame:
         # AI 모드에서 개인화된 엔딩 생성
         if self.ai_mode and self.gemini.enabled and len(self.state.choice_history) > 5:
             print("🤖 AI가 당신만의 엔딩을 생성중입니다...\n")
-            personalized_ending = self.gemini.generate_personalized_ending(self.state)
+            # 스트리밍으로 받으며 도착한 부분부터 바로 출력
+            printed = {'length': 0}
+
+            def print_new_text(text):
+                if printed['length'] == 0:
+                    print(f"🏆 당신만의 이야기\n")
+                print(text[printed['length']:], end='', flush=True)
+                printed['length'] = len(text)
+
+            personalized_ending = self.gemini.generate_personalized_ending(self.state, on_text=print_new_text)
 
             if personalized_ending:
-                print(f"🏆 당신만의 이야기\n")
-                print(personalized_ending)
-                print()
+                print("\n")
             else:
                 # 폴백: 기본 엔딩 사용
                 self._display_standard_ending()
@@ -2156,26 +2816,14 @@ class KOICAGame:
     def _generate_choice_explanation_console(self, director_type: str) -> str:
         """선택 히스토리를 분석하여 소장 유형에 대한 드라마틱한 설명 생성 (콘솔용)"""
         stats = self.state
-        style = stats.player_style
-        total_choices = len(stats.choice_history)
+        analytics = stats.analytics
 
-        if total_choices == 0:
+        if analytics.total_choices == 0:
             return "축하합니다. 2년간의 임기를 완수하셨습니다."
 
-        # 주요 관심사 파악
-        focus_areas = {
-            '평판': style['reputation_focused'],
-            '예산': style['budget_focused'],
-            '직원': style['staff_focused'],
-            '프로젝트': style['project_focused']
-        }
-
-        # 위험 감수 성향
-        risk_ratio = style['risk_taking'] / total_choices if total_choices > 0 else 0
-
-        # 상위 관심사
-        sorted_focus = sorted(focus_areas.items(), key=lambda x: x[1], reverse=True)
-        top_concern = sorted_focus[0][0] if sorted_focus[0][1] > 0 else "사무소 운영"
+        # 위험 감수 성향과 상위 관심사 (누적 집계에서 바로 조회)
+        risk_ratio = analytics.risk_ratio
+        top_concern = analytics.top_concern()
 
         # === 드라마틱한 구조로 재구성 ===
         paragraphs = []
@@ -2242,33 +2890,21 @@ class KOICAGame:
 
     def _summarize_play_style(self) -> str:
         """플레이 스타일 요약"""
-        style = self.state.player_style
-        total_choices = len(self.state.choice_history)
+        analytics = self.state.analytics
 
-        if total_choices == 0:
+        if analytics.total_choices == 0:
             return "선택을 내리지 않았습니다."
 
         summary = []
 
         # 주요 관심사
-        max_focus = max(style['reputation_focused'], style['budget_focused'],
-                       style['staff_focused'], style['project_focused'])
-
-        if max_focus > 0:
-            focuses = []
-            if style['reputation_focused'] == max_focus:
-                focuses.append("평판")
-            if style['budget_focused'] == max_focus:
-                focuses.append("예산")
-            if style['staff_focused'] == max_focus:
-                focuses.append("직원")
-            if style['project_focused'] == max_focus:
-                focuses.append("프로젝트")
-
+        if analytics.max_focus > 0:
+            focus_names = dict(FOCUS_AREAS)
+            focuses = [focus_names[key] for key in analytics.top_focus_keys()]
             summary.append(f"• 주요 관심사: {', '.join(focuses)}")
 
         # 위험 성향
-        risk_ratio = style['risk_taking'] / total_choices if total_choices > 0 else 0
+        risk_ratio = analytics.risk_ratio
         if risk_ratio > 0.3:
             summary.append("• 성향: 대담한 도전을 선호")
         elif risk_ratio < 0.1:
@@ -2284,28 +2920,23 @@ class KOICAGame:
         # 스탯 분석
         stats = self.state
 
-        # 플레이어 스타일 분석
-        style = stats.player_style
-        max_focus = max(style['reputation_focused'], style['budget_focused'],
-                       style['staff_focused'], style['project_focused'])
+        # 플레이어 스타일 분석 (누적 집계에서 바로 조회)
+        analytics = stats.analytics
 
         # 리더십 스타일 결정
-        leadership_style = []
-        if style['reputation_focused'] == max_focus:
-            leadership_style.append("외교적")
-        if style['budget_focused'] == max_focus:
-            leadership_style.append("실무형")
-        if style['staff_focused'] == max_focus:
-            leadership_style.append("인본주의적")
-        if style['project_focused'] == max_focus:
-            leadership_style.append("성과 중심적")
+        leadership_names = {
+            'reputation_focused': "외교적",
+            'budget_focused': "실무형",
+            'staff_focused': "인본주의적",
+            'project_focused': "성과 중심적"
+        }
+        leadership_style = [leadership_names[key] for key in analytics.top_focus_keys()]
 
         if not leadership_style:
             leadership_style.append("균형잡힌")
 
         # 위험 성향
-        total_choices = len(stats.choice_history)
-        risk_ratio = style['risk_taking'] / total_choices if total_choices > 0 else 0
+        risk_ratio = analytics.risk_ratio
 
         if risk_ratio > 0.3:
             risk_desc = "혁신가"
@@ -2351,25 +2982,15 @@ class KOICAGame:
         # 두 번째 문단: 리더십 스타일과 주요 결정
         para2 = f"소장님은 {' · '.join(leadership_style)} 리더십을 발휘하며 사무소를 이끌었습니다. "
 
-        # 주요 결정들 언급 (최근 5-8개)
-        recent_choices = stats.choice_history[-8:] if len(stats.choice_history) > 8 else stats.choice_history
-
-        if recent_choices:
-            # 중요한 결정들을 선별 (큰 스탯 변화를 일으킨 것들)
-            significant_choices = []
-            for choice in recent_choices:
-                if 'result' in choice and 'stats' in choice['result']:
-                    stat_changes = choice['result']['stats']
-                    total_change = sum(abs(v) for v in stat_changes.values())
-                    if total_change > 15:  # 큰 변화
-                        significant_choices.append(choice)
+        # 주요 결정들 언급 (최근 8개 중 큰 스탯 변화를 일으킨 것들)
+        if analytics.recent:
+            significant_choices = analytics.significant_recent_choices(threshold=15)
 
             if significant_choices:
                 para2 += f"{risk_desc}로서, "
 
                 # 첫 번째 중요한 결정 언급
-                first_choice = significant_choices[0]
-                choice_text = first_choice.get('choice_text', '중요한 결정')
+                choice_text = significant_choices[0][0] or '중요한 결정'
                 # 선택 텍스트에서 핵심만 추출 (너무 길면 생략)
                 if len(choice_text) > 40:
                     choice_text = choice_text[:37] + "..."
@@ -2379,9 +3000,7 @@ class KOICAGame:
                     para2 += "여러 중요한 순간마다 "
 
                     # 결정의 성향 분석
-                    positive_outcomes = sum(1 for c in significant_choices
-                                           if 'result' in c and 'stats' in c['result']
-                                           and sum(c['result']['stats'].values()) > 0)
+                    positive_outcomes = sum(1 for _, _, net_change in significant_choices if net_change > 0)
 
                     if positive_outcomes >= len(significant_choices) * 0.7:
                         para2 += "효과적인 선택을 이어갔습니다. "
@@ -2427,6 +3046,7 @@ class KOICAGame:
 
         # 네 번째 문단: 유산과 미래
         para4 = "이제 소장님의 2년 여정이 막을 내리지만, "
+        total_score = stats.final_score()
 
         if total_score >= 70:
             para4 += "소장님이 남긴 유산은 오랫동안 빛을 발할 것입니다. "
@@ -2454,25 +3074,21 @@ class KOICAGame:
         return "\n\n".join(paragraphs)
 
     def play(self):
-        """게임 플레이 메인 루프 (AI 기능 통합)"""
+        """게임 플레이 메인 루프 (AI 기능 통합, 상태 전이는 전이 엔진 step이 처리)"""
         self.display_intro()
         self.initial_lifestyle_setup()
 
         while not self.state.game_over:
-            scenario = self.display_scenario(self.state.current_scenario)
+            scenario_id = self.state.current_scenario
+            scenario = self.display_scenario(scenario_id)
 
             if not scenario:
                 break
 
-            self.state.visited_scenarios.append(self.state.current_scenario)
-
             if 'choices' not in scenario:
                 # 엔딩 시나리오
-                if not self.demo_mode:
-                    input("\nEnter를 눌러 계속...")
-                else:
-                    time.sleep(2)
-                self.state.game_over = True
+                self._pause("\nEnter를 눌러 계속...", 2)
+                self.state, _ = step(self.state, scenario_id, 0, self.rng, self.graph, scenario)
                 break
 
             # 선택 받기
@@ -2481,174 +3097,57 @@ class KOICAGame:
             # 자유 입력 모드 처리
             if choice_index == -1:
                 free_form_result = self.handle_free_form_input()
-                if free_form_result:
-                    # 자유 입력 선택 기록
-                    self.state.record_choice(
-                        self.state.current_scenario,
-                        free_form_result.get('custom_action', '자유 입력'),
-                        -1,
-                        free_form_result
-                    )
-                    self.apply_choice_result(free_form_result)
-
-                    if self.state.check_game_over():
-                        break
-
-                    if 'next' in free_form_result:
-                        self.state.current_scenario = free_form_result['next']
-                    else:
-                        self.state.current_scenario = 'ai_generated'
-                else:
+                if not free_form_result:
                     # 자유 입력 취소시 다시 선택
                     continue
-            else:
-                # 일반 선택 처리
-                selected_choice = scenario['choices'][choice_index]
-
-                # 게임 오버를 초래할 수 있는 선택인지 확인
-                if 'stats' in selected_choice['result']:
-                    if self.state.will_cause_game_over(selected_choice['result']['stats']):
-                        # 확인 프롬프트 표시
-                        print("\n" + "="*60)
-                        print("⚠️  경고: 위험한 선택")
-                        print("="*60)
-                        print("이 선택은 즉각적인 게임 종료를 초래할 수 있습니다!")
-
-                        # 예상되는 스탯 변화 표시
-                        changes = selected_choice['result']['stats']
-                        print("\n예상 스탯 변화:")
-                        if 'reputation' in changes and changes['reputation'] < 0:
-                            new_rep = max(0, self.state.reputation + changes['reputation'])
-                            print(f"  평판: {self.state.reputation} → {new_rep}")
-                        if 'staff_morale' in changes and changes['staff_morale'] < 0:
-                            new_morale = max(0, self.state.staff_morale + changes['staff_morale'])
-                            print(f"  직원 만족도: {self.state.staff_morale} → {new_morale}")
-
-                        print("\n정말로 이 선택을 진행하시겠습니까?")
-                        print("="*60)
-
-                        if not self.demo_mode:
-                            confirm = input("\n진행하려면 'yes' 입력, 다시 선택하려면 Enter: ").strip().lower()
-                            if confirm != 'yes':
-                                print("\n선택을 취소했습니다. 다시 선택하세요.")
-                                continue
-                        else:
-                            print("\n🤖 [데모 모드] 위험한 선택이지만 계속 진행합니다...")
-                            time.sleep(2)
-
-                # 선택 기록
-                self.state.record_choice(
-                    self.state.current_scenario,
-                    selected_choice['text'],
-                    choice_index,
-                    selected_choice['result']
-                )
-
-                self.apply_choice_result(selected_choice['result'])
-
-                if self.state.check_game_over():
-                    break
-
-                # 생활 이벤트 체크 (advance_time이 true인 경우에만)
-                if selected_choice['result'].get('advance_time', False):
-                    life_event_id = self.check_and_trigger_life_event()
-                    if life_event_id:
-                        # 생활 이벤트 발생
-                        life_event_scenario = self.display_scenario(life_event_id)
-                        if life_event_scenario and 'choices' in life_event_scenario:
-                            print("\n" + "="*60)
-                            print("🏠 생활 이벤트가 발생했습니다!")
-                            print("="*60)
-                            if not self.demo_mode:
-                                input("\nEnter를 눌러 계속...")
-                            else:
-                                time.sleep(1)
-
-                            # 생활 이벤트 선택 처리
-                            life_choice_index = self.display_choices(life_event_scenario['choices'])
-                            if life_choice_index >= 0:
-                                life_selected = life_event_scenario['choices'][life_choice_index]
-                                self.state.record_choice(life_event_id, life_selected['text'], life_choice_index, life_selected['result'])
-                                self.apply_choice_result(life_selected['result'])
-
-                                if self.state.check_game_over():
-                                    break
-
-                    # 고급 기능: 부소장 임계값 이벤트 체크
-                    deputy_event_id = self.check_deputy_threshold_events()
-                    if deputy_event_id:
-                        self.state.triggered_deputy_events.add(deputy_event_id)
-                        deputy_event_scenario = self.display_scenario(deputy_event_id)
-                        if deputy_event_scenario and 'choices' in deputy_event_scenario:
-                            print("\n" + "="*60)
-                            print("👥 부소장 관련 특별 이벤트가 발생했습니다!")
-                            print("="*60)
-                            if not self.demo_mode:
-                                input("\nEnter를 눌러 계속...")
-                            else:
-                                time.sleep(1)
-
-                            # 부소장 이벤트 선택 처리
-                            deputy_choice_index = self.display_choices(deputy_event_scenario['choices'])
-                            if deputy_choice_index >= 0:
-                                deputy_selected = deputy_event_scenario['choices'][deputy_choice_index]
-                                self.state.record_choice(deputy_event_id, deputy_selected['text'], deputy_choice_index, deputy_selected['result'])
-                                self.apply_choice_result(deputy_selected['result'])
-
-                                if self.state.check_game_over():
-                                    break
-
-                    # 고급 기능: 장기 영향(delayed effects) 체크
-                    triggered_effects = self.check_delayed_effects()
-                    for effect in triggered_effects:
-                        print("\n" + "="*60)
-                        print("⏰ 과거 선택의 장기 영향이 나타났습니다!")
-                        print("="*60)
-                        print(f"\n💬 {effect.get('message', '과거의 선택이 영향을 미치고 있습니다.')}")
-                        if 'stats' in effect:
-                            self.state.update_stats(effect['stats'])
-                        if not self.demo_mode:
-                            input("\nEnter를 눌러 계속...")
-                        else:
-                            time.sleep(1.5)
-
-                    # 고급 기능: 고급 엔딩 조건 체크
-                    advanced_ending = self.check_advanced_endings()
-                    if advanced_ending:
-                        self.state.game_over = True
-                        self.state.ending = advanced_ending
-                        break
-
-                if 'next' in selected_choice['result']:
-                    next_scenario = selected_choice['result']['next']
-
-                    # 'continue_main_scenario'는 현재 period의 메인 시나리오로 이동
-                    if next_scenario == 'continue_main_scenario':
-                        period_number = (self.state.year - 1) * 6 + self.state.period
-                        if period_number == 1:
-                            next_scenario = 'start'
-                        elif period_number <= 12:
-                            next_scenario = f'period_{period_number}'
-                        else:
-                            # 게임이 끝났으면 엔딩으로
-                            self.state.game_over = True
-                            break
-
-                    self.state.current_scenario = next_scenario
-                else:
-                    # 'next'가 없으면 현재 period의 메인 시나리오로 이동
-                    period_number = (self.state.year - 1) * 6 + self.state.period
-                    if period_number == 1:
-                        self.state.current_scenario = 'start'
-                    elif period_number <= 12:
-                        self.state.current_scenario = f'period_{period_number}'
+                self.state, events = step_free_form(self.state, scenario_id, free_form_result['custom_action'],
+                                                    free_form_result, self.rng, self.graph)
+                self.display_choice_result(free_form_result)
+                self.display_events(events)
+                continue
+
+            # 일반 선택 처리
+            selected_choice = scenario['choices'][choice_index]
+
+            # 게임 오버를 초래할 수 있는 선택인지 확인
+            if 'stats' in selected_choice['result']:
+                if self.state.will_cause_game_over(selected_choice['result']['stats']):
+                    # 확인 프롬프트 표시
+                    print("\n" + "="*60)
+                    print("⚠️  경고: 위험한 선택")
+                    print("="*60)
+                    print("이 선택은 즉각적인 게임 종료를 초래할 수 있습니다!")
+
+                    # 예상되는 스탯 변화 표시
+                    changes = selected_choice['result']['stats']
+                    print("\n예상 스탯 변화:")
+                    if 'reputation' in changes and changes['reputation'] < 0:
+                        new_rep = max(0, self.state.reputation + changes['reputation'])
+                        print(f"  평판: {self.state.reputation} → {new_rep}")
+                    if 'staff_morale' in changes and changes['staff_morale'] < 0:
+                        new_morale = max(0, self.state.staff_morale + changes['staff_morale'])
+                        print(f"  직원 만족도: {self.state.staff_morale} → {new_morale}")
+
+                    print("\n정말로 이 선택을 진행하시겠습니까?")
+                    print("="*60)
+
+                    if not self.demo_mode:
+                        confirm = input("\n진행하려면 'yes' 입력, 다시 선택하려면 Enter: ").strip().lower()
+                        if confirm != 'yes':
+                            print("\n선택을 취소했습니다. 다시 선택하세요.")
+                            continue
                     else:
-                        # 게임이 끝났으면 엔딩으로
-                        self.state.game_over = True
-                        break
+                        print("\n🤖 [데모 모드] 위험한 선택이지만 계속 진행합니다...")
+                        time.sleep(2)
 
-        self.display_ending()
+            # 선택 적용 -> 생활/부소장 이벤트, 장기 영향, 고급 엔딩 -> 다음 시나리오
+            self.state, events = step(self.state, scenario_id, choice_index, self.rng, self.graph, scenario)
+            self.display_choice_result(selected_choice['result'])
+            self.display_events(events)
 
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+        self.display_ending()
 
 def main():
     """메인 함수 - 게임 모드 선택"""
@@ -2666,8 +3165,15 @@ def main():
                        help='데모 모드 (자동 플레이)')
     parser.add_argument('--speed', type=float, default=1.5,
                        help='데모 모드 속도 (초 단위, 기본: 1.5초)')
+    parser.add_argument('--ai-cache-policy', choices=HIT_POLICIES, default='use',
+                       help='AI 생성 캐시 정책 (use: 재사용, refresh: 항상 새로 생성, offline: 캐시만 사용, 기본: use)')
+    parser.add_argument('--ai-cache-path', default=DEFAULT_CACHE_PATH,
+                       help=f'AI 생성 캐시 파일 (기본: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--ai-batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help=f'AI 호출 한 번에 생성할 시기 수 (1이면 시기마다 생성, 최대 {MAX_BATCH_SIZE}, 기본: {DEFAULT_BATCH_SIZE})')
 
     args = parser.parse_args()
+    generation_cache = GenerationCache(path=args.ai_cache_path, hit_policy=args.ai_cache_policy)
 
     # 데모 모드
     if args.demo:
@@ -2695,9 +3201,9 @@ def main():
     if mode_choice == "2":
         # AI 모드
         if not GEMINI_AVAILABLE:
-            print("\n⚠️  오류: google-generativeai 패키지가 설치되지 않았습니다.")
+            print("\n⚠️  오류: google-genai 패키지가 설치되지 않았습니다.")
             print("AI 모드를 사용하려면 다음 명령어를 실행하세요:")
-            print("pip install google-generativeai")
+            print("pip install google-genai")
             print("\n클래식 모드로 시작합니다...")
             input("\nEnter를 눌러 계속...")
             game = KOICAGame(ai_mode=False)
@@ -2720,11 +3226,13 @@ def main():
                     print("\n✅ 환경변수에서 API 키를 불러왔습니다.")
                     print("🤖 AI 모드로 시작합니다!\n")
                     input("Enter를 눌러 계속...")
-                    game = KOICAGame(ai_mode=True, api_key=api_key)
+                    game = KOICAGame(ai_mode=True, api_key=api_key, generation_cache=generation_cache,
+                                     ai_batch_size=args.ai_batch_size)
             else:
                 print("\n🤖 AI 모드로 시작합니다!\n")
                 input("Enter를 눌러 계속...")
-                game = KOICAGame(ai_mode=True, api_key=api_key_input)
+                game = KOICAGame(ai_mode=True, api_key=api_key_input, generation_cache=generation_cache,
+                                 ai_batch_size=args.ai_batch_size)
     else:
         # 클래식 모드
         game = KOICAGame(ai_mode=False)
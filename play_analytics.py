@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+플레이 스타일 누적 분석
+record_choice에서 선택마다 집계를 갱신하여, 엔딩 화면과 소장 유형 판정이
+선택 히스토리를 다시 훑지 않고 상수 시간에 값을 읽도록 합니다.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+
+
+# 주요 관심사 (player_style 키, 표시 이름) - 동점이면 이 순서를 따름
+FOCUS_AREAS = (
+    ('reputation_focused', '평판'),
+    ('budget_focused', '예산'),
+    ('staff_focused', '직원'),
+    ('project_focused', '프로젝트'),
+)
+
+# 선택지 효과 통계를 추적하는 스탯
+TRACKED_STATS = ('reputation', 'budget', 'staff_morale', 'project_success', 'stress', 'wellbeing')
+
+# 엔딩 설명에서 돌아보는 최근 선택 수
+RECENT_CHOICES = 8
+
+# 시나리오 ID 접두어 -> 분류 (먼저 일치하는 항목 사용)
+_CATEGORY_PREFIXES = (
+    ('period_', 'main'),
+    ('life_event_', 'life_event'),
+    ('narrative_event_', 'narrative_event'),
+    ('deputy_', 'deputy_event'),
+    ('year1_', 'yearly_event'),
+    ('year2_', 'yearly_event'),
+)
+
+
+def scenario_category(scenario_id: Optional[str]) -> str:
+    """시나리오 ID의 분류 (main, life_event, deputy_event, ai, other 등)"""
+    if scenario_id == 'start':
+        return 'main'
+    if scenario_id == 'ai_generated':
+        return 'ai'
+    if scenario_id:
+        for prefix, category in _CATEGORY_PREFIXES:
+            if scenario_id.startswith(prefix):
+                return category
+    return 'other'
+
+
+def new_player_style() -> Dict[str, float]:
+    """빈 플레이어 스타일 집계"""
+    return {
+        "reputation_focused": 0,
+        "budget_focused": 0,
+        "staff_focused": 0,
+        "project_focused": 0,
+        "risk_taking": 0,
+        "principle_oriented": 0
+    }
+
+
+class PlayStyleAnalytics:
+    """선택마다 갱신되는 플레이 스타일 누적 집계
+
+    style은 GameState.player_style로 노출되는 가중치 집계이고,
+    그 밖에 선택 수, 스탯별 변화량 합/제곱합, 시나리오 분류별 횟수,
+    최근 선택의 변화 크기를 함께 유지합니다.
+    """
+
+    __slots__ = ('style', 'total_choices', 'change_sums', 'change_squares', 'change_counts',
+                 'category_counts', 'recent')
+
+    def __init__(self):
+        self.style = new_player_style()
+        self.total_choices = 0
+        self.change_sums = dict.fromkeys(TRACKED_STATS, 0)
+        self.change_squares = dict.fromkeys(TRACKED_STATS, 0)
+        self.change_counts = dict.fromkeys(TRACKED_STATS, 0)
+        self.category_counts = {}
+        # 최근 선택: (선택 텍스트, 변화 크기 합 또는 None, 변화량 합)
+        self.recent = deque(maxlen=RECENT_CHOICES)
+
+    def copy(self) -> 'PlayStyleAnalytics':
+        """독립적인 복사본 생성"""
+        clone = PlayStyleAnalytics.__new__(PlayStyleAnalytics)
+        clone.style = self.style.copy()
+        clone.total_choices = self.total_choices
+        clone.change_sums = self.change_sums.copy()
+        clone.change_squares = self.change_squares.copy()
+        clone.change_counts = self.change_counts.copy()
+        clone.category_counts = self.category_counts.copy()
+        clone.recent = self.recent.copy()
+        return clone
+
+    def to_dict(self) -> Dict:
+        """JSON으로 직렬화할 수 있는 딕셔너리 (세션 저장용)"""
+        return {
+            'style': self.style,
+            'total_choices': self.total_choices,
+            'change_sums': self.change_sums,
+            'change_squares': self.change_squares,
+            'change_counts': self.change_counts,
+            'category_counts': self.category_counts,
+            'recent': [list(entry) for entry in self.recent],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlayStyleAnalytics':
+        """to_dict 결과로 집계 복원"""
+        analytics = cls.__new__(cls)
+        analytics.style = dict(data['style'])
+        analytics.total_choices = data['total_choices']
+        analytics.change_sums = dict(data['change_sums'])
+        analytics.change_squares = dict(data['change_squares'])
+        analytics.change_counts = dict(data['change_counts'])
+        analytics.category_counts = dict(data['category_counts'])
+        analytics.recent = deque((tuple(entry) for entry in data['recent']), maxlen=RECENT_CHOICES)
+        return analytics
+
+    def record(self, scenario_id: Optional[str], choice_text: str, result: Dict):
+        """선택 하나를 집계에 반영 (플레이어 스타일 가중치 포함)"""
+        self.total_choices += 1
+        category = scenario_category(scenario_id)
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        if 'stats' not in result:
+            self.recent.append((choice_text, None, 0))
+            return
+        stats = result['stats']
+        style = self.style
+
+        # 평판 중심: 큰 변화에 가중치 부여
+        if 'reputation' in stats:
+            rep_change = stats['reputation']
+            if abs(rep_change) >= 10:
+                # 큰 변화는 2배 가중치
+                style['reputation_focused'] += 2 if rep_change > 0 else 1
+            elif rep_change > 0:
+                style['reputation_focused'] += 1
+            elif rep_change <= -5:
+                # 큰 희생을 감수한 경우도 일부 반영 (다른 목표를 위한 tradeoff)
+                style['reputation_focused'] += 0.5
+
+        # 예산 중심: 예산 집행률 관리에 신경 쓰는 선택
+        if 'budget' in stats:
+            budget_change = stats['budget']
+            if abs(budget_change) >= 10:
+                style['budget_focused'] += 2 if budget_change > 0 else 1
+            elif budget_change != 0:
+                style['budget_focused'] += 1
+
+        # 직원 중심: 직원 만족도 증가 선택
+        if 'staff_morale' in stats:
+            morale_change = stats['staff_morale']
+            if abs(morale_change) >= 10:
+                style['staff_focused'] += 2 if morale_change > 0 else 1
+            elif morale_change > 0:
+                style['staff_focused'] += 1
+            elif morale_change <= -5:
+                style['staff_focused'] += 0.5
+
+        # 프로젝트 중심: 프로젝트 성공도 증가 선택
+        if 'project_success' in stats:
+            project_change = stats['project_success']
+            if abs(project_change) >= 10:
+                style['project_focused'] += 2 if project_change > 0 else 1
+            elif project_change > 0:
+                style['project_focused'] += 1
+            elif project_change <= -5:
+                style['project_focused'] += 0.5
+
+        # 위험 감수 성향 분석 (큰 변화를 선택하는 경우)
+        total_change = 0
+        net_change = 0
+        sums = self.change_sums
+        for stat, change in stats.items():
+            total_change += abs(change)
+            net_change += change
+            if stat in sums:
+                sums[stat] += change
+                self.change_squares[stat] += change * change
+                self.change_counts[stat] += 1
+        if total_change >= 30:
+            # 매우 큰 변화
+            style['risk_taking'] += 2
+        elif total_change >= 20:
+            # 큰 변화
+            style['risk_taking'] += 1
+
+        self.recent.append((choice_text, total_change, net_change))
+
+    @property
+    def risk_ratio(self) -> float:
+        """선택당 위험 감수 점수"""
+        if self.total_choices == 0:
+            return 0
+        return self.style['risk_taking'] / self.total_choices
+
+    @property
+    def max_focus(self) -> float:
+        """네 관심 영역 중 최고 점수"""
+        style = self.style
+        return max(style['reputation_focused'], style['budget_focused'],
+                   style['staff_focused'], style['project_focused'])
+
+    def top_focus_keys(self) -> List[str]:
+        """최고 점수를 받은 관심 영역 키 목록 (FOCUS_AREAS 순서)"""
+        max_focus = self.max_focus
+        return [key for key, _ in FOCUS_AREAS if self.style[key] == max_focus]
+
+    def top_concern(self, default: str = "사무소 운영") -> str:
+        """가장 중점을 둔 영역의 표시 이름 (모두 0이면 default)"""
+        if self.max_focus <= 0:
+            return default
+        first_key = self.top_focus_keys()[0]
+        return dict(FOCUS_AREAS)[first_key]
+
+    def change_mean(self, stat: str) -> float:
+        """스탯 변화가 있었던 선택들의 평균 변화량"""
+        count = self.change_counts.get(stat, 0)
+        return self.change_sums[stat] / count if count else 0
+
+    def change_variance(self, stat: str) -> float:
+        """스탯 변화가 있었던 선택들의 변화량 분산 (모분산)"""
+        count = self.change_counts.get(stat, 0)
+        if not count:
+            return 0
+        mean = self.change_sums[stat] / count
+        return max(0, self.change_squares[stat] / count - mean * mean)
+
+    def significant_recent_choices(self, threshold: int = 15) -> List[tuple]:
+        """최근 선택 중 변화 크기 합이 threshold를 넘는 (텍스트, 크기, 변화량 합) 목록"""
+        return [entry for entry in self.recent if entry[1] is not None and entry[1] > threshold]
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 절차적 시나리오 생성기
+AI 모드 테마(키워드/설명)와 scenarios.json의 선택지 스탯 변화 패턴을 조합하여, 네트워크 없이
+수 마이크로초 안에 AI 시나리오와 같은 형식의 유효한 시나리오를 만듭니다. 같은 상황에는 항상 같은
+시나리오를 내므로 API 장애 시의 폴백이나 부하 테스트의 대역으로 쓸 수 있습니다.
+
+사용법:
+    python3 procedural_scenarios.py --count 3           # 무작위 상황의 시나리오 예시 출력
+"""
+
+import argparse
+import json
+import random
+from typing import Dict, List, Optional, Tuple
+
+from ai_schema import STAT_LIMITS, validate_scenario
+from scenario_graph import load_scenario_graph
+
+
+# 약점 판정 규칙: (GameState 속성, 기준 비교, 기준값, 개선할 스탯 변화 키, 개선 방향, 설명)
+WEAKNESS_RULES = (
+    ('reputation', '<', 50, 'reputation', 1, "평판 저하 (외부 신뢰 회복 필요)"),
+    ('budget_execution_rate', '<', 60, 'budget', 1, "예산 집행률 저조 (80% 이상 목표)"),
+    ('budget_execution_rate', '>', 95, 'budget', -1, "예산 과다 집행 위험 (통제 필요)"),
+    ('staff_morale', '<', 50, 'staff_morale', 1, "직원 사기 저하 (내부 화합 필요)"),
+    ('project_success', '<', 50, 'project_success', 1, "프로젝트 성과 부진 (성과 개선 필요)"),
+    ('stress', '>', 70, 'stress', -1, "높은 스트레스 (개인 건강 관리 필요)"),
+    ('wellbeing', '<', 40, 'wellbeing', 1, "낮은 웰빙 (휴식과 회복 필요)"),
+)
+
+# 세목별 예산 변화는 AI 시나리오 형식의 'budget' 하나로 합침
+_BUDGET_KEYS = ('budget', 'budget_personnel', 'budget_project', 'budget_operation',
+                'budget_인건비', 'budget_사업비', 'budget_운영비')
+
+# 패턴 값에 더하는 변동 폭 (같은 패턴이라도 조금씩 다른 결과)
+JITTER = 2
+
+# 선택지 접근 방식: (역할, 선택지 문장, 결과 도입 문장) - {keyword}에 테마 키워드를 넣음
+APPROACHES = (
+    ('direct', "{keyword} 문제를 소장이 직접 챙기며 정면으로 대응한다",
+     "소장이 직접 나서자 {keyword} 문제가 빠르게 수면 위로 올라왔습니다."),
+    ('collaborative', "부소장, 현지 파트너와 협의체를 꾸려 {keyword} 문제를 함께 푼다",
+     "관계자들이 한자리에 모여 {keyword} 문제에 대한 해법을 조율했습니다."),
+    ('cautious', "{keyword} 관련 정보를 더 모으며 신중하게 상황을 지켜본다",
+     "섣불리 움직이지 않고 {keyword} 관련 상황을 면밀히 살폈습니다."),
+    ('bold', "본부 승인을 기다리지 않고 {keyword}에 과감한 조치를 취한다",
+     "과감한 결정으로 {keyword} 상황이 크게 움직이기 시작했습니다."),
+)
+
+# 스탯 변화의 결과 문장: 스탯 -> (좋아졌을 때, 나빠졌을 때)
+_STAT_PHRASES = {
+    'reputation': ("대외 신뢰가 높아졌습니다", "대외 평판이 흔들렸습니다"),
+    'budget': ("예산 집행에 속도가 붙었습니다", "예산 집행이 지연되었습니다"),
+    'staff_morale': ("직원들의 사기가 올랐습니다", "직원들 사이에 불만이 생겼습니다"),
+    'project_success': ("사업 성과가 눈에 띄게 개선되었습니다", "사업 일정에 차질이 생겼습니다"),
+    'stress': ("마음의 부담이 한결 줄었습니다", "소장의 스트레스가 늘었습니다"),
+    'wellbeing': ("몸과 마음에 여유가 생겼습니다", "개인 생활을 돌볼 여유가 줄었습니다"),
+}
+
+# 스트레스는 줄어드는 것이 좋은 방향
+_LOWER_IS_BETTER = ('stress',)
+
+
+def _matches(value, comparison: str, threshold) -> bool:
+    return value < threshold if comparison == '<' else value > threshold
+
+
+def identify_weaknesses(game_state) -> List[Tuple[str, int, str]]:
+    """게임 상태의 약점 목록 [(개선할 스탯 변화 키, 개선 방향, 설명)] (WEAKNESS_RULES 순서)"""
+    return [(stat, direction, label)
+            for attr, comparison, threshold, stat, direction, label in WEAKNESS_RULES
+            if _matches(getattr(game_state, attr), comparison, threshold)]
+
+
+def extract_stat_patterns(scenario_map: Dict) -> List[Dict[str, int]]:
+    """시나리오들의 선택지 스탯 변화를 AI 시나리오 스탯 키 기준 패턴 목록으로 추출 (중복 제거)"""
+    patterns = []
+    seen = set()
+    for scenario in scenario_map.values():
+        for choice in scenario.get('choices', ()):
+            stats = choice.get('result', {}).get('stats')
+            if not stats:
+                continue
+            pattern = {}
+            budget = sum(stats.get(key, 0) for key in _BUDGET_KEYS)
+            for stat in STAT_LIMITS:
+                value = budget if stat == 'budget' else stats.get(stat, 0)
+                if value:
+                    pattern[stat] = value
+            signature = tuple(sorted(pattern.items()))
+            if pattern and signature not in seen:
+                seen.add(signature)
+                patterns.append(pattern)
+    return patterns
+
+
+def _benefit(pattern: Dict[str, int], stat: str, direction: int) -> int:
+    """패턴이 해당 스탯을 개선 방향으로 움직이는 정도"""
+    return pattern.get(stat, 0) * direction
+
+
+class ProceduralScenarioGenerator:
+    """테마 + 스탯 변화 패턴 조합으로 AI 형식 시나리오를 만드는 결정적 로컬 생성기
+
+    패턴은 생성 시점에 한 번 스탯/방향별로 정렬해 두므로, generate는 정렬된 목록의 앞부분에서
+    고르기만 합니다. 여러 게임/세션이 공유하는 읽기 전용 객체입니다.
+    """
+
+    __slots__ = ('patterns', '_by_benefit', '_calm', '_risky')
+
+    # 역할별로 고를 후보 수 (정렬된 목록 앞에서)
+    CANDIDATES = 8
+
+    def __init__(self, patterns: List[Dict[str, int]]):
+        if not patterns:
+            raise ValueError("스탯 변화 패턴이 하나 이상 필요합니다")
+        self.patterns = patterns
+        # (스탯, 방향) -> 그 방향의 개선 폭이 큰 순서
+        self._by_benefit = {
+            (stat, direction): sorted((p for p in patterns if _benefit(p, stat, direction) > 0),
+                                      key=lambda p: -_benefit(p, stat, direction))
+            for stat in STAT_LIMITS for direction in (1, -1)
+        }
+        # 변화 폭이 작은 패턴 / 이득과 손실이 함께 큰 패턴
+        self._calm = sorted(patterns, key=lambda p: sum(abs(v) for v in p.values()))
+        self._risky = sorted((p for p in patterns if min(p.values()) < 0 < max(p.values())),
+                             key=lambda p: -(max(p.values()) - min(p.values()))) or self._calm[::-1]
+
+    def generate(self, theme: Dict, game_state, season: str = '',
+                 rng: Optional[random.Random] = None) -> Dict:
+        """테마와 게임 상태에 맞는 시나리오 생성 (validate_scenario를 통과한 형식)
+
+        선택지 4개 중 앞의 둘은 가장 시급한 약점을 개선하는 방향의 패턴을 쓰고, 나머지는
+        신중한 선택(작은 변화)과 위험을 감수하는 선택(큰 득실)입니다.
+        rng를 주지 않으면 테마/시기/약점/진행 정도로 정해지는 시드를 사용합니다.
+        """
+        weaknesses = identify_weaknesses(game_state)
+        if rng is None:
+            rng = random.Random('|'.join((
+                theme['name'], str(game_state.year), str(game_state.period),
+                ','.join(label for _, _, label in weaknesses), str(len(game_state.choice_history)))))
+
+        keyword = rng.choice(theme['keywords'])
+        targets = [(stat, direction) for stat, direction, _ in weaknesses]
+        if not targets:
+            # 약점이 없으면 무작위 스탯 두 개를 개선하는 선택지로 균형 유지
+            targets = [(stat, -1 if stat in _LOWER_IS_BETTER else 1)
+                       for stat in rng.sample(sorted(STAT_LIMITS), 2)]
+
+        candidates = (
+            self._by_benefit[targets[0]] or self.patterns,
+            self._by_benefit[targets[1 % len(targets)]] or self.patterns,
+            self._calm,
+            self._risky,
+        )
+        choices = []
+        used = set()
+        for (role, text, intro), pool in zip(APPROACHES, candidates):
+            pattern = self._pick(pool, used, rng)
+            stats = {stat: value + rng.randint(-JITTER, JITTER) for stat, value in pattern.items()}
+            choices.append({
+                'text': text.format(keyword=keyword),
+                'result': {'message': self._message(intro.format(keyword=keyword), stats), 'stats': stats}
+            })
+        rng.shuffle(choices)
+
+        description = f"{theme['description']} 상황입니다. 최근 '{keyword}' 문제가 사무소의 현안으로 떠올랐습니다."
+        if season:
+            description = f"{season}. {description}"
+        if weaknesses:
+            description += f"\n\n현재 사무소의 가장 큰 약점: {weaknesses[0][2]}"
+
+        return validate_scenario({
+            'title': f"{theme['name']}: {keyword}",
+            'description': description,
+            'choices': choices
+        })
+
+    def _pick(self, pool: List[Dict[str, int]], used: set, rng: random.Random) -> Dict[str, int]:
+        """후보 앞부분에서 이번 시나리오에 아직 쓰지 않은 패턴 하나 선택"""
+        candidates = [p for p in pool[:self.CANDIDATES] if id(p) not in used] or pool[:self.CANDIDATES]
+        pattern = rng.choice(candidates)
+        used.add(id(pattern))
+        return pattern
+
+    @staticmethod
+    def _message(intro: str, stats: Dict[str, int]) -> str:
+        """가장 크게 변한 스탯 두 개를 결과 문장으로 설명"""
+        largest = sorted(stats.items(), key=lambda item: -abs(item[1]))[:2]
+        sentences = [intro]
+        for stat, value in largest:
+            if value == 0:
+                continue
+            improved = (value < 0) if stat in _LOWER_IS_BETTER else (value > 0)
+            sentences.append(_STAT_PHRASES[stat][0 if improved else 1] + ".")
+        return ' '.join(sentences)
+
+
+# 프로세스 내 메모: 시나리오 그래프 -> 생성기
+_default_generator: Optional[Tuple[object, ProceduralScenarioGenerator]] = None
+
+
+def default_procedural_generator(path: str = 'scenarios.json') -> ProceduralScenarioGenerator:
+    """scenarios.json의 패턴으로 만든 공용 생성기 (시나리오 파일이 바뀌면 다시 만듦)"""
+    global _default_generator
+    graph = load_scenario_graph(path)
+    if _default_generator is None or _default_generator[0] is not graph:
+        _default_generator = (graph, ProceduralScenarioGenerator(extract_stat_patterns(graph.scenario_map)))
+    return _default_generator[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 절차적 시나리오 생성 예시')
+    parser.add_argument('--count', type=int, default=1, help='출력할 시나리오 수 (기본: 1)')
+    parser.add_argument('--seed', type=int, default=None, help='상황을 고르는 난수 시드')
+    args = parser.parse_args()
+
+    from koica_game import GameState, GeminiIntegration
+
+    rng = random.Random(args.seed)
+    gemini = GeminiIntegration()
+    generator = default_procedural_generator()
+    for _ in range(args.count):
+        state = GameState()
+        state.period = rng.randint(1, 6)
+        state.reputation = rng.randint(30, 70)
+        state.staff_morale = rng.randint(30, 70)
+        state.stress = rng.randint(20, 90)
+        theme = rng.choice(gemini.scenario_themes)
+        season = gemini._get_season_context(state.period)
+        print(json.dumps(generator.generate(theme, state, season), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 프롬프트 템플릿
+프롬프트를 호출마다 바뀌지 않는 앞부분(게임 배경, 조직/예산 규칙, 요구사항, 응답 형식)과
+게임 상태에 따라 바뀌는 뒷부분으로 나눕니다. 앞부분은 프로세스당 한 번만 만들어 모든 게임이
+공유하고(API가 지원하면 컨텍스트 캐시로 등록되어 호출마다 뒷부분만 전송), 호출마다 프롬프트
+크기를 기록합니다.
+"""
+
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional
+
+
+# 시나리오 하나의 JSON 형식
+SCENARIO_JSON_SCHEMA = """{
+  "title": "시나리오 제목",
+  "description": "상황 설명 (3-5문장)",
+  "choices": [
+    {
+      "text": "선택지 텍스트",
+      "result": {
+        "message": "결과 설명",
+        "stats": {
+          "reputation": 변화값 (-30~30),
+          "budget": 변화값 (-40~40),
+          "staff_morale": 변화값 (-30~30),
+          "project_success": 변화값 (-30~30)
+        }
+      }
+    }
+  ]
+}"""
+
+# 시나리오 생성 프롬프트의 고정 앞부분 (단일/일괄 생성 공통 - 단일 생성은 1개짜리 일괄 생성)
+SCENARIO_PROMPT_PREFIX = """
+당신은 KOICA 해외사무소장 시뮬레이터 게임의 시나리오 작가입니다.
+플레이어는 KOICA 48개국 해외사무소 중 한 곳의 사무소장으로서 15년 이상 경력의 전문가입니다.
+
+## 조직 구성 (약 37명)
+- 소장: 1명 (플레이어), 부소장: 2명, 코디네이터: 2명
+- YP(영프로페셔널): 7명 (19-34세), 현지 직원: 17명 (4개 섹터)
+
+## KOICA 예산 구조 (중요!)
+**본부 (HQ)**:
+- 외교부 등으로부터 전체 예산을 확보
+- 사업 계획과 전략에 따라 각 국가별, 사업별로 예산을 편성하고 배정
+- 전체적인 '예산집행지침' 마련 및 예산 이월 등 중요 변경사항 최종 승인
+
+**해외사무소 (Offices)**:
+- 본부로부터 사업별로 배정받은 예산을 집행하는 역할
+- 실제 사업 현장에서 돈을 지출하고 정산하는 실무 담당
+- **중요: 해외사무소는 배정받은 예산을 다른 사업으로 재배분할 권한 없음**
+- **중요: 해외사무소는 자체적으로 예산을 늘릴 수 없음**
+
+**따라서 시나리오 작성시 주의사항**:
+- 본부가 신규 사업 추진을 요청할 때는 반드시 예산 추가 배정과 함께 와야 함
+- "해외사무소가 예산을 추가로 헌신"하라는 요구는 구조적으로 불가능 (비현실적)
+- 현지 사무소는 A 사업 예산을 B 사업으로 옮기는 재배분 권한 없음
+- 추가 예산이 필요한 경우 본부에 요청하는 것이 정상적이고 자연스러운 절차
+- 사무소장의 예산 관련 딜레마는 "배정받은 예산을 효율적으로 집행"이거나 "본부에 추가 예산 요청 여부"여야 함
+
+## 사무소장의 6대 핵심 역할
+1. **사업 발굴 및 형성**: 현지 수요조사, 국별협력전략(CPS) 수립, PCP 접수/검토
+2. **사업 이행 및 관리**: 프로젝트 총괄, 착수/추진계획, 현장 모니터링, 평가/사후관리
+3. **연수사업 지원**: 연수생 선발 추천, 비자 발급, 출국 지원, 귀국 후 평가
+4. **해외봉사단 지원**: 단원 적응 훈련, 비자/신분증 관리, 안전관리, 활동 모니터링
+5. **협력 네트워크**: 협력국 정부 정기 협의, 타 공여국(UN 등) 동향 파악, 민관합동 회의, NGO 간담회
+6. **본부-협력국 중간 연결**: 정책 전달, 현지 상황 보고, 실시간 피드백, 의사소통 가교
+
+## 사무소장의 직무 및 책임
+- 조직 총괄: 인력/자산/회계 관리, 리더십, 팀워크 형성
+- 사업 총괄: 최종 의사결정, 성과 및 예산 책임
+- 대외 협력: 협력국 정부 고위급 협의, 재외공관(대사관) 협력, 국제기구 조율
+- 위기관리: 파견 인력 안전 총괄, 긴급상황 대응
+- 전략적 의사결정: 국별 협력전략 수립, 우선순위 설정, 자원 배분
+- 소통 및 보고: 정기 본부 보고, 연례 해외사무소장 회의(48개국) 참석
+
+## 요구사항
+1. **반드시** 아래 '작성할 시나리오'에 지정된 시기와 테마를 중심으로 작성하세요 (여러 개면 목록 순서대로)
+2. 각 시나리오의 계절/시기를 자연스럽게 반영하고, 함께 작성하는 시나리오끼리도 서로 겹치지 않게 하세요
+3. **최근 방문한 시나리오와 절대 유사하지 않은**, 완전히 새롭고 독창적인 상황을 만드세요
+4. 아래 '현재 약점'을 고려하되, 너무 노골적이지 않게 반영하세요
+5. 4개의 선택지는 서로 **완전히 다른 접근법**을 제시해야 합니다:
+   - 적극적/소극적, 단기적/장기적, 내부/외부, 협력/독립 등 다양한 축으로 분산
+6. **중요: 선택지 텍스트(choice.text)는 최대 80자 이내로 간결하게 작성하세요**
+   - 핵심 행동만 명시하고, 상세한 설명은 생략하세요
+   - 예: "현지 파트너와 긴급 협의를 진행한다" (O)
+   - 예: "현지 파트너와 긴급 협의를 진행하여 문제의 원인을 파악하고 해결책을 모색한다" (X - 너무 김)
+7. 각 선택의 결과로 스탯 변화를 제안하세요 (reputation, budget, staff_morale, project_success)
+   - budget 값은 예산 집행률 변화를 의미 (양수=집행률 상승, 음수=집행률 하락)
+8. 결과 메시지(result.message)는 3-5문장으로 풍부하게 작성하세요:
+   - 선택한 행동이 어떻게 실행되었는지
+   - 이해관계자들(직원, 파트너, 본부 등)의 구체적인 반응
+   - 최종적으로 어떤 결과와 영향이 발생했는지
+   - 인과관계를 명확히 보여주세요
+9. **창의성**: 예측 가능한 뻔한 시나리오가 아닌, 흥미롭고 예상치 못한 전개를 만드세요
+
+## 응답 형식 (반드시 JSON 형식으로)
+{"scenarios": [작성할 시나리오 수만큼의 시나리오 객체]}
+
+각 시나리오 객체의 형식:
+""" + SCENARIO_JSON_SCHEMA + """
+
+중요: 순수 JSON만 반환하세요. 추가 설명이나 마크다운 코드 블록 없이.
+
+"""
+
+# 자유 입력 판정 프롬프트의 고정 앞부분
+FREE_FORM_PROMPT_PREFIX = """
+당신은 KOICA 해외사무소장 시뮬레이터 게임의 게임 마스터입니다.
+플레이어는 KOICA 48개국 해외사무소 중 한 곳의 사무소장으로서 약 37명(부소장 2명, 코디네이터 2명, YP 7명, 현지 직원 17명)을 총괄합니다.
+플레이어가 자유롭게 입력한 행동에 대해 결과를 판정하고 스탯 변화를 계산하세요.
+
+## KOICA 예산 구조 (중요!)
+**본부**: 전체 예산 확보 및 사업별로 각 해외사무소에 배정
+**해외사무소**: 본부로부터 사업별로 배정받은 예산을 집행하는 역할
+**중요**:
+- 해외사무소는 A 사업 예산을 B 사업으로 임의로 재배분할 권한 없음
+- 해외사무소는 자체적으로 예산을 늘릴 수 없음
+- **예산 증액 요청 또는 예산 전용(목적 변경) 요청은 본부 지역실에 하는 것이 정상적이고 당연한 절차임**
+- 요청한다고 해서 항상 승인되는 것은 아니며, 본부 지역실이 검토 후 결과를 사무소에 통보함
+- **요청 자체는 문제가 없고 오히려 적극적인 사업 관리의 일환임. 단, 승인 여부는 본부의 판단**
+
+## 사무소장의 6대 핵심 역할과 권한
+1. 사업 발굴 및 형성 (CPS 수립, PCP 검토)
+2. 사업 이행 및 관리 (프로젝트 총괄, 모니터링, 평가)
+3. 연수사업 지원 (연수생 선발, 출국 지원)
+4. 해외봉사단 지원 (안전 관리, 활동 모니터링)
+5. 협력 네트워크 구축 (정부/UN/NGO 협의, 재외공관 협력)
+6. 본부-협력국 중간 연결 (보고, 조율, 피드백)
+
+## 사무소장의 직무 권한
+- 조직 총괄: 약 37명 인력 관리, 자산/회계 책임
+- 최종 의사결정권자: 모든 사업의 승인 권한
+- 외교관 준하는 지위: 수원국 장관급 면담
+- 위기관리 총괄: 파견 인력 안전 최종 책임
+
+## 요구사항
+1. 플레이어의 행동을 최대한 수용하세요. 사무소장으로서 할 수 있는 다양한 창의적 시도를 긍정적으로 해석하세요
+2. 행동의 결과를 3-5문장으로 풍부하게 설명하세요:
+   - 첫 문장: 즉각적인 결과나 반응
+   - 중간 문장들: 구체적인 과정과 영향 (누가 어떻게 반응했는지, 어떤 변화가 일어났는지)
+   - 마지막 문장: 최종 결과와 조직/개인에 미친 영향
+3. 4가지 스탯에 미치는 영향을 계산하세요 (합리적인 범위 내에서)
+4. 창의적이고 전략적인 행동은 적극 보상하세요
+5. 극단적으로 비윤리적이거나 범죄적인 행동이 아닌 이상 success: true로 처리하세요
+6. 인과관계를 명확히: "이 행동으로 인해 → 이런 일이 발생 → 그 결과" 흐름을 자연스럽게 서술하세요
+
+## 응답 형식 (반드시 JSON 형식으로)
+{
+  "success": true/false,
+  "message": "결과 설명",
+  "stats": {
+    "reputation": 변화값,
+    "budget": 변화값,
+    "staff_morale": 변화값,
+    "project_success": 변화값
+  }
+}
+
+중요: 순수 JSON만 반환하세요.
+
+"""
+
+# 개인화 엔딩 프롬프트의 고정 앞부분
+ENDING_PROMPT_PREFIX = """
+당신은 KOICA 소장 시뮬레이터 게임의 엔딩 작가입니다.
+플레이어의 2년간의 여정을 분석하여 개인화된 엔딩 내러티브를 작성하세요.
+
+## 요구사항
+1. 플레이어의 선택과 성향을 반영한 맞춤형 엔딩을 작성하세요
+2. 3-5개의 문단으로 구성하세요
+3. 플레이어의 유산(legacy)과 장기적 영향을 설명하세요
+4. 감동적이고 의미있는 마무리를 제공하세요
+
+"""
+
+
+class PromptTemplate:
+    """고정 앞부분이 정해진 프롬프트 (앞부분의 크기와 해시는 만들 때 한 번 계산)"""
+
+    __slots__ = ('name', 'prefix', 'prefix_chars', 'prefix_bytes', 'digest')
+
+    def __init__(self, name: str, prefix: str):
+        self.name = name
+        self.prefix = prefix
+        self.prefix_chars = len(prefix)
+        self.prefix_bytes = len(prefix.encode('utf-8'))
+        self.digest = hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+
+
+class PromptBuilder:
+    """템플릿 앞부분 + 호출별 뒷부분으로 프롬프트를 만들고 호출마다 크기를 기록
+
+    여러 스레드(Streamlit 세션, 선행 생성 작업)에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, templates: Iterable[PromptTemplate]):
+        self.templates: Dict[str, PromptTemplate] = {template.name: template for template in templates}
+        self._lock = threading.Lock()
+        # 템플릿 이름 -> 호출 수, 뒷부분 크기 합계/최대/마지막 (문자 수)
+        self._stats: Dict[str, Dict[str, int]] = {
+            name: {'calls': 0, 'dynamic_chars': 0, 'max_dynamic_chars': 0, 'last_dynamic_chars': 0}
+            for name in self.templates
+        }
+
+    @property
+    def prefixes(self):
+        """등록된 모든 템플릿의 고정 앞부분 (컨텍스트 캐시 등록용)"""
+        return [template.prefix for template in self.templates.values()]
+
+    def render(self, name: str, dynamic: str) -> str:
+        """템플릿 앞부분 뒤에 dynamic을 붙인 프롬프트 반환 (크기 기록)"""
+        template = self.templates[name]
+        size = len(dynamic)
+        with self._lock:
+            stats = self._stats[name]
+            stats['calls'] += 1
+            stats['dynamic_chars'] += size
+            stats['last_dynamic_chars'] = size
+            stats['max_dynamic_chars'] = max(stats['max_dynamic_chars'], size)
+        return template.prefix + dynamic
+
+    def snapshot(self, name: Optional[str] = None) -> Dict:
+        """템플릿별 프롬프트 크기 요약 (고정 앞부분, 호출 수, 뒷부분 평균/최대/마지막 문자 수)"""
+        with self._lock:
+            summary = {}
+            for template_name, template in self.templates.items():
+                if name is not None and template_name != name:
+                    continue
+                stats = dict(self._stats[template_name])
+                calls = stats['calls']
+                stats['prefix_chars'] = template.prefix_chars
+                stats['prefix_bytes'] = template.prefix_bytes
+                stats['avg_dynamic_chars'] = stats['dynamic_chars'] / calls if calls else 0.0
+                summary[template_name] = stats
+            return summary[name] if name is not None else summary
+
+
+PROMPT_TEMPLATES = (
+    PromptTemplate('scenario', SCENARIO_PROMPT_PREFIX),
+    PromptTemplate('free_form', FREE_FORM_PROMPT_PREFIX),
+    PromptTemplate('ending', ENDING_PROMPT_PREFIX),
+)
+
+# 프로세스 공용 빌더 (모든 게임/세션이 같은 템플릿과 크기 통계를 공유)
+_default_builder: Optional[PromptBuilder] = None
+_default_builder_lock = threading.Lock()
+
+
+def default_prompt_builder() -> PromptBuilder:
+    """프로세스 공용 프롬프트 빌더 (처음 호출할 때 생성)"""
+    global _default_builder
+    with _default_builder_lock:
+        if _default_builder is None:
+            _default_builder = PromptBuilder(PROMPT_TEMPLATES)
+        return _default_builder
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 시나리오 일괄 생성 대기열
+한 번의 Gemini 호출로 이번 격월부터 앞으로 K개 격월의 시나리오를 함께 생성하고,
+이번 시나리오를 제외한 나머지를 게임(세션)별 대기열에 넣어 두었다가 해당 시기에 꺼내 씁니다.
+생성할 때 가정한 스탯과 실제 스탯의 차이가 크면 대기열을 버리고 다시 생성합니다.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from scenario_graph import MAIN_PERIODS
+
+
+# 한 번에 생성할 시나리오 수 (1이면 일괄 생성하지 않음, 환경변수 GEMINI_BATCH_SIZE로 변경)
+DEFAULT_BATCH_SIZE = int(os.environ.get('GEMINI_BATCH_SIZE', 3))
+MAX_BATCH_SIZE = 6
+
+# 생성 당시 스탯과 이 값보다 크게 달라진 스탯이 있으면 대기열의 시나리오를 쓰지 않음
+DRIFT_TOLERANCE = 20
+
+# 드리프트 판정에 쓰는 스탯 (프롬프트의 '현재 게임 상태'와 약점 판정에 쓰이는 값)
+DRIFT_STATS = ('reputation', 'budget_execution_rate', 'staff_morale', 'project_success', 'stress', 'wellbeing')
+
+
+def upcoming_periods(game_state, count: int) -> List[Tuple[int, int]]:
+    """현재 격월부터 최대 count개의 (년차, 격월 기간) 목록
+
+    임기 마지막 격월(period_12)은 AI 시나리오를 쓰지 않으므로 그 전까지만 포함합니다.
+    """
+    periods = []
+    year, period = game_state.year, game_state.period
+    while len(periods) < count and (year - 1) * 6 + period < MAIN_PERIODS:
+        periods.append((year, period))
+        period += 1
+        if period > 6:
+            year, period = year + 1, 1
+    return periods
+
+
+def stat_snapshot(game_state) -> Dict[str, int]:
+    """드리프트 판정용 스탯 스냅샷"""
+    return {stat: getattr(game_state, stat) for stat in DRIFT_STATS}
+
+
+def stat_drift(snapshot: Dict[str, int], game_state) -> int:
+    """스냅샷과 현재 상태 사이의 가장 큰 스탯 차이"""
+    return max(abs(getattr(game_state, stat) - value) for stat, value in snapshot.items())
+
+
+class ScenarioBatchQueue:
+    """게임 하나의 일괄 생성 시나리오 대기열 ((년차, 격월 기간) -> 항목)
+
+    항목: {'year', 'period', 'theme', 'stats'(생성 당시 스냅샷), 'scenario'}
+    선행 생성 스레드와 화면 스레드가 함께 사용하므로 잠금으로 보호합니다.
+    """
+
+    def __init__(self, drift_tolerance: int = DRIFT_TOLERANCE):
+        self.drift_tolerance = drift_tolerance
+        self._entries: Dict[Tuple[int, int], Dict] = {}
+        self._lock = threading.Lock()
+        # 관측용 카운터
+        self.served = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, entries: List[Dict]):
+        """일괄 생성 결과를 대기열에 추가 (같은 시기의 이전 항목은 교체)"""
+        with self._lock:
+            for entry in entries:
+                self._entries[(entry['year'], entry['period'])] = entry
+
+    def covers(self, year: int, period: int) -> bool:
+        """해당 시기의 시나리오가 대기열에 있는지 여부 (드리프트는 확인하지 않음)"""
+        with self._lock:
+            return (year, period) in self._entries
+
+    def take(self, game_state) -> Optional[Dict]:
+        """현재 시기에 맞는 시나리오 반환 (없거나 드리프트가 크면 None)
+
+        지난 시기의 항목은 버리고, 드리프트가 크면 남은 항목도 모두 버립니다
+        (뒤의 시나리오일수록 더 오래된 가정에 기반하므로).
+        """
+        current = (game_state.year, game_state.period)
+        with self._lock:
+            for key in [key for key in self._entries if key < current]:
+                del self._entries[key]
+                self.discarded += 1
+            entry = self._entries.pop(current, None)
+            if entry is None:
+                return None
+            if stat_drift(entry['stats'], game_state) > self.drift_tolerance:
+                self.discarded += 1 + len(self._entries)
+                self._entries.clear()
+                return None
+            self.served += 1
+            return entry['scenario']
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
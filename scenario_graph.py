@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시나리오 그래프 사전 컴파일
+scenarios.json의 중첩 딕셔너리를 로드 시점에 한 번 정수 ID와 평탄한 배열로 변환하여,
+매 스텝마다 문자열 키로 딕셔너리를 조회하지 않도록 합니다.
+컴파일된 그래프는 읽기 전용으로 취급하며 여러 게임/작업 프로세스가 공유합니다.
+
+컴파일 결과는 JSON 옆의 바이너리 번들(scenarios.json.cache)에 저장되며,
+원본의 크기/수정 시각이 같으면 해시 계산 없이, 다르면 내용 해시로 유효성을 확인합니다
+(내용이 같으면 헤더의 크기/수정 시각을 갱신하여 다음 프로세스는 다시 해시하지 않음).
+번들은 JSON 헤더와 원본 딕셔너리, 정수 배열 버퍼로만 구성되므로 (pickle을 쓰지 않음)
+번들 파일을 바꿔치기해도 코드가 실행되지 않습니다.
+
+번들은 컴파일 단계만 생략합니다. 원본 딕셔너리는 번들에서도 JSON으로 파싱하므로 새 프로세스의
+첫 로드는 파싱 + 컴파일의 절반 정도 시간이 걸리고, 같은 프로세스의 이후 로드는 메모로 바로 반환합니다.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# 선택지 스탯 변화 벡터의 필드 순서 (GameState.apply_stat_deltas의 적용 순서와 같음)
+STAT_DELTA_FIELDS = (
+    'reputation',
+    'budget_personnel',   # 인건비 세목
+    'budget_project',     # 사업비 세목
+    'budget_operation',   # 운영비 세목
+    'budget',             # 기존 호환용 (사업비로 처리)
+    'staff_morale',
+    'project_success',
+    'stress',
+    'wellbeing',
+)
+STAT_DELTA_WIDTH = len(STAT_DELTA_FIELDS)
+
+# 세목별 예산 키의 한글 별칭 (영문 키가 함께 있으면 영문 키 우선)
+_BUDGET_ALIASES = {
+    'budget_personnel': 'budget_인건비',
+    'budget_project': 'budget_사업비',
+    'budget_operation': 'budget_운영비',
+}
+
+# 부소장 사기 변화 열 순서
+DEPUTY_FIELDS = ('principled', 'local_friendly')
+
+# next 열의 특수 값
+NEXT_NONE = -1              # next 없음 (현재 period의 메인 시나리오로 이동)
+NEXT_CONTINUE_MAIN = -2     # 'continue_main_scenario'
+NEXT_AI_GENERATED = -3      # 'ai_generated'
+
+_SPECIAL_NEXT = {
+    'continue_main_scenario': NEXT_CONTINUE_MAIN,
+    'ai_generated': NEXT_AI_GENERATED,
+}
+
+# 선택지 플래그 비트
+FLAG_ADVANCE_TIME = 1
+FLAG_HAS_STATS = 2
+FLAG_HAS_DEPUTY_MORALE = 4
+FLAG_HAS_DELAYED_EFFECTS = 8
+
+# 임기 중 메인 시나리오 수 (격월 12회)
+MAIN_PERIODS = 12
+
+
+def pack_stat_changes(changes: Dict) -> list:
+    """스탯 변화 딕셔너리를 STAT_DELTA_FIELDS 순서의 고정 폭 벡터로 변환
+
+    알 수 없는 키(예: 'budget_execution_rate')는 update_stats와 마찬가지로 무시합니다.
+    """
+    deltas = []
+    for field in STAT_DELTA_FIELDS:
+        alias = _BUDGET_ALIASES.get(field)
+        if alias is None:
+            deltas.append(changes.get(field, 0))
+        else:
+            deltas.append(changes.get(field, changes.get(alias, 0)))
+    return deltas
+
+
+def main_scenario_id(period_number: int) -> Optional[str]:
+    """통산 period 번호(1-12)의 메인 시나리오 ID, 임기가 끝났으면 None"""
+    if period_number == 1:
+        return 'start'
+    if period_number <= MAIN_PERIODS:
+        return f'period_{period_number}'
+    return None
+
+
+class ScenarioGraph:
+    """정수 ID로 인턴된 읽기 전용 시나리오 그래프
+
+    선택지는 전체 그래프에서 연속된 번호(choice index)를 가지며,
+    시나리오 i의 선택지는 choice_start[i] 이상 choice_start[i + 1] 미만입니다.
+    """
+
+    __slots__ = (
+        'ids', 'index', 'scenarios', 'scenario_map', 'choice_start', 'choice_deltas',
+        'choice_deputy', 'choice_next', 'choice_flags', 'choice_results', 'choice_texts',
+        'main_ids', 'main_period_of', 'regular_ids'
+    )
+
+    def __init__(self, scenario_map: Dict):
+        self._set_scenarios(scenario_map)
+
+        choice_start = array('i', [0])
+        deltas = array('h')
+        deputy = array('h')
+        next_ids = array('i')
+        flags = array('B')
+        results = []
+        texts = []
+
+        for scenario in self.scenarios:
+            for choice in scenario.get('choices', ()):
+                result = choice['result']
+                flag = 0
+                if result.get('advance_time'):
+                    flag |= FLAG_ADVANCE_TIME
+                if 'stats' in result:
+                    flag |= FLAG_HAS_STATS
+                    deltas.extend(_to_int(v) for v in pack_stat_changes(result['stats']))
+                else:
+                    deltas.extend([0] * STAT_DELTA_WIDTH)
+                if 'deputy_morale' in result:
+                    flag |= FLAG_HAS_DEPUTY_MORALE
+                morale = result.get('deputy_morale', {})
+                deputy.extend(_to_int(morale.get(personality, 0)) for personality in DEPUTY_FIELDS)
+                if 'delayed_effects' in result:
+                    flag |= FLAG_HAS_DELAYED_EFFECTS
+                next_ids.append(self._intern_next(result.get('next')))
+                flags.append(flag)
+                results.append(result)
+                texts.append(choice['text'])
+            choice_start.append(len(flags))
+
+        self.choice_start = choice_start
+        self.choice_deltas = deltas
+        self.choice_deputy = deputy
+        self.choice_next = next_ids
+        self.choice_flags = flags
+        self.choice_results = tuple(results)
+        self.choice_texts = tuple(texts)
+
+        # 통산 period 번호 -> 메인 시나리오 인덱스 (0번은 사용하지 않음, 없으면 -1)
+        self.main_ids = array('i', [-1] + [self.index.get(main_scenario_id(n), -1)
+                                           for n in range(1, MAIN_PERIODS + 1)])
+        self._set_derived()
+
+    @classmethod
+    def from_compiled(cls, scenario_map: Dict, arrays: Dict[str, array]) -> 'ScenarioGraph':
+        """원본 딕셔너리와 컴파일된 배열(BUNDLE_ARRAYS)로 그래프 복원 (다시 컴파일하지 않음)
+
+        Raises:
+            ValueError: 배열 크기나 값이 원본 시나리오와 맞지 않는 경우
+        """
+        graph = cls.__new__(cls)
+        graph._set_scenarios(scenario_map)
+        for name in BUNDLE_ARRAYS:
+            setattr(graph, name, arrays[name])
+
+        results = []
+        texts = []
+        for scenario in graph.scenarios:
+            for choice in scenario.get('choices', ()):
+                results.append(choice['result'])
+                texts.append(choice['text'])
+        graph.choice_results = tuple(results)
+        graph.choice_texts = tuple(texts)
+
+        choice_count = len(results)
+        scenario_count = len(graph.ids)
+        if (len(graph.choice_start) != scenario_count + 1 or graph.choice_start[-1] != choice_count
+                or len(graph.choice_deltas) != choice_count * STAT_DELTA_WIDTH
+                or len(graph.choice_deputy) != choice_count * len(DEPUTY_FIELDS)
+                or len(graph.choice_next) != choice_count or len(graph.choice_flags) != choice_count
+                or len(graph.main_ids) != MAIN_PERIODS + 1):
+            raise ValueError("컴파일된 배열의 크기가 시나리오와 맞지 않습니다.")
+        if any(not NEXT_AI_GENERATED <= i < scenario_count for i in graph.choice_next) \
+                or any(not -1 <= i < scenario_count for i in graph.main_ids):
+            raise ValueError("컴파일된 배열에 잘못된 시나리오 번호가 있습니다.")
+        graph._set_derived()
+        return graph
+
+    def _set_scenarios(self, scenario_map: Dict):
+        self.scenario_map = scenario_map
+        self.ids = tuple(scenario_map)
+        self.index = {scenario_id: i for i, scenario_id in enumerate(self.ids)}
+        self.scenarios = tuple(scenario_map[scenario_id] for scenario_id in self.ids)
+
+    def _set_derived(self):
+        # 메인 시나리오 ID -> (년차, 격월 기간)
+        self.main_period_of = {
+            main_scenario_id(n): ((n - 1) // 6 + 1, (n - 1) % 6 + 1)
+            for n in range(1, MAIN_PERIODS + 1)
+        }
+        # 무작위 이동 후보 (시작/엔딩 시나리오 제외)
+        self.regular_ids = tuple(scenario_id for scenario_id in self.ids
+                                 if scenario_id != 'start' and not scenario_id.startswith('ending_'))
+
+    def _intern_next(self, next_id: Optional[str]) -> int:
+        if next_id is None:
+            return NEXT_NONE
+        if next_id in _SPECIAL_NEXT:
+            return _SPECIAL_NEXT[next_id]
+        if next_id not in self.index:
+            raise ValueError(f"알 수 없는 다음 시나리오 '{next_id}'")
+        return self.index[next_id]
+
+    def __contains__(self, scenario_id: str) -> bool:
+        return scenario_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, scenario_id: str) -> Optional[Dict]:
+        """시나리오 ID로 원본 시나리오 딕셔너리 조회 (화면 표시용)"""
+        i = self.index.get(scenario_id)
+        return self.scenarios[i] if i is not None else None
+
+    def choice_range(self, scenario_index: int) -> range:
+        """시나리오의 선택지 번호 범위"""
+        return range(self.choice_start[scenario_index], self.choice_start[scenario_index + 1])
+
+    def stat_deltas(self, choice_index: int):
+        """선택지의 스탯 변화 벡터 (STAT_DELTA_FIELDS 순서)"""
+        offset = choice_index * STAT_DELTA_WIDTH
+        return self.choice_deltas[offset:offset + STAT_DELTA_WIDTH]
+
+    def deputy_deltas(self, choice_index: int) -> Iterable[Tuple[str, int]]:
+        """선택지의 부소장 사기 변화 (성격, 변화량) - 변화 없는 항목 제외"""
+        offset = choice_index * len(DEPUTY_FIELDS)
+        for j, personality in enumerate(DEPUTY_FIELDS):
+            change = self.choice_deputy[offset + j]
+            if change:
+                yield personality, change
+
+    def main_scenario_index(self, period_number: int) -> int:
+        """통산 period 번호의 메인 시나리오 인덱스, 없거나 임기가 끝났으면 -1"""
+        if 1 <= period_number <= MAIN_PERIODS:
+            return self.main_ids[period_number]
+        return -1
+
+
+def _to_int(value) -> int:
+    """배열 저장용 정수 변환 (정수가 아닌 값은 컴파일 오류)"""
+    if isinstance(value, bool) or int(value) != value:
+        raise ValueError(f"스탯 변화는 정수여야 합니다: {value!r}")
+    return int(value)
+
+
+def compile_scenarios(scenario_map: Dict) -> ScenarioGraph:
+    """시나리오 딕셔너리를 컴파일된 그래프로 변환"""
+    return ScenarioGraph(scenario_map)
+
+
+# 바이너리 번들 형식 버전 (ScenarioGraph 구조가 바뀌면 올려서 기존 캐시를 무효화)
+BUNDLE_FORMAT_VERSION = 2
+BUNDLE_SUFFIX = '.cache'
+
+# 번들에 버퍼로 저장하는 컴파일된 배열 (나머지 필드는 원본 딕셔너리에서 다시 만듦)
+BUNDLE_ARRAYS = ('choice_start', 'choice_deltas', 'choice_deputy', 'choice_next', 'choice_flags', 'main_ids')
+
+# 프로세스 내 메모: 절대 경로 -> ((크기, 수정 시각), 그래프)
+_loaded_graphs: Dict[str, Tuple[Tuple[int, int], ScenarioGraph]] = {}
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_bundle(bundle_path: str, signature: Tuple[int, int],
+                 source_path: str) -> Tuple[Optional[ScenarioGraph], Optional[str]]:
+    """번들이 원본과 일치하면 그래프 반환, 없거나 오래되었거나 손상되었으면 None
+
+    번들 형식: JSON 헤더 한 줄, 원본 딕셔너리 JSON, 헤더에 적힌 순서의 배열 버퍼
+
+    Returns:
+        (그래프, 크기/수정 시각이 달라 내용을 다시 해시했으면 그 sha256 - 헤더 갱신용)
+    """
+    rehashed = None
+    try:
+        with open(bundle_path, 'rb') as f:
+            header = json.loads(f.readline().decode('utf-8'))
+            if header.get('format') != BUNDLE_FORMAT_VERSION or header.get('byteorder') != sys.byteorder:
+                return None, None
+            if tuple(header.get('signature', ())) != signature:
+                # 크기/수정 시각이 달라도 (git checkout 등) 내용이 같으면 재사용
+                rehashed = _file_sha256(source_path)
+                if header.get('sha256') != rehashed:
+                    return None, None
+            scenario_map = json.loads(f.read(header['scenarios']).decode('utf-8'))
+            arrays = {}
+            for name, typecode, size in header['arrays']:
+                values = array(typecode)
+                data = f.read(size)
+                if name not in BUNDLE_ARRAYS or len(data) != size:
+                    return None, None
+                values.frombytes(data)
+                arrays[name] = values
+            return ScenarioGraph.from_compiled(scenario_map, arrays), rehashed
+    except (OSError, AttributeError, KeyError, TypeError, ValueError):
+        return None, None
+
+
+def _write_bundle(bundle_path: str, signature: Tuple[int, int], sha256: str, graph: ScenarioGraph):
+    """번들을 임시 파일에 쓴 뒤 원자적으로 교체 (쓰기 실패는 무시 - 캐시일 뿐)"""
+    scenarios = json.dumps(graph.scenario_map, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    buffers = [(name, getattr(graph, name)) for name in BUNDLE_ARRAYS]
+    header = {
+        'format': BUNDLE_FORMAT_VERSION, 'signature': signature, 'sha256': sha256,
+        'byteorder': sys.byteorder, 'scenarios': len(scenarios),
+        'arrays': [[name, values.typecode, len(values) * values.itemsize] for name, values in buffers],
+    }
+    directory = os.path.dirname(bundle_path) or '.'
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.scenarios-', suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(scenarios)
+            for _, values in buffers:
+                f.write(values.tobytes())
+        os.replace(temp_path, bundle_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_scenario_graph(path: str = 'scenarios.json', use_bundle: bool = True) -> ScenarioGraph:
+    """시나리오 JSON을 컴파일된 그래프로 로드 (프로세스 메모 -> 바이너리 번들 -> JSON 파싱과 컴파일 순)
+
+    Raises:
+        FileNotFoundError: 시나리오 파일이 없는 경우
+    """
+    source_path = os.path.abspath(path)
+    st = os.stat(source_path)
+    signature = (st.st_size, st.st_mtime_ns)
+
+    memo = _loaded_graphs.get(source_path)
+    if memo is not None and memo[0] == signature:
+        return memo[1]
+
+    bundle_path = source_path + BUNDLE_SUFFIX
+    graph, rehashed = _read_bundle(bundle_path, signature, source_path) if use_bundle else (None, None)
+    if graph is not None and rehashed is not None:
+        # 내용은 같고 크기/수정 시각만 바뀐 경우 - 다음 프로세스가 다시 해시하지 않도록 헤더 갱신
+        _write_bundle(bundle_path, signature, rehashed, graph)
+    elif graph is None:
+        with open(source_path, 'rb') as f:
+            raw = f.read()
+        graph = compile_scenarios(json.loads(raw.decode('utf-8')))
+        if use_bundle:
+            _write_bundle(bundle_path, signature, hashlib.sha256(raw).hexdigest(), graph)
+
+    _loaded_graphs[source_path] = (signature, graph)
+    return graph
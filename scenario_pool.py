@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+사전 생성 AI 시나리오 풀
+오프라인 배치 작업으로 테마 × 시기(격월) × 자주 나오는 약점 프로필 조합마다 시나리오를
+미리 생성해 두고, 게임 중에는 (테마, 시기, 약점 프로필) 색인으로 아직 쓰지 않은 항목을
+O(1)에 꺼내 씁니다. 풀에 없을 때만 실시간 생성으로 넘어갑니다.
+
+사용법:
+    python3 scenario_pool.py --per-key 2                # GEMINI_API_KEY로 풀 생성
+    python3 scenario_pool.py --stub --per-key 1         # 로컬 스텁 모델로 생성 (네트워크 없음)
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ai_schema import STAT_LIMITS
+
+
+POOL_FORMAT_VERSION = 1
+DEFAULT_POOL_PATH = 'ai_scenario_pool.json'
+
+# 약점 프로필을 만들기 위한 스탯 설정 (기본값은 약점이 없는 안정 상태)
+_HEALTHY_STATS = {
+    'reputation': 60, 'budget_rate': 85, 'staff_morale': 60,
+    'project_success': 60, 'stress': 40, 'wellbeing': 60,
+}
+_WEAKNESS_STATS = {
+    'reputation': {'reputation': 40},
+    'budget_low': {'budget_rate': 50},
+    'budget_high': {'budget_rate': 97},
+    'staff_morale': {'staff_morale': 40},
+    'project_success': {'project_success': 40},
+    'stress': {'stress': 80},
+    'wellbeing': {'wellbeing': 30},
+}
+
+# 배치 작업에서 생성할 약점 조합 (없음, 단일 약점, 자주 함께 나타나는 조합)
+COMMON_WEAKNESS_SETS = (
+    (),
+    ('reputation',),
+    ('budget_low',),
+    ('budget_high',),
+    ('staff_morale',),
+    ('project_success',),
+    ('stress',),
+    ('wellbeing',),
+    ('reputation', 'budget_low', 'project_success'),   # 게임 시작 직후
+    ('staff_morale', 'stress'),
+    ('stress', 'wellbeing'),
+    ('reputation', 'staff_morale'),
+)
+
+
+def pool_key(theme_name: str, period: int, weak_profile: str) -> str:
+    """풀 색인 키 (테마, 격월 기간, _identify_weak_stats 결과)"""
+    return f"{theme_name}|{period}|{weak_profile}"
+
+
+def profile_state(period: int, weaknesses: Iterable[str]):
+    """주어진 약점 조합이 나타나는 가상의 게임 상태 생성 (배치 생성용)"""
+    from koica_game import GameState
+
+    stats = dict(_HEALTHY_STATS)
+    for weakness in weaknesses:
+        stats.update(_WEAKNESS_STATS[weakness])
+
+    state = GameState()
+    state.period = period
+    state.reputation = stats['reputation']
+    state.staff_morale = stats['staff_morale']
+    state.project_success = stats['project_success']
+    state.stress = stats['stress']
+    state.wellbeing = stats['wellbeing']
+    for category in list(state.budget_execution_rates):
+        state.budget_execution_rates[category] = stats['budget_rate']
+    return state
+
+
+class ScenarioPool:
+    """사전 생성 시나리오 풀 (항목 목록 + 키별 항목 번호 색인)
+
+    풀은 여러 게임이 공유하는 읽기 전용 데이터이고, 게임마다의 사용 위치는
+    호출자가 넘기는 cursors 딕셔너리(키 -> (시작 위치, 사용한 수))에 기록합니다.
+    """
+
+    def __init__(self, entries: Optional[List[Dict]] = None):
+        self.entries: List[Dict] = []
+        self.index: Dict[str, List[int]] = {}
+        for entry in entries or ():
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: Dict):
+        """항목 추가 (entry: theme, period, weak_profile, scenario)"""
+        key = pool_key(entry['theme'], entry['period'], entry['weak_profile'])
+        self.index.setdefault(key, []).append(len(self.entries))
+        self.entries.append(entry)
+
+    def take(self, key: str, cursors: Dict[str, Tuple[int, int]],
+             rng: Optional[random.Random] = None) -> Optional[Dict]:
+        """키에 맞는 항목 중 이번 게임에서 아직 쓰지 않은 시나리오의 복사본 반환 (없으면 None)
+
+        게임마다 무작위 위치에서 시작하여 차례로 꺼내므로, 여러 플레이어가 같은 상황에서도
+        서로 다른 시나리오를 받고 한 게임 안에서는 같은 시나리오가 반복되지 않습니다.
+        """
+        ids = self.index.get(key)
+        if not ids:
+            return None
+        start, used = cursors.get(key, (None, 0))
+        if used >= len(ids):
+            return None
+        if start is None:
+            start = (rng or random).randrange(len(ids))
+        cursors[key] = (start, used + 1)
+        entry = self.entries[ids[(start + used) % len(ids)]]
+        return copy.deepcopy(entry['scenario'])
+
+    def to_dict(self) -> Dict:
+        return {'format': POOL_FORMAT_VERSION, 'entries': self.entries, 'index': self.index}
+
+    def save(self, path: str = DEFAULT_POOL_PATH):
+        """풀을 임시 파일에 쓴 뒤 원자적으로 교체"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.scenario-pool-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+
+def load_scenario_pool(path: str = DEFAULT_POOL_PATH) -> ScenarioPool:
+    """풀 파일 로드 (저장된 색인을 그대로 사용)
+
+    Raises:
+        FileNotFoundError: 풀 파일이 없는 경우
+        ValueError: 형식 버전이 다른 경우
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') != POOL_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 시나리오 풀 형식입니다: {data.get('format')}")
+    pool = ScenarioPool()
+    pool.entries = data['entries']
+    pool.index = {key: list(ids) for key, ids in data['index'].items()}
+    return pool
+
+
+# 프로세스 내 메모: 절대 경로 -> (수정 시각, 풀)
+_loaded_pools: Dict[str, Tuple[int, ScenarioPool]] = {}
+
+
+def default_scenario_pool(path: str = DEFAULT_POOL_PATH) -> Optional[ScenarioPool]:
+    """기본 풀 (파일이 없거나 읽을 수 없으면 None - 실시간 생성만 사용)"""
+    source_path = os.path.abspath(path)
+    try:
+        mtime = os.stat(source_path).st_mtime_ns
+    except OSError:
+        return None
+    memo = _loaded_pools.get(source_path)
+    if memo is not None and memo[0] == mtime:
+        return memo[1]
+    try:
+        pool = load_scenario_pool(source_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: 시나리오 풀을 읽을 수 없습니다 ({e}). 실시간 생성만 사용합니다.")
+        return None
+    _loaded_pools[source_path] = (mtime, pool)
+    return pool
+
+
+class StubModel:
+    """네트워크 없이 풀 생성/테스트에 쓰는 로컬 스텁 모델
+
+    generate_content(prompt)가 프롬프트의 테마/계절을 반영한 유효한 시나리오 JSON을
+    돌려주며, 같은 프롬프트에는 항상 같은 응답을 냅니다.
+    """
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        theme = re.search(r'\*\*테마\*\*: (.+)', prompt)
+        season = re.search(r'계절/상황: (.+)', prompt)
+        theme_name = theme.group(1).strip() if theme else '사무소 운영'
+        season_text = season.group(1).strip() if season else ''
+        rng = random.Random(prompt)
+
+        choices = []
+        for approach in ('적극적으로 대응한다', '신중하게 상황을 지켜본다', '본부와 협의한다', '현지 파트너에게 맡긴다'):
+            stats = {stat: rng.randint(-limit // 3, limit // 3) for stat, limit in STAT_LIMITS.items()
+                     if stat in ('reputation', 'budget', 'staff_morale', 'project_success')}
+            choices.append({
+                'text': f"{theme_name} 상황에 {approach}",
+                'result': {'message': f"{approach}. 이해관계자들의 반응이 엇갈렸다.", 'stats': stats}
+            })
+        text = json.dumps({
+            'title': f"[{theme_name}] {season_text.split(' - ')[0]}",
+            'description': f"{season_text}. {theme_name}과 관련된 상황이 발생했습니다.",
+            'choices': choices
+        }, ensure_ascii=False)
+        response = _StubResponse(text)
+        return [response] if stream else response
+
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def build_scenario_pool(gemini, per_key: int = 1, periods: Iterable[int] = range(1, 7),
+                        weakness_sets: Iterable[Tuple[str, ...]] = COMMON_WEAKNESS_SETS,
+                        pool: Optional[ScenarioPool] = None, save_path: Optional[str] = None,
+                        verbose: bool = True) -> ScenarioPool:
+    """테마 × 시기 × 약점 조합마다 시나리오를 per_key개씩 생성하여 풀에 추가
+
+    이미 per_key개 이상 있는 키는 건너뛰므로 중단된 작업을 이어서 실행할 수 있습니다
+    (save_path를 주면 테마 하나를 마칠 때마다 저장). 검증에 실패한 응답은 버립니다.
+    """
+    pool = pool or ScenarioPool()
+    weakness_sets = list(weakness_sets)
+    for theme in gemini.scenario_themes:
+        for period in periods:
+            for weaknesses in weakness_sets:
+                state = profile_state(period, weaknesses)
+                weak_profile = gemini._identify_weak_stats(state)
+                key = pool_key(theme['name'], period, weak_profile)
+                for _ in range(per_key - len(pool.index.get(key, ()))):
+                    scenario = gemini.generate_scenario(state, theme=theme, use_pool=False, allow_local=False)
+                    if scenario is None:
+                        continue
+                    pool.add({'theme': theme['name'], 'period': period,
+                              'weak_profile': weak_profile, 'scenario': scenario})
+                    if verbose:
+                        print(f"  + {key} ({len(pool)}개)")
+        if save_path:
+            pool.save(save_path)
+    return pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI 시나리오 풀 사전 생성')
+    parser.add_argument('--output', default=DEFAULT_POOL_PATH,
+                        help=f'풀 파일 경로 (기본: {DEFAULT_POOL_PATH}, 있으면 이어서 채움)')
+    parser.add_argument('--per-key', type=int, default=1,
+                        help='테마/시기/약점 조합마다 생성할 시나리오 수 (기본: 1)')
+    parser.add_argument('--stub', action='store_true',
+                        help='Gemini 대신 로컬 스텁 모델 사용 (테스트용)')
+    parser.add_argument('--api-key', default=None,
+                        help='Gemini API 키 (기본: 환경변수 GEMINI_API_KEY)')
+    args = parser.parse_args()
+
+    from koica_game import GeminiIntegration
+
+    if args.stub:
+        gemini = GeminiIntegration(model=StubModel())
+    else:
+        api_key = args.api_key or os.environ.get('GEMINI_API_KEY')
+        gemini = GeminiIntegration(api_key)
+        if not gemini.enabled:
+            print("오류: google-genai 패키지와 API 키가 필요합니다 (또는 --stub 사용).")
+            sys.exit(1)
+
+    pool = None
+    if os.path.exists(args.output):
+        pool = load_scenario_pool(args.output)
+        print(f"기존 풀 {len(pool)}개에 이어서 생성합니다.")
+
+    pool = build_scenario_pool(gemini, per_key=args.per_key, pool=pool, save_path=args.output)
+    pool.save(args.output)
+    print(f"\n✅ {args.output}: 시나리오 {len(pool)}개, 색인 키 {len(pool.index)}개")
+
+
+if __name__ == "__main__":
+    main()
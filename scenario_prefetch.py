@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 시나리오 선행 생성 (prefetch)
+AI 시나리오가 화면에 표시되는 즉시, 플레이어가 읽고 고르는 동안 백그라운드 스레드에서
+다음 격월의 시나리오를 미리 생성합니다. 선택 후 실제 상태가 예측한 상태와 맞으면
+생성 결과를 바로 사용하고, 맞지 않으면 오래된 생성 작업을 버립니다.
+"""
+
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Dict, Hashable, Optional, Tuple
+
+from scenario_graph import MAIN_PERIODS
+
+
+def leads_to_ai_scenario(scenario: Optional[Dict]) -> bool:
+    """선택지 중 하나라도 다음 시나리오로 AI 생성 시나리오를 가리키는지 여부"""
+    if not scenario:
+        return False
+    return any(choice.get('result', {}).get('next') == 'ai_generated'
+               for choice in scenario.get('choices', ()))
+
+
+class ScenarioPrefetcher:
+    """다음 AI 시나리오 한 개를 예측 상태 기준으로 미리 생성
+
+    예측 상태는 현재 상태에서 시간을 한 번 진행한 복사본이며
+    (AI 시나리오의 선택지는 모두 advance_time), 선택 자체의 스탯 변화는 알 수 없으므로
+    (년차, 격월 기간, 약점 프로필)을 키로 삼아 실제 상태와 비교합니다.
+    약점 프로필은 프롬프트의 '현재 약점' 항목과 같은 값이라, 키가 같으면
+    프롬프트의 핵심 조건이 같은 시나리오를 재사용하게 됩니다.
+    선행 생성은 사전 생성 풀과 일괄 생성 대기열을 건드리지 않고 다음 시기 하나만 생성하므로,
+    키가 맞지 않아 결과를 버려도 풀/대기열의 항목은 그대로 남습니다.
+    """
+
+    def __init__(self, gemini, max_workers: int = 2):
+        # gemini: GeminiIntegration (generate_scenario, _identify_weak_stats 사용)
+        self.gemini = gemini
+        # 실행 중인 생성은 취소할 수 없으므로, 오래된 작업이 새 작업을 막지 않도록 작업자 2개
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._future: Optional[Future] = None
+        self._key: Optional[Tuple[Hashable, ...]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.gemini is not None and self.gemini.enabled
+
+    def state_key(self, game_state) -> Tuple[Hashable, ...]:
+        """생성 결과를 재사용할 수 있는 상태 키 (년차, 격월 기간, 약점 프로필)"""
+        return (game_state.year, game_state.period, self.gemini._identify_weak_stats(game_state))
+
+    def start(self, game_state) -> bool:
+        """현재 상태에서 시간이 한 번 진행된 상태를 기준으로 다음 시나리오 생성 시작
+
+        같은 키의 생성이 이미 진행 중이거나 끝났으면 그대로 두고,
+        다른 키의 생성은 취소(또는 결과 폐기)합니다.
+
+        Returns:
+            생성이 진행 중(또는 완료)이면 True, 대상이 아니어서 시작하지 않았으면 False
+        """
+        if not self.enabled:
+            return False
+
+        projected = game_state.copy()
+        projected.advance_time()
+        # 임기 마지막 격월은 AI 시나리오 대신 period_12를 사용하므로 생성하지 않음
+        if (projected.year - 1) * 6 + projected.period >= MAIN_PERIODS:
+            self.cancel()
+            return False
+
+        # 일괄 생성 대기열에 다음 시기 시나리오가 이미 있으면 화면 스레드가 그것을 사용
+        batch_queue = self.gemini.batch_queue
+        if batch_queue is not None and batch_queue.covers(projected.year, projected.period):
+            self.cancel()
+            return False
+
+        key = self.state_key(projected)
+        if self._future is not None and self._key == key:
+            return True
+
+        self.cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='scenario-prefetch')
+        # 풀/대기열의 항목은 소비하지 않음 (예측이 빗나가면 잃어버리므로 화면 스레드가 직접 꺼내 씀)
+        self._future = self._executor.submit(self.gemini.generate_scenario, projected,
+                                             use_pool=False, use_batch=False)
+        self._key = key
+        return True
+
+    def take(self, game_state, timeout: Optional[float] = None) -> Optional[Dict]:
+        """실제 상태에 맞는 선행 생성 결과 반환 (아직 진행 중이면 완료까지 대기)
+
+        키가 맞지 않거나, 생성이 실패했거나, timeout 안에 끝나지 않으면 None을 반환하며
+        호출자는 동기 생성으로 대체합니다. 결과는 한 번만 사용됩니다.
+        """
+        future, key = self._future, self._key
+        self._future = None
+        self._key = None
+        if future is None:
+            return None
+        if key != self.state_key(game_state):
+            future.cancel()
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except CancelledError:
+            return None
+        except Exception:
+            # TimeoutError 포함 - 늦게 끝나는 결과는 버림
+            future.cancel()
+            return None
+
+    def cancel(self):
+        """진행 중인 선행 생성 폐기 (아직 시작 전이면 취소)"""
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._key = None
+
+    def shutdown(self):
+        """선행 생성 중단 및 작업 스레드 정리 (실행 중인 요청은 기다리지 않음)"""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+게임 세션 저장소
+웹 세션의 게임 진행(GameState, 대기 중인 이벤트 표시, 현재 AI 시나리오, 화면 위치)을 선택마다
+압축된 JSON으로 외부 저장소에 기록하여, 서버 재시작/재배포 후에도 이어서 플레이하고
+여러 앱 복제본(replica)이 같은 저장소를 공유해 어느 프로세스에서든 세션을 복원할 수 있게 합니다.
+
+저장소는 세션 ID -> 바이트 값의 get/put/delete만 구현하면 되므로
+(SQLite, 파일 디렉터리 외에) Redis 같은 키-값 저장소로도 쉽게 바꿀 수 있습니다.
+
+KOICA_SESSION_STORE 환경변수로 저장소를 지정합니다 (URL 규칙대로 슬래시 세 개 뒤는 절대 경로):
+    sqlite:///절대/경로/sessions.sqlite3   SQLite 파일 (한 호스트 안에서만 공유 가능)
+    sqlite:상대/경로.sqlite3               작업 디렉터리 기준 상대 경로 (기본: sqlite:koica_sessions.sqlite3)
+    file:///절대/경로/디렉터리               세션마다 파일 하나 (공유 볼륨에 두면 여러 호스트가 공유 가능)
+    file:상대/디렉터리
+    off                                   저장하지 않음
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from koica_game import GameState
+from scenario_graph import ScenarioGraph
+
+
+SESSION_FORMAT_VERSION = 1
+DEFAULT_SESSION_STORE = 'sqlite:koica_sessions.sqlite3'
+DEFAULT_SESSION_TTL = 14 * 24 * 3600     # 14일 동안 접속하지 않은 세션은 삭제
+
+# 세션 ID 형식 (URL 쿼리 파라미터로 전달되므로 URL 안전 문자만 허용)
+_SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+
+def new_session_id() -> str:
+    """추측할 수 없는 새 세션 ID"""
+    return secrets.token_urlsafe(16)
+
+
+def valid_session_id(session_id: Optional[str]) -> bool:
+    return bool(session_id) and _SESSION_ID_PATTERN.match(session_id) is not None
+
+
+def encode_session(state: Optional[GameState], ui: Dict, graph: Optional[ScenarioGraph] = None) -> bytes:
+    """게임 상태와 화면 상태를 압축된 바이트로 직렬화
+
+    ui는 JSON으로 직렬화할 수 있는 화면 상태(현재 화면, 결과 표시, 현재 AI 시나리오 등)입니다.
+    """
+    payload = {
+        'format': SESSION_FORMAT_VERSION,
+        'state': state.to_dict(graph) if state is not None else None,
+        'ui': ui,
+    }
+    text = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return zlib.compress(text.encode('utf-8'))
+
+
+def decode_session(blob: bytes, graph: Optional[ScenarioGraph] = None,
+                   stat_history_limit: Optional[int] = None) -> Tuple[Optional[GameState], Dict]:
+    """encode_session의 역변환
+
+    Raises:
+        ValueError: 손상되었거나 형식 버전이 다른 경우
+    """
+    try:
+        payload = json.loads(zlib.decompress(blob).decode('utf-8'))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"세션 데이터를 읽을 수 없습니다: {e}") from e
+    if payload.get('format') != SESSION_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 세션 형식입니다: {payload.get('format')}")
+    data = payload['state']
+    state = GameState.from_dict(data, graph, stat_history_limit) if data is not None else None
+    return state, payload['ui']
+
+
+class SessionStore(ABC):
+    """세션 저장소 인터페이스 (세션 ID -> 압축된 세션 바이트)
+
+    get/put/delete만 구현하면 되며, 여러 스레드(Streamlit 세션)에서 함께 사용할 수 있어야 합니다.
+    put은 마지막 접근 시각을 갱신하고, ttl이 지난 세션은 get에서 None으로 취급합니다.
+    """
+
+    def __init__(self, ttl: Optional[float] = DEFAULT_SESSION_TTL):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[bytes]:
+        """저장된 세션 바이트 (없거나 만료되었으면 None)"""
+
+    @abstractmethod
+    def put(self, session_id: str, blob: bytes):
+        """세션 바이트 저장 (마지막 접근 시각 갱신)"""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """세션 삭제 (없어도 오류 없음)"""
+
+    def close(self):
+        pass
+
+    def _expired(self, saved_at: float, now: float) -> bool:
+        return self.ttl is not None and now - saved_at > self.ttl
+
+    def save(self, session_id: str, state: Optional[GameState], ui: Dict, graph: Optional[ScenarioGraph] = None):
+        """세션 저장"""
+        self.put(session_id, encode_session(state, ui, graph))
+
+    def load(self, session_id: str, graph: Optional[ScenarioGraph] = None,
+             stat_history_limit: Optional[int] = None) -> Optional[Tuple[Optional[GameState], Dict]]:
+        """세션 복원 (없거나 만료되었거나 읽을 수 없으면 None)"""
+        blob = self.get(session_id)
+        if blob is None:
+            return None
+        try:
+            return decode_session(blob, graph, stat_history_limit)
+        except (ValueError, KeyError, TypeError, IndexError):
+            # 형식이 바뀌었거나 시나리오 파일이 바뀌어 복원할 수 없는 세션은 버림
+            self.delete(session_id)
+            return None
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite 파일 세션 저장소 (같은 호스트에서 같은 파일을 쓰는 여러 프로세스가 공유 가능)
+
+    WAL 잠금은 공유 메모리를 쓰므로 네트워크 볼륨을 통해 여러 호스트가 함께 쓰면 안전하지 않습니다.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = DEFAULT_SESSION_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_purge = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            # WAL: 다른 프로세스가 쓰는 동안에도 읽기가 막히지 않음
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, data BLOB NOT NULL, saved_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_saved ON sessions (saved_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connect().execute("SELECT data, saved_at FROM sessions WHERE id = ?",
+                                          (session_id,)).fetchone()
+        if row is None or self._expired(row[1], time.time()):
+            return None
+        return bytes(row[0])
+
+    def put(self, session_id: str, blob: bytes):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO sessions (id, data, saved_at) VALUES (?, ?, ?)",
+                         (session_id, blob, now))
+            # 만료 세션 정리는 한 시간에 한 번만
+            if self.ttl is not None and now - self._last_purge > 3600:
+                conn.execute("DELETE FROM sessions WHERE saved_at < ?", (now - self.ttl,))
+                self._last_purge = now
+            conn.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class FileSessionStore(SessionStore):
+    """세션마다 파일 하나를 쓰는 저장소 (공유 볼륨에 두면 여러 복제본이 함께 사용 가능)"""
+
+    def __init__(self, directory: str, ttl: Optional[float] = DEFAULT_SESSION_TTL):
+        super().__init__(ttl)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.session")
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        path = self._path(session_id)
+        try:
+            saved_at = os.path.getmtime(path)
+            if self._expired(saved_at, time.time()):
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, session_id: str, blob: bytes):
+        """임시 파일에 쓴 뒤 원자적으로 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.session-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(temp_path, self._path(session_id))
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def delete(self, session_id: str):
+        try:
+            os.remove(self._path(session_id))
+        except OSError:
+            pass
+
+
+def open_session_store(spec: str, ttl: Optional[float] = DEFAULT_SESSION_TTL) -> Optional[SessionStore]:
+    """저장소 지정 문자열로 세션 저장소 생성 ('off'나 빈 문자열이면 None)
+
+    sqlite:///data/s.sqlite3처럼 슬래시 세 개 뒤의 경로는 절대 경로(/data/s.sqlite3)이고,
+    sqlite:s.sqlite3처럼 슬래시 없이 쓰면 작업 디렉터리 기준 상대 경로입니다.
+
+    Raises:
+        ValueError: 알 수 없는 저장소 종류이거나 경로가 없는 경우
+    """
+    if not spec or spec == 'off':
+        return None
+    url = urlparse(spec)
+    if url.scheme not in ('sqlite', 'file'):
+        raise ValueError(f"알 수 없는 세션 저장소 '{spec}' (sqlite:///경로, file:///디렉터리, off 중 하나)")
+    # sqlite://data/s.sqlite3처럼 슬래시가 두 개뿐이면 첫 경로 성분이 호스트로 읽히므로 거부
+    if url.netloc not in ('', 'localhost'):
+        raise ValueError(f"세션 저장소 경로에 호스트 '{url.netloc}'를 쓸 수 없습니다: '{spec}' "
+                         f"(절대 경로는 {url.scheme}:///경로)")
+    path = unquote(url.path)
+    if not path:
+        raise ValueError(f"세션 저장소 경로가 없습니다: '{spec}'")
+    if url.scheme == 'sqlite':
+        return SQLiteSessionStore(path, ttl=ttl)
+    return FileSessionStore(path, ttl=ttl)
+
+
+_default_store: Optional[SessionStore] = None
+_default_store_lock = threading.Lock()
+_default_store_loaded = False
+
+
+def default_session_store() -> Optional[SessionStore]:
+    """프로세스 공용 세션 저장소 (KOICA_SESSION_STORE, 열 수 없으면 None)"""
+    global _default_store, _default_store_loaded
+    with _default_store_lock:
+        if not _default_store_loaded:
+            _default_store_loaded = True
+            spec = os.environ.get('KOICA_SESSION_STORE', DEFAULT_SESSION_STORE)
+            try:
+                _default_store = open_session_store(spec)
+            except (ValueError, OSError, sqlite3.Error) as e:
+                print(f"Warning: 세션 저장소를 열 수 없어 진행 상황을 저장하지 않습니다: {e}")
+                _default_store = None
+        return _default_store
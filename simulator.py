@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KOICA 소장 시뮬레이터 - 헤드리스 배치 시뮬레이션 엔진
+화면 출력과 대기 없이 CLI/Streamlit과 같은 전이 엔진(koica_game.step: 생활 이벤트, 부소장 임계값
+이벤트, 장기 영향, 고급 엔딩)을 구동하여 scenarios.json 밸런스 회귀 검증에 사용합니다.
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from koica_game import KOICAGame, step
+from scenario_graph import ScenarioGraph, compile_scenarios
+
+
+# 선택 정책: (게임, 시나리오 ID, 선택지 목록) -> 선택 인덱스 (0-based)
+ChoicePolicy = Callable[[KOICAGame, str, List[Dict]], int]
+
+
+def random_policy(game: KOICAGame, scenario_id: str, choices: List[Dict]) -> int:
+    """무작위 선택 정책"""
+    return game.rng.randrange(len(choices))
+
+
+def first_choice_policy(game: KOICAGame, scenario_id: str, choices: List[Dict]) -> int:
+    """항상 첫 번째 선택지를 고르는 정책"""
+    return 0
+
+
+def balanced_policy(game: KOICAGame, scenario_id: str, choices: List[Dict]) -> int:
+    """데모 모드와 동일한 균형 선택 정책 (낮은 스탯을 보완하는 선택 선호)"""
+    return game._demo_choose(choices)
+
+
+POLICIES = {
+    'random': random_policy,
+    'first': first_choice_policy,
+    'balanced': balanced_policy,
+}
+
+
+class HeadlessGame(KOICAGame):
+    """출력/입력/대기 없이 게임 한 판을 끝까지 진행하는 헤드리스 게임"""
+
+    def __init__(self, policy: ChoicePolicy = random_policy, scenarios: Optional[Dict] = None,
+                 rng: Optional[random.Random] = None, graph: Optional[ScenarioGraph] = None):
+        super().__init__(ai_mode=False, demo_mode=True, scenarios=scenarios,
+                         rng=rng if rng is not None else random.Random(), graph=graph)
+        self.policy = policy
+
+    def notify(self, message: str):
+        """헤드리스 실행에서는 알림을 출력하지 않음"""
+
+    def clear_screen(self):
+        """헤드리스 실행에서는 화면을 지우지 않음"""
+
+    def setup_lifestyle(self):
+        """초기 생활 선택 (데모 모드와 동일하게 무작위)"""
+        rng = self.rng
+        self.state.car_choice = self.apply_lifestyle_effect(self.CAR_EFFECTS, rng.randint(1, 3))
+        self.state.housing_choice = self.apply_lifestyle_effect(self.HOUSING_EFFECTS, rng.randint(1, 4))
+        self.state.leisure_choice = self.apply_lifestyle_effect(self.LEISURE_EFFECTS, rng.randint(1, 4))
+        self.state.meal_choice = self.apply_lifestyle_effect(self.MEAL_EFFECTS, rng.randint(1, 3))
+
+    def run(self) -> Dict:
+        """게임 한 판을 끝까지 진행하고 결과 요약 반환 (CLI/Streamlit과 같은 전이 엔진 step 사용)"""
+        graph = self.graph
+        rng = self.rng
+        self.setup_lifestyle()
+
+        while not self.state.game_over:
+            scenario_id = self.state.current_scenario
+            scenario = graph.get(scenario_id)
+            if scenario is None:
+                break
+            choices = scenario.get('choices')
+            choice_index = self.policy(self, scenario_id, choices) if choices else 0
+            self.state, _ = step(self.state, scenario_id, choice_index, rng, graph)
+
+        return self.summarize()
+
+    def summarize(self) -> Dict:
+        """게임 결과 요약 (엔딩, 소장 유형, 최종 스탯)"""
+        state = self.state
+        return {
+            'ending': state.ending,
+            'director_type': self._determine_director_types()[0],
+            'year': state.year,
+            'period': state.period,
+            'stats': {
+                'reputation': state.reputation,
+                'budget_execution_rate': state.budget_execution_rate,
+                'staff_morale': state.staff_morale,
+                'project_success': state.project_success,
+                'stress': state.stress,
+                'wellbeing': state.wellbeing
+            },
+            'player_style': dict(state.player_style),
+            'total_choices': len(state.choice_history),
+            'life_events': state.life_events_count
+        }
+
+
+def simulate_games(num_games: int, policy: ChoicePolicy = random_policy, seed: Optional[int] = None,
+                   scenarios: Optional[Dict] = None, graph: Optional[ScenarioGraph] = None):
+    """헤드리스 게임을 num_games회 진행하며 결과 요약을 순서대로 생성"""
+    if graph is None:
+        graph = compile_scenarios(scenarios) if scenarios is not None else KOICAGame.load_scenario_graph()
+    rng = random.Random(seed)
+    for _ in range(num_games):
+        yield HeadlessGame(policy=policy, rng=rng, graph=graph).run()
+
+
+# 스탯 히스토그램 구간 크기 (0-9, 10-19, ..., 100)
+STAT_BUCKET_SIZE = 10
+
+# 작업 프로세스별로 한 번만 로드/컴파일하는 시나리오 그래프
+_worker_graph = None
+
+
+def new_summary() -> Dict:
+    """빈 집계 결과 생성"""
+    return {
+        'games': 0,
+        'endings': Counter(),
+        'director_types': Counter(),
+        'stat_histograms': {},
+        'stat_sums': Counter()
+    }
+
+
+def add_result(summary: Dict, result: Dict):
+    """게임 결과 하나를 집계에 반영"""
+    summary['games'] += 1
+    summary['endings'][result['ending']] += 1
+    summary['director_types'][result['director_type']] += 1
+    for stat, value in result['stats'].items():
+        summary['stat_histograms'].setdefault(stat, Counter())[int(value) // STAT_BUCKET_SIZE * STAT_BUCKET_SIZE] += 1
+        summary['stat_sums'][stat] += value
+
+
+def merge_summaries(target: Dict, other: Dict) -> Dict:
+    """다른 집계 결과를 target에 병합"""
+    target['games'] += other['games']
+    target['endings'].update(other['endings'])
+    target['director_types'].update(other['director_types'])
+    for stat, histogram in other['stat_histograms'].items():
+        target['stat_histograms'].setdefault(stat, Counter()).update(histogram)
+    target['stat_sums'].update(other['stat_sums'])
+    return target
+
+
+def _init_worker():
+    """작업 프로세스 초기화 - 시나리오를 프로세스당 한 번만 로드/컴파일"""
+    global _worker_graph
+    _worker_graph = KOICAGame.load_scenario_graph()
+
+
+def _run_chunk(policy_name: str, num_games: int, seed: int) -> Dict:
+    """작업 프로세스에서 게임 묶음을 실행하고 집계 결과만 반환"""
+    summary = new_summary()
+    for result in simulate_games(num_games, POLICIES[policy_name], seed, graph=_worker_graph):
+        add_result(summary, result)
+    return summary
+
+
+def run_monte_carlo(num_games: int, policy_name: str = 'random', seed: Optional[int] = None,
+                    workers: Optional[int] = None, chunk_size: int = 2000) -> Dict:
+    """실제 게임 플레이를 여러 프로세스에 나누어 실행하고 집계 결과 병합
+
+    묶음마다 마스터 시드에서 파생한 독립 시드를 사용하므로,
+    같은 시드와 chunk_size라면 작업 프로세스 수와 관계없이 같은 결과를 얻습니다.
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"알 수 없는 선택 정책: {policy_name}")
+
+    seed_rng = random.Random(seed)
+    chunks = []
+    remaining = num_games
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append((size, seed_rng.getrandbits(64)))
+        remaining -= size
+
+    summary = new_summary()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker()
+        for size, chunk_seed in chunks:
+            merge_summaries(summary, _run_chunk(policy_name, size, chunk_seed))
+        return summary
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(_run_chunk, policy_name, size, chunk_seed) for size, chunk_seed in chunks]
+        for future in futures:
+            merge_summaries(summary, future.result())
+    return summary
+
+
+def print_summary(summary: Dict, elapsed: float):
+    """집계 결과 출력"""
+    games = summary['games']
+    print(f"🎲 {games:,}게임 완료 ({elapsed:.2f}초, 초당 {games / elapsed:,.0f}게임)\n")
+    print("🏁 엔딩 분포:")
+    for ending, count in summary['endings'].most_common():
+        print(f"   {str(ending):<28} {count / games * 100:>6.2f}%")
+    print("\n✨ 소장 유형 분포:")
+    for director_type, count in summary['director_types'].most_common():
+        print(f"   {director_type:<20} {count / games * 100:>6.2f}%")
+    print("\n📊 최종 스탯 평균:")
+    for stat, total in summary['stat_sums'].items():
+        print(f"   {stat:<24} {total / games:>6.1f}")
+
+
+def main():
+    """배치 시뮬레이션 실행 및 결과 요약 출력"""
+    parser = argparse.ArgumentParser(description='KOICA 소장 시뮬레이터 헤드리스 배치 실행')
+    parser.add_argument('--games', type=int, default=1000, help='플레이할 게임 수 (기본: 1000)')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random', help='선택 정책 (기본: random)')
+    parser.add_argument('--seed', type=int, default=None, help='난수 시드')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='작업 프로세스 수 (기본: CPU 코어 수, 1이면 단일 프로세스)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='작업 단위당 게임 수 (기본: 2000)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = run_monte_carlo(args.games, args.policy, args.seed, args.workers, args.chunk_size)
+    print_summary(summary, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
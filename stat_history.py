@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스탯 변화 히스토리 (열 지향 로그)
+update_stats 호출마다 스냅샷 딕셔너리 두 개를 쌓는 대신, 변화 전/후 스탯 값과 변화량을
+고정 폭 정수 배열에 이어 붙여 저장합니다. 기존 딕셔너리 형태는 필요할 때만 복원합니다.
+"""
+
+from array import array
+from typing import Dict, Iterator, Optional, Sequence
+
+from scenario_graph import STAT_DELTA_FIELDS, STAT_DELTA_WIDTH
+
+
+# GameState 스탯 벡터 필드 순서 (koica_game의 STAT_* 인덱스와 같음)
+STAT_VECTOR_FIELDS = (
+    'reputation',
+    'budget_personnel',
+    'budget_project',
+    'budget_operation',
+    'staff_morale',
+    'project_success',
+    'stress',
+    'wellbeing',
+)
+STAT_VECTOR_WIDTH = len(STAT_VECTOR_FIELDS)
+
+_BUDGET_FIELDS = (('인건비', 1), ('사업비', 2), ('운영비', 3))
+
+
+def _snapshot(values: Sequence[int], with_rates: bool) -> Dict:
+    """스탯 벡터 한 행을 기존 히스토리의 'old'/'new' 딕셔너리로 변환"""
+    personnel, project, operation = values[1], values[2], values[3]
+    snapshot = {
+        'reputation': values[0],
+        'budget_execution_rate': (personnel + project + operation) / 3,
+        'staff_morale': values[4],
+        'project_success': values[5],
+        'stress': values[6],
+        'wellbeing': values[7]
+    }
+    if with_rates:
+        snapshot['budget_execution_rates'] = {name: values[i] for name, i in _BUDGET_FIELDS}
+    return snapshot
+
+
+class StatHistory:
+    """스탯 변화 기록 (행마다 기간 인덱스, 변화 전/후 스탯 벡터, 변화량 벡터)
+
+    maxlen을 지정하면 최근 maxlen개만 유지하는 링 버퍼로 동작합니다.
+    """
+
+    __slots__ = ('maxlen', '_periods', '_old_values', '_values', '_deltas')
+
+    def __init__(self, maxlen: Optional[int] = None):
+        if maxlen is not None and maxlen <= 0:
+            raise ValueError("maxlen은 1 이상이어야 합니다.")
+        self.maxlen = maxlen
+        self._periods = array('H')     # (year - 1) * 6 + (period - 1)
+        self._old_values = array('h')  # 변화 전 스탯, 행마다 STAT_VECTOR_WIDTH칸
+        self._values = array('h')      # 변화 후 스탯, 행마다 STAT_VECTOR_WIDTH칸
+        self._deltas = array('h')      # 변화량, 행마다 STAT_DELTA_WIDTH칸 (STAT_DELTA_FIELDS 순서)
+
+    def append(self, year: int, period: int, old_stats: Sequence[int], stats: Sequence[int],
+               deltas: Sequence[int]):
+        """변화 전/후 스탯과 변화량 한 행 추가"""
+        self._periods.append((year - 1) * 6 + (period - 1))
+        self._old_values.extend(old_stats)
+        self._values.extend(stats)
+        self._deltas.extend(deltas)
+        if self.maxlen is not None and len(self._periods) >= 2 * self.maxlen:
+            self._drop_oldest(len(self._periods) - self.maxlen)
+
+    def _drop_oldest(self, count: int):
+        """오래된 기록 count개 삭제 (한 번에 묶어서 지워 상환 비용 O(1))"""
+        del self._periods[:count]
+        del self._old_values[:count * STAT_VECTOR_WIDTH]
+        del self._values[:count * STAT_VECTOR_WIDTH]
+        del self._deltas[:count * STAT_DELTA_WIDTH]
+
+    def _start(self) -> int:
+        """링 버퍼 모드에서 노출할 첫 행 (최근 maxlen개)"""
+        if self.maxlen is None:
+            return 0
+        return max(0, len(self._periods) - self.maxlen)
+
+    def __len__(self) -> int:
+        return len(self._periods) - self._start()
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index: int) -> Dict:
+        """index번째 기록을 기존 딕셔너리 형태로 복원 (year, period, changes, old, new)"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("stat history index out of range")
+        row = self._start() + index
+
+        old_values = self._old_values[row * STAT_VECTOR_WIDTH:(row + 1) * STAT_VECTOR_WIDTH]
+        new_values = self._values[row * STAT_VECTOR_WIDTH:(row + 1) * STAT_VECTOR_WIDTH]
+        deltas = self._deltas[row * STAT_DELTA_WIDTH:(row + 1) * STAT_DELTA_WIDTH]
+        period_index = self._periods[row]
+
+        return {
+            'year': period_index // 6 + 1,
+            'period': period_index % 6 + 1,
+            'changes': {field: delta for field, delta in zip(STAT_DELTA_FIELDS, deltas) if delta},
+            'old': _snapshot(old_values, with_rates=False),
+            'new': _snapshot(new_values, with_rates=True)
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, field: str) -> array:
+        """스탯 하나의 변화 후 값 배열 (STAT_VECTOR_FIELDS 중 하나)"""
+        offset = STAT_VECTOR_FIELDS.index(field)
+        start = self._start() * STAT_VECTOR_WIDTH
+        return self._values[start + offset::STAT_VECTOR_WIDTH]
+
+    def period_indices(self) -> array:
+        """각 기록의 통산 기간 인덱스 ((year - 1) * 6 + (period - 1))"""
+        return self._periods[self._start():]
+
+    def copy(self) -> 'StatHistory':
+        """독립적인 복사본 생성"""
+        clone = StatHistory(self.maxlen)
+        clone._periods = self._periods[:]
+        clone._old_values = self._old_values[:]
+        clone._values = self._values[:]
+        clone._deltas = self._deltas[:]
+        return clone
+
+    def to_dict(self) -> Dict:
+        """JSON으로 직렬화할 수 있는 딕셔너리 (세션 저장용, 노출 중인 최근 행만 포함)"""
+        start = self._start()
+        return {
+            'maxlen': self.maxlen,
+            'periods': self._periods[start:].tolist(),
+            'old': self._old_values[start * STAT_VECTOR_WIDTH:].tolist(),
+            'values': self._values[start * STAT_VECTOR_WIDTH:].tolist(),
+            'deltas': self._deltas[start * STAT_DELTA_WIDTH:].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, maxlen: Optional[int] = None) -> 'StatHistory':
+        """to_dict 결과로 기록 복원 (maxlen을 지정하면 저장된 상한 대신 사용)"""
+        history = cls(maxlen if maxlen is not None else data['maxlen'])
+        history._periods = array('H', data['periods'])
+        history._old_values = array('h', data['old'])
+        history._values = array('h', data['values'])
+        history._deltas = array('h', data['deltas'])
+        start = history._start()
+        if start:
+            history._drop_oldest(start)
+        return history
+
+    def clear(self):
+        """기록 전체 삭제"""
+        del self._periods[:]
+        del self._old_values[:]
+        del self._values[:]
+        del self._deltas[:]
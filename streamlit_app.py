@@ -7,20 +7,25 @@ KOICA 소장 시뮬레이터 - Streamlit Web Version
 
 import streamlit as st
 import json
+import os
 import sys
-import random
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 # Gemini API import (optional)
 try:
-    import google.generativeai as genai
+    from google import genai
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
 
 # Import game classes from original game
 # We'll need to refactor the classes to work with Streamlit's state management
-from koica_game import GameState, KOICAGame
+from koica_game import (EVENT_DELAYED_EFFECT, EVENT_DEPUTY, EVENT_LIFE, EVENT_NOTICE, GameState, KOICAGame,
+                        step, step_free_form)
+from scenario_graph import ScenarioGraph
+from scenario_prefetch import leads_to_ai_scenario
+from session_store import default_session_store, encode_session, new_session_id, valid_session_id
 
 
 def get_stat_grade(value):
@@ -111,6 +116,32 @@ st.markdown("""
         font-size: 0.9rem;
     }
 
+    /* 스탯 패널 (한 번에 그리는 HTML 막대) */
+    .stat-row {
+        margin: 0.4rem 0 0.8rem 0;
+    }
+
+    .stat-bar {
+        background-color: #e6e9ef;
+        border-radius: 0.25rem;
+        height: 0.5rem;
+        margin-top: 0.3rem;
+        overflow: hidden;
+    }
+
+    .stat-bar > div {
+        background-color: #1f77b4;
+        height: 100%;
+    }
+
+    .stat-warning {
+        background-color: #ffe3e3;
+        color: #a61b1b;
+        padding: 0.6rem 1rem;
+        border-radius: 0.5rem;
+        margin: 0.5rem 0;
+    }
+
     /* 로딩 인디케이터 */
     .loading-overlay {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -172,6 +203,18 @@ st.markdown("""
         text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
     }
 
+    /* AI 백엔드 장애 배지 */
+    .ai-degraded-badge {
+        background: #fff4e5;
+        border: 1px solid #f0ad4e;
+        color: #8a5a00;
+        padding: 0.5rem 1rem;
+        border-radius: 2rem;
+        display: inline-block;
+        font-size: 0.9rem;
+        margin-bottom: 0.5rem;
+    }
+
     /* 모바일에서 사이드바 숨기기 */
     @media (max-width: 768px) {
         .main {
@@ -216,6 +259,133 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# 웹 세션에서 보관할 스탯 변화 기록 수 (긴 AI 모드 세션의 메모리 상한)
+STAT_HISTORY_LIMIT = 200
+
+# 게임 화면 하단에 클릭당 스크립트 실행 횟수 표시 (KOICA_RUN_COUNTER=1)
+RUN_COUNTER_ENABLED = os.environ.get('KOICA_RUN_COUNTER') == '1'
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_shared_scenario_graph(source_signature) -> ScenarioGraph:
+    """서버 프로세스당 한 번만 로드하는 시나리오 그래프 (시나리오 파일이 바뀌면 다시 로드)"""
+    graph = KOICAGame.load_scenario_graph()
+    warm_scenario_card_cache(graph)
+    return graph
+
+
+def get_shared_scenario_graph() -> ScenarioGraph:
+    """모든 세션이 공유하는 읽기 전용 시나리오 그래프
+
+    세션마다 시나리오를 복사해 두지 않고 이 객체를 참조하므로,
+    세션별 메모리는 GameState와 UI 상태뿐입니다. 절대 수정하지 마세요.
+    """
+    st_result = os.stat('scenarios.json')
+    return _load_shared_scenario_graph((st_result.st_size, st_result.st_mtime_ns))
+
+
+# 세션 저장소에 함께 저장하는 화면 상태 (재시작/다른 복제본에서 이어서 플레이할 때 복원)
+PERSISTED_UI_KEYS = (
+    'current_screen', 'ai_mode', 'lifestyle_step', 'choice_made', 'result_message', 'stat_changes',
+    'last_choice_text', 'last_choice_idx', 'life_event_triggered', 'delayed_effects', 'event_notices',
+    'current_ai_scenario', 'free_form_mode', 'free_form_action', 'ai_ending_text',
+)
+
+# 세션 ID를 전달하는 URL 쿼리 파라미터 (새로고침/재접속 시 같은 세션을 찾음)
+SESSION_QUERY_PARAM = 'sid'
+
+
+def new_game(state: Optional[GameState] = None) -> KOICAGame:
+    """현재 모드와 API 키로 게임 인스턴스 생성 (state를 주면 복원한 상태로 이어서 진행)"""
+    api_key = st.session_state.get('api_key', None) if st.session_state.ai_mode else None
+    game = KOICAGame(ai_mode=st.session_state.ai_mode, api_key=api_key,
+                     graph=get_shared_scenario_graph(),
+                     stat_history_limit=STAT_HISTORY_LIMIT)
+    if state is not None:
+        game.state = state
+    return game
+
+
+def restore_session():
+    """브라우저 세션마다 한 번, URL의 세션 ID로 저장된 게임 진행 복원
+
+    저장소가 없거나 st.query_params를 지원하지 않는 Streamlit 버전에서는 아무것도 하지 않습니다.
+    AI 모드 세션은 API 키를 저장하지 않으므로 키를 다시 입력받은 뒤 저장된 화면으로 돌아갑니다.
+    """
+    if 'session_id' in st.session_state:
+        return
+    store = default_session_store()
+    query_params = getattr(st, 'query_params', None)
+    if store is None or query_params is None:
+        st.session_state.session_id = None
+        return
+
+    session_id = query_params.get(SESSION_QUERY_PARAM)
+    restored = None
+    if valid_session_id(session_id):
+        try:
+            restored = store.load(session_id, get_shared_scenario_graph(), STAT_HISTORY_LIMIT)
+        except Exception as e:
+            print(f"Warning: 세션을 복원할 수 없습니다: {e}")
+    else:
+        session_id = new_session_id()
+        query_params[SESSION_QUERY_PARAM] = session_id
+    st.session_state.session_id = session_id
+    st.session_state.saved_session = None
+
+    if restored is None or restored[0] is None:
+        return
+    state, ui = restored
+    for key in PERSISTED_UI_KEYS:
+        if key in ui:
+            st.session_state[key] = ui[key]
+    st.session_state.game = new_game(state)
+    if st.session_state.ai_mode and not st.session_state.get('api_key'):
+        st.session_state.resume_screen = st.session_state.current_screen
+        st.session_state.current_screen = 'ai_setup'
+
+
+def save_session():
+    """게임 진행을 세션 저장소에 기록 (마지막으로 저장한 내용과 같으면 건너뜀)
+
+    전체 실행과 게임 화면 fragment 실행이 끝날 때마다 호출합니다.
+    """
+    session_id = st.session_state.get('session_id')
+    if not session_id:
+        return
+    store = default_session_store()
+    game = st.session_state.game
+    try:
+        if game is None:
+            # 메인 메뉴로 돌아간 경우 저장된 진행 삭제
+            if st.session_state.saved_session is not None:
+                store.delete(session_id)
+                st.session_state.saved_session = None
+            return
+        ui = {key: st.session_state.get(key) for key in PERSISTED_UI_KEYS}
+        if st.session_state.get('resume_screen'):
+            ui['current_screen'] = st.session_state.resume_screen
+        blob = encode_session(game.state, ui, game.graph)
+        if blob != st.session_state.saved_session:
+            store.put(session_id, blob)
+            st.session_state.saved_session = blob
+    except Exception as e:
+        # 저장소 장애가 게임 진행을 막지 않도록 경고만 남김
+        print(f"Warning: 세션을 저장할 수 없습니다: {e}")
+
+
+def reset_session():
+    """저장된 진행을 지우고 세션 상태를 초기화 (같은 세션 ID로 새 게임 시작)"""
+    session_id = st.session_state.get('session_id')
+    if session_id:
+        try:
+            default_session_store().delete(session_id)
+        except Exception as e:
+            print(f"Warning: 세션을 삭제할 수 없습니다: {e}")
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+
+
 def initialize_session_state():
     """세션 상태 초기화"""
     if 'game' not in st.session_state:
@@ -236,80 +406,89 @@ def initialize_session_state():
         st.session_state.free_form_action = ""
     if 'is_generating_ai' not in st.session_state:
         st.session_state.is_generating_ai = False
-    if 'selected_choice_idx' not in st.session_state:
-        st.session_state.selected_choice_idx = None
-    if 'selected_scenario_id' not in st.session_state:
-        st.session_state.selected_scenario_id = None
+    if 'pending_free_form_action' not in st.session_state:
+        st.session_state.pending_free_form_action = None
+    if 'free_form_empty' not in st.session_state:
+        st.session_state.free_form_empty = False
+    if 'script_runs' not in st.session_state:
+        st.session_state.script_runs = 0
+        st.session_state.click_run_mark = 0
+        st.session_state.fragment_runs = 0
+        st.session_state.click_fragment_mark = 0
     if 'current_ai_scenario' not in st.session_state:
         st.session_state.current_ai_scenario = None
+    if 'ai_ending_text' not in st.session_state:
+        st.session_state.ai_ending_text = None
+
+
+def stats_key(state: GameState) -> Tuple:
+    """스탯 패널이 의존하는 상태 (이 값이 같으면 패널 HTML도 같음)"""
+    rates = state.budget_execution_rates
+    return (state.year, state.period, state.reputation, int(rates['인건비']), int(rates['사업비']),
+            int(rates['운영비']), state.staff_morale, state.project_success, state.stress, state.wellbeing)
+
+
+def _stat_row_html(label: str, value: int, extra: str = '') -> str:
+    width = max(0, min(100, value))
+    return (f'<div class="stat-row"><b>{label}</b>: {value}/100{extra}'
+            f'<div class="stat-bar"><div style="width: {width}%"></div></div></div>')
+
+
+@lru_cache(maxsize=512)
+def _stats_panel_html(key: Tuple) -> Tuple[str, str]:
+    """스탯 패널의 두 열 HTML (스탯 조합별로 한 번만 만듦)
+
+    스탯마다 markdown/progress 요소를 따로 보내지 않고 열마다 HTML 하나로 보내므로,
+    상호작용마다 전송하는 요소 수와 크기가 줄어듭니다.
+    """
+    (year, period, reputation, personnel, project, operation,
+     staff_morale, project_success, stress, wellbeing) = key
+    avg_budget = int((personnel + project + operation) / 3)
+
+    core = ''.join((
+        '<h3>📊 핵심 지표</h3>',
+        _stat_row_html('평판', reputation),
+        _stat_row_html('예산 집행률(평균)', avg_budget,
+                       f'<br><small>인건비: {personnel}/100 | 사업비: {project}/100 | 운영비: {operation}/100</small>'),
+        _stat_row_html('직원 만족도', staff_morale),
+        _stat_row_html('프로젝트 성공도', project_success),
+    ))
+
+    period_months = {
+        1: "1-2월", 2: "3-4월", 3: "5-6월",
+        4: "7-8월", 5: "9-10월", 6: "11-12월"
+    }
+    period_str = period_months.get(period, f"{period}기")
+
+    # 경고 표시
+    warnings = []
+    if reputation <= 20:
+        warnings.append("⚠️ 평판 위기!")
+    if staff_morale <= 20:
+        warnings.append("⚠️ 직원 사기 저하!")
+    if stress >= 80:
+        warnings.append("⚠️ 스트레스 과다!")
+    if wellbeing <= 20:
+        warnings.append("⚠️ 건강 위험!")
+
+    personal = ''.join((
+        '<h3>🏥 개인 상태</h3>',
+        _stat_row_html('스트레스', stress),
+        _stat_row_html('웰빙', wellbeing),
+        f'<p><b>📅 {year}년차 {period_str}</b></p>',
+        ''.join(f'<div class="stat-warning">{warning}</div>' for warning in warnings),
+    ))
+    return core, personal
 
 
 def display_stats(state: GameState):
     """스탯 표시"""
+    core, personal = _stats_panel_html(stats_key(state))
     col1, col2 = st.columns(2)
-
     with col1:
-        st.markdown("### 📊 핵심 지표")
-
-        # 평판
-        rep_color = "normal" if state.reputation > 30 else "inverse"
-        st.markdown(f"**평판**: {state.reputation}/100")
-        st.progress(state.reputation / 100)
-
-        # 예산 집행률 (세목별)
-        budget_color = "normal"
-        avg_budget = int(state.budget_execution_rate)
-        st.markdown(f"**예산 집행률(평균)**: {avg_budget}/100")
-        st.progress(avg_budget / 100)
-        st.markdown(f"<small>인건비: {int(state.budget_execution_rates['인건비'])}/100 | "
-                   f"사업비: {int(state.budget_execution_rates['사업비'])}/100 | "
-                   f"운영비: {int(state.budget_execution_rates['운영비'])}/100</small>",
-                   unsafe_allow_html=True)
-
-        # 직원 만족도
-        morale_color = "normal" if state.staff_morale > 30 else "inverse"
-        st.markdown(f"**직원 만족도**: {state.staff_morale}/100")
-        st.progress(state.staff_morale / 100)
-
-        # 프로젝트 성공도
-        st.markdown(f"**프로젝트 성공도**: {state.project_success}/100")
-        st.progress(state.project_success / 100)
-
+        st.markdown(core, unsafe_allow_html=True)
     with col2:
-        st.markdown("### 🏥 개인 상태")
-
-        # 스트레스
-        stress_color = "inverse" if state.stress > 70 else "normal"
-        st.markdown(f"**스트레스**: {state.stress}/100")
-        st.progress(state.stress / 100)
-
-        # 웰빙
-        wellbeing_color = "normal" if state.wellbeing > 30 else "inverse"
-        st.markdown(f"**웰빙**: {state.wellbeing}/100")
-        st.progress(state.wellbeing / 100)
-
-        # 시간
-        period_months = {
-            1: "1-2월", 2: "3-4월", 3: "5-6월",
-            4: "7-8월", 5: "9-10월", 6: "11-12월"
-        }
-        period_str = period_months.get(state.period, f"{state.period}기")
-        st.markdown(f"**📅 {state.year}년차 {period_str}**")
-
-        # 경고 표시
-        warnings = []
-        if state.reputation <= 20:
-            warnings.append("⚠️ 평판 위기!")
-        if state.staff_morale <= 20:
-            warnings.append("⚠️ 직원 사기 저하!")
-        if state.stress >= 80:
-            warnings.append("⚠️ 스트레스 과다!")
-        if state.wellbeing <= 20:
-            warnings.append("⚠️ 건강 위험!")
-
-        if warnings:
-            for warning in warnings:
-                st.error(warning)
+        st.markdown(personal, unsafe_allow_html=True)
 
 
 def welcome_screen():
@@ -368,7 +547,7 @@ def welcome_screen():
                 st.session_state.current_screen = 'ai_setup'
                 st.rerun()
         else:
-            st.button("🤖 AI 모드\n\n(google-generativeai 설치 필요)", key="ai_mode_disabled", disabled=True, use_container_width=True)
+            st.button("🤖 AI 모드\n\n(google-genai 설치 필요)", key="ai_mode_disabled", disabled=True, use_container_width=True)
 
 
 def ai_setup_screen():
@@ -389,14 +568,22 @@ def ai_setup_screen():
         if st.button("시작하기", use_container_width=True):
             if api_key:
                 st.session_state.api_key = api_key
-                st.session_state.current_screen = 'game_intro'
+                resume_screen = st.session_state.pop('resume_screen', None)
+                if resume_screen and st.session_state.game is not None:
+                    # 복원한 AI 모드 세션: 새 키로 게임을 다시 만들고 저장된 화면으로 돌아감
+                    st.session_state.game = new_game(st.session_state.game.state)
+                    st.session_state.current_screen = resume_screen
+                else:
+                    st.session_state.current_screen = 'game_intro'
                 st.rerun()
             else:
                 st.error("API 키를 입력해주세요.")
 
     with col2:
         if st.button("뒤로 가기", use_container_width=True):
+            st.session_state.pop('resume_screen', None)
             st.session_state.current_screen = 'welcome'
+            st.session_state.game = None
             st.rerun()
 
 
@@ -421,10 +608,10 @@ def game_intro_screen():
 
     if st.button("게임 시작하기", use_container_width=True):
         # 게임 인스턴스 생성
-        api_key = st.session_state.get('api_key', None) if st.session_state.ai_mode else None
-        st.session_state.game = KOICAGame(ai_mode=st.session_state.ai_mode, api_key=api_key)
+        st.session_state.game = new_game()
         st.session_state.current_screen = 'lifestyle_setup'
         st.session_state.lifestyle_step = 0
+        st.session_state.ai_ending_text = None
         st.rerun()
 
 
@@ -559,6 +746,68 @@ def lifestyle_setup_screen():
             st.rerun()
 
 
+# 시나리오 비주얼 스타일 (분류 결과 -> 이모지/그라디언트/테두리 색상)
+SCENARIO_VISUAL_STYLES = {
+    'crisis': {
+        'emoji': '🚨',
+        'gradient': 'linear-gradient(135deg, #ff6b6b 0%, #c92a2a 100%)',
+        'border_color': '#c92a2a'
+    },
+    'positive_ending': {
+        'emoji': '🎉',
+        'gradient': 'linear-gradient(135deg, #51cf66 0%, #2f9e44 100%)',
+        'border_color': '#2f9e44'
+    },
+    'negative_ending': {
+        'emoji': '💔',
+        'gradient': 'linear-gradient(135deg, #868e96 0%, #495057 100%)',
+        'border_color': '#495057'
+    },
+    'life_event': {
+        'emoji': '⭐',
+        'gradient': 'linear-gradient(135deg, #a78bfa 0%, #7c3aed 100%)',
+        'border_color': '#7c3aed'
+    },
+    'start': {
+        'emoji': '🌍',
+        'gradient': 'linear-gradient(135deg, #339af0 0%, #1864ab 100%)',
+        'border_color': '#1864ab'
+    },
+    'routine': {
+        'emoji': '📋',
+        'gradient': 'linear-gradient(135deg, #748ffc 0%, #5c7cfa 100%)',
+        'border_color': '#5c7cfa'
+    },
+}
+
+# 위기/문제 상황 키워드
+CRISIS_KEYWORDS = ('위기', '갈등', '문제', '충돌', '압력', '긴급', '비상', '파탄', '붕괴', '번아웃')
+# 긍정적 엔딩 키워드
+POSITIVE_ENDING_KEYWORDS = ('성공', '승진', '완료', '달성', '전문가', '변화')
+
+# 렌더된 시나리오 카드 HTML 캐시 크기 (클래식 시나리오 전체 + 최근 AI 시나리오)
+SCENARIO_CARD_CACHE_SIZE = 256
+
+
+def classify_scenario_style(scenario_id: str, title: str, description: str) -> str:
+    """시나리오 ID와 제목/설명 키워드로 비주얼 스타일 분류 (SCENARIO_VISUAL_STYLES의 키)"""
+    # 제목과 설명을 한 번만 소문자로 바꿔 함께 검사
+    text = f"{title}\n{description}".lower()
+
+    if any(keyword in text for keyword in CRISIS_KEYWORDS):
+        return 'crisis'
+    if scenario_id.startswith('ending_'):
+        if any(keyword in text for keyword in POSITIVE_ENDING_KEYWORDS):
+            return 'positive_ending'
+        return 'negative_ending'
+    if scenario_id.startswith('life_event_'):
+        return 'life_event'
+    if scenario_id == 'start':
+        return 'start'
+    # 기본 (일상적인 업무)
+    return 'routine'
+
+
 def get_scenario_visual_style(scenario_id: str, scenario: dict) -> dict:
     """시나리오 ID와 내용을 기반으로 비주얼 스타일 반환
 
@@ -569,115 +818,139 @@ def get_scenario_visual_style(scenario_id: str, scenario: dict) -> dict:
             'border_color': 테두리 색상
         }
     """
-    # 키워드 기반 분류
-    title_lower = scenario.get('title', '').lower()
-    desc_lower = scenario.get('description', '').lower()
-
-    # 위기/문제 상황
-    crisis_keywords = ['위기', '갈등', '문제', '충돌', '압력', '긴급', '비상', '파탄', '붕괴', '번아웃']
-    if any(keyword in title_lower or keyword in desc_lower for keyword in crisis_keywords):
-        return {
-            'emoji': '🚨',
-            'gradient': 'linear-gradient(135deg, #ff6b6b 0%, #c92a2a 100%)',
-            'border_color': '#c92a2a'
-        }
+    category = classify_scenario_style(scenario_id, scenario.get('title', ''), scenario.get('description', ''))
+    return SCENARIO_VISUAL_STYLES[category]
 
-    # 엔딩 (긍정적)
-    positive_ending_keywords = ['성공', '승진', '완료', '달성', '전문가', '변화']
-    if scenario_id.startswith('ending_') and any(keyword in title_lower or keyword in desc_lower for keyword in positive_ending_keywords):
-        return {
-            'emoji': '🎉',
-            'gradient': 'linear-gradient(135deg, #51cf66 0%, #2f9e44 100%)',
-            'border_color': '#2f9e44'
-        }
 
-    # 엔딩 (부정적)
-    if scenario_id.startswith('ending_'):
-        return {
-            'emoji': '💔',
-            'gradient': 'linear-gradient(135deg, #868e96 0%, #495057 100%)',
-            'border_color': '#495057'
-        }
+def _scenario_badge_html(scenario_id: str, scenario: dict) -> str:
+    """시나리오 제목 컬러 배지 HTML"""
+    visual_style = get_scenario_visual_style(scenario_id, scenario)
+    return f"""
+    <div style="background: {visual_style['gradient']};
+                padding: 2rem 1.5rem;
+                border-radius: 1rem;
+                text-align: center;
+                margin: 1rem 0 2rem 0;
+                box-shadow: 0 4px 15px rgba(0,0,0,0.15);
+                border: 3px solid {visual_style['border_color']};">
+        <div style="font-size: 3.5rem; margin-bottom: 0.5rem;">
+            {visual_style['emoji']}
+        </div>
+        <h2 style="color: white; margin: 0; font-size: 1.6rem; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">
+            {scenario['title']}
+        </h2>
+    </div>
+    """
 
-    # 생활 이벤트
-    if scenario_id.startswith('life_event_'):
-        return {
-            'emoji': '⭐',
-            'gradient': 'linear-gradient(135deg, #a78bfa 0%, #7c3aed 100%)',
-            'border_color': '#7c3aed'
-        }
 
-    # 시작
-    if scenario_id == 'start':
-        return {
-            'emoji': '🌍',
-            'gradient': 'linear-gradient(135deg, #339af0 0%, #1864ab 100%)',
-            'border_color': '#1864ab'
-        }
+@lru_cache(maxsize=SCENARIO_CARD_CACHE_SIZE)
+def _scenario_card_html(scenario_id: str, title: str, description: str) -> str:
+    """시나리오 카드(컬러 배지 + 설명) HTML
 
-    # 기본 (일상적인 업무)
-    return {
-        'emoji': '📋',
-        'gradient': 'linear-gradient(135deg, #748ffc 0%, #5c7cfa 100%)',
-        'border_color': '#5c7cfa'
-    }
+    시나리오 내용 자체가 키이므로 같은 시나리오는 서버 프로세스 전체에서 한 번만 분류/렌더하고,
+    내용이 바뀐 시나리오는 새 항목으로 계산됩니다. 클래식 시나리오는 로드할 때 미리 채워 두고
+    (warm_scenario_card_cache), AI 시나리오는 처음 화면에 표시될 때 한 번 계산됩니다.
+    """
+    return _scenario_badge_html(scenario_id, {'title': title, 'description': description}) + f"""
+    <div class="scenario-text">
+    {description}
+    </div>
+    """
 
 
-def game_play_screen():
-    """게임 플레이 화면"""
-    game = st.session_state.game
-    state = game.state
+def scenario_card_html(scenario_id: str, scenario: dict) -> str:
+    """캐시된 시나리오 카드 HTML"""
+    return _scenario_card_html(scenario_id, scenario.get('title', ''), scenario.get('description', ''))
 
-    # 선택 처리 (세션 상태에서 선택 인덱스 확인)
-    if hasattr(st.session_state, 'selected_choice_idx') and st.session_state.selected_choice_idx is not None:
-        selected_idx = st.session_state.selected_choice_idx
-        selected_scenario_id = st.session_state.selected_scenario_id
 
-        # 현재 시나리오 가져오기 - selected_scenario_id 기준으로 확인
-        if st.session_state.ai_mode and selected_scenario_id == 'ai_generated':
-            # AI 생성 시나리오인 경우, 세션 상태에서 가져오기
-            scenario = st.session_state.current_ai_scenario
-            if not scenario:
-                st.error("AI 시나리오를 찾을 수 없습니다. 다시 시도해주세요.")
-                st.session_state.selected_choice_idx = None
-                st.session_state.selected_scenario_id = None
-                st.rerun()
-                return
-        else:
-            scenario = game.scenarios.get(selected_scenario_id)
+def warm_scenario_card_cache(graph: ScenarioGraph):
+    """클래식 시나리오의 카드 HTML을 미리 계산"""
+    for scenario_id, scenario in zip(graph.ids, graph.scenarios):
+        if 'title' in scenario:
+            scenario_card_html(scenario_id, scenario)
 
-        if scenario and 'choices' in scenario and selected_idx < len(scenario['choices']):
-            choice = scenario['choices'][selected_idx]
 
-            # 선택한 텍스트와 결과 메시지를 로깅 (디버깅용)
-            st.session_state.last_choice_idx = selected_idx
-            st.session_state.last_choice_text = choice.get('text', '')
+def _scenario_preview_html(scenario_id: str, fields: dict) -> str:
+    """스트리밍 중인 AI 시나리오 미리보기 HTML (제목/설명 중 완성된 부분만)"""
+    html = _scenario_badge_html(scenario_id, {'title': fields.get('title', '...'),
+                                              'description': fields.get('description', '')})
+    if 'description' in fields:
+        html += f"""
+    <div class="scenario-text">
+    {fields['description']}
+    </div>
+    """
+    html += """
+    <p style="text-align: center; color: #5c7cfa;">🤖 선택지를 준비하고 있습니다...</p>
+    """
+    return html
 
-            # 선택 처리
-            handle_choice(game, choice, selected_scenario_id)
 
-        # 선택 상태 초기화
-        st.session_state.selected_choice_idx = None
-        st.session_state.selected_scenario_id = None
-        st.rerun()
-        return
+def _ai_degraded_badge_html(status: dict) -> str:
+    """AI 백엔드 장애(회로 차단기 open/half_open) 안내 배지"""
+    if status['state'] == 'open':
+        detail = f"약 {int(status['retry_in']) + 1}초 후 다시 연결을 시도합니다"
+    else:
+        detail = "AI 서버 연결을 확인하는 중입니다"
+    return f'<div class="ai-degraded-badge">⚠️ AI 오프라인 모드 · 준비된 시나리오로 진행 중 ({detail})</div>'
 
-    # 게임 오버 체크
-    if state.game_over:
-        st.session_state.current_screen = 'game_over'
-        st.rerun()
-        return
 
-    # 2년 완료 체크
-    if state.year > 2:
-        st.session_state.current_screen = 'ending'
-        st.rerun()
+# st.fragment가 없는 Streamlit 버전(1.37 미만)에서는 일반 함수로 그림 (매번 전체 실행)
+_fragment = getattr(st, 'fragment', None) or (lambda func: func)
+
+
+@_fragment
+def game_play_screen():
+    """게임 플레이 화면 fragment - 스탯 패널과 시나리오 카드(결과 메시지, 시나리오 설명, 선택지, 자유 답변)
+
+    화면 안의 버튼(선택지, '다음으로', 자유 답변)은 이 fragment만 다시 실행하며, 선택으로 바뀐 스탯과
+    다음 시나리오(또는 게임 오버/엔딩 화면)를 그 한 번의 실행에서 함께 그립니다.
+    fragment만 다시 실행될 때도 진행이 저장되도록 끝에서 세션을 저장합니다.
+    """
+    _game_play_body()
+    save_session()
+
+
+def _game_play_body():
+    st.session_state.fragment_runs += 1
+    game = st.session_state.game
+    # 스탯 패널 자리 (자유 답변 결과까지 반영한 스탯을 아래에서 채움)
+    stats_area = st.container()
+
+    # 자유 답변 실행 (버튼 콜백이 남긴 행동을 이번 실행에서 처리, 진행 표시는 카드 자리에 그림)
+    action = st.session_state.pending_free_form_action
+    if action:
+        st.session_state.pending_free_form_action = None
+        if handle_free_form_action(game, action):
+            st.session_state.free_form_mode = False
+            st.session_state.free_form_action = ""
+        else:
+            # 실패 시 입력 내용을 유지하여 다시 입력할 수 있도록 (에러 메시지는 위에 표시됨)
+            st.session_state.free_form_action = action
+
+    # 게임이 끝났으면 종료 화면으로 (전체를 다시 실행하지 않고 이번 실행에서 바로 그림)
+    # 임기를 마친 경우 step이 game_over와 최종 엔딩을 함께 설정하므로 2년 완료를 먼저 확인
+    state = game.state
+    if st.session_state.current_screen == 'game_play':
+        if state.year > 2:
+            st.session_state.current_screen = 'ending'
+        elif state.game_over:
+            st.session_state.current_screen = 'game_over'
+    if st.session_state.current_screen == 'ending':
+        ending_screen()
+        return
+    if st.session_state.current_screen == 'game_over':
+        game_over_screen()
         return
 
-    # 스탯 표시
-    display_stats(state)
+    with stats_area:
+        display_stats(state)
+        st.markdown("---")
 
-    st.markdown("---")
+    # AI 백엔드 장애 시 기다리게 하지 않고 오프라인 폴백 중임을 표시
+    ai_degraded = st.session_state.ai_mode and game.gemini is not None and game.gemini.degraded
+    if ai_degraded:
+        st.markdown(_ai_degraded_badge_html(game.gemini.backend_status()), unsafe_allow_html=True)
 
     # 결과 메시지 표시
     if st.session_state.result_message:
@@ -752,6 +1025,12 @@ def game_play_screen():
                             else:
                                 st.markdown(f"• {stat_name}: **{change}** {grade}")
 
+        # 생활 습관 효과 등 알림 표시
+        if st.session_state.get('event_notices'):
+            for notice in st.session_state.event_notices:
+                st.success(notice)
+            st.session_state.event_notices = None
+
         # 고급 기능: delayed effects 표시
         if hasattr(st.session_state, 'delayed_effects') and st.session_state.delayed_effects:
             st.markdown("---")
@@ -759,14 +1038,8 @@ def game_play_screen():
                 st.info(f"⏰ **과거 선택의 장기 영향:** {effect.get('message', '')}")
             st.session_state.delayed_effects = None
 
-        if st.button("다음으로", use_container_width=True):
-            st.session_state.result_message = ""
-            st.session_state.stat_changes = {}
-            st.session_state.choice_made = False
-            # AI 시나리오 초기화 (새로운 시나리오를 위해)
-            st.session_state.current_ai_scenario = None
-            st.rerun()
-
+        st.button("다음으로", use_container_width=True, on_click=_on_result_next)
+        _show_run_counter()
         return
 
     # 현재 시나리오 가져오기
@@ -786,33 +1059,42 @@ def game_play_screen():
             scenario = st.session_state.current_ai_scenario
         else:
             # 새로운 AI 시나리오 생성
-            # 로딩 인디케이터 표시
-            st.markdown("""
-            <div class="loading-overlay">
-                <div class="loading-spinner"></div>
-                <div class="loading-text">🤖 AI가 맞춤형 시나리오를 생성중입니다</div>
-                <div class="loading-subtext">플레이어의 선택을 분석하여 최적의 시나리오를 준비하고 있습니다...</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # AI 시나리오 생성
-            scenario = game.gemini.generate_scenario(state)
+            # 로딩 인디케이터 표시 (제목/설명이 스트리밍으로 도착하면 미리보기로 교체)
+            loading_placeholder = st.empty()
+            if not ai_degraded:
+                loading_placeholder.markdown("""
+                <div class="loading-overlay">
+                    <div class="loading-spinner"></div>
+                    <div class="loading-text">🤖 AI가 맞춤형 시나리오를 생성중입니다</div>
+                    <div class="loading-subtext">플레이어의 선택을 분석하여 최적의 시나리오를 준비하고 있습니다...</div>
+                </div>
+                """, unsafe_allow_html=True)
+            preview_placeholder = st.empty()
+
+            def show_partial_scenario(fields):
+                loading_placeholder.empty()
+                preview_placeholder.markdown(_scenario_preview_html(current_scenario_id, fields),
+                                             unsafe_allow_html=True)
+
+            # AI 시나리오 생성 (이전 시나리오를 읽는 동안 미리 생성한 결과가 있으면 사용)
+            prefetcher = getattr(game, 'prefetcher', None)
+            scenario = prefetcher.take(state) if prefetcher else None
+            theme = game.gemini.pick_theme()
+            if not scenario:
+                scenario = game.gemini.generate_scenario(state, on_partial=show_partial_scenario, theme=theme)
+
+            # 미리보기 제거 (아래에서 완성된 시나리오를 다시 그림)
+            loading_placeholder.empty()
+            preview_placeholder.empty()
 
             if not scenario:
-                st.warning("AI 시나리오 생성 실패. 기본 시나리오를 사용합니다.")
-                # 폴백: 랜덤 시나리오 선택
-                fallback_scenarios = ['budget_crisis_1', 'cultural_conflict', 'staff_problem_1']
-                available_fallbacks = [s for s in fallback_scenarios if s in game.scenarios]
-                if available_fallbacks:
-                    current_scenario_id = random.choice(available_fallbacks)
-                    scenario = game.scenarios.get(current_scenario_id)
-                else:
-                    # 모든 폴백이 없으면 아무 시나리오나 선택
-                    current_scenario_id = random.choice([s for s in game.scenarios.keys()
-                                                         if not s.startswith("ending_") and s != "start"])
-                    scenario = game.scenarios.get(current_scenario_id)
-            else:
-                # AI 생성 시나리오를 세션 상태에 저장
+                if not game.gemini.degraded:
+                    st.warning("AI 시나리오 생성 실패. 기본 시나리오를 사용합니다.")
+                # 폴백: 같은 테마의 클래식 시나리오 (AI 시나리오처럼 다음 AI 시나리오로 이어짐)
+                _, scenario = game.fallback_ai_scenario(theme)
+
+            if scenario:
+                # AI 생성(또는 폴백) 시나리오를 세션 상태에 저장
                 st.session_state.current_ai_scenario = scenario
     else:
         scenario = game.scenarios.get(current_scenario_id)
@@ -836,44 +1118,18 @@ def game_play_screen():
         </div>
         """, unsafe_allow_html=True)
 
-    # 시나리오 비주얼 스타일 가져오기
-    visual_style = get_scenario_visual_style(current_scenario_id, scenario)
-
-    # 컬러 배지 표시
-    st.markdown(f"""
-    <div style="background: {visual_style['gradient']};
-                padding: 2rem 1.5rem;
-                border-radius: 1rem;
-                text-align: center;
-                margin: 1rem 0 2rem 0;
-                box-shadow: 0 4px 15px rgba(0,0,0,0.15);
-                border: 3px solid {visual_style['border_color']};">
-        <div style="font-size: 3.5rem; margin-bottom: 0.5rem;">
-            {visual_style['emoji']}
-        </div>
-        <h2 style="color: white; margin: 0; font-size: 1.6rem; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">
-            {scenario['title']}
-        </h2>
-    </div>
-    """, unsafe_allow_html=True)
+    # 시나리오 비주얼 스타일에 맞춘 컬러 배지와 설명 (캐시된 HTML)
+    st.markdown(scenario_card_html(current_scenario_id, scenario), unsafe_allow_html=True)
 
-    # 시나리오 설명
-    st.markdown(f"""
-    <div class="scenario-text">
-    {scenario['description']}
-    </div>
-    """, unsafe_allow_html=True)
+    # 플레이어가 읽고 고르는 동안 다음 AI 시나리오 생성 시작 (같은 상태면 재실행해도 한 번만)
+    prefetcher = getattr(game, 'prefetcher', None)
+    if st.session_state.ai_mode and prefetcher and leads_to_ai_scenario(scenario):
+        prefetcher.start(state)
 
     # 엔딩 시나리오 처리 (choices가 없는 경우)
     if 'choices' not in scenario:
         st.markdown("---")
-        if st.button("다음으로", use_container_width=True):
-            # 게임 오버 상태인지 확인
-            if state.check_game_over():
-                st.session_state.current_screen = 'game_over'
-            else:
-                st.session_state.current_screen = 'ending'
-            st.rerun()
+        st.button("다음으로", use_container_width=True, on_click=_on_ending_scenario_next)
         return
 
     # 자유 답변 모드 처리
@@ -881,32 +1137,16 @@ def game_play_screen():
         st.markdown("### 💡 자유 답변 모드")
         st.markdown("원하는 행동을 자유롭게 입력하세요. 예: '현지 부족장들과 직접 만나 대화한다', '직원들과 회의를 소집한다' 등")
 
-        action = st.text_area("행동:", value=st.session_state.free_form_action, key="free_action_input", height=100)
+        st.text_area("행동:", value=st.session_state.free_form_action, key="free_action_input", height=100)
+        if st.session_state.free_form_empty:
+            st.error("행동을 입력해주세요.")
+            st.session_state.free_form_empty = False
 
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("실행", use_container_width=True):
-                if action.strip():
-                    # 자유 답변 처리
-                    success = handle_free_form_action(game, action.strip())
-                    if success:
-                        # 성공 시에만 자유 답변 모드 종료
-                        st.session_state.free_form_mode = False
-                        st.session_state.free_form_action = ""
-                        st.rerun()
-                    else:
-                        # 실패 시 입력 내용 유지하여 다시 입력할 수 있도록
-                        # st.rerun()을 호출하지 않아 에러 메시지가 표시됨
-                        st.session_state.free_form_mode = True
-                        st.session_state.free_form_action = action
-                else:
-                    st.error("행동을 입력해주세요.")
-
+            st.button("실행", use_container_width=True, on_click=_on_free_form_submit)
         with col2:
-            if st.button("취소", use_container_width=True):
-                st.session_state.free_form_mode = False
-                st.session_state.free_form_action = ""
-                st.rerun()
+            st.button("취소", use_container_width=True, on_click=_on_free_form_cancel)
 
         return
 
@@ -916,20 +1156,108 @@ def game_play_screen():
     for idx, choice in enumerate(scenario['choices']):
         button_text = f"{idx + 1}. {choice['text']}"
 
-        # 선택지 버튼
+        # 선택지 버튼 (선택은 콜백에서 처리하므로 클릭 한 번에 스크립트는 한 번만 실행됨)
         with st.container():
-            if st.button(button_text, key=f"choice_{idx}", use_container_width=True):
-                # 선택 인덱스를 세션 상태에 저장
-                st.session_state.selected_choice_idx = idx
-                st.session_state.selected_scenario_id = current_scenario_id
-                st.rerun()
+            st.button(button_text, key=f"choice_{idx}", use_container_width=True,
+                      on_click=_on_choice, args=(current_scenario_id, idx, state.current_scenario))
 
     # AI 모드에서만 자유 답변 버튼 표시
     if st.session_state.ai_mode and game.gemini and game.gemini.enabled:
         st.markdown("---")
-        if st.button("💡 자유롭게 답변하기 (AI)", use_container_width=True):
-            st.session_state.free_form_mode = True
-            st.rerun()
+        st.button("💡 자유롭게 답변하기 (AI)", use_container_width=True, disabled=ai_degraded,
+                  help="AI 서버가 회복되면 다시 사용할 수 있습니다" if ai_degraded else None,
+                  on_click=_on_free_form_open)
+
+    _show_run_counter()
+
+
+# ============================================================
+# 게임 화면 버튼 콜백 (on_click)
+# 콜백은 다음 스크립트 실행이 시작되기 전에 호출되므로, 상태를 여기서 바꾸면
+# st.rerun() 없이 그 한 번의 실행에서 바뀐 화면을 그립니다.
+# ============================================================
+
+def _mark_click():
+    """클릭 시점의 스크립트 실행 횟수 기록 (이후 늘어난 횟수 = 클릭 한 번에 든 실행 수)"""
+    st.session_state.click_run_mark = st.session_state.script_runs
+    st.session_state.click_fragment_mark = st.session_state.fragment_runs
+
+
+def _on_choice(scenario_id: str, choice_index: int, state_scenario_id: str):
+    """선택지 버튼 콜백 - 표시했던 시나리오의 선택지를 전이 엔진으로 처리
+
+    state_scenario_id는 버튼을 그릴 때의 game.state.current_scenario입니다 (임기 마지막의 AI 모드처럼
+    표시한 시나리오 ID와 다를 수 있음).
+    """
+    _mark_click()
+    game = st.session_state.game
+    # 버튼 인자는 이전 화면의 값이므로, 그 사이 선택이 처리되어 결과를 표시 중이거나 상태가 다음
+    # 시나리오/이벤트로 넘어갔으면 무시 (빠른 중복 클릭이 같은 선택을 두 번 적용하지 않도록)
+    if state_scenario_id != game.state.current_scenario or st.session_state.result_message:
+        return
+    if st.session_state.ai_mode and scenario_id == 'ai_generated':
+        # AI 생성 시나리오는 화면에 표시했던 것과 같은 객체를 사용
+        scenario = st.session_state.current_ai_scenario
+    else:
+        scenario = game.scenarios.get(scenario_id)
+    if not scenario or choice_index >= len(scenario.get('choices', ())):
+        return
+
+    choice = scenario['choices'][choice_index]
+    st.session_state.last_choice_idx = choice_index
+    st.session_state.last_choice_text = choice.get('text', '')
+    handle_choice(game, scenario, scenario_id, choice_index)
+
+
+def _on_result_next():
+    """결과 화면의 '다음으로' - 결과 표시를 지우고 다음 시나리오로"""
+    _mark_click()
+    st.session_state.result_message = ""
+    st.session_state.stat_changes = {}
+    st.session_state.choice_made = False
+    # AI 시나리오 초기화 (새로운 시나리오를 위해)
+    st.session_state.current_ai_scenario = None
+
+
+def _on_ending_scenario_next():
+    """엔딩 시나리오의 '다음으로' - 게임 오버 상태에 따라 결과 화면 선택"""
+    _mark_click()
+    state = st.session_state.game.state
+    st.session_state.current_screen = 'game_over' if state.check_game_over() else 'ending'
+
+
+def _on_free_form_open():
+    _mark_click()
+    st.session_state.free_form_mode = True
+
+
+def _on_free_form_submit():
+    """자유 답변 '실행' - AI 호출은 진행 표시를 그릴 수 있도록 다음 실행의 화면 코드에서 처리"""
+    _mark_click()
+    action = st.session_state.free_action_input.strip()
+    if action:
+        st.session_state.pending_free_form_action = action
+    else:
+        st.session_state.free_form_empty = True
+
+
+def _on_free_form_cancel():
+    _mark_click()
+    st.session_state.free_form_mode = False
+    st.session_state.free_form_action = ""
+
+
+def _show_run_counter():
+    """마지막 클릭 이후 실행 횟수 표시 (RUN_COUNTER_ENABLED일 때)
+
+    전체 실행은 스크립트 전체, 부분 실행은 게임 화면 fragment만 다시 실행한 횟수입니다.
+    fragment는 전체 실행 때마다 한 번씩 함께 실행되므로 그만큼을 빼서 셉니다.
+    """
+    if RUN_COUNTER_ENABLED:
+        full = st.session_state.script_runs - st.session_state.click_run_mark
+        partial = st.session_state.fragment_runs - st.session_state.click_fragment_mark - full
+        st.caption(f"⏱️ 마지막 클릭 이후 전체 실행 {full}회 · 부분 실행 {partial}회 "
+                   f"(누적 전체 {st.session_state.script_runs}회)")
 
 
 def handle_free_form_action(game: KOICAGame, action: str) -> bool:
@@ -943,8 +1271,9 @@ def handle_free_form_action(game: KOICAGame, action: str) -> bool:
         st.error("⚠️ AI 모드가 활성화되어 있지 않습니다.")
         return False
 
-    # 로딩 인디케이터 표시
-    st.markdown("""
+    # 로딩 인디케이터 표시 (결과 메시지가 스트리밍으로 도착하면 미리보기로 교체)
+    loading_placeholder = st.empty()
+    loading_placeholder.markdown("""
     <div class="loading-overlay">
         <div class="loading-spinner"></div>
         <div class="loading-text">🤖 AI가 결과를 계산중입니다</div>
@@ -952,11 +1281,20 @@ def handle_free_form_action(game: KOICAGame, action: str) -> bool:
     </div>
     """, unsafe_allow_html=True)
 
+    def show_partial_result(fields):
+        loading_placeholder.markdown(f"""
+        <div class="scenario-text">
+        {fields['message']}
+        </div>
+        """, unsafe_allow_html=True)
+
     try:
-        result = game.gemini.generate_free_form_result(game.state, action)
+        result = game.gemini.generate_free_form_result(game.state, action, on_partial=show_partial_result)
     except Exception as e:
+        loading_placeholder.empty()
         st.error(f"⚠️ AI 처리 중 오류가 발생했습니다: {str(e)}")
         return False
+    loading_placeholder.empty()
 
     if result and result.get('success'):
         # 결과 메시지 저장
@@ -965,47 +1303,13 @@ def handle_free_form_action(game: KOICAGame, action: str) -> bool:
         # 선택한 행동 텍스트 저장 (결과 화면에 표시용)
         st.session_state.last_choice_text = action
 
-        # 스탯 업데이트
-        stats = result.get('stats', {})
         # 스탯 변화 저장 (표시용)
-        st.session_state.stat_changes = stats.copy() if stats else {}
-        game.state.update_stats(stats)
-
-        # 선택 히스토리 기록
-        game.state.choice_history.append({
-            'year': game.state.year,
-            'period': game.state.period,
-            'action': action,
-            'custom': True
-        })
-
-        # 다음 시나리오는 AI 생성 또는 랜덤
-        game.state.current_scenario = 'ai_generated' if game.gemini.enabled else random.choice(
-            [s for s in game.scenarios.keys() if not s.startswith("ending_") and s != "start"]
-        )
-
-        # AI 자유 입력은 항상 시간을 진행시킴
-        # 다음 period_N 시나리오를 예측하여 시간 설정
-        game.state.period += 1
-        if game.state.period > 6:
-            game.state.period = 1
-            game.state.year += 1
-
-        # 생활 이벤트 체크 (시간이 진행되었으므로)
-        life_event_id = game.check_and_trigger_life_event()
-        if life_event_id:
-            # 원래 다음 시나리오를 저장하고, 생활 이벤트를 먼저 표시
-            st.session_state.pending_next_scenario = game.state.current_scenario
-            game.state.current_scenario = life_event_id
-            # 생활 이벤트 발생 플래그 설정
-            st.session_state.life_event_triggered = True
-
-        # 게임 오버 체크
-        if (game.state.reputation <= 0 or
-            game.state.staff_morale <= 0 or
-            game.state.stress >= 100 or
-            game.state.wellbeing <= 0):
-            game.state.game_over = True
+        st.session_state.stat_changes = dict(result['stats'])
+
+        # AI 자유 입력은 항상 시간을 진행시키고 다음 AI 시나리오로 이어짐 (이벤트 처리는 step과 같음)
+        game.state, events = step_free_form(game.state, game.state.current_scenario, action, result,
+                                            game.rng, game.graph)
+        _store_transition_events(events)
 
         return True
     else:
@@ -1019,174 +1323,28 @@ def handle_free_form_action(game: KOICAGame, action: str) -> bool:
         return False
 
 
-def handle_choice(game: KOICAGame, choice: dict, scenario_id: str):
-    """선택 처리"""
-    result = choice.get('result', {})
-
-    # 디버깅: 선택한 텍스트와 결과 메시지 로깅
-    choice_text = choice.get('text', '')
-    result_message = result.get('message', '')
-
-    # 로그를 위해 정보 저장 (개발자 도구에서 확인 가능)
-    if st.session_state.ai_mode:
-        # AI 모드에서는 매핑이 올바른지 확인
-        print(f"[DEBUG] 선택한 텍스트: {choice_text[:50]}...")
-        print(f"[DEBUG] 결과 메시지: {result_message[:50]}...")
-
-    # 결과 메시지 저장
-    st.session_state.result_message = result_message
+def handle_choice(game: KOICAGame, scenario: dict, scenario_id: str, choice_index: int):
+    """선택 처리 (상태 전이는 CLI/배치 시뮬레이터와 같은 전이 엔진 step이 처리)"""
+    result = scenario['choices'][choice_index].get('result', {})
 
-    # 스탯 변화 저장 (표시용)
+    # 결과 메시지와 스탯 변화 저장 (표시용)
+    st.session_state.result_message = result.get('message', '')
     stats = result.get('stats', {})
     st.session_state.stat_changes = stats.copy() if stats else {}
 
-    # 스탯 업데이트
-    game.state.update_stats(stats)
-
-    # 시간 진행 (advance_time이 true인 경우)
-    # 주의: year/period 동기화보다 먼저 실행해야 함
-    if result.get('advance_time', False):
-        game.state.advance_time()
-
-    # 시나리오 ID와 year/period 매핑 (동기화)
-    scenario_period_map = {
-        'start': (1, 1),
-        'period_2': (1, 2), 'period_3': (1, 3), 'period_4': (1, 4),
-        'period_5': (1, 5), 'period_6': (1, 6),
-        'period_7': (2, 1), 'period_8': (2, 2), 'period_9': (2, 3),
-        'period_10': (2, 4), 'period_11': (2, 5), 'period_12': (2, 6)
-    }
+    game.state, events = step(game.state, scenario_id, choice_index, game.rng, game.graph, scenario)
+    _store_transition_events(events)
 
-    # 다음 시나리오의 year/period 동기화
-    next_scenario = result.get('next')
-    if next_scenario and next_scenario in scenario_period_map:
-        expected_year, expected_period = scenario_period_map[next_scenario]
-        # 동기화가 필요한 경우에만 덮어씀
-        game.state.year = expected_year
-        game.state.period = expected_period
-
-    # 부소장 사기 변경 처리
-    if 'deputy_morale' in result:
-        for personality, change in result['deputy_morale'].items():
-            game.state.update_deputy_morale(personality, change)
-
-    # 고급 기능: delayed_effects 처리
-    if 'delayed_effects' in result:
-        # Backward compatibility: Initialize pending_delayed_effects if it doesn't exist
-        if not hasattr(game.state, 'pending_delayed_effects'):
-            game.state.pending_delayed_effects = []
-        for effect in result['delayed_effects']:
-            game.state.pending_delayed_effects.append(effect.copy())
-
-    # 시나리오 방문 기록
-    if scenario_id not in game.state.visited_scenarios:
-        game.state.visited_scenarios.append(scenario_id)
-
-    # 선택 히스토리 기록
-    game.state.choice_history.append({
-        'scenario_id': scenario_id,
-        'choice_text': choice.get('text', ''),
-        'year': game.state.year,
-        'period': game.state.period,
-        'result': result
-    })
-
-    # 다음 시나리오 설정
-    # 생활 이벤트 이후 pending_next_scenario가 있으면 그걸로 이동
-    if hasattr(st.session_state, 'pending_next_scenario') and st.session_state.pending_next_scenario:
-        game.state.current_scenario = st.session_state.pending_next_scenario
-        # 생활 이벤트 복귀 후 year/period 재동기화
-        if game.state.current_scenario in scenario_period_map:
-            expected_year, expected_period = scenario_period_map[game.state.current_scenario]
-            game.state.year = expected_year
-            game.state.period = expected_period
-        st.session_state.pending_next_scenario = None
-        # 생활 이벤트 플래그 제거
-        if hasattr(st.session_state, 'life_event_triggered'):
-            st.session_state.life_event_triggered = False
-    else:
-        next_scenario = result.get('next')
-
-        # 'continue_main_scenario' 또는 next가 없으면 현재 period의 메인 시나리오로 이동
-        if next_scenario == 'continue_main_scenario' or not next_scenario:
-            period_number = (game.state.year - 1) * 6 + game.state.period
-            if period_number == 1:
-                next_scenario = 'start'
-            elif period_number <= 12:
-                next_scenario = f'period_{period_number}'
-            else:
-                # 게임이 끝났으면 엔딩으로
-                game.state.game_over = True
-                st.session_state.game_over = True
-
-        if next_scenario and next_scenario in game.scenarios:
-            # 엔딩 시나리오인 경우 year를 증가시켜 바로 엔딩 화면으로 이동
-            if next_scenario.startswith('ending_'):
-                game.state.year = 3  # 2년 완료로 설정하여 엔딩 화면으로 이동
-            else:
-                # 다음 시나리오가 존재하는 경우에만 설정
-                game.state.current_scenario = next_scenario
-        else:
-            # AI 모드인 경우 AI가 생성한 시나리오 사용
-            if st.session_state.ai_mode and game.gemini and game.gemini.enabled:
-                game.state.current_scenario = 'ai_generated'
-            else:
-                # 다음 시나리오가 없거나 존재하지 않으면 랜덤 시나리오 선택
-                # 엔딩 시나리오는 제외
-                available = [s for s in game.scenarios.keys()
-                            if s not in game.state.visited_scenarios
-                            and s != "start"
-                            and not s.startswith("ending_")]
-                if available:
-                    game.state.current_scenario = random.choice(available)
-                else:
-                    # 모든 시나리오를 방문했으면 리셋 (엔딩 시나리오는 여전히 제외)
-                    game.state.visited_scenarios = []
-                    non_ending_scenarios = [s for s in game.scenarios.keys()
-                                           if not s.startswith("ending_") and s != "start"]
-                    if non_ending_scenarios:
-                        game.state.current_scenario = random.choice(non_ending_scenarios)
-                    else:
-                        game.state.current_scenario = "start"
-
-    # 생활 이벤트 체크 (advance_time이 true이고, 엔딩 시나리오가 아닌 경우에만)
-    if result.get('advance_time', False):
-        # 엔딩 시나리오로 가는 경우 생활 이벤트 발생 방지
-        next_scenario = result.get('next')
-        if not next_scenario or not next_scenario.startswith('ending_'):
-            life_event_id = game.check_and_trigger_life_event()
-            if life_event_id:
-                # 원래 다음 시나리오를 저장하고, 생활 이벤트를 먼저 표시
-                st.session_state.pending_next_scenario = game.state.current_scenario
-                game.state.current_scenario = life_event_id
-                # 생활 이벤트 발생 플래그 설정
-                st.session_state.life_event_triggered = True
-            else:
-                # 생활 이벤트가 없는 경우에만 부소장 이벤트 체크
-                # (한 턴에 하나의 이벤트만 발생하도록)
-                deputy_event_id = game.check_deputy_threshold_events()
-                if deputy_event_id:
-                    st.session_state.pending_next_scenario = game.state.current_scenario
-                    game.state.current_scenario = deputy_event_id
-                    st.session_state.deputy_event_triggered = True
-
-        # 고급 기능: 장기 영향(delayed effects) 체크
-        triggered_effects = game.check_delayed_effects()
-        if triggered_effects:
-            st.session_state.delayed_effects = triggered_effects
-
-        # 고급 기능: 고급 엔딩 조건 체크
-        advanced_ending = game.check_advanced_endings()
-        if advanced_ending:
-            game.state.game_over = True
-            game.state.ending = advanced_ending
-
-    # 게임 오버 체크
-    if (game.state.reputation <= 0 or
-        game.state.staff_morale <= 0 or
-        game.state.stress >= 100 or
-        game.state.wellbeing <= 0):
-        game.state.game_over = True
+
+def _store_transition_events(events: List[Dict]):
+    """전이 엔진 이벤트를 다음 화면에 표시할 세션 상태로 저장
+
+    생활/부소장 이벤트가 발생하면 game.state.current_scenario가 이미 그 이벤트로 바뀌어 있으므로
+    알림 배너만 켭니다 (이벤트 선택 후 원래 진행은 step이 이어서 처리).
+    """
+    st.session_state.life_event_triggered = any(event['type'] in (EVENT_LIFE, EVENT_DEPUTY) for event in events)
+    st.session_state.delayed_effects = [event['effect'] for event in events if event['type'] == EVENT_DELAYED_EFFECT]
+    st.session_state.event_notices = [event['message'] for event in events if event['type'] == EVENT_NOTICE]
 
 
 def game_over_screen():
@@ -1235,8 +1393,7 @@ def game_over_screen():
     with col1:
         if st.button("다시 시작", use_container_width=True):
             # 세션 초기화
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_session()
             st.rerun()
 
     with col2:
@@ -1267,6 +1424,19 @@ def ending_screen():
     </div>
     """, unsafe_allow_html=True)
 
+    # AI 모드: 개인화된 엔딩 (스트리밍으로 도착하는 대로 표시, 재실행 시에는 저장된 텍스트 사용)
+    if st.session_state.ai_mode and game.gemini and game.gemini.enabled and len(state.choice_history) > 5:
+        ending_placeholder = st.empty()
+        if st.session_state.ai_ending_text is None:
+            ending_placeholder.info("🤖 AI가 당신만의 엔딩을 생성중입니다...")
+            st.session_state.ai_ending_text = game.gemini.generate_personalized_ending(
+                state, on_text=lambda text: ending_placeholder.markdown(f"### 🏆 당신만의 이야기\n\n{text}")
+            )
+        if st.session_state.ai_ending_text:
+            ending_placeholder.markdown(f"### 🏆 당신만의 이야기\n\n{st.session_state.ai_ending_text}")
+        else:
+            ending_placeholder.empty()
+
     st.markdown(f"""
     <div class="scenario-text">
     <h3>📊 영역별 성과</h3>
@@ -1297,8 +1467,7 @@ def ending_screen():
 
     with col1:
         if st.button("다시 시작", use_container_width=True):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_session()
             st.rerun()
 
     with col2:
@@ -1311,26 +1480,14 @@ def ending_screen():
 def _generate_choice_explanation(state: GameState, director_type: str) -> str:
     """선택 히스토리를 분석하여 소장 유형에 대한 드라마틱한 설명 생성"""
 
-    style = state.player_style
-    total_choices = len(state.choice_history)
+    analytics = state.analytics
 
-    if total_choices == 0:
+    if analytics.total_choices == 0:
         return "축하합니다. 2년간의 임기를 완수하셨습니다."
 
-    # 주요 관심사 파악
-    focus_areas = {
-        '평판': style['reputation_focused'],
-        '예산': style['budget_focused'],
-        '직원': style['staff_focused'],
-        '프로젝트': style['project_focused']
-    }
-
-    # 위험 감수 성향
-    risk_ratio = style['risk_taking'] / total_choices if total_choices > 0 else 0
-
-    # 상위 관심사
-    sorted_focus = sorted(focus_areas.items(), key=lambda x: x[1], reverse=True)
-    top_concern = sorted_focus[0][0] if sorted_focus[0][1] > 0 else "사무소 운영"
+    # 위험 감수 성향과 상위 관심사 (누적 집계에서 바로 조회)
+    risk_ratio = analytics.risk_ratio
+    top_concern = analytics.top_concern()
 
     # === 드라마틱한 구조로 재구성 ===
     paragraphs = []
@@ -1399,6 +1556,8 @@ def _generate_choice_explanation(state: GameState, director_type: str) -> str:
 def main():
     """메인 함수"""
     initialize_session_state()
+    restore_session()
+    st.session_state.script_runs += 1
 
     screen = st.session_state.current_screen
 
@@ -1417,6 +1576,8 @@ def main():
     elif screen == 'ending':
         ending_screen()
 
+    save_session()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""테스트 공통 설정 - 저장소 최상위 모듈을 import할 수 있도록 경로 추가"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# 테스트는 저장소의 scenarios.json 등을 상대 경로로 읽으므로 최상위에서 실행
+os.chdir(ROOT)
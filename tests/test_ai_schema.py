@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""AI 응답 검증이 잘못된 스탯 값을 ScenarioValidationError로 거르는지 확인"""
+
+import json
+
+import pytest
+
+from ai_schema import ScenarioValidationError, clamp_stat_changes, validate_free_form_result, validate_scenario
+from koica_game import GeminiIntegration
+from scenario_pool import StubModel
+
+
+def _scenario(title, stats_text):
+    """stats 부분을 원문 JSON 텍스트로 넣은 시나리오 (NaN/Infinity 리터럴 포함 가능)"""
+    choice = '{"text": "선택", "result": {"message": "결과", "stats": %s}}' % stats_text
+    return '{"title": "%s", "description": "설명", "choices": [%s, %s]}' % (title, choice, choice)
+
+
+@pytest.mark.parametrize('literal', ['NaN', 'Infinity', '-Infinity'])
+def test_non_finite_stat_changes_are_validation_errors(literal):
+    data = json.loads(_scenario('제목', '{"budget": %s}' % literal))
+    with pytest.raises(ScenarioValidationError) as excinfo:
+        validate_scenario(data)
+    assert excinfo.value.field == 'choices[0].result.stats.budget'
+
+    with pytest.raises(ScenarioValidationError):
+        validate_free_form_result(json.loads('{"success": true, "message": "m", "stats": {"stress": %s}}' % literal))
+
+
+def test_finite_stat_changes_are_clamped():
+    assert clamp_stat_changes({'budget': 1e9, 'stress': -3.6}) == {'budget': 40, 'stress': -4}
+
+
+def test_batch_keeps_valid_scenarios_when_one_has_nan():
+    gemini = GeminiIntegration(model=StubModel(), cache=None, pool=None)
+    text = '{"scenarios": [%s, %s]}' % (_scenario('정상', '{"budget": 5}'), _scenario('비정상', '{"budget": NaN}'))
+    scenarios = gemini._parse_scenarios(text, count=2)
+    assert scenarios is not None
+    assert scenarios[0]['title'] == '정상'
+    assert scenarios[1] is None
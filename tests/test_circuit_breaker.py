@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""회로 차단기의 차단, 시험 요청(half-open), 차단 시간 증가"""
+
+import pytest
+
+from gemini_client import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _breaker(clock):
+    return CircuitBreaker(window=60, min_calls=4, failure_rate=0.5, slow_call_seconds=10,
+                          slow_call_rate=0.8, open_seconds=30, max_open_seconds=100, clock=clock)
+
+
+def _trip(breaker):
+    """실패 요청으로 차단시키고, 차단 전에 시작한 요청 번호 반환"""
+    stale = breaker.allow_request()
+    for _ in range(4):
+        breaker.record_failure(1.0, breaker.allow_request())
+    assert breaker.state == BREAKER_OPEN
+    return stale
+
+
+def test_trips_on_failure_rate(clock):
+    breaker = _breaker(clock)
+    for ok in (True, False, True):
+        token = breaker.allow_request()
+        (breaker.record_success if ok else breaker.record_failure)(1.0, token)
+    assert breaker.state == BREAKER_CLOSED   # 최소 요청 수 미달
+    breaker.record_failure(1.0, breaker.allow_request())
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.allow_request() is None
+    assert breaker.snapshot()['rejected_calls'] == 1
+    assert breaker.trips == 1
+
+
+def test_trips_on_slow_calls(clock):
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_success(12.0, breaker.allow_request())
+    assert breaker.state == BREAKER_OPEN
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(1.0, breaker.allow_request())
+    clock.now += 61
+    breaker.record_failure(1.0, breaker.allow_request())
+    assert breaker.state == BREAKER_CLOSED
+
+
+def test_half_open_allows_one_probe_and_closes_on_success(clock):
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now += 29
+    assert breaker.allow_request() is None
+    clock.now += 1
+    assert breaker.state == BREAKER_HALF_OPEN
+    probe = breaker.allow_request()
+    assert probe is not None
+    assert breaker.allow_request() is None   # 시험 요청은 하나만
+    breaker.record_success(1.0, probe)
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.allow_request() is not None
+
+
+def test_probe_failure_doubles_open_time_up_to_max(clock):
+    breaker = _breaker(clock)
+    _trip(breaker)
+    for expected in (60, 100, 100):
+        clock.now += breaker.snapshot()['retry_in']
+        probe = breaker.allow_request()
+        breaker.record_failure(1.0, probe)
+        assert breaker.state == BREAKER_OPEN
+        assert breaker.snapshot()['retry_in'] == expected
+
+    # 느린 시험 요청도 실패로 취급, 성공하면 차단 시간이 처음 값으로 돌아감
+    clock.now += 100
+    breaker.record_success(10.0, breaker.allow_request())
+    assert breaker.state == BREAKER_OPEN
+    clock.now += 100
+    breaker.record_success(1.0, breaker.allow_request())
+    assert breaker.state == BREAKER_CLOSED
+    _trip(breaker)
+    assert breaker.snapshot()['retry_in'] == 30
+
+
+def test_stale_results_do_not_decide_half_open(clock):
+    breaker = _breaker(clock)
+    stale = _trip(breaker)
+    clock.now += 30
+    probe = breaker.allow_request()
+
+    # 차단 전에 시작한 요청의 늦은 성공/실패는 회로를 닫거나 차단 시간을 늘리지 않음
+    breaker.record_success(1.0, stale)
+    assert breaker.state == BREAKER_HALF_OPEN
+    breaker.record_failure(1.0, stale)
+    assert breaker.state == BREAKER_HALF_OPEN
+    # 번호 없는 결과도 시험 요청으로 취급하지 않음
+    breaker.record_failure(1.0)
+    assert breaker.state == BREAKER_HALF_OPEN
+    assert breaker.allow_request() is None   # 시험 요청은 아직 진행 중
+
+    breaker.record_failure(1.0, probe)
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.snapshot()['retry_in'] == 60
+
+
+def test_stale_results_after_recovery_are_ignored(clock):
+    breaker = _breaker(clock)
+    stale = [breaker.allow_request() for _ in range(4)]
+    _trip(breaker)
+    clock.now += 30
+    breaker.record_success(1.0, breaker.allow_request())
+    assert breaker.state == BREAKER_CLOSED
+    for token in stale:
+        breaker.record_failure(1.0, token)
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.snapshot()['calls'] == 0
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""director_scoring 일괄 채점이 스칼라 기준 구현과 정확히 일치하는지 확인"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from calculate_director_probability import generate_random_game_states
+from director_scoring import determine_director_type_indices, empty_states, score_director_types_batch
+from koica_game import DIRECTOR_TYPES, score_director_types
+
+
+def _scalar_scores(row):
+    style = {
+        'reputation_focused': row['reputation_focused'],
+        'budget_focused': row['budget_focused'],
+        'staff_focused': row['staff_focused'],
+        'project_focused': row['project_focused'],
+        'risk_taking': row['risk_taking'],
+    }
+    scores = score_director_types(row['reputation'], row['budget_execution_rate'], row['staff_morale'],
+                                  row['project_success'], row['stress'], row['wellbeing'],
+                                  style, int(row['total_choices']))
+    return [scores[director_type] for director_type in DIRECTOR_TYPES]
+
+
+def _edge_states():
+    """경계값(동점, 선택 0회, 임계값 직전/직후)을 포함한 상태"""
+    states = empty_states(6)
+    states[1] = (50, 50, 50, 50, 50, 50, 0, 0, 0, 0, 0, 0)
+    states[2] = (70, 60, 50, 45, 65, 70, 8, 8, 5, 3, 10, 20)
+    states[3] = (69.5, 59.9, 49.9, 44.9, 64.9, 69.9, 7, 4, 2, 2, 9, 20)
+    states[4] = (100, 100, 100, 100, 0, 100, 15, 0, 0, 0, 35, 35)
+    states[5] = (0, 0, 0, 0, 100, 0, 0, 0, 0, 15, 0, 35)
+    return states
+
+
+def test_batch_scores_match_scalar_exactly():
+    states = np.concatenate([_edge_states(), generate_random_game_states(20000, np.random.default_rng(7))])
+    batch = score_director_types_batch(states)
+    for row, scores in zip(states, batch):
+        assert scores.tolist() == _scalar_scores(row)
+
+
+def test_generated_states_are_in_range_and_seeded():
+    states = generate_random_game_states(50000, np.random.default_rng(3))
+    assert states['total_choices'].min() >= 20 and states['total_choices'].max() <= 35
+    assert (states['risk_taking'] <= states['total_choices']).all()
+    for field in ('reputation', 'budget_execution_rate', 'staff_morale', 'project_success'):
+        assert states[field].min() >= 20 and states[field].max() <= 90
+    for field in ('reputation_focused', 'budget_focused', 'staff_focused', 'project_focused'):
+        assert states[field].min() >= 0 and states[field].max() <= 15
+
+    again = generate_random_game_states(50000, np.random.default_rng(3))
+    assert (states == again).all()
+
+
+def test_tie_break_picks_only_top_scoring_types():
+    states = generate_random_game_states(5000, np.random.default_rng(11))
+    scores = score_director_types_batch(states)
+    indices = determine_director_type_indices(states, np.random.default_rng(5))
+    assert (scores[np.arange(len(states)), indices] == scores.max(axis=1)).all()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""전이 엔진(step/step_free_form)과 배치 시뮬레이터의 결정적 동작 확인"""
+
+import random
+
+import pytest
+
+import simulator
+from koica_game import (EVENT_DEPUTY, EVENT_DELAYED_EFFECT, EVENT_GAME_OVER, EVENT_LIFE, GameState,
+                        load_scenario_graph, step, step_free_form)
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return load_scenario_graph()
+
+
+def _play(graph, seed, choice_idx=0, max_steps=200):
+    """항상 같은 선택지를 고르는 시드 고정 플레이 ([(시나리오 ID, 이벤트 목록)], 최종 상태)"""
+    rng = random.Random(seed)
+    state = GameState()
+    log = []
+    while not state.game_over and len(log) < max_steps:
+        scenario_id = state.current_scenario
+        state, events = step(state, scenario_id, choice_idx, rng, graph)
+        log.append((scenario_id, events))
+    return log, state
+
+
+def test_same_seed_same_playthrough(graph):
+    log_a, state_a = _play(graph, seed=3)
+    log_b, state_b = _play(graph, seed=3)
+    assert log_a == log_b
+    assert state_a.to_dict(graph) == state_b.to_dict(graph)
+    assert state_a.game_over and state_a.ending
+
+
+def test_step_does_not_mutate_input(graph):
+    state = GameState()
+    before = state.to_dict(graph)
+    new_state, _ = step(state, 'start', 0, random.Random(0), graph)
+    assert state.to_dict(graph) == before
+    assert new_state is not state
+    assert new_state.visited_scenarios == ['start']
+
+
+def test_life_event_interrupts_and_resumes_turn(graph):
+    # 시드 1: 첫 선택 뒤 생활 이벤트 -> (이벤트 선택 후) 부소장 이벤트 -> 원래 다음 시나리오
+    rng = random.Random(1)
+    state, events = step(GameState(), 'start', 0, rng, graph)
+    assert [event['type'] for event in events] == [EVENT_LIFE]
+    life_event = events[0]['scenario_id']
+    assert state.current_scenario == life_event
+    assert state.pending_turn == {'stage': 1, 'next': 'period_2'}
+    assert (state.year, state.period) == (1, 2)
+
+    state, events = step(state, life_event, 0, rng, graph)
+    assert [event['type'] for event in events] == [EVENT_DEPUTY]
+    deputy_event = events[0]['scenario_id']
+    assert state.current_scenario == deputy_event
+    assert state.pending_turn == {'stage': 2, 'next': 'period_2'}
+
+    state, events = step(state, deputy_event, 0, rng, graph)
+    assert state.pending_turn is None
+    assert state.current_scenario == 'period_2'
+    # 이벤트 선택지는 시간을 진행시키지 않고, 방문 기록에는 턴을 시작한 시나리오만 남음
+    assert (state.year, state.period) == (1, 2)
+    assert state.visited_scenarios == ['start']
+    assert [record['scenario_id'] for record in state.choice_history] == ['start', life_event, deputy_event]
+
+
+def test_resume_after_session_round_trip(graph):
+    # 이벤트 선택을 기다리는 상태를 저장/복원해도 같은 시드에서 같은 결과로 이어짐
+    rng = random.Random(1)
+    state, events = step(GameState(), 'start', 0, rng, graph)
+    restored = GameState.from_dict(state.to_dict(graph), graph)
+    rng_state = rng.getstate()
+
+    expected, expected_events = step(state, state.current_scenario, 0, rng, graph)
+    rng.setstate(rng_state)
+    resumed, resumed_events = step(restored, restored.current_scenario, 0, rng, graph)
+    assert resumed_events == expected_events
+    assert resumed.to_dict(graph) == expected.to_dict(graph)
+
+
+def test_delayed_effects_come_before_advanced_ending(graph):
+    state = GameState()
+    state.current_scenario = 'period_2'
+    state.life_events_count = 4  # 생활/부소장 이벤트 없음
+    state.pending_delayed_effects = [{'trigger_period': 0, 'condition': 'always',
+                                      'stats': {'stress': 100}, 'message': '누적된 피로'}]
+    state, events = step(state, 'period_2', 2, random.Random(0), graph)
+    assert [event['type'] for event in events] == [EVENT_DELAYED_EFFECT, EVENT_GAME_OVER]
+    assert events[0]['effect']['message'] == '누적된 피로'
+    assert events[1]['ending'] == 'ending_burnout'
+    assert state.game_over and state.pending_delayed_effects == []
+
+
+def test_stat_game_over_ends_turn_immediately(graph):
+    state = GameState()
+    state.current_scenario = 'period_2'
+    state.wellbeing = 3
+    state.pending_turn = {'stage': 1, 'next': 'period_3'}
+    state, events = step(state, 'period_2', 1, random.Random(0), graph)  # 웰빙 -5
+    assert events == [{'type': EVENT_GAME_OVER, 'ending': 'health_crisis'}]
+    assert state.game_over and state.pending_turn is None
+
+
+def test_end_of_term_ends_game_with_final_ending(graph):
+    state = GameState()
+    state.year, state.period = 2, 6
+    state.current_scenario = 'period_12'
+    state, events = step(state, 'period_12', 0, random.Random(0), graph)
+    assert state.game_over and (state.year, state.period) == (3, 1)
+    assert events == [{'type': EVENT_GAME_OVER, 'ending': state.ending}]
+    assert state.ending in ('legendary_director', 'successful_director', 'average_director', 'struggling_director')
+
+
+def test_ending_scenario_without_choices_ends_game(graph):
+    state = GameState()
+    state.current_scenario = 'ending_headquarters'
+    state, events = step(state, 'ending_headquarters', 0, random.Random(0), graph)
+    assert state.game_over
+    assert events == [{'type': EVENT_GAME_OVER, 'ending': None}]
+    assert state.visited_scenarios == ['ending_headquarters']
+
+
+def test_unknown_scenario_needs_content(graph):
+    with pytest.raises(KeyError):
+        step(GameState(), 'ai_generated', 0, random.Random(0), graph)
+
+
+def test_free_form_advances_time_and_continues_with_ai(graph):
+    state = GameState()
+    state.current_scenario = 'period_2'
+    state.life_events_count = 4
+    result = {'message': '현지 언론과 인터뷰했습니다', 'stats': {'reputation': 5}}
+    new_state, events = step_free_form(state, 'period_2', '언론 인터뷰', result, random.Random(0), graph)
+    assert events == []
+    assert (new_state.year, new_state.period) == (1, 2)
+    assert new_state.reputation == state.reputation + 5
+    assert new_state.current_scenario == 'ai_generated'
+    record = new_state.choice_history[-1]
+    assert (record['choice_text'], record['choice_index']) == ('언론 인터뷰', -1)
+    assert 'advance_time' not in result
+
+
+def test_monte_carlo_independent_of_worker_count():
+    single = simulator.run_monte_carlo(120, seed=2024, workers=1, chunk_size=30)
+    parallel = simulator.run_monte_carlo(120, seed=2024, workers=2, chunk_size=30)
+    assert single['games'] == parallel['games'] == 120
+    assert single == parallel
+
+
+def test_simulator_golden_summary():
+    # 엔진이나 시나리오 데이터가 바뀌어 결과가 달라지면 의도한 변경인지 확인한 뒤 갱신
+    summary = simulator.run_monte_carlo(200, seed=11, workers=1, chunk_size=50)
+    assert summary['games'] == 200
+    assert dict(summary['endings']) == {
+        'successful_director': 113, 'average_director': 42, 'burnout': 25, 'legendary_director': 11,
+        'reputation_loss': 7, 'ending_burnout': 2,
+    }
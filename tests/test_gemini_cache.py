@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""생성 결과 캐시의 만료, 개수 제한, 메모리 LRU, 적중 정책"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_cache
+from gemini_cache import GenerationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(gemini_cache, 'time', SimpleNamespace(time=fake))
+    return fake
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'cache' / 'gemini.sqlite3')
+
+
+def test_values_persist_and_are_copied(db_path, clock):
+    cache = GenerationCache(db_path)
+    cache.put('k', {'title': '제목', 'choices': [1, 2]})
+    value = cache.get('k')
+    value['choices'].append(3)
+    assert cache.get('k') == {'title': '제목', 'choices': [1, 2]}
+    cache.close()
+
+    # 새 프로세스(빈 메모리 캐시)에서도 디스크에서 읽음
+    reopened = GenerationCache(db_path)
+    assert reopened.get('k') == {'title': '제목', 'choices': [1, 2]}
+    assert (reopened.hits, reopened.misses) == (1, 0)
+    reopened.close()
+
+
+def test_ttl_expiry(db_path, clock):
+    cache = GenerationCache(db_path, ttl=100)
+    cache.put('old', 1)
+    clock.now += 50
+    cache.put('new', 2)
+    clock.now += 51
+    # 메모리와 디스크 모두에서 만료
+    assert cache.get('old') is None
+    assert cache.get('new') == 2
+    cache._memory.clear()
+    assert cache.get('old') is None
+    assert cache._conn.execute("SELECT key FROM generations").fetchall() == [('new',)]
+    cache.close()
+
+
+def test_max_entries_evicts_least_recently_used(db_path, clock):
+    # 메모리 캐시 없이 디스크 접근 시각만으로 제거 순서 결정
+    cache = GenerationCache(db_path, memory_size=0, max_entries=3, ttl=None)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key)
+        clock.now += 1
+    assert cache.get('a') == 'a'     # a를 최근에 사용
+    clock.now += 1
+    cache.put('d', 'd')
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in ('a', 'c', 'd')] == ['a', 'c', 'd']
+    assert cache._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0] == 3
+    cache.close()
+
+
+def test_memory_lru(clock):
+    cache = GenerationCache(None, memory_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert list(cache._memory) == ['a', 'c']
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_offline_policy_reads_but_never_writes(db_path, clock):
+    seeded = GenerationCache(db_path)
+    seeded.put('k', 'saved')
+    seeded.close()
+
+    cache = GenerationCache(db_path, hit_policy='offline')
+    assert not cache.allows_generation
+    assert cache.get('k') == 'saved'
+    cache.put('other', 'new')
+    assert cache.get('other') is None
+    cache.close()
+
+
+def test_refresh_policy_always_misses_and_overwrites(db_path, clock):
+    seeded = GenerationCache(db_path)
+    seeded.put('k', 'old')
+    seeded.close()
+
+    cache = GenerationCache(db_path, hit_policy='refresh')
+    assert cache.allows_generation
+    assert cache.get('k') is None
+    cache.put('k', 'fresh')
+    cache.close()
+
+    reopened = GenerationCache(db_path)
+    assert reopened.get('k') == 'fresh'
+    reopened.close()
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        GenerationCache(None, hit_policy='sometimes')
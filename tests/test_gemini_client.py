@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""API 키별 Gemini 클라이언트 분리, 컨텍스트 캐시 생성, 응답하지 않는 요청 처리"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_client
+from gemini_client import DeadlineExceeded, ModelClient
+
+
+class FakeApiClient:
+    """google-genai Client 대역 - 생성에 쓰인 키와 요청을 기록"""
+
+    def __init__(self, api_key, http_options=None):
+        self.api_key = api_key
+        self.http_options = http_options
+        self.requests = []
+        self.caches_created = []
+        self.models = SimpleNamespace(generate_content=self._generate,
+                                      generate_content_stream=self._generate_stream)
+        self.caches = SimpleNamespace(create=self._create_cache)
+
+    def _generate(self, model, contents, config):
+        self.requests.append((contents, config.cached_content))
+        return SimpleNamespace(text=f'{self.api_key}:{contents}')
+
+    def _generate_stream(self, model, contents, config):
+        return [self._generate(model, contents, config)]
+
+    def _create_cache(self, model, config):
+        self.caches_created.append(config.contents)
+        return SimpleNamespace(name=f'cachedContents/{self.api_key}-{len(self.caches_created)}')
+
+
+class FakeConfig(SimpleNamespace):
+    pass
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    created = []
+
+    def make_client(api_key, http_options=None):
+        client = FakeApiClient(api_key, http_options)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(gemini_client, 'GEMINI_AVAILABLE', True)
+    monkeypatch.setattr(gemini_client, 'genai', SimpleNamespace(Client=make_client), raising=False)
+    monkeypatch.setattr(gemini_client, 'genai_types',
+                        SimpleNamespace(GenerateContentConfig=FakeConfig, CreateCachedContentConfig=FakeConfig,
+                                        HttpOptions=FakeConfig),
+                        raising=False)
+    monkeypatch.setattr(gemini_client, 'CONTEXT_CACHE_ENABLED', True)
+    monkeypatch.setattr(gemini_client, '_shared_clients', {})
+    return created
+
+
+def test_each_api_key_gets_its_own_client(fake_genai):
+    client_a = gemini_client.shared_model_client('key-a')
+    client_b = gemini_client.shared_model_client('key-b')
+
+    assert gemini_client.shared_model_client('key-a') is client_a
+    assert [c.api_key for c in fake_genai] == ['key-a', 'key-b']
+
+    # 키 B를 나중에 만들어도 키 A의 요청은 A의 클라이언트로만 전송
+    assert client_a.generate_text('hello') == 'key-a:hello'
+    assert client_b.generate_text('hello') == 'key-b:hello'
+    assert len(fake_genai[0].requests) == 1 and len(fake_genai[1].requests) == 1
+
+
+def test_context_cache_is_created_with_the_owning_key(fake_genai):
+    prefix = 'P' * 50
+    client_a = gemini_client.shared_model_client('key-a')
+    gemini_client.shared_model_client('key-b')
+    client_a.register_context_prefixes([prefix])
+
+    client_a.generate_text(prefix + 'state')
+    deadline = time.monotonic() + 5
+    while not fake_genai[0].caches_created and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert fake_genai[0].caches_created == [[prefix]]
+    assert fake_genai[1].caches_created == []
+
+
+class EchoModel:
+    """받은 프롬프트를 그대로 돌려주는 스텁 모델"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, prompt, stream=False):
+        response = SimpleNamespace(text=f'{self.name}:{prompt}')
+        return [response] if stream else response
+
+
+def test_context_cache_creation_does_not_block_requests():
+    prefix = 'P' * 50
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_factory(text):
+        started.set()
+        release.wait(5)
+        return EchoModel('cached')
+
+    client = ModelClient(EchoModel('full'), max_concurrency=1, context_cache_factory=slow_factory)
+    client.register_context_prefixes([prefix])
+
+    # 캐시 생성이 끝나지 않았어도 요청은 (동시 요청 슬롯이 하나뿐이어도) 전체 프롬프트로 바로 처리
+    assert client.generate_text(prefix + 'a') == f'full:{prefix}a'
+    assert started.wait(5)
+    assert client.generate_text(prefix + 'b') == f'full:{prefix}b'
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while client.generate_text(prefix + 'c', key=str(time.monotonic())) != 'cached:c':
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert client.context_cache_hits >= 1
+
+
+def test_api_client_requests_time_out(fake_genai):
+    gemini_client.shared_model_client('key-a')
+    assert fake_genai[0].http_options.timeout == int(gemini_client.UPSTREAM_TIMEOUT * 1000)
+
+
+class HangingModel:
+    """응답하지 않는 업스트림 - release되거나 timeout(HTTP 타임아웃 대역)이 지나야 끝남"""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.release = threading.Event()
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if not self.release.wait(self.timeout):
+            raise TimeoutError('upstream request timed out')
+        return SimpleNamespace(text=prompt)
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_deadline_abandons_hung_flights():
+    model = HangingModel()
+    client = ModelClient(model, max_concurrency=4)
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            client.generate_hedged('same prompt', lambda text: text, deadline=0.1, hedge_delay=0.03)
+        # 이후의 같은 요청이 응답하지 않는 요청에 합류하지 않도록 목록에서 제거됨
+        assert client._flights == {}
+    assert client.coalesced_calls == 0
+    assert client.upstream_calls == 6
+
+    # 새 요청은 새로 호출되어 응답을 받음
+    model.release.set()
+    assert client.generate_hedged('same prompt', lambda text: text, deadline=5) == 'same prompt'
+    _wait_for(lambda: client._semaphore._value == 4)
+
+
+def test_upstream_timeout_returns_concurrency_slots():
+    client = ModelClient(HangingModel(timeout=0.3), max_concurrency=2)
+    with pytest.raises(DeadlineExceeded):
+        client.generate_hedged('prompt', lambda text: text, deadline=0.1, hedge_delay=0.03)
+    # 업스트림 호출이 타임아웃으로 끝나면 슬롯을 돌려받음
+    _wait_for(lambda: client._semaphore._value == 2)
+    assert client._flights == {}
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""컴파일된 시나리오 그래프와 바이너리 번들 캐시"""
+
+import json
+import os
+import pickle
+import shutil
+
+import pytest
+
+import scenario_graph
+from scenario_graph import BUNDLE_SUFFIX, ScenarioGraph, compile_scenarios, load_scenario_graph
+
+
+@pytest.fixture
+def scenario_copy(tmp_path):
+    """임시 디렉터리의 scenarios.json 사본 (번들 캐시를 저장소 밖에 만듦)"""
+    path = tmp_path / 'scenarios.json'
+    shutil.copy('scenarios.json', path)
+    scenario_graph._loaded_graphs.clear()
+    yield str(path)
+    scenario_graph._loaded_graphs.clear()
+
+
+def _assert_same_graph(graph, expected):
+    for name in ScenarioGraph.__slots__:
+        assert getattr(graph, name) == getattr(expected, name), name
+
+
+def test_bundle_round_trip_matches_fresh_compile(scenario_copy):
+    with open(scenario_copy, encoding='utf-8') as f:
+        expected = compile_scenarios(json.load(f))
+
+    load_scenario_graph(scenario_copy)
+    assert os.path.exists(scenario_copy + BUNDLE_SUFFIX)
+
+    scenario_graph._loaded_graphs.clear()
+    _assert_same_graph(load_scenario_graph(scenario_copy), expected)
+
+
+class _Payload:
+    """역직렬화되면 표시 파일을 만드는 객체 (pickle 번들이 실행되는지 확인용)"""
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (open, (self.marker, 'w'))
+
+
+def test_pickle_bundle_is_never_unpickled(scenario_copy, tmp_path):
+    marker = tmp_path / 'executed'
+    with open(scenario_copy + BUNDLE_SUFFIX, 'wb') as f:
+        pickle.dump({'format': 1}, f)
+        pickle.dump(_Payload(str(marker)), f)
+
+    graph = load_scenario_graph(scenario_copy)
+
+    assert not marker.exists()
+    assert len(graph) > 0
+    with open(scenario_copy + BUNDLE_SUFFIX, 'rb') as f:
+        assert json.loads(f.readline())['format'] == scenario_graph.BUNDLE_FORMAT_VERSION
+
+
+def test_bundle_with_inconsistent_arrays_is_recompiled(scenario_copy):
+    load_scenario_graph(scenario_copy)
+    bundle_path = scenario_copy + BUNDLE_SUFFIX
+    with open(bundle_path, 'rb') as f:
+        header = json.loads(f.readline())
+        body = f.read()
+    # 다음 시나리오 번호 배열을 범위 밖 값으로 바꿈 (크기는 유지)
+    offset = header['scenarios']
+    for name, _, size in header['arrays']:
+        if name == 'choice_next':
+            body = body[:offset] + b'\x7f' * size + body[offset + size:]
+            break
+        offset += size
+    with open(bundle_path, 'wb') as f:
+        f.write(json.dumps(header).encode('utf-8') + b'\n' + body)
+
+    scenario_graph._loaded_graphs.clear()
+    graph = load_scenario_graph(scenario_copy)
+    assert all(-3 <= i < len(graph) for i in graph.choice_next)
+
+
+def test_touched_source_is_rehashed_once(scenario_copy, monkeypatch):
+    load_scenario_graph(scenario_copy)
+    st = os.stat(scenario_copy)
+    os.utime(scenario_copy, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    hashed = []
+    file_sha256 = scenario_graph._file_sha256
+    monkeypatch.setattr(scenario_graph, '_file_sha256', lambda path: hashed.append(path) or file_sha256(path))
+    monkeypatch.setattr(scenario_graph, 'compile_scenarios', None)   # 번들에서 읽어야 함
+
+    # 수정 시각만 바뀌면 내용 해시로 확인한 뒤 헤더를 갱신하여, 다음 프로세스는 다시 해시하지 않음
+    for _ in range(2):
+        scenario_graph._loaded_graphs.clear()
+        assert len(load_scenario_graph(scenario_copy)) > 0
+    assert hashed == [os.path.abspath(scenario_copy)]
+    with open(scenario_copy + BUNDLE_SUFFIX, 'rb') as f:
+        assert json.loads(f.readline())['signature'] == [st.st_size, st.st_mtime_ns + 10 ** 9]
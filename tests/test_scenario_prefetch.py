@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""AI 시나리오 선행 생성이 사전 생성 풀과 일괄 생성 대기열을 소비하지 않는지 확인"""
+
+import json
+
+import pytest
+
+from koica_game import GameState, GeminiIntegration
+from scenario_batch import stat_snapshot
+from scenario_pool import ScenarioPool, StubModel
+from scenario_prefetch import ScenarioPrefetcher
+
+
+class CountingModel(StubModel):
+    """호출된 프롬프트를 기록하는 스텁 모델"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        return super().generate_content(prompt, stream)
+
+
+def _pool_for(gemini, state):
+    """모든 테마에 대해 state의 시기/약점 프로필 시나리오를 하나씩 가진 풀"""
+    weak = gemini._identify_weak_stats(state)
+    text = StubModel().generate_content('**테마**: 풀\n계절/상황: 풀').text
+    pool = ScenarioPool()
+    for theme in gemini.scenario_themes:
+        pool.add({'theme': theme['name'], 'period': state.period, 'weak_profile': weak,
+                  'scenario': json.loads(text)})
+    return pool
+
+
+@pytest.fixture
+def model():
+    return CountingModel()
+
+
+def _gemini(model, pool=None, batch_size=1):
+    return GeminiIntegration(model=model, cache=None, pool=pool, batch_size=batch_size)
+
+
+def test_prefetch_leaves_pool_cursors_untouched(model):
+    state = GameState()
+    projected = state.copy()
+    projected.advance_time()
+    gemini = _gemini(model)
+    gemini.pool = _pool_for(gemini, projected)
+    prefetcher = ScenarioPrefetcher(gemini)
+
+    assert prefetcher.start(state)
+    prefetched = prefetcher.take(projected, timeout=10)
+    prefetcher.shutdown()
+
+    assert prefetched is not None
+    assert gemini._pool_cursors == {}
+    assert len(model.prompts) == 1
+
+    # 화면 스레드는 여전히 풀에서 꺼내 씀 (API 호출 없음)
+    assert gemini.generate_scenario(projected) is not None
+    assert len(gemini._pool_cursors) == 1
+    assert len(model.prompts) == 1
+
+
+def test_prefetch_generates_one_period_without_filling_queue(model):
+    gemini = _gemini(model, batch_size=3)
+    prefetcher = ScenarioPrefetcher(gemini)
+
+    assert prefetcher.start(GameState())
+    prefetcher._future.result(timeout=10)
+    prefetcher.shutdown()
+
+    assert len(model.prompts) == 1
+    assert '작성할 시나리오 (1개' in model.prompts[0]
+    assert len(gemini.batch_queue) == 0
+
+
+def test_prefetch_skips_period_already_in_batch_queue(model):
+    gemini = _gemini(model, batch_size=3)
+    state = GameState()
+    scenario = json.loads(StubModel().generate_content('**테마**: 대기열').text)
+    gemini.batch_queue.put([{'year': 1, 'period': period, 'theme': '대기열', 'stats': stat_snapshot(state),
+                             'scenario': scenario} for period in (2, 3)])
+    calls = len(model.prompts)
+
+    prefetcher = ScenarioPrefetcher(gemini)
+    assert not prefetcher.start(state)
+    prefetcher.shutdown()
+
+    assert len(model.prompts) == calls
+    assert len(gemini.batch_queue) == 2
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""세션 저장소 지정 문자열 해석과 저장 형식 왕복 확인"""
+
+import json
+import random
+import zlib
+
+import pytest
+
+from koica_game import GameState, load_scenario_graph, step, step_free_form
+from session_store import (SESSION_FORMAT_VERSION, FileSessionStore, SessionStore, SQLiteSessionStore,
+                           decode_session, encode_session, new_session_id, open_session_store)
+
+
+AI_SCENARIO = {
+    'title': 'AI 시나리오',
+    'description': '현지 정부가 추가 협력을 요청했습니다.',
+    'choices': [
+        {'text': '수락한다', 'result': {'message': '협력 확대', 'stats': {'reputation': 4, 'stress': 3},
+                                     'advance_time': True, 'next': 'ai_generated'}},
+        {'text': '보류한다', 'result': {'message': '신중한 검토', 'stats': {'stress': -2},
+                                     'advance_time': True, 'next': 'ai_generated'}},
+    ],
+}
+
+UI = {'current_screen': 'game_play', 'ai_mode': True, 'result_message': '협력 확대',
+      'stat_changes': {'reputation': 4}, 'current_ai_scenario': AI_SCENARIO, 'event_notices': None}
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return load_scenario_graph()
+
+
+@pytest.fixture(scope='module')
+def mid_turn_state(graph):
+    """그래프 선택, AI 시나리오 선택, 자유 입력을 거쳐 생활 이벤트 선택을 기다리는 상태"""
+    rng = random.Random(1)
+    state, _ = step(GameState(), 'start', 0, rng, graph)
+    assert state.pending_turn is not None
+    state, _ = step(state, state.current_scenario, 0, rng, graph)
+    state, _ = step(state, state.current_scenario, 0, rng, graph)
+    state, _ = step(state, 'ai_generated', 0, rng, graph, scenario=AI_SCENARIO)
+    state, _ = step_free_form(state, 'ai_generated', '직원 간담회를 연다',
+                              {'message': '사기가 올랐습니다', 'stats': {'staff_morale': 6}}, rng, graph)
+    # 생활 이벤트가 턴을 멈출 때까지 진행
+    while state.pending_turn is None and not state.game_over:
+        scenario = AI_SCENARIO if state.current_scenario == 'ai_generated' else None
+        state, _ = step(state, state.current_scenario, 0, rng, graph, scenario=scenario)
+    assert state.pending_turn is not None and not state.game_over
+    return state
+
+
+def test_session_round_trip_keeps_mid_turn_state(graph, mid_turn_state):
+    blob = encode_session(mid_turn_state, UI, graph)
+    restored, ui = decode_session(blob, graph)
+    assert restored.to_dict(graph) == mid_turn_state.to_dict(graph)
+    assert restored.pending_turn == mid_turn_state.pending_turn
+    assert restored.current_scenario == mid_turn_state.current_scenario
+    assert restored.choice_history == mid_turn_state.choice_history
+    assert ui == UI
+
+    # 이어서 진행해도 원래 상태와 같은 결과
+    expected, expected_events = step(mid_turn_state, mid_turn_state.current_scenario, 0, random.Random(5), graph)
+    resumed, resumed_events = step(restored, restored.current_scenario, 0, random.Random(5), graph)
+    assert resumed_events == expected_events
+    assert resumed.to_dict(graph) == expected.to_dict(graph)
+
+
+def test_session_format(graph, mid_turn_state):
+    payload = json.loads(zlib.decompress(encode_session(mid_turn_state, UI, graph)).decode('utf-8'))
+    assert payload['format'] == SESSION_FORMAT_VERSION
+    assert payload['ui'] == UI
+    records = {record[0]: record for record in payload['state']['choice_history']}
+    # 시나리오 파일의 선택지는 [ID, 번호, 년차, 기간]만, AI 시나리오와 자유 입력은 텍스트와 결과까지 저장
+    assert records['start'][:2] == ['start', 0] and len(records['start']) == 4
+    ai_records = [record for record in payload['state']['choice_history'] if record[0] == 'ai_generated']
+    assert [record[1] for record in ai_records[:2]] == [0, -1]
+    assert ai_records[0][4:] == ['수락한다', AI_SCENARIO['choices'][0]['result']]
+    assert ai_records[1][4] == '직원 간담회를 연다'
+    assert payload['state']['pending_turn'] == mid_turn_state.pending_turn
+
+
+def test_session_without_game_state(graph):
+    assert decode_session(encode_session(None, {'current_screen': 'welcome'}, graph), graph) == \
+        (None, {'current_screen': 'welcome'})
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'file'])
+def test_store_round_trip(tmp_path, graph, mid_turn_state, backend):
+    if backend == 'sqlite':
+        store = SQLiteSessionStore(str(tmp_path / 'sessions.sqlite3'))
+    else:
+        store = FileSessionStore(str(tmp_path / 'sessions'))
+    session_id = new_session_id()
+    assert store.load(session_id, graph) is None
+
+    store.save(session_id, mid_turn_state, UI, graph)
+    state, ui = store.load(session_id, graph)
+    assert state.to_dict(graph) == mid_turn_state.to_dict(graph)
+    assert ui == UI
+
+    # 읽을 수 없는 세션은 버림
+    store.put(session_id, b'not a session')
+    assert store.load(session_id, graph) is None
+    assert store.get(session_id) is None
+
+    # ttl이 지난 세션은 없는 것으로 취급
+    store.save(session_id, mid_turn_state, UI, graph)
+    store.ttl = -1
+    assert store.get(session_id) is None
+    store.close()
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_store_spec_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # 슬래시 세 개 뒤는 절대 경로
+    store = open_session_store(f"sqlite://{tmp_path}/db/sessions.sqlite3")
+    assert isinstance(store, SQLiteSessionStore)
+    assert store.path == f"{tmp_path}/db/sessions.sqlite3"
+    store = open_session_store(f"file://{tmp_path}/sessions")
+    assert isinstance(store, FileSessionStore)
+    assert store.directory == f"{tmp_path}/sessions"
+    # 슬래시 없이 쓰면 작업 디렉터리 기준 상대 경로
+    assert open_session_store('sqlite:koica_sessions.sqlite3').path == 'koica_sessions.sqlite3'
+    assert open_session_store('file:sessions').directory == 'sessions'
+    assert open_session_store('off') is None
+
+
+@pytest.mark.parametrize('spec', ['redis://localhost/0', 'sqlite://data/sessions.sqlite3', 'file:'])
+def test_invalid_store_spec(spec):
+    with pytest.raises(ValueError):
+        open_session_store(spec)